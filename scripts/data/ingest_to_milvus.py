@@ -1,3 +1,4 @@
+import asyncio
 import json
 import jsonlines
 import sys
@@ -13,6 +14,9 @@ script_dir = Path(__file__).parent.parent
 env_path = script_dir.parent / 'shopassist-api' / '.env'
 load_dotenv(dotenv_path=env_path)
 from shopassist_api.application.settings.config import settings
+from shopassist_api.application.services.keyword_index import build_keyword_index_file
+from shopassist_api.application.services.retrieval_cache import RetrievalCache
+from shopassist_api.infrastructure.services.redis_cache_service import RedisCacheService
 
 product_jsonl_file = "c:/personal/_ProductSupportAIAgent/datasets/product_data/amazon_50_with_transformers_embeddings.jsonl"
 knowledge_base_jsonl_file = "c:/personal/_ProductSupportAIAgent/ProductSupportAIAgent/scripts/knowledge_base_chunked/kb_with_embeddings.jsonl "
@@ -29,6 +33,13 @@ def load_jsonl(file_path: str):
             data.append(obj)
     return data
 
+async def invalidate_retrieval_cache(collections: list[str]):
+    """Move cached retrieval results and answers of the re-ingested collections to a new catalog version"""
+    cache = RetrievalCache(RedisCacheService())
+    for collection in collections:
+        token = await cache.invalidate(collection)
+        print(f"♻️ Retrieval cache for {collection} invalidated (catalog version {token})")
+
 def main( option: str):
     print("🚀 Starting Milvus ingestion...\n")
     
@@ -37,6 +48,7 @@ def main( option: str):
         host="localhost",  # Change to Azure DNS if deployed
         port="19530"
     )
+    ingested = []
     
     if option in ["products", "both"]:
         # 1. Ingest products
@@ -54,6 +66,12 @@ def main( option: str):
             total_inserted += count
         
         print(f"✅ Inserted {total_inserted} product chunks\n")
+        ingested.append("products")
+
+        # Keyword (BM25) index over the same chunks, used by hybrid search
+        print("🔤 Building keyword index...")
+        index_path = build_keyword_index_file(products)
+        print(f"✅ Keyword index saved to {index_path}\n")
 
     if option in ["knowledgebase", "both"]:
 
@@ -64,6 +82,7 @@ def main( option: str):
         
         count = milvus_service.insert_knowledge_base(kb_chunks)
         print(f"✅ Inserted {count} knowledge base chunks\n")
+        ingested.append("knowledge_base")
     
     if option in ["categories", "both"]:
         # 2. Ingest categories
@@ -74,6 +93,12 @@ def main( option: str):
         count = milvus_service.insert_categories(categories)
         print(f"✅ Inserted {count} categories\n")
 
+    if ingested and (settings.retrieval_cache_enabled or settings.semantic_cache_enabled):
+        try:
+            asyncio.run(invalidate_retrieval_cache(ingested))
+        except Exception as e:
+            print(f"⚠️ Could not invalidate retrieval cache: {e}")
+
     # 3. Print statistics
     print("📊 Collection Statistics:")
     
@@ -1,4 +1,7 @@
 import argparse
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
 
 from pymilvus import (
     connections,
@@ -9,18 +12,41 @@ from pymilvus import (
     utility
 )
 
-def create_products_collection():
-    """Create products collection with vector index"""
+sys.path.append('../../shopassist-api')
+# Load .env file from the correct location
+script_dir = Path(__file__).parent.parent
+env_path = script_dir.parent / 'shopassist-api' / '.env'
+load_dotenv(dotenv_path=env_path)
+from shopassist_api.application.settings.config import settings
+from shopassist_api.infrastructure.services.milvus_index_profiles import INDEX_PROFILES, build_index_params
+
+def create_products_collection(
+    name: str = "products_collection",
+    partition_key: bool = True,
+    scalar_indexes: bool = True,
+    num_partitions: int = 64,
+    index_profile: str = "hnsw",
+    dim: int = 768
+):
+    """
+    Create products collection with vector index
+
+    partition_key: use 'category' as partition key, so filters such as
+        "category in [...]" only search the matching partitions
+    scalar_indexes: add scalar indexes on 'price' (STL_SORT) and 'brand' (INVERTED)
+        so range/equality filters don't scan every row
+    index_profile: ANN index profile name (see milvus_index_profiles.INDEX_PROFILES)
+    """
     # Define fields
     fields = [
         FieldSchema(name="id", dtype=DataType.VARCHAR, is_primary=True, max_length=100),
         FieldSchema(name="product_id", dtype=DataType.VARCHAR, max_length=50),
         FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=5000),
         # Adjust dimension as needed. Use 1536 for OpenAI 'text-embedding-3-small' or 768 for MiniLM
-        FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=768),
+        FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=dim),
         FieldSchema(name="chunk_index", dtype=DataType.INT64),
         FieldSchema(name="total_chunks", dtype=DataType.INT64),
-        FieldSchema(name="category", dtype=DataType.VARCHAR, max_length=100),
+        FieldSchema(name="category", dtype=DataType.VARCHAR, max_length=100, is_partition_key=partition_key),
         FieldSchema(name="price", dtype=DataType.FLOAT),
         FieldSchema(name="brand", dtype=DataType.VARCHAR, max_length=100)
     ]
@@ -32,30 +58,44 @@ def create_products_collection():
     )
     
     # Create collection
-    collection = Collection(
-        name="products_collection",
-        schema=schema
-    )
-    
-    # Create HNSW index for vector field
-    index_params = {
-        "metric_type": "COSINE",  # or "L2", "IP"
-        "index_type": "HNSW",
-        "params": {
-            "M": 16,  # Max connections per layer
-            "efConstruction": 256  # Search depth during construction
-        }
-    }
+    if partition_key:
+        collection = Collection(
+            name=name,
+            schema=schema,
+            num_partitions=num_partitions
+        )
+    else:
+        collection = Collection(
+            name=name,
+            schema=schema
+        )
+    
+    # Create vector index from the profile (default HNSW, M=16, efConstruction=256)
+    index_params = build_index_params(index_profile, dim)
     
     collection.create_index(
         field_name="embedding",
         index_params=index_params
     )
-    
-    print(f"✅ Created collection: products_collection")
+
+    if scalar_indexes:
+        # Sorted index for price range filters
+        collection.create_index(
+            field_name="price",
+            index_name="price_index",
+            index_params={"index_type": "STL_SORT"}
+        )
+        # Inverted index for brand equality filters
+        collection.create_index(
+            field_name="brand",
+            index_name="brand_index",
+            index_params={"index_type": "INVERTED"}
+        )
+    
+    print(f"✅ Created collection: {name} (index={index_profile}, partition_key={partition_key}, scalar_indexes={scalar_indexes})")
     return collection
 
-def create_knowledge_base_collection():
+def create_knowledge_base_collection(index_profile: str = "hnsw", dim: int = 768):
     """Create knowledge base collection"""
     fields = [
         FieldSchema(name="id", dtype=DataType.VARCHAR, is_primary=True, max_length=100),
@@ -63,7 +103,7 @@ def create_knowledge_base_collection():
         FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=5000),
         FieldSchema(name="chunk_index", dtype=DataType.INT64),
         # Adjust dimension as needed. Use 1536 for OpenAI 'text-embedding-3-small' or 768 for MiniLM
-        FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=768), 
+        FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=dim), 
         FieldSchema(name="doc_type", dtype=DataType.VARCHAR, max_length=50)
     ]
     
@@ -78,21 +118,17 @@ def create_knowledge_base_collection():
     )
     
     # Create index
-    index_params = {
-        "metric_type": "COSINE",
-        "index_type": "HNSW",
-        "params": {"M": 16, "efConstruction": 256}
-    }
+    index_params = build_index_params(index_profile, dim)
     
     collection.create_index(
         field_name="embedding",
         index_params=index_params
     )
     
-    print(f"✅ Created collection: knowledge_base_collection")
+    print(f"✅ Created collection: knowledge_base_collection (index={index_profile})")
     return collection
 
-def create_categories_collection():
+def create_categories_collection(index_profile: str = "hnsw", dim: int = 1024):
     """Create categories collection"""
     fields = [
         FieldSchema(name="id", dtype=DataType.VARCHAR, is_primary=True, max_length=100),
@@ -100,8 +136,8 @@ def create_categories_collection():
         FieldSchema(name="full_name", dtype=DataType.VARCHAR, max_length=1000),
         # Adjust dimension as needed. Use 1024 for intfloat/e5-large-v2
         # Use 768 for sentence-transformers/multi-qa-mpnet-base-dot-v1
-        FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=1024), # Adjust dimension as needed
-        FieldSchema(name="full_embedding", dtype=DataType.FLOAT_VECTOR, dim=1024), # Adjust dimension as needed
+        FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=dim), # Adjust dimension as needed
+        FieldSchema(name="full_embedding", dtype=DataType.FLOAT_VECTOR, dim=dim), # Adjust dimension as needed
 
     ]
     
@@ -116,11 +152,7 @@ def create_categories_collection():
     )
 
         # Create index
-    index_params = {
-        "metric_type": "COSINE",
-        "index_type": "HNSW",
-        "params": {"M": 16, "efConstruction": 256}
-    }
+    index_params = build_index_params(index_profile, dim)
     
     collection.create_index(
         field_name="embedding",
@@ -132,13 +164,22 @@ def create_categories_collection():
         index_params=index_params
     )
 
-    print(f"✅ Created collection: categories_collection")
+    print(f"✅ Created collection: categories_collection (index={index_profile})")
     return collection
 
 def main():
 
     parser = argparse.ArgumentParser(description="Embedding Generation Script")
     parser.add_argument("option", type=str, help="Products, KnowledgeBase, Categories, or All")
+    parser.add_argument("--legacy-schema", action="store_true",
+                        help="Products without category partition key and scalar indexes")
+    parser.add_argument("--num-partitions", type=int, default=64, help="Partitions for the category partition key")
+    parser.add_argument("--products-index", type=str, default=settings.milvus_product_index_profile,
+                        choices=list(INDEX_PROFILES), help="Index profile for products_collection")
+    parser.add_argument("--knowledge-base-index", type=str, default=settings.milvus_knowledge_base_index_profile,
+                        choices=list(INDEX_PROFILES), help="Index profile for knowledge_base_collection")
+    parser.add_argument("--categories-index", type=str, default=settings.milvus_categories_index_profile,
+                        choices=list(INDEX_PROFILES), help="Index profile for categories_collection")
     args = parser.parse_args()
     option = args.option.lower()
     
@@ -157,20 +198,25 @@ def main():
         if utility.has_collection("products_collection"):
             utility.drop_collection("products_collection")
             print("Dropped existing products_collection")
-        create_products_collection()
+        create_products_collection(
+            partition_key=not args.legacy_schema,
+            scalar_indexes=not args.legacy_schema,
+            num_partitions=args.num_partitions,
+            index_profile=args.products_index
+        )
     
     if option in ["knowledgebase", "all"]:
         if utility.has_collection("knowledge_base_collection"):
             utility.drop_collection("knowledge_base_collection")
             print("Dropped existing knowledge_base_collection")
-        create_knowledge_base_collection()
+        create_knowledge_base_collection(index_profile=args.knowledge_base_index)
 
     if option in ["categories", "all"]:
         if utility.has_collection("categories_collection"):
             utility.drop_collection("categories_collection")
             print("Dropped existing categories_collection")
 
-        create_categories_collection()
+        create_categories_collection(index_profile=args.categories_index)
     
     # List collections
     collections = utility.list_collections()
@@ -0,0 +1,114 @@
+"""
+Agent prefetch mode benchmark: LLM calls and latency saved per intent
+
+Runs the policy, product discovery and product detail agents over the same
+queries twice:
+  - react:    the create_agent ReAct loop (a first LLM call decides the tool call,
+              a second one answers)
+  - prefetch: the tool runs directly from the query and one LLM call answers,
+              with the ReAct loop as fallback when the answer signals missing info
+and reports, per intent, LLM calls, latency and the prefetch fallback rate
+(AgentPrefetch.get_stats()).
+
+Usage:
+    python test_agent_prefetch.py
+    python test_agent_prefetch.py --repeat 3
+"""
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from pathlib import Path
+from dotenv import load_dotenv
+
+sys.path.append('../../shopassist-api')
+# Load .env file from the correct location
+script_dir = Path(__file__).parent.parent
+env_path = script_dir.parent / 'shopassist-api' / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from shopassist_api.application.agents.policy_agent import PolicyAgent
+from shopassist_api.application.agents.prefetch import AgentPrefetch
+from shopassist_api.application.agents.product_detail_agent import ProductDetailAgent
+from shopassist_api.application.agents.product_discovery_agent import ProductDiscoveryAgent
+from shopassist_api.application.prompts.agent_templates import PolicyTemplates, ProductDetailTemplates, ProductSearchTemplates
+
+RESULTS_FILE = Path(__file__).parent / "results" / "agent_prefetch.json"
+
+QUERIES = {
+    "policy": [
+        "what is the return policy",
+        "how long does shipping take",
+        "what does the warranty cover for laptops",
+    ],
+    "product_search": [
+        "wireless headphones under $100",
+        "laptop for video editing",
+        "bluetooth speaker for outdoor use",
+    ],
+    "product_detail": [
+        "what is the battery life of the Sony WH-1000XM5",
+        "does the Samsung z flip 5 have camera stabilization",
+        "what are the specs of the Dell XPS 13",
+    ],
+}
+
+
+def build_agents():
+    return {
+        "policy": (PolicyAgent(), PolicyTemplates.SYSTEM_PROMPT),
+        "product_search": (ProductDiscoveryAgent(), ProductSearchTemplates.SYSTEM_PROMPT_DISCOVERY),
+        "product_detail": (ProductDetailAgent(), ProductDetailTemplates.SYSTEM_PROMPT),
+    }
+
+
+async def run_mode(agents: dict, prefetch: bool, repeat: int) -> dict:
+    AgentPrefetch._stats = {}
+    for intent, (agent, system_prompt) in agents.items():
+        agent.prefetch = AgentPrefetch(intent, agent.llm, system_prompt) if prefetch else None
+        for _ in range(repeat):
+            for query in QUERIES[intent]:
+                # fresh session per query: no history, both modes see the same input
+                state = {"user_query": query, "session_Id": uuid.uuid4().hex[:12]}
+                if intent == "policy":
+                    await agent.ainvoke(input=state)
+                else:
+                    await agent.ainvoke(state=state)
+    return AgentPrefetch.get_stats()
+
+
+async def main(args):
+    agents = build_agents()
+    react = await run_mode(agents, prefetch=False, repeat=args.repeat)
+    prefetch = await run_mode(agents, prefetch=True, repeat=args.repeat)
+
+    results = {}
+    for intent in QUERIES:
+        baseline = react.get(intent, {})
+        stats = prefetch.get(intent, {})
+        runs = stats.get("prefetch_runs", 0) + stats.get("fallbacks", 0)
+        # Fallback runs also count their ReAct calls; prefetch runs make exactly one call
+        prefetch_calls = stats.get("prefetch_runs", 0) + stats.get("react_runs", 0) * (stats.get("avg_react_llm_calls") or 0) \
+            + stats.get("fallbacks", 0)
+        results[intent] = {
+            "react_avg_llm_calls": baseline.get("avg_react_llm_calls"),
+            "react_avg_ms": baseline.get("avg_react_ms"),
+            "prefetch_avg_llm_calls": round(prefetch_calls / runs, 2) if runs else None,
+            "prefetch_avg_ms": stats.get("avg_prefetch_ms"),
+            "fallback_rate": stats.get("fallback_rate"),
+        }
+        r = results[intent]
+        print(f"{intent:<16} react {r['react_avg_llm_calls']} calls {r['react_avg_ms'] or 0:>8.1f} ms | "
+              f"prefetch {r['prefetch_avg_llm_calls']} calls {r['prefetch_avg_ms'] or 0:>8.1f} ms | "
+              f"fallback rate {r['fallback_rate']}")
+
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_FILE.write_text(json.dumps({"repeat": args.repeat, "results": results}, indent=2))
+    print(f"\nSaved results to {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agent prefetch mode benchmark")
+    parser.add_argument("--repeat", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
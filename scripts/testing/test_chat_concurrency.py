@@ -0,0 +1,129 @@
+"""
+Concurrency benchmark for /api/v1/chat/message (or /api/v1/chat/orchestrate)
+
+Fires N concurrent chat requests (1/8/32 by default) against a running API and
+reports throughput and latency percentiles. Run it once against the build
+before a change (--label before) and once after (--label after); results are
+appended to the same JSON file and printed side by side.
+
+Usage:
+    python test_chat_concurrency.py --label before
+    python test_chat_concurrency.py --label after --levels 1 8 32 --requests 64
+    python test_chat_concurrency.py --label orchestrate --endpoint orchestrate
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+BASE_URL = "http://localhost:8000"
+ENDPOINT = "message"
+RESULTS_FILE = Path(__file__).parent / "results" / "chat_concurrency.json"
+
+QUERIES = [
+    "wireless headphones under $100",
+    "what is the return policy",
+    "smartphone with good camera",
+    "how long does shipping take",
+    "laptop for video editing",
+    "warranty for electronics",
+    "Sony cameras",
+    "bluetooth speaker for outdoor use",
+]
+
+
+async def send_message(client: httpx.AsyncClient, query: str) -> tuple[float, int]:
+    """Send a single chat message, return (latency_ms, status_code)"""
+    start = time.perf_counter()
+    try:
+        response = await client.post(
+            f"{BASE_URL}/api/v1/chat/{ENDPOINT}",
+            json={"message": query, "session_id": uuid.uuid4().hex[:12]},
+        )
+        status = response.status_code
+    except httpx.HTTPError:
+        status = 0
+    return (time.perf_counter() - start) * 1000, status
+
+
+async def run_level(concurrency: int, total_requests: int, timeout: float) -> dict:
+    """Run total_requests with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(timeout=timeout) as client:
+
+        async def worker(i: int):
+            nonlocal errors
+            async with semaphore:
+                latency, status = await send_message(client, QUERIES[i % len(QUERIES)])
+                if status != 200:
+                    errors += 1
+                latencies.append(latency)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker(i) for i in range(total_requests)])
+        elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total_requests / elapsed, 3),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+    }
+
+
+def save_results(label: str, results: list[dict]) -> dict:
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    all_results = {}
+    if RESULTS_FILE.exists():
+        all_results = json.loads(RESULTS_FILE.read_text())
+    all_results[label] = results
+    RESULTS_FILE.write_text(json.dumps(all_results, indent=2))
+    return all_results
+
+
+def print_comparison(all_results: dict):
+    print(f"\n{'label':<10} {'conc':>5} {'rps':>8} {'p50 ms':>10} {'p99 ms':>10} {'errors':>7}")
+    for label, results in all_results.items():
+        for r in results:
+            print(f"{label:<10} {r['concurrency']:>5} {r['throughput_rps']:>8} "
+                  f"{r['p50_ms']:>10} {r['p99_ms']:>10} {r['errors']:>7}")
+
+
+async def main():
+    global BASE_URL, ENDPOINT
+    parser = argparse.ArgumentParser(description="Chat endpoint concurrency benchmark")
+    parser.add_argument("--label", type=str, default="after", help="Label for this run, e.g. before/after")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=32, help="Requests per concurrency level")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--base-url", type=str, default=BASE_URL)
+    parser.add_argument("--endpoint", type=str, default=ENDPOINT, choices=["message", "orchestrate"])
+    args = parser.parse_args()
+    BASE_URL = args.base_url
+    ENDPOINT = args.endpoint
+
+    results = []
+    for level in args.levels:
+        print(f"🚀 Running {args.requests} requests at concurrency {level}...")
+        result = await run_level(level, max(args.requests, level), args.timeout)
+        print(f"   {result}")
+        results.append(result)
+
+    all_results = save_results(args.label, results)
+    print_comparison(all_results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+"""
+Time-to-first-token benchmark for the streaming chat endpoints
+
+For each query, calls the blocking endpoint (/chat/message or /chat/orchestrate)
+and its SSE variant (/chat/message/stream or /chat/orchestrate/stream) against a
+running API, and reports:
+  - blocking: time until the full response arrives
+  - stream:   time to the sources event, to the first token, and to the metadata event
+
+Usage:
+    python test_chat_streaming.py
+    python test_chat_streaming.py --endpoint orchestrate --repeat 3
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+BASE_URL = "http://localhost:8000"
+RESULTS_FILE = Path(__file__).parent / "results" / "chat_streaming.json"
+
+QUERIES = [
+    "what is the return policy",
+    "wireless headphones under $100",
+    "how long does shipping take",
+    "return policy for headphones and show me Sony headphones under $100",
+]
+
+
+async def blocking_latency(client: httpx.AsyncClient, endpoint: str, query: str) -> float:
+    start = time.perf_counter()
+    response = await client.post(f"{BASE_URL}/api/v1/chat/{endpoint}",
+                                 json={"message": query, "session_id": uuid.uuid4().hex[:12]})
+    response.raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+async def stream_timings(client: httpx.AsyncClient, endpoint: str, query: str) -> dict:
+    """Milliseconds from request to the first sources/token event and to the metadata event"""
+    timings = {"sources_ms": None, "ttft_ms": None, "total_ms": None, "tokens": 0}
+    start = time.perf_counter()
+    event = None
+    async with client.stream("POST", f"{BASE_URL}/api/v1/chat/{endpoint}/stream",
+                             json={"message": query, "session_id": uuid.uuid4().hex[:12]}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            elapsed = (time.perf_counter() - start) * 1000
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                if event == "sources" and timings["sources_ms"] is None:
+                    timings["sources_ms"] = elapsed
+                elif event == "token":
+                    timings["tokens"] += 1
+                    if timings["ttft_ms"] is None:
+                        timings["ttft_ms"] = elapsed
+                elif event == "metadata":
+                    timings["total_ms"] = elapsed
+                elif event == "error":
+                    raise RuntimeError(json.loads(line[len("data: "):]))
+    return timings
+
+
+def summarize(values: list) -> dict:
+    values = [v for v in values if v is not None]
+    if not values:
+        return {}
+    return {"p50_ms": round(float(np.percentile(values, 50)), 1), "p95_ms": round(float(np.percentile(values, 95)), 1)}
+
+
+async def main(args):
+    blocking, streams = [], []
+    async with httpx.AsyncClient(timeout=args.timeout) as client:
+        for _ in range(args.repeat):
+            for query in QUERIES:
+                blocking.append(await blocking_latency(client, args.endpoint, query))
+                timings = await stream_timings(client, args.endpoint, query)
+                streams.append(timings)
+                print(f"{query[:50]:<52} blocking {blocking[-1]:>8.1f} ms | sources {timings['sources_ms'] or 0:>8.1f} "
+                      f"ttft {timings['ttft_ms'] or 0:>8.1f} total {timings['total_ms'] or 0:>8.1f} ms")
+
+    results = {
+        "endpoint": args.endpoint,
+        "blocking_total": summarize(blocking),
+        "stream_sources": summarize([t["sources_ms"] for t in streams]),
+        "stream_ttft": summarize([t["ttft_ms"] for t in streams]),
+        "stream_total": summarize([t["total_ms"] for t in streams]),
+    }
+    print(json.dumps(results, indent=2))
+
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_FILE.write_text(json.dumps(results, indent=2))
+    print(f"Saved results to {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming chat time-to-first-token benchmark")
+    parser.add_argument("--endpoint", type=str, default="message", choices=["message", "orchestrate"])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--base-url", type=str, default=BASE_URL)
+    args = parser.parse_args()
+    BASE_URL = args.base_url
+    asyncio.run(main(args))
@@ -0,0 +1,92 @@
+"""
+Checkpoint growth of a long product conversation
+
+Plays a multi-turn conversation through ProductDiscoveryAgent (ReAct loop, prefetch
+disabled) in one session and reports per turn:
+  - messages in the session thread after the turn (bounded by trim_thread_messages)
+  - checkpoint versions stored for the thread ('full' mode keeps every version
+    until the TTL; 'shallow' keeps one)
+  - CheckpointStore read/write latency and checkpoint size
+Run it with AGENT_CHECKPOINT_MODE=shallow and =full to compare.
+
+Usage:
+    python test_checkpoint_growth.py
+    python test_checkpoint_growth.py --turns 20
+"""
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from pathlib import Path
+from dotenv import load_dotenv
+
+sys.path.append('../../shopassist-api')
+# Load .env file from the correct location
+script_dir = Path(__file__).parent.parent
+env_path = script_dir.parent / 'shopassist-api' / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from shopassist_api.application.agents.checkpointing import CheckpointStore
+from shopassist_api.application.agents.product_discovery_agent import ProductDiscoveryAgent
+from shopassist_api.application.interfaces.di_container import get_checkpoint_store
+from shopassist_api.application.settings.config import settings
+
+RESULTS_FILE = Path(__file__).parent / "results" / f"checkpoint_growth_{settings.agent_checkpoint_mode}.json"
+
+QUERIES = [
+    "wireless headphones under $100",
+    "show me some with noise cancelling",
+    "laptop for video editing",
+    "something lighter",
+    "bluetooth speaker for outdoor use",
+    "a waterproof one",
+    "4k smart TV with HDMI 2.1",
+    "a bigger screen",
+    "smartphone with a good camera",
+    "one with longer battery life",
+]
+
+
+async def count_versions(saver, session_id: str) -> int:
+    config = {"configurable": {"thread_id": session_id, "checkpoint_ns": ""}}
+    return len([item async for item in saver.alist(config)])
+
+
+async def main(args):
+    settings.agent_prefetch_enabled = False
+    settings.agent_checkpoint_size_sample_every = 1
+    store = get_checkpoint_store()
+    await store.open()
+    saver = await store.get_saver()
+    agent = ProductDiscoveryAgent()
+    session_id = uuid.uuid4().hex[:12]
+
+    rows = []
+    for turn in range(args.turns):
+        query = QUERIES[turn % len(QUERIES)]
+        response = await agent.ainvoke({"user_query": query, "session_Id": session_id})
+        thread = await agent.agent.aget_state({"configurable": {"thread_id": session_id}})
+        stats = CheckpointStore.get_stats()
+        rows.append({
+            "turn": turn + 1,
+            "thread_messages": len(thread.values.get("messages", [])),
+            "checkpoint_versions": await count_versions(saver, session_id),
+            "input_tokens": response.metadata.input_token,
+            "max_checkpoint_bytes": stats["max_checkpoint_bytes"],
+            "avg_read_ms": stats["avg_read_ms"],
+            "avg_write_ms": stats["avg_write_ms"],
+        })
+        print(json.dumps(rows[-1]))
+
+    results = {"mode": settings.agent_checkpoint_mode, "turns": rows, "stats": CheckpointStore.get_stats()}
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_FILE.write_text(json.dumps(results, indent=2))
+    print(f"Saved results to {RESULTS_FILE}")
+    await store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Checkpoint thread size and versions per turn")
+    parser.add_argument("--turns", type=int, default=len(QUERIES))
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,96 @@
+"""
+Prompt tokens per turn of a long conversation: rolling summary vs full history
+
+Plays the same multi-turn conversation through RAGService.generate_answer twice,
+in a fresh session each time:
+  - full:    SessionManager without summarizer (the raw history is formatted into prompts)
+  - summary: ConversationSummarizer on; the background refresh scheduled after
+             each answer is awaited before the next turn
+and reports the prompt tokens billed per turn. With the summary the history part
+of the prompt stops growing once the conversation is longer than the verbatim window.
+
+Usage:
+    python test_conversation_summary.py
+    python test_conversation_summary.py --turns 12
+"""
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from pathlib import Path
+from dotenv import load_dotenv
+
+sys.path.append('../../shopassist-api')
+# Load .env file from the correct location
+script_dir = Path(__file__).parent.parent
+env_path = script_dir.parent / 'shopassist-api' / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from shopassist_api.application.interfaces.di_container import get_conversation_summarizer, get_rag_service
+from shopassist_api.application.services.conversation_summarizer import ConversationSummarizer
+
+RESULTS_FILE = Path(__file__).parent / "results" / "conversation_summary.json"
+
+CONVERSATION = [
+    "I'm looking for a laptop for video editing",
+    "my budget is around $1500",
+    "which of those has the best screen?",
+    "does it have a dedicated graphics card?",
+    "what about battery life?",
+    "can you show me some headphones for editing too?",
+    "I prefer over-ear ones",
+    "which is the lightest?",
+    "what is your return policy for laptops?",
+    "and for headphones?",
+    "go back to the laptops, which one had the most RAM?",
+    "ok, what warranty does that one have?",
+]
+
+
+async def run_mode(rag, mode: str, summarizer: ConversationSummarizer, turns: int) -> list:
+    session_manager = rag.session_manager
+    session_manager.summarizer = summarizer if mode == "summary" else None
+    session_id = uuid.uuid4().hex[:12]
+    prompt_tokens = []
+    for query in CONVERSATION[:turns]:
+        result = await rag.generate_answer(user_id="benchmark", query=query, session_id=session_id)
+        tokens = result["metadata"].get("tokens") or {}
+        prompt_tokens.append(tokens.get("prompt", 0) if isinstance(tokens, dict) else 0)
+        # Wait for the background refresh scheduled by add_message so the next turn sees it
+        task = summarizer._tasks.get(session_id)
+        if task is not None:
+            await task
+        print(f"[{mode:<7}] turn {len(prompt_tokens):>2}  {prompt_tokens[-1]:>6} prompt tokens  {query}")
+    return prompt_tokens
+
+
+async def main(args):
+    rag = get_rag_service()
+    summarizer = get_conversation_summarizer()
+    if summarizer is None:
+        print("Conversation summary is disabled (CONVERSATION_SUMMARY_ENABLED=false)")
+        return
+    original = rag.session_manager.summarizer
+
+    results = {}
+    for mode in ("full", "summary"):
+        per_turn = await run_mode(rag, mode, summarizer, args.turns)
+        results[mode] = {
+            "prompt_tokens_per_turn": per_turn,
+            "total_prompt_tokens": sum(per_turn),
+            "last_turn_prompt_tokens": per_turn[-1] if per_turn else 0,
+        }
+    rag.session_manager.summarizer = original
+    results["summary_stats"] = ConversationSummarizer.get_stats()
+    print(json.dumps(results, indent=2))
+
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_FILE.write_text(json.dumps(results, indent=2))
+    print(f"Saved results to {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prompt tokens per turn with and without the rolling conversation summary")
+    parser.add_argument("--turns", type=int, default=len(CONVERSATION))
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,123 @@
+"""
+Cosmos DB concurrency benchmark: blocking sync SDK vs async SDK (CosmosProductService)
+
+Runs the same workload (conversation history reads + product lookups) with N
+concurrent tasks on one event loop, the way FastAPI serves requests:
+  - sync:  azure.cosmos.CosmosClient + list(container.query_items(...)) inside
+           coroutines (the previous repository implementation)
+  - async: CosmosProductService on azure.cosmos.aio
+A probe task sleeps 10 ms in a loop and records how late it wakes up: with the
+sync SDK every round trip stalls the loop, so the probe lag grows with the
+round-trip time and requests are served one at a time.
+
+Usage:
+    python test_cosmos_concurrency.py --session-id <existing session> --product-ids id1 id2 id3
+    python test_cosmos_concurrency.py --session-id <id> --product-ids id1 id2 --concurrency 32 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+import numpy as np
+
+sys.path.append('../../shopassist-api')
+# Load .env file from the correct location
+script_dir = Path(__file__).parent.parent
+env_path = script_dir.parent / 'shopassist-api' / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from azure.cosmos import CosmosClient
+from shopassist_api.application.settings.config import settings
+from shopassist_api.infrastructure.services.azure_credential_manager import get_credential_manager
+from shopassist_api.infrastructure.services.cosmos_product_service import CosmosProductService
+
+RESULTS_FILE = Path(__file__).parent / "results" / "cosmos_concurrency.json"
+PROBE_INTERVAL_S = 0.01
+
+
+class SyncRepository:
+    """The previous blocking implementation of the two benchmarked calls"""
+
+    def __init__(self):
+        client = CosmosClient(url=settings.cosmosdb_endpoint,
+                              credential=get_credential_manager().get_cosmos_credential())
+        database = client.get_database_client(settings.cosmosdb_database)
+        self.products = database.get_container_client(settings.cosmosdb_product_container)
+        self.messages = database.get_container_client(settings.cosmosdb_messages_container)
+
+    async def get_conversation_history(self, session_id: str):
+        query = "SELECT c.role, c.content, c.timestamp, c.metadata FROM c WHERE c.session_id = @session_id ORDER BY c.timestamp ASC"
+        return list(self.messages.query_items(query=query, parameters=[{"name": "@session_id", "value": session_id}],
+                                              enable_cross_partition_query=True))
+
+    async def get_products_by_ids(self, product_ids):
+        query = "SELECT * FROM c WHERE ARRAY_CONTAINS(@ids, c.id)"
+        return list(self.products.query_items(query=query, parameters=[{"name": "@ids", "value": product_ids}],
+                                              enable_cross_partition_query=True))
+
+
+async def probe(stop: asyncio.Event, lags: list):
+    """Measure how late the event loop wakes a 10 ms sleeper"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL_S)
+        lags.append((time.perf_counter() - start - PROBE_INTERVAL_S) * 1000)
+
+
+async def run_workload(repository, session_id: str, product_ids: list, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, lags = [], []
+
+    async def one_request():
+        async with semaphore:
+            start = time.perf_counter()
+            await repository.get_conversation_history(session_id)
+            await repository.get_products_by_ids(product_ids)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe_task
+
+    return {
+        "requests_per_s": round(requests / elapsed, 2),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "loop_lag_p95_ms": round(float(np.percentile(lags, 95)), 2) if lags else None,
+        "loop_lag_max_ms": round(float(max(lags)), 2) if lags else None,
+    }
+
+
+async def main(args):
+    results = {}
+    repositories = {"sync": SyncRepository(), "async": CosmosProductService()}
+    for mode in args.modes:
+        repository = repositories[mode]
+        await run_workload(repository, args.session_id, args.product_ids, min(10, args.requests), args.concurrency)  # warm up
+        results[mode] = await run_workload(repository, args.session_id, args.product_ids, args.requests, args.concurrency)
+        print(f"{mode:<6} {results[mode]}")
+    await CosmosProductService.close()
+
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_FILE.write_text(json.dumps({
+        "requests": args.requests, "concurrency": args.concurrency, "results": results
+    }, indent=2))
+    print(f"\nSaved results to {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cosmos DB sync vs async concurrency benchmark")
+    parser.add_argument("--session-id", type=str, required=True)
+    parser.add_argument("--product-ids", type=str, nargs="+", required=True)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--modes", type=str, nargs="+", default=["sync", "async"], choices=["sync", "async"])
+    asyncio.run(main(parser.parse_args()))
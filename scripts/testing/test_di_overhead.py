@@ -0,0 +1,82 @@
+"""
+DI container benchmark: per-request service construction vs lifecycle-scoped singletons
+
+Resolves what one chat request resolves (the RAG service for the endpoint plus
+the retrieval service used by the agent tools) with two containers:
+  - transient: every resolution builds the service graph (the previous behaviour:
+               OpenAILLMService x2 with tiktoken, Cosmos/Milvus/Redis services,
+               RetrievalService, embedding wrappers, ...)
+  - singleton: the graph is built once at startup and reused
+
+Usage:
+    python test_di_overhead.py
+    python test_di_overhead.py --requests 500
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from dotenv import load_dotenv
+
+import numpy as np
+
+sys.path.append('../../shopassist-api')
+# Load .env file from the correct location
+script_dir = Path(__file__).parent.parent
+env_path = script_dir.parent / 'shopassist-api' / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from shopassist_api.application.interfaces.di_container import DIContainer, Scope
+from shopassist_api.application.services.rag_service import RAGService
+from shopassist_api.application.services.retrieval_service import RetrievalService
+
+RESULTS_FILE = Path(__file__).parent / "results" / "di_overhead.json"
+
+
+def resolve_request(container: DIContainer):
+    """The services resolved while serving one chat request"""
+    container.get_service(RAGService)
+    container.get_service(RetrievalService)  # agent tool
+
+
+def run(container: DIContainer, requests: int) -> dict:
+    resolve_request(container)  # warm up (startup for the singleton container)
+    latencies = []
+    tracemalloc.start()
+    for _ in range(requests):
+        start = time.perf_counter()
+        resolve_request(container)
+        latencies.append((time.perf_counter() - start) * 1000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "mean_ms": round(float(np.mean(latencies)), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 4),
+        "peak_alloc_kb": round(peak / 1024, 1),
+    }
+
+
+def main(args):
+    results = {
+        "transient": run(DIContainer(scope_override=Scope.TRANSIENT), args.requests),
+        "singleton": run(DIContainer(), args.requests),
+    }
+    for mode, result in results.items():
+        print(f"{mode:<10} {result}")
+    saved = results["transient"]["mean_ms"] - results["singleton"]["mean_ms"]
+    print(f"\nConstruction overhead removed per request: {saved:.3f} ms")
+
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_FILE.write_text(json.dumps({
+        "requests": args.requests, "saved_ms_per_request": round(saved, 4), "results": results
+    }, indent=2))
+    print(f"Saved results to {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DI per-request construction overhead benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    main(parser.parse_args())
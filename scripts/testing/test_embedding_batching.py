@@ -0,0 +1,91 @@
+"""
+Benchmark micro-batched vs per-call embeddings under concurrent load
+
+Simulates N concurrent sessions each calling generate_embedding and reports
+embeddings/sec and p50/p99 latency with batching disabled and enabled.
+
+Usage:
+    python test_embedding_batcher.py --sessions 20 --requests 10
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+import numpy as np
+
+sys.path.append('../../shopassist-api')
+# Load .env file from the correct location
+script_dir = Path(__file__).parent.parent
+env_path = script_dir.parent / 'shopassist-api' / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from shopassist_api.application.settings.config import settings
+from shopassist_api.infrastructure.services.embedding_batcher import EmbeddingBatcher
+from shopassist_api.infrastructure.services.transformers_embedding_service import TransformersEmbeddingService
+
+QUERIES = [
+    "wireless headphones under $100",
+    "smartphone with good camera",
+    "laptop for video editing",
+    "bluetooth speaker for outdoor use",
+    "case for Samsung z flip",
+    "what is the return policy",
+]
+
+
+async def run(service: TransformersEmbeddingService, sessions: int, requests_per_session: int) -> dict:
+    latencies = []
+
+    async def session(session_idx: int):
+        for i in range(requests_per_session):
+            query = f"{QUERIES[(session_idx + i) % len(QUERIES)]} {session_idx}"
+            start = time.perf_counter()
+            await service.generate_embedding(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[session(s) for s in range(sessions)])
+    elapsed = time.perf_counter() - start
+    total = sessions * requests_per_session
+    return {
+        "embeddings": total,
+        "embeddings_per_sec": round(total / elapsed, 2),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Embedding micro-batching benchmark")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--max-batch", type=int, default=settings.embedding_batch_max_size)
+    parser.add_argument("--max-wait-ms", type=float, default=settings.embedding_batch_max_wait_ms)
+    args = parser.parse_args()
+
+    service = TransformersEmbeddingService(model_name=settings.transformers_embedding_model)
+    await service.generate_embedding("warmup")
+
+    # Per-call encodes
+    service.batcher = None
+    unbatched = await run(service, args.sessions, args.requests)
+    print(f"🐢 Per-call : {unbatched}")
+
+    # Micro-batched encodes
+    model = service.model
+    service.batcher = EmbeddingBatcher(
+        encode_fn=lambda texts: model.encode(texts, convert_to_tensor=False),
+        max_batch_size=args.max_batch,
+        max_wait_ms=args.max_wait_ms,
+        name="benchmark"
+    )
+    batched = await run(service, args.sessions, args.requests)
+    print(f"🚀 Batched  : {batched}")
+    print(f"   Batcher stats: {service.batcher.get_stats()}")
+    await service.batcher.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,211 @@
+"""
+Filtered product search benchmark: legacy schema vs category partition key + scalar indexes
+
+Loads the product chunks JSONL used by ingest_to_milvus.py into two temporary
+collections:
+  - legacy:      no partition key, no scalar indexes, filters as
+                 "(category == 'a' or category == 'b') and price <= 500"
+  - partitioned: 'category' partition key, STL_SORT on price, INVERTED on brand,
+                 filters as "category in {categories} and price <= {max_price}"
+                 with expr_params
+and runs the same filtered queries against both. Recall@k is measured against
+an exact (brute force) filtered search over the same vectors.
+
+Usage:
+    python test_filtered_search.py --products-file <product chunks jsonl>
+    python test_filtered_search.py --queries 200 --top-k 5 --keep
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+import jsonlines
+import numpy as np
+
+sys.path.append('../../shopassist-api')
+sys.path.append('../deployment')
+# Load .env file from the correct location
+script_dir = Path(__file__).parent.parent
+env_path = script_dir.parent / 'shopassist-api' / '.env'
+load_dotenv(dotenv_path=env_path)
+from pymilvus import connections, utility
+from shopassist_api.application.settings.config import settings
+from create_milvus_collections import create_products_collection
+
+RESULTS_FILE = Path(__file__).parent / "results" / "filtered_search.json"
+OUTPUT_FIELDS = ["product_id", "category", "price", "brand"]
+
+
+def load_products(file_path: str) -> list[dict]:
+    with jsonlines.open(file_path, 'r') as reader:
+        return list(reader)
+
+
+def legacy_filter_expression(filters: dict) -> str:
+    """Filter expression as built before the parameterised templates"""
+    expressions = []
+    if "max_price" in filters:
+        expressions.append(f"price <= {filters['max_price']}")
+    if "categories" in filters:
+        category_expr = " or ".join([f"category == '{cat}'" for cat in filters['categories']])
+        expressions.append(f"({category_expr})")
+    if "brand" in filters:
+        expressions.append(f"brand == '{filters['brand']}'")
+    return " and ".join(expressions)
+
+
+def template_filter_expression(filters: dict) -> tuple[str, dict]:
+    """Same filters as a template + params (RetrievalService._build_filter_expression)"""
+    expressions, params = [], {}
+    if "max_price" in filters:
+        expressions.append("price <= {max_price}")
+        params["max_price"] = float(filters["max_price"])
+    if "categories" in filters:
+        expressions.append("category in {categories}")
+        params["categories"] = filters["categories"]
+    if "brand" in filters:
+        expressions.append("brand == {brand}")
+        params["brand"] = filters["brand"]
+    return " and ".join(expressions), params
+
+
+def matches(product: dict, filters: dict) -> bool:
+    if "max_price" in filters and product["price"] > filters["max_price"]:
+        return False
+    if "categories" in filters and product["category"] not in filters["categories"]:
+        return False
+    if "brand" in filters and product["brand"] != filters["brand"]:
+        return False
+    return True
+
+
+def build_workload(products: list[dict], num_queries: int, seed: int = 7) -> list[dict]:
+    """Queries are perturbed product vectors with filters drawn from the catalog"""
+    rng = random.Random(seed)
+    categories = sorted({p["category"] for p in products})
+    brands = sorted({p["brand"] for p in products})
+    prices = sorted(p["price"] for p in products)
+    workload = []
+    for _ in range(num_queries):
+        source = rng.choice(products)
+        vector = np.asarray(source["embedding"], dtype=np.float32)
+        vector = vector + np.random.default_rng(rng.randint(0, 1 << 30)).normal(0, 0.02, vector.shape).astype(np.float32)
+        filters = {"categories": rng.sample(categories, k=min(len(categories), rng.randint(1, 3)))}
+        if rng.random() < 0.5:
+            filters["max_price"] = float(prices[rng.randint(len(prices) // 4, len(prices) - 1)])
+        if rng.random() < 0.2:
+            filters["brand"] = source["brand"]
+            filters["categories"] = list({*filters["categories"], source["category"]})
+        workload.append({"vector": vector.tolist(), "filters": filters})
+    return workload
+
+
+def exact_top_k(matrix: np.ndarray, products: list[dict], query: list[float], filters: dict, top_k: int) -> set:
+    candidates = np.asarray([i for i, p in enumerate(products) if matches(p, filters)], dtype=np.int64)
+    if candidates.size == 0:
+        return set()
+    q = np.asarray(query, dtype=np.float32)
+    scores = matrix[candidates] @ (q / np.linalg.norm(q))
+    top = candidates[np.argsort(-scores)[:top_k]]
+    return {products[i]["id"] for i in top}
+
+
+def populate(collection, products: list[dict], batch_size: int = 500):
+    for i in range(0, len(products), batch_size):
+        batch = products[i:i + batch_size]
+        collection.insert([
+            [p["id"] for p in batch],
+            [p["product_id"] for p in batch],
+            [p["text"][:5000] for p in batch],
+            [p["embedding"] for p in batch],
+            [p["chunk_index"] for p in batch],
+            [p["total_chunks"] for p in batch],
+            [p["category"] for p in batch],
+            [p["price"] for p in batch],
+            [p["brand"] for p in batch],
+        ])
+    collection.flush()
+    collection.load()
+
+
+def run(collection, workload: list[dict], truth: list[set], top_k: int, templated: bool) -> dict:
+    search_params = {"metric_type": "COSINE", "params": {"ef": settings.milvus_product_search_ef}}
+    latencies, recalls = [], []
+    for item, expected in zip(workload, truth):
+        if templated:
+            expr, params = template_filter_expression(item["filters"])
+            kwargs = {"expr": expr, "expr_params": params}
+        else:
+            kwargs = {"expr": legacy_filter_expression(item["filters"])}
+        start = time.perf_counter()
+        hits = collection.search(
+            data=[item["vector"]],
+            anns_field="embedding",
+            param=search_params,
+            limit=top_k,
+            output_fields=OUTPUT_FIELDS,
+            consistency_level="Strong",
+            **kwargs
+        )[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        if expected:
+            recalls.append(len({hit.id for hit in hits} & expected) / len(expected))
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "recall_at_k": round(float(np.mean(recalls)), 4) if recalls else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Filtered search benchmark")
+    parser.add_argument("--products-file", type=str, default=settings.local_vector_products_file)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--num-partitions", type=int, default=64)
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark collections")
+    args = parser.parse_args()
+
+    connections.connect(alias="default", host=settings.milvus_host, port=settings.milvus_port)
+    products = load_products(args.products_file)
+    print(f"Loaded {len(products)} product chunks")
+
+    matrix = np.asarray([p["embedding"] for p in products], dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    workload = build_workload(products, args.queries)
+    truth = [exact_top_k(matrix, products, w["vector"], w["filters"], args.top_k) for w in workload]
+
+    schemas = {
+        "legacy": {"partition_key": False, "scalar_indexes": False, "templated": False},
+        "partitioned": {"partition_key": True, "scalar_indexes": True, "templated": True},
+    }
+    results = {}
+    for label, schema in schemas.items():
+        name = f"products_bench_{label}"
+        if utility.has_collection(name):
+            utility.drop_collection(name)
+        collection = create_products_collection(
+            name=name,
+            partition_key=schema["partition_key"],
+            scalar_indexes=schema["scalar_indexes"],
+            num_partitions=args.num_partitions
+        )
+        populate(collection, products)
+        run(collection, workload[:10], truth[:10], args.top_k, schema["templated"])  # warm up
+        results[label] = run(collection, workload, truth, args.top_k, schema["templated"])
+        print(f"{label:<12} {results[label]}")
+        if not args.keep:
+            utility.drop_collection(name)
+
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_FILE.write_text(json.dumps({"queries": args.queries, "top_k": args.top_k, "results": results}, indent=2))
+    print(f"\nSaved results to {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    main()
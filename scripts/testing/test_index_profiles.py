@@ -0,0 +1,162 @@
+"""
+ANN index profile benchmark: memory, build time, latency and recall@k
+
+Builds every index profile (milvus_index_profiles.INDEX_PROFILES) over the
+product chunks JSONL used by ingest_to_milvus.py and reports, per profile:
+  - loaded memory (sum of query segment mem_size)
+  - index build time
+  - p50/p99 search latency
+  - recall@k against exact (brute force) cosine search
+
+--scale N grows the catalog with N jittered copies of every vector to see how
+the profiles behave past the 100-product sample.
+
+Usage:
+    python test_index_profiles.py --products-file <product chunks jsonl>
+    python test_index_profiles.py --profiles hnsw ivf_sq8 --scale 20 --queries 200
+"""
+import argparse
+import json
+import sys
+import time
+import uuid
+from pathlib import Path
+from dotenv import load_dotenv
+
+import jsonlines
+import numpy as np
+
+sys.path.append('../../shopassist-api')
+sys.path.append('../deployment')
+# Load .env file from the correct location
+script_dir = Path(__file__).parent.parent
+env_path = script_dir.parent / 'shopassist-api' / '.env'
+load_dotenv(dotenv_path=env_path)
+from pymilvus import connections, utility
+from shopassist_api.application.settings.config import settings
+from shopassist_api.infrastructure.services.milvus_index_profiles import (
+    INDEX_PROFILES, build_index_params, build_search_params, get_index_profile
+)
+from create_milvus_collections import create_products_collection
+
+RESULTS_FILE = Path(__file__).parent / "results" / "index_profiles.json"
+
+
+def load_vectors(file_path: str, scale: int, seed: int = 7) -> np.ndarray:
+    with jsonlines.open(file_path, 'r') as reader:
+        vectors = np.asarray([record["embedding"] for record in reader], dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    copies = [vectors] + [vectors + rng.normal(0, 0.05, vectors.shape).astype(np.float32) for _ in range(scale - 1)]
+    vectors = np.concatenate(copies)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def populate(collection, vectors: np.ndarray, batch_size: int = 1000) -> list[str]:
+    """Insert synthetic rows (only the vector matters for this benchmark)"""
+    ids = [uuid.uuid4().hex for _ in range(len(vectors))]
+    for i in range(0, len(vectors), batch_size):
+        n = len(vectors[i:i + batch_size])
+        collection.insert([
+            ids[i:i + batch_size],
+            [f"p{j}" for j in range(i, i + n)],
+            [""] * n,
+            vectors[i:i + batch_size].tolist(),
+            [0] * n,
+            [1] * n,
+            ["bench"] * n,
+            [0.0] * n,
+            ["bench"] * n,
+        ])
+    collection.flush()
+    return ids
+
+
+def loaded_memory_mb(name: str) -> float:
+    segments = utility.get_query_segment_info(name)
+    return sum(segment.mem_size for segment in segments) / (1024 * 1024)
+
+
+def benchmark_profile(profile: str, vectors: np.ndarray, queries: np.ndarray, truth: list[set],
+                      top_k: int, ef: int, nprobe: int) -> dict:
+    name = f"products_bench_{profile}"
+    if utility.has_collection(name):
+        utility.drop_collection(name)
+    dim = vectors.shape[1]
+
+    # Create with the default index, then time the profile's index build separately
+    collection = create_products_collection(name=name, partition_key=False, scalar_indexes=False,
+                                            index_profile="hnsw", dim=dim)
+    row_ids = populate(collection, vectors)
+    collection.release()
+    collection.drop_index()
+    start = time.perf_counter()
+    collection.create_index(field_name="embedding", index_params=build_index_params(profile, dim, len(vectors)))
+    utility.wait_for_index_building_complete(name)
+    build_s = time.perf_counter() - start
+    collection.load()
+
+    search_params = build_search_params(profile, ef, nprobe)
+    search_params["params"].pop("radius")
+    position = {row_id: i for i, row_id in enumerate(row_ids)}
+
+    latencies, recalls = [], []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        hits = collection.search(data=[query.tolist()], anns_field="embedding", param=search_params,
+                                 limit=top_k, consistency_level="Strong")[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        found = {position[hit.id] for hit in hits}
+        recalls.append(len(found & expected) / len(expected))
+
+    result = {
+        "index_type": get_index_profile(profile)["index_type"],
+        "metric_type": get_index_profile(profile)["metric_type"],
+        "memory_mb": round(loaded_memory_mb(name), 2),
+        "build_s": round(build_s, 3),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "recall_at_k": round(float(np.mean(recalls)), 4),
+    }
+    utility.drop_collection(name)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ANN index profile benchmark")
+    parser.add_argument("--products-file", type=str, default=settings.local_vector_products_file)
+    parser.add_argument("--profiles", type=str, nargs="+", default=list(INDEX_PROFILES), choices=list(INDEX_PROFILES))
+    parser.add_argument("--scale", type=int, default=1, help="Jittered copies of the catalog")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--ef", type=int, default=settings.milvus_product_search_ef)
+    parser.add_argument("--nprobe", type=int, default=settings.milvus_search_nprobe)
+    args = parser.parse_args()
+
+    connections.connect(alias="default", host=settings.milvus_host, port=settings.milvus_port)
+    vectors = load_vectors(args.products_file, args.scale)
+    print(f"Catalog: {len(vectors)} vectors, dim={vectors.shape[1]}")
+
+    # Queries: perturbed catalog vectors; ground truth from exact cosine search
+    rng = np.random.default_rng(11)
+    queries = vectors[rng.choice(len(vectors), size=args.queries)] + rng.normal(0, 0.02, (args.queries, vectors.shape[1])).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ vectors.T
+    truth = [set(np.argsort(-row)[:args.top_k].tolist()) for row in scores]
+
+    results = {}
+    print(f"\n{'profile':<10} {'memory MB':>10} {'build s':>8} {'p50 ms':>8} {'p99 ms':>8} {'recall@k':>9}")
+    for profile in args.profiles:
+        r = benchmark_profile(profile, vectors, queries, truth, args.top_k, args.ef, args.nprobe)
+        results[profile] = r
+        print(f"{profile:<10} {r['memory_mb']:>10} {r['build_s']:>8} {r['p50_ms']:>8} {r['p99_ms']:>8} {r['recall_at_k']:>9}")
+
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_FILE.write_text(json.dumps({
+        "vectors": len(vectors), "queries": args.queries, "top_k": args.top_k,
+        "ef": args.ef, "nprobe": args.nprobe, "results": results
+    }, indent=2))
+    print(f"\nSaved results to {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    main()
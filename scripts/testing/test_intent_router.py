@@ -0,0 +1,108 @@
+"""
+Local intent router evaluation: bypass rate vs accuracy per threshold
+
+Routes a labelled set of queries (single- and multi-intent) with the
+IntentRouter over the configured embedding service and, for each threshold,
+reports how many queries skip the supervisor LLM call (bypass rate) and how
+many of those are routed to the expected intent. Multi-intent queries are
+expected to fall back.
+
+Usage:
+    python test_intent_router.py
+    python test_intent_router.py --thresholds 0.5 0.55 0.6 0.65 0.7 --margin 0.05
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+sys.path.append('../../shopassist-api')
+# Load .env file from the correct location
+script_dir = Path(__file__).parent.parent
+env_path = script_dir.parent / 'shopassist-api' / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from shopassist_api.application.agents.intent_router import IntentRouter
+from shopassist_api.application.interfaces.di_container import get_embedding_service
+
+RESULTS_FILE = Path(__file__).parent / "results" / "intent_router.json"
+
+# (query, expected intent); None = multi-intent, must go to the supervisor
+LABELLED_QUERIES = [
+    ("return policy", "policy"),
+    ("how many days do I have to return headphones", "policy"),
+    ("when will my order be shipped", "policy"),
+    ("is there a warranty on laptops", "policy"),
+    ("do you offer free shipping", "policy"),
+    ("show me Sony headphones under $100", "product_search"),
+    ("I am looking for a 65 inch TV", "product_search"),
+    ("smartphone with good camera", "product_search"),
+    ("best mirrorless camera for beginners", "product_search"),
+    ("portable speaker with long battery", "product_search"),
+    ("does the Galaxy S24 support wireless charging", "product_detail"),
+    ("what is the screen size of the MacBook Air M2", "product_detail"),
+    ("tell me about the JBL Flip 6", "product_detail"),
+    ("compare the Galaxy S24 and the iPhone 15", "comparison"),
+    ("AirPods Pro vs Galaxy Buds 2 Pro", "comparison"),
+    ("which is better for gaming, PS5 or Xbox Series X", "comparison"),
+    ("I need to speak with customer service", "escalation"),
+    ("my package arrived damaged and I want my money back now", "escalation"),
+    ("return policy for headphones and show me Sony headphones under $100", None),
+    ("what phones do you have? also what's the shipping time?", None),
+    ("compare the iPad Air and iPad Pro and tell me the warranty", None),
+]
+
+
+async def evaluate(router: IntentRouter, embedding_service) -> dict:
+    IntentRouter._stats = {key: 0 for key in IntentRouter._stats}
+    bypassed = correct = 0
+    latencies = []
+    errors = []
+    for query, expected in LABELLED_QUERIES:
+        start = time.perf_counter()
+        decision = await router.route(query, embedding_service)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if decision is None:
+            continue
+        bypassed += 1
+        intent = decision.routes[0].intent
+        if intent == expected:
+            correct += 1
+        else:
+            errors.append({"query": query, "expected": expected, "routed": intent})
+    return {
+        "bypass_rate": round(bypassed / len(LABELLED_QUERIES), 3),
+        "bypass_accuracy": round(correct / bypassed, 3) if bypassed else None,
+        "avg_router_ms": round(sum(latencies) / len(latencies), 2),
+        "misroutes": errors,
+        "stats": IntentRouter.get_stats(),
+    }
+
+
+async def main(args):
+    embedding_service = get_embedding_service()
+    base = IntentRouter(margin=args.margin)
+    await base.ensure_built(embedding_service)
+
+    results = {}
+    for threshold in args.thresholds:
+        router = IntentRouter(threshold=threshold, margin=args.margin)
+        router.intents, router.centroids = base.intents, base.centroids
+        results[str(threshold)] = await evaluate(router, embedding_service)
+        r = results[str(threshold)]
+        print(f"threshold {threshold:<5} bypass {r['bypass_rate']:<6} accuracy {r['bypass_accuracy']} "
+              f"router {r['avg_router_ms']} ms misroutes {len(r['misroutes'])}")
+
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_FILE.write_text(json.dumps({"margin": args.margin, "results": results}, indent=2))
+    print(f"\nSaved results to {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local intent router evaluation")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.5, 0.55, 0.6, 0.65, 0.7])
+    parser.add_argument("--margin", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,81 @@
+"""
+Trivial-intent turns: templated answers vs the chat model
+
+Sends greetings, thanks and off-topic / out-of-scope messages through
+RAGService.generate_answer twice, with the TemplateResponder in 'template' and
+in 'llm' mode, and reports per mode the latency, completion tokens and how many
+turns skipped the intent classifier.
+
+Usage:
+    python test_template_responder.py
+    python test_template_responder.py --repeat 3
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from pathlib import Path
+from dotenv import load_dotenv
+
+import numpy as np
+
+sys.path.append('../../shopassist-api')
+# Load .env file from the correct location
+script_dir = Path(__file__).parent.parent
+env_path = script_dir.parent / 'shopassist-api' / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from shopassist_api.application.interfaces.di_container import get_rag_service
+from shopassist_api.application.services.template_responder import TemplateResponder
+
+RESULTS_FILE = Path(__file__).parent / "results" / "template_responder.json"
+
+QUERIES = [
+    "hi!",
+    "hello there",
+    "thanks a lot",
+    "bye",
+    "hola",
+    "muchas gracias",
+    "what's the weather like today?",
+    "tell me a joke",
+    "where is my order?",
+    "I want to change my account password",
+]
+
+
+async def run_mode(rag, mode: str, repeat: int) -> dict:
+    rag.template_responder = TemplateResponder(mode=mode)
+    TemplateResponder._stats = {"template": 0, "llm": 0, "classifier_skipped": 0}
+    latencies, tokens = [], []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            result = await rag.generate_answer(user_id="benchmark", query=query, session_id=uuid.uuid4().hex[:12])
+            latencies.append((time.perf_counter() - start) * 1000)
+            tokens.append(result["metadata"]["tokens"].get("total", 0))
+            print(f"[{mode:<8}] {query[:40]:<42} {result['query_type']:<14} {latencies[-1]:>8.1f} ms  {result['response'][:60]}")
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 1),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 1),
+        "completion_tokens": int(sum(tokens)),
+        "stats": TemplateResponder.get_stats(),
+    }
+
+
+async def main(args):
+    rag = get_rag_service()
+    results = {mode: await run_mode(rag, mode, args.repeat) for mode in ("llm", "template")}
+    print(json.dumps(results, indent=2))
+
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_FILE.write_text(json.dumps(results, indent=2))
+    print(f"Saved results to {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Templated vs LLM answers for trivial intents")
+    parser.add_argument("--repeat", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
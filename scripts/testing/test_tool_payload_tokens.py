@@ -0,0 +1,110 @@
+"""
+Prompt tokens per product discovery turn: compact tool content vs the previous JSON payload
+
+Runs ProductDiscoveryAgent (ReAct loop, prefetch disabled) over a set of queries,
+each in a fresh session, and reports per turn:
+  - input tokens billed for the turn (AgentResponse metadata)
+  - tokens of the tool results the model read (ToolMessage content: context only)
+  - tokens the same results cost before, when tools returned
+    {"context": ..., "products": [...]} serialised as JSON into the ToolMessage
+The difference is counted once per LLM call that follows the tool call.
+
+Usage:
+    python test_tool_payload_tokens.py
+"""
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from pathlib import Path
+from dotenv import load_dotenv
+
+import numpy as np
+import tiktoken
+
+sys.path.append('../../shopassist-api')
+# Load .env file from the correct location
+script_dir = Path(__file__).parent.parent
+env_path = script_dir.parent / 'shopassist-api' / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from shopassist_api.application.agents.product_discovery_agent import ProductDiscoveryAgent
+
+RESULTS_FILE = Path(__file__).parent / "results" / "tool_payload_tokens.json"
+
+QUERIES = [
+    "wireless headphones under $100",
+    "laptop for video editing",
+    "bluetooth speaker for outdoor use",
+    "4k smart TV with HDMI 2.1",
+    "smartphone with a good camera and long battery life",
+]
+
+encoding = tiktoken.encoding_for_model("gpt-4")
+
+
+def tokens(text: str) -> int:
+    return len(encoding.encode(text))
+
+
+def turn_messages(messages: list) -> list:
+    """Messages of the last turn"""
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return messages[i:]
+    return messages
+
+
+def payload_tokens(messages: list) -> dict:
+    """Tool result tokens as read by the model now and in the previous JSON format"""
+    compact = legacy = 0
+    for i, msg in enumerate(messages):
+        if not isinstance(msg, ToolMessage) or msg.name != "search_products":
+            continue
+        # every later LLM call of the turn re-reads the tool message
+        readers = sum(1 for later in messages[i + 1:] if isinstance(later, AIMessage))
+        compact += tokens(msg.content) * readers
+        legacy += tokens(json.dumps({"context": msg.content, "products": msg.artifact or []})) * readers
+    return {"compact": compact, "legacy": legacy}
+
+
+async def main(args):
+    agent = ProductDiscoveryAgent()
+    agent.prefetch = None
+    agent.agent = await agent._get_agent()
+
+    turns = []
+    for query in QUERIES:
+        session_Id = uuid.uuid4().hex[:12]
+        response = await agent.ainvoke(state={"user_query": query, "session_Id": session_Id})
+        state = await agent.agent.aget_state({"configurable": {"thread_id": session_Id}})
+        payload = payload_tokens(turn_messages(state.values.get("messages", [])))
+        turn = {
+            "query": query,
+            "input_tokens": response.metadata.input_token,
+            "tool_tokens": payload["compact"],
+            "legacy_tool_tokens": payload["legacy"],
+            "legacy_input_tokens": response.metadata.input_token + payload["legacy"] - payload["compact"],
+        }
+        turns.append(turn)
+        print(f"{query[:45]:<47} input {turn['input_tokens']:>6} (before ~{turn['legacy_input_tokens']:>6}) "
+              f"tool {turn['tool_tokens']:>6} (before {turn['legacy_tool_tokens']:>6})")
+
+    summary = {
+        "avg_input_tokens": float(np.mean([t["input_tokens"] for t in turns])),
+        "avg_legacy_input_tokens": float(np.mean([t["legacy_input_tokens"] for t in turns])),
+        "avg_tool_tokens": float(np.mean([t["tool_tokens"] for t in turns])),
+        "avg_legacy_tool_tokens": float(np.mean([t["legacy_tool_tokens"] for t in turns])),
+    }
+    print(json.dumps(summary, indent=2))
+
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    RESULTS_FILE.write_text(json.dumps({"summary": summary, "turns": turns}, indent=2))
+    print(f"Saved results to {RESULTS_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prompt tokens per product discovery turn")
+    asyncio.run(main(parser.parse_args()))
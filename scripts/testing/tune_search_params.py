@@ -0,0 +1,266 @@
+"""
+Search-parameter autotuner: sweep ef (or nprobe), radius and top_k per collection
+
+For every collection in the labelled query set (tuning_queries.json, built from
+the queries in test_retrieval.py and test_top_category.py) this script:
+  1. embeds the queries with the same models the API uses
+  2. computes exact top-k neighbours by brute force over all vectors of the collection
+  3. runs the Milvus search for every (ef, radius, top_k) combination and measures
+     p50/p95 latency, recall@k against exact search (above the same radius),
+     label precision (hits matching expected_category / expected_doc_type)
+     and coverage (queries with at least one hit)
+  4. keeps the Pareto-optimal settings and recommends one per collection
+
+Results go to results/search_tuning.json; the recommended values are written as
+.env entries to results/search_tuning.env, read by MilvusService through
+settings (no code edits needed to deploy them).
+
+With CATEGORY_INDEX_ENABLED (the default) categories are answered by the
+in-process CategoryIndex, never by a Milvus search: the categories collection is
+then tuned on CategoryIndex.search (exact, so only radius and top_k are swept)
+and the result is written as CATEGORY_INDEX_SEARCH_RADIUS / TOP_K_CATEGORIES.
+
+Usage:
+    python tune_search_params.py
+    python tune_search_params.py --collections products --ef 16 32 64 128 256 --radius 0 0.4 0.5 0.6
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+import numpy as np
+
+sys.path.append('../../shopassist-api')
+# Load .env file from the correct location
+script_dir = Path(__file__).parent.parent
+env_path = script_dir.parent / 'shopassist-api' / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from shopassist_api.application.services.category_index import CategoryIndex
+from shopassist_api.application.settings.config import settings
+from shopassist_api.infrastructure.services.milvus_service import MilvusService
+from shopassist_api.infrastructure.services.milvus_index_profiles import build_search_params, get_index_profile
+from shopassist_api.infrastructure.services.transformers_embedding_service import TransformersEmbeddingService
+
+QUERIES_FILE = Path(__file__).parent / "tuning_queries.json"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Fields compared against the query labels, per collection
+LABEL_FIELDS = {
+    "products": ("expected_category", ["category"]),
+    "knowledge_base": ("expected_doc_type", ["doc_type"]),
+    "categories": ("expected_category", ["name", "full_name"]),
+}
+
+# .env names of the tuned values, per collection
+ENV_NAMES = {
+    "products": {"ef": "MILVUS_PRODUCT_SEARCH_EF", "radius": "THRESHOLD_PRODUCT_SIMILARITY"},
+    "knowledge_base": {"ef": "MILVUS_KNOWLEDGE_BASE_SEARCH_EF", "radius": "MILVUS_KNOWLEDGE_BASE_SEARCH_RADIUS"},
+    "categories": {"ef": "MILVUS_CATEGORIES_SEARCH_EF", "radius": "MILVUS_CATEGORIES_SEARCH_RADIUS", "top_k": "TOP_K_CATEGORIES"},
+    "category_index": {"radius": "CATEGORY_INDEX_SEARCH_RADIUS", "top_k": "TOP_K_CATEGORIES"},
+}
+
+
+def label_matches(expected: str, hit: dict, fields: list[str]) -> bool:
+    expected = expected.lower().rstrip("s")
+    return any(expected in str(hit.get(field) or "").lower() for field in fields)
+
+
+def fetch_vectors(milvus: MilvusService, key: str, field: str = "embedding") -> tuple[list, np.ndarray]:
+    """All primary keys and normalised vectors of a collection"""
+    collection = milvus.registry.get(key)
+    iterator = collection.query_iterator(batch_size=1000, expr="", output_fields=["id", field])
+    ids, vectors = [], []
+    while True:
+        batch = iterator.next()
+        if not batch:
+            iterator.close()
+            break
+        ids.extend(row["id"] for row in batch)
+        vectors.extend(row[field] for row in batch)
+    matrix = np.asarray(vectors, dtype=np.float32)
+    return ids, matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def pareto_front(points: list[dict]) -> list[dict]:
+    """Points not dominated on (p95 latency min, recall max, label precision max, coverage max)"""
+    def objectives(p):
+        return (-p["p95_ms"], p["recall_at_k"], p["label_precision"] or 0.0, p["coverage"])
+
+    front = []
+    for p in points:
+        op = objectives(p)
+        dominated = any(
+            all(a >= b for a, b in zip(objectives(q), op)) and objectives(q) != op
+            for q in points
+        )
+        if not dominated:
+            front.append(p)
+    return sorted(front, key=lambda p: p["p95_ms"])
+
+
+def recommend(front: list[dict], min_recall: float, min_coverage: float) -> dict:
+    """Best label precision (then lowest latency) among front points meeting the recall/coverage floor"""
+    eligible = [p for p in front if p["recall_at_k"] >= min_recall and p["coverage"] >= min_coverage] or front
+    return max(eligible, key=lambda p: (p["label_precision"] or 0.0, p["recall_at_k"], -p["p95_ms"]))
+
+
+def run_config(milvus: MilvusService, key: str, embeddings: list, queries: list[dict], exact: np.ndarray,
+               ids: list, ef: int, radius: float, top_k: int) -> dict:
+    collection = milvus.registry.get(key)
+    defaults = milvus.registry.get_defaults(key)
+    search_params = build_search_params(defaults["index_profile"], ef, ef, radius)
+    vectors = milvus._prepare_vectors(key, embeddings)
+    label_key, label_fields = LABEL_FIELDS[key]
+
+    latencies, recalls, precisions, covered = [], [], [], 0
+    for query, vector, scores in zip(queries, vectors, exact):
+        start = time.perf_counter()
+        hits = collection.search(
+            data=[vector], anns_field="embedding", param=search_params, limit=top_k,
+            output_fields=[f for f in defaults["output_fields"] if "embedding" not in f],
+            consistency_level=defaults["consistency_level"]
+        )[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        # Exact neighbours above the same radius
+        order = np.argsort(-scores)[:top_k]
+        expected_ids = {ids[i] for i in order if scores[i] > radius}
+        found_ids = {hit.id for hit in hits}
+        if expected_ids:
+            recalls.append(len(found_ids & expected_ids) / len(expected_ids))
+        if hits:
+            covered += 1
+        if query.get(label_key) and hits:
+            entities = [{f: hit.entity.get(f) for f in label_fields} for hit in hits]
+            precisions.append(np.mean([label_matches(query[label_key], e, label_fields) for e in entities]))
+
+    return {
+        "ef": ef,
+        "radius": radius,
+        "top_k": top_k,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "recall_at_k": round(float(np.mean(recalls)), 4) if recalls else 1.0,
+        "label_precision": round(float(np.mean(precisions)), 4) if precisions else None,
+        "coverage": round(covered / len(queries), 4),
+    }
+
+
+def run_category_index_config(index: CategoryIndex, embeddings: list, queries: list[dict],
+                              radius: float, top_k: int) -> dict:
+    """Same measures for the in-process CategoryIndex (exact scoring: recall@k is 1 by construction)"""
+    label_key, label_fields = LABEL_FIELDS["categories"]
+    latencies, precisions, covered = [], [], 0
+    for query, vector in zip(queries, embeddings):
+        start = time.perf_counter()
+        hits = index.search(vector, top_k=top_k, radius=radius)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if hits:
+            covered += 1
+        if query.get(label_key) and hits:
+            precisions.append(np.mean([label_matches(query[label_key], hit, label_fields) for hit in hits]))
+
+    return {
+        "ef": None,
+        "radius": radius,
+        "top_k": top_k,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "recall_at_k": 1.0,
+        "label_precision": round(float(np.mean(precisions)), 4) if precisions else None,
+        "coverage": round(covered / len(queries), 4),
+    }
+
+
+async def tune(args):
+    milvus = MilvusService()
+    embedders = {
+        "products": TransformersEmbeddingService(model_name=settings.transformers_embedding_model),
+        "knowledge_base": TransformersEmbeddingService(model_name=settings.transformers_embedding_model),
+        "categories": TransformersEmbeddingService(model_name=settings.transformers_category_embedding_model),
+    }
+    all_queries = json.loads(QUERIES_FILE.read_text())
+
+    report, env_lines = {}, []
+    for key in args.collections:
+        queries = [q for q in all_queries if q["collection"] == key]
+        if not queries:
+            continue
+        print(f"\n🔧 Tuning [{key}] with {len(queries)} queries")
+        embeddings = await embedders[key].generate_embeddings([q["query"] for q in queries])
+
+        if key == "categories" and settings.category_index_enabled:
+            index = CategoryIndex.get_instance()
+            await index.ensure_fresh(milvus)
+            points = []
+            for radius in args.radius:
+                for top_k in args.top_k:
+                    point = run_category_index_config(index, embeddings, queries, radius, top_k)
+                    points.append(point)
+                    print(f"   {point}")
+            front = pareto_front(points)
+            best = recommend(front, args.min_recall, args.min_coverage)
+            report["category_index"] = {"points": points, "pareto_front": front, "recommended": best}
+            print(f"✅ [category_index] recommended: {best}")
+
+            names = ENV_NAMES["category_index"]
+            env_lines.append(f"# category_index: p95={best['p95_ms']}ms, "
+                             f"label_precision={best['label_precision']}, coverage={best['coverage']}")
+            env_lines.append(f"{names['radius']}={best['radius']}")
+            env_lines.append(f"{names['top_k']}={best['top_k']}")
+            continue
+
+        ids, matrix = fetch_vectors(milvus, key)
+        q = np.asarray(embeddings, dtype=np.float32)
+        exact = (q / np.linalg.norm(q, axis=1, keepdims=True)) @ matrix.T
+
+        search_values = args.ef
+        if get_index_profile(milvus.registry.get_defaults(key)["index_profile"])["search_param"] == "nprobe":
+            search_values = args.nprobe
+        points = []
+        for ef in search_values:
+            for radius in args.radius:
+                for top_k in args.top_k:
+                    point = run_config(milvus, key, embeddings, queries, exact, ids, ef, radius, top_k)
+                    points.append(point)
+                    print(f"   {point}")
+
+        front = pareto_front(points)
+        best = recommend(front, args.min_recall, args.min_coverage)
+        report[key] = {"points": points, "pareto_front": front, "recommended": best}
+        print(f"✅ [{key}] recommended: {best}")
+
+        names = ENV_NAMES[key]
+        env_lines.append(f"# {key}: recall@k={best['recall_at_k']}, p95={best['p95_ms']}ms, "
+                         f"label_precision={best['label_precision']}, coverage={best['coverage']}")
+        env_lines.append(f"{names['ef']}={best['ef']}" if search_values is args.ef else f"MILVUS_SEARCH_NPROBE={best['ef']}")
+        env_lines.append(f"{names['radius']}={best['radius']}")
+        if "top_k" in names:
+            env_lines.append(f"{names['top_k']}={best['top_k']}")
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    (RESULTS_DIR / "search_tuning.json").write_text(json.dumps(report, indent=2))
+    (RESULTS_DIR / "search_tuning.env").write_text("\n".join(env_lines) + "\n")
+    print(f"\nSaved results to {RESULTS_DIR / 'search_tuning.json'} and {RESULTS_DIR / 'search_tuning.env'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Milvus search-parameter autotuner")
+    parser.add_argument("--collections", type=str, nargs="+", default=["products", "knowledge_base", "categories"])
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32, 64])
+    parser.add_argument("--radius", type=float, nargs="+", default=[0.0, 0.3, 0.4, 0.5, 0.6, 0.7])
+    parser.add_argument("--top-k", type=int, nargs="+", default=[3, 5, 10])
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    parser.add_argument("--min-coverage", type=float, default=0.9)
+    args = parser.parse_args()
+    asyncio.run(tune(args))
+
+
+if __name__ == "__main__":
+    main()
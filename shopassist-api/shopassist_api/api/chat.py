@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Any, List, Dict, Optional
+from typing import Any, AsyncIterator, List, Dict, Optional
+import json
 import uuid
 from datetime import datetime, timezone
 
@@ -51,13 +53,49 @@ async def chat_dump_message(request: ChatRequest,
             metadata=result['metadata']
         )
 
+def sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # no proxy buffering
+    )
+
+
+def orchestrator_metadata(result: Dict) -> Dict:
+    """Token totals and cache info of an orchestrator result"""
+    metadatas = result.get("metadatas", [])
+    total_input_tokens = 0
+    total_output_tokens = 0
+    total_total_tokens = 0
+    for metadata in metadatas:
+        total_input_tokens += metadata.input_token or 0
+        total_output_tokens += metadata.output_token or 0
+        total_total_tokens += metadata.total_token or 0
+
+    return {
+        "tokens": {
+            "input_tokens": total_input_tokens,
+            "output_tokens": total_output_tokens,
+            "total_tokens": total_total_tokens
+        },
+        "cost": 0.0,
+        "num_sources": len(result['response_sources']) if 'response_sources' in result else 0,
+        "semantic_cache": result.get("semantic_cache"),
+    }
+
+
 @router.post("/orchestrate", response_model=ChatResponse)
 async def chat_orchestrator(request: ChatRequest):
     """
     Process a chat message using orchestrator and return AI response
     """
     try:
-        orchestrator = AgentOrchestrator()
+        orchestrator = AgentOrchestrator.get_instance()
         session_id = request.session_id or str(uuid.uuid4().hex[:12])
         user_id = "default_user"  # Placeholder for user identification
         logger.info(f"Orchestrator processing for session_id: {session_id}, user_id: {user_id}, message: {request.message}")
@@ -68,37 +106,47 @@ async def chat_orchestrator(request: ChatRequest):
 
         logger.info(f"Orchestrator response for session_id: {session_id} ready.")
 
-        metadatas = result.get("metadatas", [])
-        total_input_tokens = 0
-        total_output_tokens = 0
-        total_total_tokens = 0
-        for metadata in metadatas:
-            total_input_tokens += metadata.input_token or 0
-            total_output_tokens += metadata.output_token or 0
-            total_total_tokens += metadata.total_token or 0
-
         return ChatResponse(
             session_id=session_id,
             response=result['response'],
             sources=result['response_sources'] if 'response_sources' in result else [],
             query_type=result['current_agent'],
-            metadata = {
-                "tokens": {
-                    "input_tokens": total_input_tokens,
-                    "output_tokens": total_output_tokens,
-                    "total_tokens": total_total_tokens
-                },
-                "cost": 0.0,
-                "num_sources": len(result['response_sources']) if 'response_sources' in result else 0,
-            }
+            metadata = orchestrator_metadata(result)
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-        
-   
 
 
+@router.post("/orchestrate/stream")
+async def chat_orchestrator_stream(request: ChatRequest):
+    """
+    Orchestrator chat as server-sent events:
+    session, token (per route), sources (per route), metadata (final response and tokens), error
+    """
+    orchestrator = AgentOrchestrator.get_instance()
+    session_id = request.session_id or str(uuid.uuid4().hex[:12])
+    logger.info(f"Orchestrator streaming for session_id: {session_id}, message: {request.message}")
+
+    async def events():
+        yield sse_event("session", {"session_id": session_id})
+        try:
+            async for event in orchestrator.astream({"user_query": request.message, "session_Id": session_id}):
+                if event["event"] == "result":
+                    result = event["data"]
+                    yield sse_event("metadata", {
+                        **orchestrator_metadata(result),
+                        "response": result["response"],
+                        "query_type": result["current_agent"]
+                    })
+                else:
+                    yield sse_event(event["event"], event["data"])
+        except Exception as e:
+            logger.error(f"Orchestrator streaming failed for session_id: {session_id}: {e}")
+            yield sse_event("error", {"detail": str(e)})
+
+    return sse_response(events())
+
 @router.post("/message", response_model=ChatResponse)
 async def chat_message(request: ChatRequest,
                        rag_service:RAGService = Depends(get_rag_service)):
@@ -127,12 +175,35 @@ async def chat_message(request: ChatRequest,
                 "tokens": result['metadata'].get('tokens', {}),
                 "cost": result['metadata'].get('cost', 0.0),
                 "num_sources": result['metadata'].get('num_sources', 0),
+                "semantic_cache": result['metadata'].get('semantic_cache'),
             }
         )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/message/stream")
+async def chat_message_stream(request: ChatRequest,
+                              rag_service:RAGService = Depends(get_rag_service)):
+    """
+    RAG chat as server-sent events:
+    session, sources (before the LLM call), token (content deltas), metadata (after the turn is saved), error
+    """
+    session_id = request.session_id or str(uuid.uuid4().hex[:12])
+    user_id = "default_user"  # Placeholder for user identification
+    logger.info(f"Streaming answer for session_id: {session_id}, user_id: {user_id}, message: {request.message}")
+
+    async def events():
+        yield sse_event("session", {"session_id": session_id})
+        try:
+            async for event in rag_service.stream_answer(user_id=user_id, query=request.message, session_id=session_id):
+                yield sse_event(event["event"], event["data"])
+        except Exception as e:
+            logger.error(f"Streaming failed for session_id: {session_id}: {e}")
+            yield sse_event("error", {"detail": str(e)})
+
+    return sse_response(events())
+
 @router.get("/history_raw/{session_id}")
 async def get_chat_history(session_id: str,
                            cosmos_service:RepositoryServiceInterface = Depends(get_repository_service)):
@@ -4,10 +4,22 @@ Health check endpoint.
 from fastapi import APIRouter, Depends
 from datetime import datetime, timezone
 from fastapi.responses import JSONResponse
+from shopassist_api.application.agents.intent_router import IntentRouter
+from shopassist_api.application.agents.checkpointing import CheckpointStore
+from shopassist_api.application.agents.prefetch import AgentPrefetch
+from shopassist_api.application.agents.thread_summarizer import ThreadSummarizer
+from shopassist_api.application.agents.orchestrator import AgentOrchestrator
 from shopassist_api.application.interfaces.di_container import get_cache_service, get_rag_service, get_repository_service
 from shopassist_api.application.interfaces.service_interfaces import CacheServiceInterface, RepositoryServiceInterface
 from shopassist_api.application.services.rag_service import RAGService
+from shopassist_api.application.services.product_hydrator import ProductHydrator
+from shopassist_api.application.services.conversation_summarizer import ConversationSummarizer
+from shopassist_api.application.services.retrieval_cache import RetrievalCache
+from shopassist_api.application.services.semantic_cache import SemanticAnswerCache
+from shopassist_api.application.services.template_responder import TemplateResponder
 from shopassist_api.application.settings.config import settings
+from shopassist_api.infrastructure.services.transformers_embedding_service import TransformersEmbeddingService
+from shopassist_api.infrastructure.services.cached_embedding_service import CachedEmbeddingService
 from shopassist_api.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -32,7 +44,8 @@ async def readiness_check():
         "embedding_service": False,
         "vector_service": False,
         "llm_service": False,
-        "cache_service": False
+        "cache_service": False,
+        "orchestrator": False
     }
     
     try:
@@ -55,6 +68,10 @@ async def readiness_check():
         
         cache_service = get_cache_service()
         services_ready["cache_service"] = True
+
+        # Warmed up at startup; not created here so a cold process stays not-ready
+        orchestrator = AgentOrchestrator._instance
+        services_ready["orchestrator"] = orchestrator is not None and orchestrator.ready
         
     except Exception as e:
         logger.error(f"Readiness check failed: {e}")
@@ -73,6 +90,24 @@ async def readiness_check():
         }
     )
 
+@router.get("/metrics")
+async def metrics():
+    """Runtime performance metrics (batching, caches)"""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "embedding_batchers": TransformersEmbeddingService.get_batcher_stats(),
+        "embedding_cache": CachedEmbeddingService.get_stats(),
+        "retrieval_cache": RetrievalCache.get_stats(),
+        "semantic_cache": SemanticAnswerCache.get_stats(),
+        "product_cache": ProductHydrator.get_stats(),
+        "intent_router": IntentRouter.get_stats(),
+        "agent_prefetch": AgentPrefetch.get_stats(),
+        "template_responder": TemplateResponder.get_stats(),
+        "conversation_summary": ConversationSummarizer.get_stats(),
+        "agent_thread_summary": ThreadSummarizer.get_stats(),
+        "agent_checkpoints": CheckpointStore.get_stats(),
+    }
+
 @router.get("/full")
 async def health_check(cosmos_service:RepositoryServiceInterface = Depends(get_repository_service),
                        rag_service:RAGService = Depends(get_rag_service),
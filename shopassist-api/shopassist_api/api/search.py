@@ -5,7 +5,8 @@ from shopassist_api.application.services.context_builder import ContextBuilder
 from shopassist_api.application.services.query_processor import QueryProcessor
 from shopassist_api.application.services.retrieval_service import RetrievalService
 from shopassist_api.logging_config import get_logger
-from shopassist_api.application.interfaces.di_container import get_retrieval_service
+from shopassist_api.application.interfaces.di_container import get_retrieval_service, get_vector_service
+from shopassist_api.application.interfaces.service_interfaces import VectorServiceInterface
 
 logger = get_logger(__name__)
 
@@ -20,6 +21,19 @@ class SearchRequest(BaseModel):
     top_k: int = 5
     filters: Optional[Dict] = None
 
+class HybridSearchRequest(BaseModel):
+    query: str
+    top_k: int = 5
+    filters: Optional[Dict] = None
+    use_vector: bool = True
+    use_keyword: bool = True
+    vector_weight: Optional[float] = None  # defaults to settings.hybrid_vector_weight
+    keyword_weight: Optional[float] = None  # defaults to settings.hybrid_keyword_weight
+    rrf_k: Optional[int] = None  # defaults to settings.hybrid_rrf_k
+
+class ReloadCollectionsRequest(BaseModel):
+    collections: Optional[List[str]] = None  # e.g. ["products", "knowledge_base", "categories"]
+
 class SearchResponse(BaseModel):
     query: str
     results: List[Dict]
@@ -86,15 +100,60 @@ async def vector_search(request: SearchRequest,
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/hybrid")
-async def hybrid_search(request: SearchRequest,
+@router.post("/hybrid", response_model=SearchResponse)
+async def hybrid_search(request: HybridSearchRequest,
                         retrieval_service: RetrievalService = Depends(get_retrieval_service)):
     """
-    Perform hybrid search (vector + keyword)
+    Perform hybrid search (vector + BM25 keyword, reciprocal-rank fusion)
+    """
+    try:
+        logger.info(f"Processing hybrid query: {request.query}")
+        cleaned_query, filters = query_processor.process_query(request.query)
+        filters = {**filters, **(request.filters or {})}
+
+        logger.info(f"  Cleaned query: {cleaned_query}, filters: {filters}")
+        results = await retrieval_service.hybrid_search(
+            cleaned_query,
+            top_k=request.top_k,
+            filters=filters,
+            use_vector=request.use_vector,
+            use_keyword=request.use_keyword,
+            vector_weight=request.vector_weight,
+            keyword_weight=request.keyword_weight,
+            rrf_k=request.rrf_k
+        )
+        context = context_builder.build_product_context(results)
+
+        return SearchResponse(
+            query=request.query,
+            results=results,
+            context=context,
+            query_type="product_search",
+            filters_applied=filters
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/collections")
+async def get_collections_state(vector_service: VectorServiceInterface = Depends(get_vector_service)):
+    """
+    Get the load state of the vector collections
+    """
+    return {"collections": vector_service.get_load_state()}
+
+@router.post("/collections/reload")
+async def reload_collections(request: ReloadCollectionsRequest,
+                             vector_service: VectorServiceInterface = Depends(get_vector_service)):
+    """
+    Re-load vector collections after ingestion
     """
-    # For now, same as vector search
-    # Can add keyword search logic later
-    return await vector_search(request, retrieval_service)
+    try:
+        logger.info(f"Reloading vector collections: {request.collections or 'all'}")
+        state = vector_service.reload_collections(request.collections)
+        return {"collections": state}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/test")
 async def test_retrieval(retrieval_service: RetrievalService = Depends(get_retrieval_service)):
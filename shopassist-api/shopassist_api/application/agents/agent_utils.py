@@ -58,4 +58,31 @@ class AgentTools:
                 "metadata": metadata
             })
         
-        return response
\ No newline at end of file
+        return response
+
+    @staticmethod
+    def tool_artifacts(messages: list, tool_name: str) -> list:
+        """Structured results (ToolMessage.artifact) of a tool's calls in the last turn.
+        Tools declared with response_format="content_and_artifact" send only their
+        content to the model; the artifact carries the sources."""
+        artifacts = []
+        for msg in reversed(messages):
+            if isinstance(msg, HumanMessage):
+                break
+            if isinstance(msg, ToolMessage) and msg.name == tool_name and msg.artifact:
+                artifacts[:0] = msg.artifact
+        return artifacts
+
+    @staticmethod
+    def turn_usage(messages: list) -> tuple[int, int, int]:
+        """(input, output, total) tokens of the model calls of the last turn; the
+        checkpointed thread also holds the AI messages of earlier turns."""
+        input_tokens = output_tokens = total_tokens = 0
+        for msg in reversed(messages):
+            if isinstance(msg, HumanMessage):
+                break
+            if isinstance(msg, AIMessage) and msg.usage_metadata:
+                input_tokens += msg.usage_metadata.get("input_tokens") or 0
+                output_tokens += msg.usage_metadata.get("output_tokens") or 0
+                total_tokens += msg.usage_metadata.get("total_tokens") or 0
+        return input_tokens, output_tokens, total_tokens
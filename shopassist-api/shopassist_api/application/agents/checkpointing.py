@@ -0,0 +1,186 @@
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from typing import List, Optional
+from langchain.agents.middleware import AgentState, before_model
+from langchain_core.messages import AnyMessage, HumanMessage, RemoveMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+from langgraph.checkpoint.redis.ashallow import AsyncShallowRedisSaver
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+from langgraph.runtime import Runtime
+from shopassist_api.application.settings.config import settings
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class _CheckpointMetrics:
+    """
+    Read/write latency and checkpoint size of a Redis saver (CheckpointStore stats).
+    The size needs a second serialisation of the checkpoint, so it is measured on
+    one write in agent_checkpoint_size_sample_every.
+    """
+
+    async def aget_tuple(self, config):
+        start = time.perf_counter()
+        try:
+            return await super().aget_tuple(config)
+        finally:
+            CheckpointStore._stats["reads"] += 1
+            CheckpointStore._stats["read_ms"] += (time.perf_counter() - start) * 1000
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        start = time.perf_counter()
+        result = await super().aput(config, checkpoint, metadata, new_versions)
+        CheckpointStore._stats["writes"] += 1
+        CheckpointStore._stats["write_ms"] += (time.perf_counter() - start) * 1000
+        if CheckpointStore._stats["writes"] % settings.agent_checkpoint_size_sample_every == 0:
+            CheckpointStore.record_size(self._size(checkpoint), len(checkpoint.get("channel_values", {}).get("messages", [])))
+        return result
+
+    async def aput_writes(self, config, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await super().aput_writes(config, *args, **kwargs)
+        finally:
+            CheckpointStore._stats["pending_writes"] += 1
+            CheckpointStore._stats["write_ms"] += (time.perf_counter() - start) * 1000
+
+    def _size(self, checkpoint) -> int:
+        try:
+            return len(self.serde.dumps_typed(checkpoint)[1])
+        except Exception:
+            return 0
+
+
+class InstrumentedRedisSaver(_CheckpointMetrics, AsyncRedisSaver):
+    """AsyncRedisSaver (every checkpoint version kept until the TTL) with CheckpointStore metrics"""
+
+
+class InstrumentedShallowRedisSaver(_CheckpointMetrics, AsyncShallowRedisSaver):
+    """AsyncShallowRedisSaver (latest checkpoint only) with CheckpointStore metrics"""
+
+
+class CheckpointStore:
+    """
+    The Redis checkpointer shared by the checkpointed agents.
+
+    One saver per process: opened by the app lifespan (open(), or lazily by the
+    first agent) and closed with the DI container, so its Redis connection lives
+    as long as the app instead of the `async with` block that created it.
+
+    settings.agent_checkpoint_mode:
+      - shallow: only the latest checkpoint of a thread is stored; each write
+        replaces the previous version, so old versions never accumulate
+      - full: every version is stored until the TTL expires (history / time travel)
+    Reads do not refresh the TTL unless agent_checkpoint_refresh_on_read is set.
+    """
+
+    # Process-wide counters
+    _stats = {"reads": 0, "read_ms": 0.0, "writes": 0, "write_ms": 0.0, "pending_writes": 0,
+              "checkpoint_bytes": 0, "max_checkpoint_bytes": 0, "max_messages": 0,
+              "size_samples": 0, "trimmed_threads": 0, "trimmed_messages": 0}
+
+    def __init__(self,
+                 redis_url: str = None,
+                 mode: str = None,
+                 ttl_minutes: int = None,
+                 refresh_on_read: bool = None):
+        self.redis_url = redis_url or settings.redis_url
+        self.mode = mode or settings.agent_checkpoint_mode
+        self.ttl_minutes = ttl_minutes or settings.agent_checkpoint_ttl_minutes
+        self.refresh_on_read = settings.agent_checkpoint_refresh_on_read if refresh_on_read is None else refresh_on_read
+        self._saver: Optional[_CheckpointMetrics] = None
+        self._stack: Optional[AsyncExitStack] = None
+        self._lock = asyncio.Lock()
+
+    async def open(self) -> None:
+        """Connect and create the checkpoint indexes (application startup)"""
+        await self.get_saver()
+
+    async def get_saver(self) -> _CheckpointMetrics:
+        if self._saver is None:
+            async with self._lock:
+                if self._saver is None:
+                    await self._open()
+        return self._saver
+
+    async def _open(self) -> None:
+        saver_class = InstrumentedRedisSaver if self.mode == "full" else InstrumentedShallowRedisSaver
+        logger.info(f"Opening Redis checkpointer ({self.mode}): {self.redis_url}")
+        stack = AsyncExitStack()
+        saver = await stack.enter_async_context(saver_class.from_conn_string(
+            self.redis_url, ttl={"default_ttl": self.ttl_minutes, "refresh_on_read": self.refresh_on_read}))
+        try:
+            await saver.asetup()
+        except Exception:
+            await stack.aclose()
+            raise
+        self._stack, self._saver = stack, saver
+
+    async def has_thread(self, thread_id: str) -> bool:
+        """True when the session already has a checkpointed agent thread (a previous turn); True on errors"""
+        try:
+            saver = await self.get_saver()
+            return await saver.aget_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}) is not None
+        except Exception as e:
+            logger.error(f"Error reading the checkpoint of thread {thread_id}: {e}")
+            return True
+
+    async def close(self) -> None:
+        """Close the Redis connection (application shutdown)"""
+        if self._stack is not None:
+            await self._stack.aclose()
+        self._stack, self._saver = None, None
+
+    @classmethod
+    def record_size(cls, size: int, messages: int) -> None:
+        cls._stats["size_samples"] += 1
+        cls._stats["checkpoint_bytes"] += size
+        cls._stats["max_checkpoint_bytes"] = max(cls._stats["max_checkpoint_bytes"], size)
+        cls._stats["max_messages"] = max(cls._stats["max_messages"], messages)
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        stats = dict(cls._stats)
+        stats["avg_read_ms"] = round(stats["read_ms"] / stats["reads"], 2) if stats["reads"] else 0.0
+        stats["avg_write_ms"] = round(stats["write_ms"] / (stats["writes"] + stats["pending_writes"]), 2) \
+            if stats["writes"] + stats["pending_writes"] else 0.0
+        stats["avg_checkpoint_bytes"] = stats["checkpoint_bytes"] // stats["size_samples"] if stats["size_samples"] else 0
+        return stats
+
+
+def trim_thread(messages: List[AnyMessage], max_tokens: int = None, max_messages: int = None) -> Optional[List[AnyMessage]]:
+    """
+    Messages of a thread over max_tokens / max_messages without its oldest turns,
+    None when it fits. Turns are dropped from a user message, so tool calls stay
+    with their results; a leading SystemMessage (thread summary) and the current
+    turn are always kept.
+    """
+    max_tokens = max_tokens or settings.agent_checkpoint_max_tokens
+    max_messages = max_messages or settings.agent_checkpoint_max_messages
+    if len(messages) <= max_messages and count_tokens_approximately(messages) <= max_tokens:
+        return None
+
+    head = messages[:1] if messages and isinstance(messages[0], SystemMessage) else []
+    turn_starts = [index for index, msg in enumerate(messages) if index > len(head) and isinstance(msg, HumanMessage)]
+    if not turn_starts:
+        return None
+    for start in turn_starts:
+        kept = head + messages[start:]
+        if len(kept) <= max_messages and count_tokens_approximately(kept) <= max_tokens:
+            return kept
+    return head + messages[turn_starts[-1]:]
+
+
+@before_model
+async def trim_thread_messages(state: AgentState, runtime: Runtime) -> Optional[dict]:
+    """Middleware bounding checkpointed threads before each model call (trim_thread)"""
+    messages = state["messages"]
+    kept = trim_thread(messages)
+    if kept is None:
+        return None
+    CheckpointStore._stats["trimmed_threads"] += 1
+    CheckpointStore._stats["trimmed_messages"] += len(messages) - len(kept)
+    return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *kept]}
@@ -0,0 +1,139 @@
+import asyncio
+import re
+from threading import RLock
+from typing import Dict, List, Optional
+import numpy as np
+from langsmith import traceable
+from shopassist_api.application.agents.base import Metadata, RouteDecision, RouteDecisionResponse
+from shopassist_api.application.interfaces.service_interfaces import EmbeddingServiceInterface
+from shopassist_api.application.prompts.agent_templates import RouteTemplates
+from shopassist_api.application.settings.config import settings
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class IntentRouter:
+    """
+    Local intent router in front of the SupervisorAgent LLM call.
+
+    Nearest centroid over sentence embeddings of labelled examples
+    (RouteTemplates.ROUTER_EXAMPLES): a query is routed in-process when its
+    best centroid similarity reaches the threshold and beats the runner-up by
+    the margin. Queries made of clauses with different intents are multi-intent
+    (except comparisons) and, like low-confidence queries, are left to the
+    supervisor (route returns None).
+    """
+
+    # Clause separators used to spot multi-intent queries
+    CLAUSE_PATTERN = re.compile(r"[?;.!]|\b(?:and|also|plus)\b", re.IGNORECASE)
+    MIN_CLAUSE_WORDS = 3
+
+    # Process-wide instance
+    _instance: "IntentRouter" = None
+    _instance_lock = RLock()
+    _stats = {"queries": 0, "bypassed": 0, "low_confidence": 0, "multi_intent": 0, "errors": 0}
+
+    def __init__(self, examples: Dict[str, List[str]] = None, threshold: float = None, margin: float = None):
+        self.examples = examples or RouteTemplates.ROUTER_EXAMPLES
+        self.threshold = threshold if threshold is not None else settings.intent_router_threshold
+        self.margin = margin if margin is not None else settings.intent_router_margin
+        self.intents: List[str] = []
+        self.centroids: Optional[np.ndarray] = None  # shape (n_intents, dim), L2-normalised
+        self._build_lock = asyncio.Lock()
+
+    @classmethod
+    def get_instance(cls) -> "IntentRouter":
+        if cls._instance is None:
+            with cls._instance_lock:
+                # Double-check after acquiring lock
+                if cls._instance is None:
+                    cls._instance = IntentRouter()
+        return cls._instance
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    @property
+    def is_ready(self) -> bool:
+        return self.centroids is not None
+
+    async def ensure_built(self, embedding_service: EmbeddingServiceInterface) -> None:
+        """Embed the examples and compute one centroid per intent (once)"""
+        if self.centroids is not None:
+            return
+        async with self._build_lock:
+            if self.centroids is not None:
+                return
+            intents = list(self.examples)
+            texts = [text for intent in intents for text in self.examples[intent]]
+            vectors = self._normalize(np.asarray(await embedding_service.generate_embeddings(texts), dtype=np.float32))
+
+            centroids = []
+            start = 0
+            for intent in intents:
+                count = len(self.examples[intent])
+                centroids.append(vectors[start:start + count].mean(axis=0))
+                start += count
+            self.intents = intents
+            self.centroids = self._normalize(np.stack(centroids))
+            logger.info(f"Built intent router: {len(intents)} intents from {len(texts)} examples")
+
+    def classify(self, embedding: List[float]) -> tuple[str, float, float]:
+        """(intent, similarity, margin over the runner-up) for one query embedding"""
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = self.centroids @ query
+        order = np.argsort(-scores)
+        best = float(scores[order[0]])
+        runner_up = float(scores[order[1]]) if len(order) > 1 else -1.0
+        return self.intents[order[0]], best, best - runner_up
+
+    def _clauses(self, query: str) -> List[str]:
+        clauses = [clause.strip() for clause in self.CLAUSE_PATTERN.split(query)]
+        return [clause for clause in clauses if len(clause.split()) >= self.MIN_CLAUSE_WORDS]
+
+    @traceable(name="intent_router.route", tags=["router", "intent", "local"], metadata={"version": "1.0"})
+    async def route(self, user_query: str, embedding_service: EmbeddingServiceInterface) -> Optional[RouteDecisionResponse]:
+        """Single-intent route decided in-process, or None when the supervisor should decide"""
+        IntentRouter._stats["queries"] += 1
+        try:
+            await self.ensure_built(embedding_service)
+            clauses = self._clauses(user_query)
+            texts = [user_query, *clauses] if len(clauses) > 1 else [user_query]
+            embeddings = await embedding_service.generate_embeddings(texts)
+        except Exception as e:
+            IntentRouter._stats["errors"] += 1
+            logger.error(f"Intent router failed, falling back to supervisor: {e}")
+            return None
+
+        intent, similarity, margin = self.classify(embeddings[0])
+        clause_intents = {self.classify(embedding)[0] for embedding in embeddings[1:]}
+        # "compare X and Y" joins products, not requests
+        if intent != "comparison" and len(clause_intents) > 1:
+            IntentRouter._stats["multi_intent"] += 1
+            logger.info(f"Intent router: multi-intent query {clause_intents}, deferring to supervisor")
+            return None
+        if similarity < self.threshold or margin < self.margin:
+            IntentRouter._stats["low_confidence"] += 1
+            logger.info(f"Intent router: low confidence {intent} ({similarity:.3f}, margin {margin:.3f}), deferring to supervisor")
+            return None
+
+        IntentRouter._stats["bypassed"] += 1
+        logger.info(f"Intent router: routed to {intent} ({similarity:.3f}, margin {margin:.3f})")
+        return RouteDecisionResponse(
+            agent_name="intent_router",
+            model=getattr(embedding_service, "model_name", type(embedding_service).__name__),
+            reasoning=f"Local intent router: {intent} (similarity {similarity:.3f}, margin {margin:.3f})",
+            routes=[RouteDecision(query=user_query, intent=intent)],
+            metadata=Metadata(id="intent_router", input_token=0, output_token=0, total_token=0)
+        )
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        stats = dict(cls._stats)
+        stats["bypass_rate"] = stats["bypassed"] / stats["queries"] if stats["queries"] else 0.0
+        return stats
@@ -1,20 +1,29 @@
+import asyncio
 import json
+import time
+from threading import RLock
 from langgraph.graph import StateGraph, END
+from langgraph.types import Send
 from langgraph.graph.state import CompiledStateGraph
 from typing import Annotated, Optional, TypedDict
 
 from langchain.messages import AnyMessage
+from langchain_core.runnables import RunnableLambda
 import operator
 
 from langsmith import traceable
 from shopassist_api.application.agents.base import Metadata
 from shopassist_api.application.agents.escalation_agent import EscalationAgent
+from shopassist_api.application.agents.intent_router import IntentRouter
 from shopassist_api.application.agents.policy_agent import PolicyAgent
 from shopassist_api.application.agents.product_comparison_agent import ProductComparisonAgent
 from shopassist_api.application.agents.product_detail_agent import ProductDetailAgent
 from shopassist_api.application.agents.product_discovery_agent import ProductDiscoveryAgent
 
 from shopassist_api.application.agents.supervisor_agent import SupervisorAgent
+from shopassist_api.application.interfaces.di_container import get_checkpoint_store, get_embedding_service, get_semantic_cache
+from shopassist_api.application.prompts.agent_templates import PrefetchTemplates
+from shopassist_api.application.settings.config import settings
 
 from shopassist_api.logging_config import get_logger
 
@@ -27,8 +36,8 @@ class OrchestratorState(TypedDict):
     current_agent: str
 
     route_request: Optional[any]
-    current_route_index: int
-    next_action: str
+    route_indexes: list[int]  # routes executed by one fan-out branch
+    route_results: Annotated[list[dict], operator.add]  # merged from the branches
     response: Optional[str]
     route_responses: list[str]
     response_sources: list[list[dict]]
@@ -36,7 +45,23 @@ class OrchestratorState(TypedDict):
     metadatas: list[Metadata]
 
 
+# Agents that keep the conversation in the session's checkpoint thread
+SESSION_AGENTS = {"product_search", "product_detail", "product_comparison"}
+
+
 class AgentOrchestrator:
+    """
+    Routes a query through the supervisor and the specialist agents.
+
+    Use get_instance(): the agents, their LLM clients and the compiled graph are
+    built once per process and shared by concurrent requests (all per-request
+    data lives in the graph state). warmup() creates the LangGraph agents at
+    startup so the first request does not pay for it.
+    """
+
+    # Process-wide instance
+    _instance: "AgentOrchestrator" = None
+    _instance_lock = RLock()
     
     def __init__(self):
         
@@ -47,8 +72,37 @@ class AgentOrchestrator:
         self.product_detail_agent = ProductDetailAgent()
         self.product_comparison_agent = ProductComparisonAgent()
         self.escalation_agent = EscalationAgent()
+        self.semantic_cache = get_semantic_cache()
+        self.intent_router = IntentRouter.get_instance() if settings.intent_router_enabled else None
+        self.agent_run = RunnableLambda(self._invoke_agent_run)
 
         self.graph = self._build_graph()
+        self.ready = False
+        self._warmup_lock = asyncio.Lock()
+
+    @classmethod
+    def get_instance(cls) -> "AgentOrchestrator":
+        if cls._instance is None:
+            with cls._instance_lock:
+                # Double-check after acquiring lock
+                if cls._instance is None:
+                    cls._instance = AgentOrchestrator()
+        return cls._instance
+
+    async def warmup(self):
+        """Create the agents (on the shared checkpointer) once; concurrent callers wait for the first."""
+        if self.ready:
+            return
+        async with self._warmup_lock:
+            if self.ready:
+                return
+            for agent in (self.policy_agent, self.product_discovery_agent,
+                          self.product_detail_agent, self.product_comparison_agent):
+                if agent.agent is None:
+                    agent.agent = await agent._get_agent()
+            if self.intent_router is not None:
+                await self.intent_router.ensure_built(get_embedding_service())
+            self.ready = True
 
     def _build_graph(self)-> CompiledStateGraph:
         workflow  = StateGraph(OrchestratorState)
@@ -56,41 +110,19 @@ class AgentOrchestrator:
         
         #nodes
         workflow.add_node("supervisor", self._supervisor_node)
-        workflow.add_node("router", self._router_node)
-
-        workflow.add_node("policy", self._policy_node)
-        workflow.add_node("product_search", self._product_search_node)
-        workflow.add_node("product_detail", self._product_detail_node)
-        workflow.add_node("product_comparison", self._product_comparison_node)
-        workflow.add_node("escalation", self._escalation_node)
+        workflow.add_node("execute_routes", self._execute_routes_node)
         workflow.add_node("aggregate_responses", self.aggregate_responses)
 
         #entry point
         workflow.set_entry_point("supervisor")
 
-        #transitions
+        #transitions: one Send per independent lane of routes (map), merged in aggregate_responses (reduce)
         workflow.add_conditional_edges(
-            "router",
-            self.route_to_next,
-            {
-                "policy": "policy",
-                "product_search": "product_search",
-                "product_detail": "product_detail",
-                "comparison":"product_comparison",
-                "escalation": "escalation",
-                "aggregate_responses": "aggregate_responses",
-                "END": END
-            }
+            "supervisor",
+            self.fan_out_routes,
+            ["execute_routes", "aggregate_responses"]
         )
-
-        workflow.add_edge("supervisor", "router")
-
-        workflow.add_edge("policy", "router")
-        workflow.add_edge("product_search", "router")
-        workflow.add_edge("product_detail", "router")
-        workflow.add_edge("product_comparison", "router")
-        workflow.add_edge("escalation", "router")
-
+        workflow.add_edge("execute_routes", "aggregate_responses")
         workflow.add_edge("aggregate_responses", END)
 
         return workflow.compile()
@@ -107,8 +139,32 @@ class AgentOrchestrator:
         }
         return mapping.get(intent, "product_search")
 
+    def route_lanes(self, routes: list) -> list[list[int]]:
+        """
+        Group route indexes into lanes that can run concurrently.
+
+        Routes of the agents sharing the session's checkpoint thread stay in one
+        lane, in route order, so the thread history remains linear; stateless
+        routes (policy, escalation) get a lane each.
+        """
+        lanes = []
+        session_lane = []
+        for index, route in enumerate(routes):
+            if self.map_intent_to_agent(route.intent) in SESSION_AGENTS:
+                if not session_lane:
+                    lanes.append(session_lane)
+                session_lane.append(index)
+            else:
+                lanes.append([index])
+        return lanes
+
     async def _supervisor_node(self, state: OrchestratorState):
         """Route the query"""
+        if self.intent_router is not None:
+            route_request = await self.intent_router.route(state["user_query"], get_embedding_service())
+            if route_request is not None:
+                return {"route_request": route_request}
+
         logger.info("Orchestrator invoking SupervisorAgent for routing. User Query: %s, Session: %s", state["user_query"], state["session_Id"]) 
         route_request = await self.supervisor.route(
             user_query=state["user_query"],
@@ -116,181 +172,85 @@ class AgentOrchestrator:
         )
         logger.info(f"Orchestrator routed to agent: {route_request}")
         
-        state["route_request"] = route_request
-        state["current_route_index"] = 0
-        state["route_responses"] = []
-
-        first_route = route_request.routes[0] if route_request.routes else None
-        state["next_action"] = self.map_intent_to_agent(first_route.intent)
-
-        return state
-
-    async def _router_node(self, state: OrchestratorState):
-        logger.info("Orchestrator at router node. Current route index: %d. Next action %s", state["current_route_index"], state["next_action"])
+        return {"route_request": route_request}
 
-        return state
-
-    def route_to_next(self, state: OrchestratorState) -> str:
+    def fan_out_routes(self, state: OrchestratorState):
         """
-        Conditional edge function to route to next agent or finish
+        Conditional edge function: dispatch every lane of routes concurrently
         """
-        
         route_request = state["route_request"]
-        current_idx = state["current_route_index"]
-        # Check if we've processed all routes
-        if current_idx >= len(route_request.routes):
-            # All routes complete - aggregate if multiple
-            if len(route_request.routes) > 1:
-                return "aggregate_responses"
-            else:
-                return "END"
-        
-        # Route to next agent
-        current_route = route_request.routes[current_idx]
-        logger.info("Orchestrator routing to next agent based on intent: %s", current_route.intent)
-        return self.map_intent_to_agent(current_route.intent)
-
-    def _get_current_user_query(self, state: OrchestratorState) -> str:
-        """Get the current user query based on route index"""
-        route_request = state["route_request"]
-        current_idx = state["current_route_index"]
-        current_route = route_request.routes[current_idx]
-        return current_route.query
-
-    async def _policy_node(self, state: OrchestratorState):
-        """Execute policy agent"""
-
-        state["user_query"] = self._get_current_user_query(state)
-
-        logger.info("Orchestrator invoking PolicyAgent. User Query: %s , Session: %s, RouteIndex: %d", state["user_query"], state["session_Id"], state["current_route_index"])
-
-        result = await self.policy_agent.ainvoke(input={
-            "user_query": state["user_query"],
-            "session_Id": state["session_Id"]
-        })
-        state["response"] = result.message
-        state["route_responses"].append(result.message)
-        
-        # Move to next route
-        state["current_route_index"] += 1
-
-        metadatalist = state.get("metadatas", [])
-        if result.metadata:
-            metadatalist.append(result.metadata)
-            state["metadatas"] = metadatalist
-        
-        logger.info("PolicyAgent completed. Updated state current_route_index to %d", state["current_route_index"])
-        return state
-    
-
-    async def _product_search_node(self, state: OrchestratorState):
-        """Execute product discovery agent"""
-
-        state["user_query"] = self._get_current_user_query(state)
-
-        logger.info("Orchestrator invoking ProductSearchAgent. User Query: %s, Session: %s ", state["user_query"], state["session_Id"])
-        result = await self.product_discovery_agent.ainvoke(state=state)
-
-        state["response"] = result.message
-        state["route_responses"].append(result.message)
-        state["response_sources"].append(result.sources)
-        
-        # Move to next route
-        state["current_route_index"] += 1
-
-
-        metadatalist = state.get("metadatas", [])
-        if result.metadata:
-            metadatalist.append(result.metadata)
-            state["metadatas"] = metadatalist
-        return state
-
-    async def _product_detail_node(self, state: OrchestratorState):
-        """Execute product detail agent"""
-        
-        state["user_query"] = self._get_current_user_query(state)
-
-        logger.info("Orchestrator invoking ProductDetailAgent. User Query: %s, Session: %s ", state["user_query"], state["session_Id"])
-        result = await self.product_detail_agent.ainvoke(state=state)
-
-        state["response"] = result.message
-        state["route_responses"].append(result.message)
-        state["response_sources"].append(result.sources)
-        
-        # Move to next route
-        state["current_route_index"] += 1
-
-        metadatalist = state.get("metadatas", [])
-        if result.metadata:
-            metadatalist.append(result.metadata)
-            state["metadatas"] = metadatalist
-        return state
-    
-    async def _product_comparison_node(self, state: OrchestratorState):
-        """Execute product comparison agent"""
-        
-        state["user_query"] = self._get_current_user_query(state)
-        logger.info("Orchestrator invoking ProductComparisonAgent. User Query: %s, Session: %s ", state["user_query"], state["session_Id"])
-        result = await self.product_comparison_agent.ainvoke(state=state)
-
-        state["response"] = result.message
-        state["route_responses"].append(result.message)
-        state["response_sources"].append(result.sources)
-        
-        # Move to next route
-        state["current_route_index"] += 1
-
-        metadatalist = state.get("metadatas", [])
-        if result.metadata:
-            metadatalist.append(result.metadata)
-            state["metadatas"] = metadatalist
-        return state
-
-    async def _escalation_node(self, state: OrchestratorState):
-        """Execute escalation agent"""
-        state["user_query"] = self._get_current_user_query(state)
-        logger.info("Orchestrator invoking EscalationAgent. User Query: %s, Session: %s ", state["user_query"], state["session_Id"])
-        result = await self.escalation_agent.ainvoke(state=state)
-
-        state["response"] = result.message
-        state["route_responses"].append(result.message)
-        
-        # Move to next route
-        state["current_route_index"] += 1
-
-        metadatalist = state.get("metadatas", [])        
-        if result.metadata:
-            result.metadata.id = "escalation_agent"
-            metadatalist.append(result.metadata)
-            state["metadatas"] = metadatalist
-
-        return state    
-
-    
-    async def aggregate_responses(self, state: OrchestratorState) -> OrchestratorState:
+        routes = route_request.routes if route_request else []
+        if not routes:
+            return "aggregate_responses"
+
+        lanes = self.route_lanes(routes)
+        logger.info("Orchestrator dispatching %d routes in %d concurrent lanes: %s", len(routes), len(lanes), lanes)
+        return [
+            Send("execute_routes", {
+                "session_Id": state["session_Id"],
+                "route_request": route_request,
+                "route_indexes": lane
+            })
+            for lane in lanes
+        ]
+
+    async def _execute_routes_node(self, state: OrchestratorState):
+        """Execute one lane of routes in order"""
+        routes = state["route_request"].routes
+        results = []
+        for index in state["route_indexes"]:
+            route = routes[index]
+            agent_name = self.map_intent_to_agent(route.intent)
+            # One child run per route (prefetch call and/or agent loop), so astream can tag its tokens
+            result = await self.agent_run.ainvoke(
+                {"agent_name": agent_name, "user_query": route.query, "session_Id": state["session_Id"]},
+                config={"run_name": agent_name})
+            results.append({
+                "index": index,
+                "agent": agent_name,
+                "response": result.message,
+                # policy sources are document IDs, not products
+                "sources": result.sources if agent_name in SESSION_AGENTS else None,
+                "metadata": result.metadata
+            })
+        return {"route_results": results}
+
+    async def _invoke_agent_run(self, run: dict):
+        return await self._invoke_agent(run["agent_name"], run["user_query"], run["session_Id"])
+
+    async def _invoke_agent(self, agent_name: str, user_query: str, session_Id: str):
+        """Execute the agent serving one route"""
+        logger.info("Orchestrator invoking %s. User Query: %s, Session: %s", agent_name, user_query, session_Id)
+        agent_state = {"user_query": user_query, "session_Id": session_Id}
+
+        if agent_name == "policy":
+            return await self.policy_agent.ainvoke(input=agent_state)
+        if agent_name == "product_detail":
+            return await self.product_detail_agent.ainvoke(state=agent_state)
+        if agent_name == "product_comparison":
+            return await self.product_comparison_agent.ainvoke(state=agent_state)
+        if agent_name == "escalation":
+            result = await self.escalation_agent.ainvoke(state=agent_state)
+            if result.metadata:
+                result.metadata.id = "escalation_agent"
+            return result
+        return await self.product_discovery_agent.ainvoke(state=agent_state)
+
+    async def aggregate_responses(self, state: OrchestratorState):
         """
-        Combine responses from multiple routes into coherent answer
+        Combine responses from the routes into one answer, in route order
         """
-        logger.info("Orchestrator aggregating responses from multiple agents.")
-        combined_response = "\n\n".join(state["route_responses"])
-        state["response"] = combined_response
-        state["next_action"] = "END"
-        
-        return state
-
-    def _route_to_agent(self, state: OrchestratorState) -> str:
-        """Determine which agent to execute"""
-        logger.info("Orchestrator routing to agent: %s", state["current_agent"])
-        return state["current_agent"]
-    
+        results = sorted(state.get("route_results", []), key=lambda result: result["index"])
+        logger.info("Orchestrator aggregating responses from %d routes.", len(results))
+        route_responses = [result["response"] for result in results]
+        return {
+            "route_responses": route_responses,
+            "response_sources": [result["sources"] for result in results if result["sources"] is not None],
+            "metadatas": [result["metadata"] for result in results if result["metadata"]],
+            "response": "\n\n".join(route_responses)
+        }
 
-    @traceable(name="orchestrator.ainvoke", tags=["orchestration","entry-point"], metadata={"version": "2.0"})
-    async def ainvoke(self, input: dict):
-        """Orchestrate the agents based on user query
-        input: dict
-            user_query: str
-            session_Id: str
-        """
+    def _initial_state(self, input: dict) -> dict:
         user_query: str = input.get("user_query", "")
         session_Id: str = input.get("session_Id", "")
         
@@ -298,14 +258,14 @@ class AgentOrchestrator:
             raise ValueError("user_query and session_Id are required inputs")
 
         """Main entry point"""
-        initial_state = {
+        return {
             "messages": [],
             "user_query": user_query,
             "session_Id": session_Id,
             "current_agent": "",
             "route_request": None,
-            "current_route_index": 0,
-            "next_action": "",
+            "route_indexes": [],
+            "route_results": [],
             "route_responses": [],
             "response_sources": [],
             "response": "",
@@ -313,6 +273,141 @@ class AgentOrchestrator:
             "metadatas": []
         }
 
-        logger.info("Orchestrator starting execution for session_Id: %s and user_query %s", session_Id, user_query)
-        result = await self.graph.ainvoke(initial_state)
-        return result
\ No newline at end of file
+    async def _use_cache(self, session_Id: str) -> bool:
+        """
+        Semantic answer cache: only the first turn of a session is looked up and stored
+        (no checkpointed agent thread yet); follow-ups depend on the conversation
+        """
+        if self.semantic_cache is None:
+            return False
+        return not await get_checkpoint_store().has_thread(session_Id)
+
+    async def _lookup_cache(self, initial_state: dict) -> Optional[dict]:
+        """Cached answer of a route served by a stateless agent (semantic_cache_orchestrator_intents)"""
+        cached = await self.semantic_cache.lookup("orchestrator", initial_state["user_query"],
+                                                  settings.semantic_cache_orchestrator_intents)
+        if not cached:
+            return None
+        return {
+            **initial_state,
+            "response": cached["response"],
+            "route_responses": [cached["response"]],
+            "response_sources": cached.get("response_sources", []),
+            "semantic_cache": {"similarity": cached["similarity"], "cached_query": cached.get("query")}
+        }
+
+    async def _store_in_cache(self, user_query: str, result: dict, start: float):
+        route_request = result.get("route_request")
+        route_intents = {route.intent for route in route_request.routes} if route_request else set()
+        if self.semantic_cache is not None and len(route_intents) == 1 and route_intents <= set(settings.semantic_cache_orchestrator_intents):
+            await self.semantic_cache.store(
+                namespace="orchestrator",
+                query=user_query,
+                intent=route_intents.pop(),
+                payload={"response": result["response"], "response_sources": result.get("response_sources", [])},
+                latency_ms=(time.perf_counter() - start) * 1000,
+                tokens=sum(metadata.total_token or 0 for metadata in result.get("metadatas", []))
+            )
+
+    def _run_config(self) -> dict:
+        return {"max_concurrency": settings.orchestrator_max_concurrency}
+
+    @traceable(name="orchestrator.ainvoke", tags=["orchestration","entry-point"], metadata={"version": "2.0"})
+    async def ainvoke(self, input: dict):
+        """Orchestrate the agents based on user query
+        input: dict
+            user_query: str
+            session_Id: str
+        """
+        initial_state = self._initial_state(input)
+        use_cache = await self._use_cache(initial_state["session_Id"])
+        cached = await self._lookup_cache(initial_state) if use_cache else None
+        if cached:
+            return cached
+
+        await self.warmup()
+        logger.info("Orchestrator starting execution for session_Id: %s and user_query %s", initial_state["session_Id"], initial_state["user_query"])
+        start = time.perf_counter()
+        result = await self.graph.ainvoke(initial_state, config=self._run_config())
+
+        if use_cache:
+            await self._store_in_cache(initial_state["user_query"], result, start)
+        return result
+
+    @traceable(name="orchestrator.astream", tags=["orchestration","entry-point", "streaming"], metadata={"version": "1.0"})
+    async def astream(self, input: dict):
+        """Streaming variant of ainvoke (graph.astream_events)
+
+        Yields events as {"event": ..., "data": ...}:
+          token   - agent LLM content deltas, tagged with their route index
+                    (lanes run concurrently, so tokens of different routes interleave)
+          sources - response and sources of each route as soon as its lane completes
+          result  - the final orchestrator state (same as ainvoke)
+        """
+        initial_state = self._initial_state(input)
+        use_cache = await self._use_cache(initial_state["session_Id"])
+        cached = await self._lookup_cache(initial_state) if use_cache else None
+        if cached:
+            yield {"event": "sources", "data": {"route": 0, "sources": cached["response_sources"]}}
+            yield {"event": "token", "data": {"route": 0, "content": cached["response"]}}
+            yield {"event": "result", "data": cached}
+            return
+
+        await self.warmup()
+        logger.info("Orchestrator streaming execution for session_Id: %s and user_query %s", initial_state["session_Id"], initial_state["user_query"])
+        start = time.perf_counter()
+        lanes = {}  # run_id of each execute_routes branch -> {"routes": route indexes, "started": agent runs so far}
+        agent_routes = {}  # run_id of each agent run -> its route index (a lane runs one agent per route, in order)
+        held = {}  # run_id of prefetch LLM calls -> content held back while it may be PrefetchTemplates.MISSING_INFO
+        result = None
+        async for event in self.graph.astream_events(initial_state, config=self._run_config(), version="v2"):
+            kind = event["event"]
+            parent_ids = event.get("parent_ids", [])
+            if kind == "on_chain_start" and event["name"] == "execute_routes":
+                lanes[event["run_id"]] = {"routes": event["data"].get("input", {}).get("route_indexes", []), "started": 0}
+
+            elif kind == "on_chain_start" and parent_ids and parent_ids[-1] in lanes:
+                lane = lanes[parent_ids[-1]]
+                if lane["routes"]:
+                    agent_routes[event["run_id"]] = lane["routes"][min(lane["started"], len(lane["routes"]) - 1)]
+                lane["started"] += 1
+
+            elif kind == "on_chat_model_stream":
+                # Only agent answers; the supervisor's routing output is not streamed
+                route = next((agent_routes[run_id] for run_id in reversed(parent_ids) if run_id in agent_routes), None)
+                content = event["data"]["chunk"].content
+                if route is None or not content or not isinstance(content, str):
+                    continue
+                if "prefetch" in event.get("tags", []) and held.get(event["run_id"]) is not None:
+                    # A prefetch answer that turns out to be the missing-info reply is replaced by the agent loop
+                    content = held.pop(event["run_id"]) + content
+                    if PrefetchTemplates.MISSING_INFO.startswith(content.strip()):
+                        held[event["run_id"]] = content
+                        continue
+                yield {"event": "token", "data": {"route": route, "content": content}}
+
+            elif kind == "on_chat_model_start" and "prefetch" in event.get("tags", []):
+                held[event["run_id"]] = ""
+
+            elif kind == "on_chat_model_end" and event["run_id"] in held:
+                # Short answers that never diverged from the marker prefix
+                content = held.pop(event["run_id"])
+                route = next((agent_routes[run_id] for run_id in reversed(parent_ids) if run_id in agent_routes), None)
+                if route is not None and content.strip() != PrefetchTemplates.MISSING_INFO:
+                    yield {"event": "token", "data": {"route": route, "content": content}}
+
+            elif kind == "on_chain_end" and event["name"] == "execute_routes":
+                for route_result in event["data"].get("output", {}).get("route_results", []):
+                    yield {"event": "sources", "data": {
+                        "route": route_result["index"],
+                        "agent": route_result["agent"],
+                        "response": route_result["response"],
+                        "sources": route_result["sources"] or []
+                    }}
+
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                result = event["data"]["output"]
+
+        if use_cache:
+            await self._store_in_cache(initial_state["user_query"], result, start)
+        yield {"event": "result", "data": result}
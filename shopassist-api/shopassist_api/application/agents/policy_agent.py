@@ -1,53 +1,48 @@
 import uuid
-import json
-import operator
 import time
 
 from typing import Optional, TypedDict, Annotated
 
 from langchain_openai import AzureChatOpenAI
 from langchain.agents import create_agent
+from langgraph.graph.message import add_messages
 from langgraph.checkpoint.memory import InMemorySaver  
-from langgraph.runtime import Runtime
-from langchain.messages import RemoveMessage
-from langgraph.graph.message import REMOVE_ALL_MESSAGES
-from langchain.agents.middleware import before_model
 from langchain.tools import tool
 from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 from langgraph.checkpoint.redis import RedisSaver, RunnableConfig, CheckpointTuple
-from langgraph.checkpoint.redis.aio import AsyncRedisSaver
 
 from langsmith import traceable
 from shopassist_api.application.agents.agent_utils import AgentTools
+from shopassist_api.application.agents.checkpointing import trim_thread_messages
 from shopassist_api.application.agents.base import Metadata, PolicyResponse
+from shopassist_api.application.agents.prefetch import AgentPrefetch
 from shopassist_api.application.agents.token_monitor import token_monitor_dec
 from shopassist_api.application.settings.config import settings
 from shopassist_api.infrastructure.services.azure_credential_manager import get_credential_manager
-from shopassist_api.infrastructure.services.transformers_embedding_service import TransformersEmbeddingService
 from shopassist_api.application.prompts.agent_templates import PolicyTemplates
-from shopassist_api.infrastructure.services.milvus_service import MilvusService
+from shopassist_api.application.interfaces.di_container import get_embedding_service, get_vector_service
 
 from shopassist_api.logging_config import get_logger
 logger = get_logger(__name__)
 
 class PolicyAgentState(TypedDict):
-    messages: Annotated[list, operator.add]
+    messages: Annotated[list, add_messages]
     user_query: str = ""
     top_k: int = 2
 
-@tool
+@tool(response_format="content_and_artifact")
 @traceable(name="policy_agent.search_knowledge_base", tags=["policy", "agent_tool"], metadata={"version": "2.0"})
-async def search_knowledge_base(state: PolicyAgentState) -> dict:
+async def search_knowledge_base(state: PolicyAgentState) -> tuple[str, list[str]]:
     """Tool to search knowledge base in Milvus and return context and IDs of the sources.
         the results include information about Return Policy, Shipping Information, Warranty Details, etc.
     Args:
         state (PolicyAgentState): The current state of the agent.
     Returns:
-        dict: context and document IDs
+        str: context (the document IDs of the sources are returned as the tool artifact)
     """
 
-    milvus = MilvusService( settings.milvus_host, settings.milvus_port)
-    embedder = TransformersEmbeddingService(settings.transformers_embedding_model)
+    milvus = get_vector_service()
+    embedder = get_embedding_service()
 
     user_query = state.get("user_query", "")
     top_k =2 # state.get("top_k", 2)
@@ -55,7 +50,7 @@ async def search_knowledge_base(state: PolicyAgentState) -> dict:
     logger.info(f"PolicyAgent: Searching knowledge base with query: [{user_query}] Top K: {top_k}")
 
     query_embedding = await embedder.generate_embedding(user_query)
-    docs = milvus.search_knowledge_base(query_embedding= query_embedding, top_k=top_k)
+    docs = await milvus.asearch_knowledge_base(query_embedding= query_embedding, top_k=top_k)
     context_parts = []
     doc_names = []
     for i, chunk in enumerate(docs, 1):
@@ -65,28 +60,7 @@ async def search_knowledge_base(state: PolicyAgentState) -> dict:
     
     context = "\n\n".join(context_parts)
     logger.info(f"PolicyAgent: Retrieved {doc_names} from knowledge base for query: [{user_query}]")
-    return { "context": context, "doc_ids": doc_names }
-
-@before_model
-async def trim_message_history(state: PolicyAgentState, runtime:Runtime) -> PolicyAgentState:
-    """Middleware to trim message history if it exceeds a certain length.
-    Used to control memory usage for in-memory checkpointer.
-    """
-    messages = state["messages"]
-    if len(messages) <= 10:
-        return None
-
-    first_msg = messages[0]
-    recent_messages = messages[-9:] if len(messages) % 10 == 0 else messages[-10:]
-    new_messages = [first_msg] + recent_messages
-
-    return {
-        "messages": [
-            RemoveMessage(id=REMOVE_ALL_MESSAGES),
-            *new_messages
-        ]
-    }
-
+    return context, doc_names
 
 #region PolicyAgent wrapper class
 class PolicyAgent:
@@ -104,6 +78,7 @@ class PolicyAgent:
             temperature=0.3
         )
         self.agent = None
+        self.prefetch = AgentPrefetch.for_intent("policy", self.llm, PolicyTemplates.SYSTEM_PROMPT)
         
     async def _get_agent(self):
 
@@ -128,9 +103,18 @@ class PolicyAgent:
         #policy agent doesn't need session id from outside, generate a new one
         #this is to ensure each invocation is stateless from outside and save tokens
 
+        if self.prefetch is not None:
+            start = time.perf_counter()
+            response, llm_calls = await self._prefetch_answer(user_query)
+            if response is not None:
+                AgentPrefetch.record("policy", "prefetch", AgentPrefetch.elapsed_ms(start), llm_calls)
+                return response
+            AgentPrefetch.record("policy", "fallback", AgentPrefetch.elapsed_ms(start), llm_calls)
+
         if self.agent is None:
             self.agent = await self._get_agent()
 
+        start = time.perf_counter()
         result = await self.agent.ainvoke(
                 { 
                 "messages": [ HumanMessage(content=user_query) ],
@@ -146,18 +130,15 @@ class PolicyAgent:
         sum_output_tokens = 0
         sum_total_tokens = 0
         
-        doc_ids = []
+        doc_ids = AgentTools.tool_artifacts(messages, "search_knowledge_base")
         for msg in messages:
-            if isinstance(msg, ToolMessage) and msg.name == "search_knowledge_base":
-                content = msg.content
-                jsonobj = json.loads(content)                        
-                doc_ids = jsonobj["doc_ids"] if "doc_ids" in content else []
             if isinstance(msg, AIMessage):
                 metadata = msg.usage_metadata
                 if metadata:
                     sum_input_tokens += metadata.get("input_tokens") or 0
                     sum_output_tokens += metadata.get("output_tokens") or 0
                     sum_total_tokens += metadata.get("total_tokens") or 0
+        AgentPrefetch.record("policy", "react", AgentPrefetch.elapsed_ms(start), AgentPrefetch.turn_llm_calls(messages))
                 
         return PolicyResponse(
             message=response,
@@ -172,6 +153,30 @@ class PolicyAgent:
             )
         )
 
+    async def _prefetch_answer(self, user_query: str) -> tuple[Optional[PolicyResponse], int]:
+        """Knowledge base search + one completion; (None, LLM calls spent) when the ReAct loop must answer"""
+        context, doc_ids = await search_knowledge_base.coroutine({"user_query": user_query})
+        if not doc_ids:
+            return None, 0
+
+        message = await self.prefetch.answer(user_query, context)
+        if message is None:
+            return None, 1
+
+        usage = message.usage_metadata or {}
+        return PolicyResponse(
+            message=message.content,
+            sources=doc_ids,
+            needs_escalation=False,
+            agent_name=f"policy_agent",
+            model=self.deployment_name,
+            metadata= Metadata(
+                input_token=usage.get("input_tokens") or 0,
+                output_token=usage.get("output_tokens") or 0,
+                total_token=usage.get("total_tokens") or 0
+            )
+        ), 1
+
     def get_agent(self):
         return self.agent
 
@@ -241,9 +246,9 @@ def invoke_policy_agent_test(user_query: str):
     agent = create_agent (
                 model=llm,
                 tools=[search_knowledge_base],
-                # for testing purposes use in-memory checkpointer. trim_message_history for in-memory only
+                # for testing purposes use in-memory checkpointer
                 checkpointer=InMemorySaver(), 
-                middleware=[trim_message_history],
+                middleware=[trim_thread_messages],
                 system_prompt= PolicyTemplates.SYSTEM_PROMPT,
                 state_schema=PolicyAgentState,
             )
@@ -273,12 +278,7 @@ def invoke_policy_agent_test(user_query: str):
         print("Tool Messages:")
         for tm in tool_messages:
             print(f"- Tool Message Content: {tm.content}")
-            content = tm.content
-            #print type of content
-            print(f"  Content Type: {type(content)}")
-            jsonobj = json.loads(content)                        
-            doc_ids = jsonobj["doc_ids"] if "doc_ids" in content else []
-            print(f"  Associated Document IDs: {doc_ids}")
+            print(f"  Associated Document IDs: {tm.artifact}")
 
     print("Asking follow-up question...")
     time.sleep(3)  # Simulate some delay before follow-up question
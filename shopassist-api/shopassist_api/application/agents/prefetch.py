@@ -0,0 +1,130 @@
+import time
+from threading import RLock
+from typing import Dict, List, Optional
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langsmith import traceable
+from shopassist_api.application.prompts.agent_templates import PrefetchTemplates
+from shopassist_api.application.settings.config import settings
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class AgentPrefetch:
+    """
+    Prefetch execution mode for agents whose tool call is deterministic.
+
+    The agent runs its tool directly from the routed sub-query and answers with
+    one completion over the tool context, instead of spending a first LLM call
+    on deciding to call the tool. When the model replies with
+    PrefetchTemplates.MISSING_INFO (or the tool found nothing) answer() returns
+    None and the agent falls back to its ReAct loop.
+
+    Per-intent stats compare both paths: LLM calls and latency of ReAct runs
+    are the baseline for the calls and milliseconds saved by prefetch runs.
+    """
+
+    _stats: Dict[str, Dict[str, float]] = {}
+    _stats_lock = RLock()
+
+    def __init__(self, intent: str, llm, system_prompt: str):
+        self.intent = intent
+        self.llm = llm
+        self.system_prompt = system_prompt
+
+    @classmethod
+    def for_intent(cls, intent: str, llm, system_prompt: str) -> Optional["AgentPrefetch"]:
+        """Prefetch runner for the agent serving the intent, or None when disabled for it"""
+        if not settings.agent_prefetch_enabled or intent not in settings.agent_prefetch_intents:
+            return None
+        return cls(intent, llm, system_prompt)
+
+    @staticmethod
+    def history(messages: List[BaseMessage], limit: Optional[int] = None) -> List[BaseMessage]:
+        """Last user/assistant turns of a checkpointed thread (tool calls and results dropped),
+        after the summary of the earlier turns when the thread was compacted"""
+        limit = settings.agent_prefetch_history_messages if limit is None else limit
+        summaries = [msg for msg in messages if isinstance(msg, SystemMessage)]
+        turns = [
+            msg for msg in messages
+            if isinstance(msg, HumanMessage) or (isinstance(msg, AIMessage) and msg.content and not msg.tool_calls)
+        ]
+        return summaries + turns[-limit:] if limit > 0 else []
+
+    @staticmethod
+    def turn_llm_calls(messages: List[BaseMessage]) -> int:
+        """LLM calls of the last turn of a ReAct run (AI messages after the last user message)"""
+        calls = 0
+        for msg in reversed(messages):
+            if isinstance(msg, HumanMessage):
+                break
+            if isinstance(msg, AIMessage):
+                calls += 1
+        return calls
+
+    @traceable(name="agent_prefetch.answer", tags=["agent", "prefetch"], metadata={"version": "1.0"})
+    async def answer(self, user_query: str, context: str, history: List[BaseMessage] = None) -> Optional[AIMessage]:
+        """One completion over the prefetched context; None when the model signals missing information"""
+        messages = [
+            SystemMessage(content=self.system_prompt + PrefetchTemplates.INSTRUCTIONS.format(context=context)),
+            *(history or []),
+            HumanMessage(content=user_query),
+        ]
+        response = await self.llm.ainvoke(messages, config={"run_name": f"{self.intent}.prefetch", "tags": ["prefetch"]})
+        if PrefetchTemplates.MISSING_INFO in (response.content or ""):
+            logger.info(f"Prefetch [{self.intent}]: model signalled missing information, falling back to the agent loop")
+            return None
+        return response
+
+    @classmethod
+    def record(cls, intent: str, mode: str, elapsed_ms: float, llm_calls: int = 0) -> None:
+        """
+        Record one agent run. mode is
+          prefetch - answered with the prefetched context (one LLM call)
+          fallback - prefetch gave up; elapsed_ms/llm_calls are what it wasted before the ReAct run
+          react    - a ReAct loop run (the fallback itself, or prefetch disabled)
+        """
+        with cls._stats_lock:
+            stats = cls._stats.setdefault(intent, {
+                "prefetch_runs": 0, "prefetch_ms": 0.0,
+                "fallbacks": 0, "fallback_llm_calls": 0, "fallback_ms": 0.0,
+                "react_runs": 0, "react_llm_calls": 0, "react_ms": 0.0,
+            })
+            stats[f"{mode}_runs" if mode != "fallback" else "fallbacks"] += 1
+            stats[f"{mode}_ms"] += elapsed_ms
+            if mode != "prefetch":
+                stats[f"{mode}_llm_calls"] += llm_calls
+
+    @staticmethod
+    def elapsed_ms(start: float) -> float:
+        return (time.perf_counter() - start) * 1000
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """Per-intent runs, fallback rate and LLM calls / latency saved against the ReAct baseline"""
+        report = {}
+        with cls._stats_lock:
+            for intent, stats in cls._stats.items():
+                prefetch_runs, react_runs = stats["prefetch_runs"], stats["react_runs"]
+                attempts = prefetch_runs + stats["fallbacks"]
+                avg_prefetch_ms = stats["prefetch_ms"] / prefetch_runs if prefetch_runs else None
+                avg_react_ms = stats["react_ms"] / react_runs if react_runs else None
+                avg_react_calls = stats["react_llm_calls"] / react_runs if react_runs else None
+                entry = {
+                    "prefetch_runs": prefetch_runs,
+                    "fallbacks": stats["fallbacks"],
+                    "react_runs": react_runs,
+                    "fallback_rate": stats["fallbacks"] / attempts if attempts else 0.0,
+                    "avg_prefetch_ms": avg_prefetch_ms,
+                    "avg_react_ms": avg_react_ms,
+                    "avg_react_llm_calls": avg_react_calls,
+                    # No baseline until at least one ReAct run has been observed
+                    "llm_calls_saved": None,
+                    "latency_saved_ms": None,
+                }
+                if react_runs:
+                    entry["llm_calls_saved"] = prefetch_runs * (avg_react_calls - 1) - stats["fallback_llm_calls"]
+                    entry["latency_saved_ms"] = round(
+                        prefetch_runs * (avg_react_ms - (avg_prefetch_ms or 0.0)) - stats["fallback_ms"], 1)
+                report[intent] = entry
+        return report
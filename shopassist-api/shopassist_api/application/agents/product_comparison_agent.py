@@ -1,23 +1,22 @@
-import json
-import operator
 from typing import Annotated, Optional, TypedDict
 import uuid
 from langchain_openai import AzureChatOpenAI
-from langgraph.checkpoint.redis.aio import AsyncRedisSaver
 from langchain.agents import create_agent
+from langgraph.graph.message import add_messages
 from langchain.tools import tool
-from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.messages import HumanMessage
 
 
 from langsmith import traceable
 from shopassist_api.application.agents.agent_utils import AgentTools
+from shopassist_api.application.agents.checkpointing import trim_thread_messages
 from shopassist_api.application.agents.base import Metadata, AgentResponse
 from shopassist_api.application.agents.token_monitor import token_monitor_dec
 from shopassist_api.application.settings.config import settings
 from shopassist_api.infrastructure.services.azure_credential_manager import get_credential_manager
 from shopassist_api.application.prompts.agent_templates import ProductComparisonTemplates
 from shopassist_api.application.services.context_builder import ContextBuilder
-from shopassist_api.application.interfaces.di_container import get_retrieval_service
+from shopassist_api.application.interfaces.di_container import get_retrieval_service, get_thread_summarizer, get_checkpoint_store
 
 
 from shopassist_api.logging_config import get_logger
@@ -25,20 +24,20 @@ logger = get_logger(__name__)
 
 class ProductComparisonAgentState(TypedDict):
     """State schema for ProductComparisonAgent"""
-    messages: Annotated[list, operator.add]
+    messages: Annotated[list, add_messages]
     product_names: Optional[list[str]] = None
 
 
-@tool
+@tool(response_format="content_and_artifact")
 @traceable(name="comparison_agent.search_product", tags=["comparison", "agent_tool"], metadata={"version": "2.0"})
-async def search_product(state:ProductComparisonAgentState) -> dict:
+async def search_product(state:ProductComparisonAgentState) -> tuple[str, list[dict]]:
     """ Tool to get product details based on product names.
     Args:
         state (ProductComparisonAgentState): The current state of the agent.
         state includes:
             - product_names: List of product names to get details for.
     Returns:
-        dict: A dictionary containing the product details and context.
+        str: The context for the answer (the matched products are returned as the tool artifact).
     """
     product_names = state.get("product_names", [])
     logger.info(f"Getting details for products: {product_names}")
@@ -55,10 +54,7 @@ async def search_product(state:ProductComparisonAgentState) -> dict:
 
     if not products or len(products) == 0:
         logger.info(f"No products found for query [{query}]")
-        return {
-            "products": [],
-            "context": "No products found matching the input."
-        }
+        return "No products found matching the input.", []
     
     context_builder = ContextBuilder()
     context = context_builder.build_product_context(products)
@@ -76,14 +72,10 @@ async def search_product(state:ProductComparisonAgentState) -> dict:
     
     logger.info(f"Retrieved {formatted_products} products for query: [{query}]")
     
-    return {
-        "products": formatted_products,
-        "context": context
-    }
+    return context, formatted_products
 
 class ProductComparisonAgent:
     
-    cache_checkpointer = None   
 
     def __init__(self):
         credential_manager = get_credential_manager()
@@ -96,18 +88,14 @@ class ProductComparisonAgent:
                 temperature=0
         )
         self.agent = None
+        self.thread_summarizer = get_thread_summarizer()
 
     async def _get_agent(self):
-        if ProductComparisonAgent.cache_checkpointer is None:
-            logger.info(f"Initializing Redis Checkpointer for ProductComparisonAgent: {settings.redis_url}")
-            async with AsyncRedisSaver.from_conn_string(settings.redis_url, ttl={ "default_ttl":1440, "refresh_on_read": True }) as checkpointer:
-                await checkpointer.asetup()
-                ProductComparisonAgent.cache_checkpointer = checkpointer
-
         agent = create_agent(
                 model=self.llm,
                 tools=[search_product],
-                checkpointer= ProductComparisonAgent.cache_checkpointer,  
+                checkpointer=await get_checkpoint_store().get_saver(),
+                middleware=[trim_thread_messages],
                 system_prompt= ProductComparisonTemplates.SYSTEM_PROMPT,
                 state_schema=ProductComparisonAgentState,
             )
@@ -136,40 +124,13 @@ class ProductComparisonAgent:
         )
 
         messages = result["messages"]
+        if self.thread_summarizer is not None:
+            self.thread_summarizer.schedule(self.agent, session_Id)
 
         response = messages[-1].content
 
-        sources = []
-        sum_input_tokens = 0
-        sum_output_tokens = 0
-        sum_total_tokens = 0
-
-        for msg in messages:
-            if isinstance(msg, ToolMessage):
-                if msg.name == "search_products":
-                    if not msg.content or not isinstance(msg.content, str):
-                        logger.warning(f"Invalid tool message content: {msg.content}")
-                        continue
-                    
-                    content = msg.content.strip()
-                    try:
-                        if not content:
-                            logger.warning("Tool message content is empty.")
-                            continue
-                        jsonobj = json.loads(content)
-                        products = jsonobj.get("products", [])
-                        sources.extend(products)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"JSON decode error while parsing tool message content: {e}")
-                        logger.error(f"Content was: {content} \n end")  # Log first 200 chars of content
-                        continue
-            
-            if isinstance(msg, AIMessage):
-                metadata = msg.usage_metadata
-                if metadata:
-                    sum_input_tokens += metadata.get("input_tokens") or 0
-                    sum_output_tokens += metadata.get("output_tokens") or 0
-                    sum_total_tokens += metadata.get("total_tokens") or 0
+        sources = AgentTools.tool_artifacts(messages, "search_product")
+        sum_input_tokens, sum_output_tokens, sum_total_tokens = AgentTools.turn_usage(messages)
         
 
         return AgentResponse(
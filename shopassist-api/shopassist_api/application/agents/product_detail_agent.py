@@ -1,23 +1,24 @@
-import json
-import operator
+import time
 from typing import Annotated, Optional, TypedDict
 import uuid
 from langchain_openai import AzureChatOpenAI
-from langgraph.checkpoint.redis.aio import AsyncRedisSaver
 from langchain.agents import create_agent
+from langgraph.graph.message import add_messages
 from langchain.tools import tool
-from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.messages import HumanMessage
 
 
 from langsmith import traceable
 from shopassist_api.application.agents.agent_utils import AgentTools
+from shopassist_api.application.agents.checkpointing import trim_thread_messages
 from shopassist_api.application.agents.base import AgentResponse, Metadata
+from shopassist_api.application.agents.prefetch import AgentPrefetch
 from shopassist_api.application.agents.token_monitor import token_monitor_dec
 from shopassist_api.application.settings.config import settings
 from shopassist_api.infrastructure.services.azure_credential_manager import get_credential_manager
 from shopassist_api.application.prompts.agent_templates import ProductDetailTemplates
 from shopassist_api.application.services.context_builder import ContextBuilder
-from shopassist_api.application.interfaces.di_container import get_retrieval_service
+from shopassist_api.application.interfaces.di_container import get_retrieval_service, get_thread_summarizer, get_checkpoint_store
 
 
 from shopassist_api.logging_config import get_logger
@@ -28,12 +29,12 @@ logger = get_logger(__name__)
 class ProductDetailAgentState(TypedDict):
 
     """State schema for ProductDetailAgent"""
-    messages: Annotated[list, operator.add]
+    messages: Annotated[list, add_messages]
     product_name: Optional[str] = None
 
-@tool
+@tool(response_format="content_and_artifact")
 @traceable(name="detail_agent.search_product", tags=["details", "agent_tool"], metadata={"version": "2.0"})
-async def search_product(state:ProductDetailAgentState) -> dict:
+async def search_product(state:ProductDetailAgentState) -> tuple[str, list[dict]]:
     """Tool to search products based on user query.
     Args:
         state (ProductDetailAgentState): The current state of the agent.
@@ -41,7 +42,7 @@ async def search_product(state:ProductDetailAgentState) -> dict:
             - product_name: The name of the product to get details for.
             - top_k: Number of top products to retrieve.
     Returns:
-        dict: A dictionary containing the search results and context.
+        str: The context for the answer (the matched products are returned as the tool artifact).
     """
 
     query = state.get("product_name", "")
@@ -55,10 +56,7 @@ async def search_product(state:ProductDetailAgentState) -> dict:
 
     if not products or len(products) == 0:
         logger.info(f"No products found for query [{query}]")
-        return {
-            "products": [],
-            "context": "No products found matching your query."
-        }
+        return "No products found matching your query.", []
     
     context_builder = ContextBuilder()
     context = context_builder.build_product_context(products)
@@ -75,15 +73,11 @@ async def search_product(state:ProductDetailAgentState) -> dict:
         "product_url": prod['product_url']
     } for prod in products ]
     logger.info(f"Retrieved {formatted_products} products for query: [{query}]")
-    return {
-        "context": context,
-        "products": formatted_products
-    }
+    return context, formatted_products
 
 
 class ProductDetailAgent:
 
-    cache_checkpointer = None
 
     def __init__(self):
         credential_manager = get_credential_manager()
@@ -96,18 +90,15 @@ class ProductDetailAgent:
                 temperature=0
         )
         self.agent = None
+        self.thread_summarizer = get_thread_summarizer()
+        self.prefetch = AgentPrefetch.for_intent("product_detail", self.llm, ProductDetailTemplates.SYSTEM_PROMPT)
 
     async def _get_agent(self):
-        if ProductDetailAgent.cache_checkpointer is None:
-            logger.info(f"Initializing Redis Checkpointer for ProductDetailAgent: {settings.redis_url}")
-            async with AsyncRedisSaver.from_conn_string(settings.redis_url, ttl={ "default_ttl":1440, "refresh_on_read": True }) as checkpointer:
-                await checkpointer.asetup()
-                ProductDetailAgent.cache_checkpointer = checkpointer
-
         agent = create_agent(
                 model=self.llm,
                 tools=[search_product],
-                checkpointer= ProductDetailAgent.cache_checkpointer,  
+                checkpointer=await get_checkpoint_store().get_saver(),
+                middleware=[trim_thread_messages],
                 system_prompt= ProductDetailTemplates.SYSTEM_PROMPT,
                 state_schema=ProductDetailAgentState,
             )
@@ -129,47 +120,30 @@ class ProductDetailAgent:
         if self.agent is None:
             self.agent = await self._get_agent()
 
+        if self.prefetch is not None:
+            start = time.perf_counter()
+            response, llm_calls = await self._prefetch_answer(user_query, session_Id)
+            if response is not None:
+                AgentPrefetch.record("product_detail", "prefetch", AgentPrefetch.elapsed_ms(start), llm_calls)
+                return response
+            AgentPrefetch.record("product_detail", "fallback", AgentPrefetch.elapsed_ms(start), llm_calls)
+
         logger.info(f"ProductDetailAgent: Invoking agent for query: [{user_query}] in session: {session_Id}")
+        start = time.perf_counter()
         result = await self.agent.ainvoke(
             {"messages": [ HumanMessage(content=user_query) ],},
             {"configurable": {"thread_id": session_Id}}
         )
 
         messages = result["messages"]
+        if self.thread_summarizer is not None:
+            self.thread_summarizer.schedule(self.agent, session_Id)
 
         response = messages[-1].content
 
-        sources = []
-        sum_input_tokens = 0
-        sum_output_tokens = 0
-        sum_total_tokens = 0
-
-        for msg in messages:
-            if isinstance(msg, ToolMessage):
-                if msg.name == "search_products":
-                    if not msg.content or not isinstance(msg.content, str):
-                        logger.warning(f"Invalid tool message content: {msg.content}")
-                        continue
-                    
-                    content = msg.content.strip()
-                    try:
-                        if not content:
-                            logger.warning("Tool message content is empty.")
-                            continue
-                        jsonobj = json.loads(content)
-                        products = jsonobj.get("products", [])
-                        sources.extend(products)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"JSON decode error while parsing tool message content: {e}")
-                        logger.error(f"Content was: {content} \n end")  # Log first 200 chars of content
-                        continue
-            
-            if isinstance(msg, AIMessage):
-                metadata = msg.usage_metadata
-                if metadata:
-                    sum_input_tokens += metadata.get("input_tokens") or 0
-                    sum_output_tokens += metadata.get("output_tokens") or 0
-                    sum_total_tokens += metadata.get("total_tokens") or 0
+        sources = AgentTools.tool_artifacts(messages, "search_product")
+        sum_input_tokens, sum_output_tokens, sum_total_tokens = AgentTools.turn_usage(messages)
+        AgentPrefetch.record("product_detail", "react", AgentPrefetch.elapsed_ms(start), AgentPrefetch.turn_llm_calls(messages))
         
 
         return AgentResponse(
@@ -184,6 +158,35 @@ class ProductDetailAgent:
                 total_token=sum_total_tokens
             ))
     
+    async def _prefetch_answer(self, user_query: str, session_Id: str) -> tuple[Optional[AgentResponse], int]:
+        """Product lookup from the query and one completion; (None, LLM calls spent) when the ReAct loop must answer"""
+        context, products = await search_product.coroutine({"product_name": user_query})
+        if not products:
+            return None, 0
+
+        config = {"configurable": {"thread_id": session_Id}}
+        thread = await self.agent.aget_state(config)
+        message = await self.prefetch.answer(user_query, context, AgentPrefetch.history(thread.values.get("messages", [])))
+        if message is None:
+            return None, 1
+
+        # Keep the session thread complete for follow-ups answered by the ReAct loop
+        await self.agent.aupdate_state(config, {"messages": [HumanMessage(content=user_query), message]}, as_node="model")
+        if self.thread_summarizer is not None:
+            self.thread_summarizer.schedule(self.agent, session_Id)
+        usage = message.usage_metadata or {}
+        return AgentResponse(
+            message=message.content,
+            sources=products,
+            agent_name=f"product_detail_agent",
+            model=self.llm.deployment_name,
+            metadata=Metadata(
+                id="product_detail_agent",
+                input_token=usage.get("input_tokens") or 0,
+                output_token=usage.get("output_tokens") or 0,
+                total_token=usage.get("total_tokens") or 0
+            )), 1
+
     async def get_history(self, session_id: str) -> list[dict]:
         """Retrieve the message history for a given session ID."""
         if self.agent is None:
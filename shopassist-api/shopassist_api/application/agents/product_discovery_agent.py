@@ -1,23 +1,25 @@
-import json
-import operator
+import time
 from typing import Annotated, Optional, TypedDict
 import uuid
 from langchain_openai import AzureChatOpenAI
-from langgraph.checkpoint.redis.aio import AsyncRedisSaver
 from langchain.agents import create_agent
+from langgraph.graph.message import add_messages
 from langchain.tools import tool
-from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.messages import HumanMessage
 
 from langsmith import traceable
 from pydantic import BaseModel, Field
 from shopassist_api.application.agents.agent_utils import AgentTools
+from shopassist_api.application.agents.checkpointing import trim_thread_messages
 from shopassist_api.application.agents.base import AgentResponse, Metadata, PriceFilter
+from shopassist_api.application.agents.prefetch import AgentPrefetch
 from shopassist_api.application.agents.token_monitor import token_monitor_dec
 from shopassist_api.application.settings.config import settings
 from shopassist_api.infrastructure.services.azure_credential_manager import get_credential_manager
 from shopassist_api.application.prompts.agent_templates import ProductSearchTemplates
 from shopassist_api.application.services.context_builder import ContextBuilder
-from shopassist_api.application.interfaces.di_container import get_retrieval_service
+from shopassist_api.application.services.query_processor import QueryProcessor
+from shopassist_api.application.interfaces.di_container import get_retrieval_service, get_thread_summarizer, get_checkpoint_store
 
 from shopassist_api.logging_config import get_logger
 logger = get_logger(__name__)
@@ -26,7 +28,7 @@ logger = get_logger(__name__)
 #region ProductDiscoveryAgentState
 class ProductDiscoveryAgentState(TypedDict):
     """State schema for ProductDiscoveryAgentState"""
-    messages: Annotated[list, operator.add]
+    messages: Annotated[list, add_messages]
     user_query: Optional[str] = None
     top_k: int = 3
     price_filter: Optional[PriceFilter] = None
@@ -40,16 +42,16 @@ async def search_categories(query:str) -> list[str]:
         query (str): The user's search query.
     """
     retrieval = get_retrieval_service()
-    logger.info(f"Extracting categories for query: [{query}], top_k={settings.top_k_categories}, radius={settings.threshold_category_similarity}")  
-    categories = await retrieval.retrieve_top_categories(query, top_k=settings.top_k_categories, radius=settings.threshold_category_similarity)
+    logger.info(f"Extracting categories for query: [{query}], top_k={settings.top_k_categories}, radius={retrieval.category_radius()}")  
+    categories = await retrieval.retrieve_top_categories(query, top_k=settings.top_k_categories)
     cat_names = [ cat["name"] for cat in categories ]
     
     logger.info(f"Extracted categories for query [{query}]: {cat_names}")
     return cat_names
 
-@tool(name_or_callable="search_products")
+@tool(name_or_callable="search_products", response_format="content_and_artifact")
 @traceable(name="product_discovery.search_product", tags=["search", "agent_tool","products"], metadata={"version": "2.0"})
-async def search_products(state:ProductDiscoveryAgentState) -> dict:
+async def search_products(state:ProductDiscoveryAgentState) -> tuple[str, list[dict]]:
     """Tool to search products based on user query.
     Args:
         state (ProductDiscoveryAgentState): The current state of the agent.
@@ -59,7 +61,7 @@ async def search_products(state:ProductDiscoveryAgentState) -> dict:
             - categories: List of categories to filter the search.
             - price_filter: Optional price filter extracted from the query.
     Returns:
-        dict: A dictionary containing the search results and context.
+        str: The context for the answer (the matched products are returned as the tool artifact).
     """
     query = state.get("user_query", "")
     #hardcode top_k for now
@@ -101,10 +103,7 @@ async def search_products(state:ProductDiscoveryAgentState) -> dict:
     
     if not products or len(products) == 0:
         logger.info(f"No products found for query: [{query}] with filters: {filters}")
-        return {
-            "products": [],
-            "context": "No products found matching your query."
-        }
+        return "No products found matching your query.", []
     
     context_builder = ContextBuilder()
     context = context_builder.build_product_context(products)
@@ -120,14 +119,10 @@ async def search_products(state:ProductDiscoveryAgentState) -> dict:
         "distance": prod.get('distance', None)
     } for prod in products ]
     logger.info(f"Retrieved {formatted_products} products for query: [{query}]")
-    return {
-        "context": context,
-        "products": formatted_products
-    }
+    return context, formatted_products
 
 class ProductDiscoveryAgent:
 
-    cache_checkpointer = None
 
     def __init__(self):
         
@@ -142,19 +137,16 @@ class ProductDiscoveryAgent:
                 temperature=0
         )
         self.agent = None
+        self.thread_summarizer = get_thread_summarizer()
+        self.prefetch = AgentPrefetch.for_intent("product_search", self.llm, ProductSearchTemplates.SYSTEM_PROMPT_DISCOVERY)
         
     
     async def _get_agent(self):
-        if ProductDiscoveryAgent.cache_checkpointer is None:
-            logger.info(f"Initializing Redis Checkpointer for ProductDiscoveryAgent: {settings.redis_url}")
-            async with AsyncRedisSaver.from_conn_string(settings.redis_url, ttl={ "default_ttl":1440, "refresh_on_read": True }) as checkpointer:
-                await checkpointer.asetup()
-                ProductDiscoveryAgent.cache_checkpointer = checkpointer
-
         agent = create_agent(
                 model=self.llm,
                 tools=[search_products, search_categories],
-                checkpointer= ProductDiscoveryAgent.cache_checkpointer,  
+                checkpointer=await get_checkpoint_store().get_saver(),
+                middleware=[trim_thread_messages],
                 system_prompt= ProductSearchTemplates.SYSTEM_PROMPT_DISCOVERY,
                 state_schema=ProductDiscoveryAgentState,
             )
@@ -176,47 +168,30 @@ class ProductDiscoveryAgent:
         if self.agent is None:
             self.agent = await self._get_agent()
 
+        if self.prefetch is not None:
+            start = time.perf_counter()
+            response, llm_calls = await self._prefetch_answer(user_query, session_Id)
+            if response is not None:
+                AgentPrefetch.record("product_search", "prefetch", AgentPrefetch.elapsed_ms(start), llm_calls)
+                return response
+            AgentPrefetch.record("product_search", "fallback", AgentPrefetch.elapsed_ms(start), llm_calls)
+
         logger.info(f"Invoking with session_Id: {session_Id} and user_query: {user_query}")
+        start = time.perf_counter()
         result = await self.agent.ainvoke(
             {"messages": [ HumanMessage(content=user_query) ],},
             {"configurable": {"thread_id": session_Id}}
         )
 
         messages = result["messages"]
+        if self.thread_summarizer is not None:
+            self.thread_summarizer.schedule(self.agent, session_Id)
 
         response = messages[-1].content
 
-        sources = []
-        sum_input_tokens = 0
-        sum_output_tokens = 0
-        sum_total_tokens = 0
-
-        for msg in messages:
-            if isinstance(msg, ToolMessage):
-                if msg.name == "search_products":
-                    if not msg.content or not isinstance(msg.content, str):
-                        logger.warning(f"Invalid tool message content: {msg.content}")
-                        continue
-                    
-                    content = msg.content.strip()
-                    try:
-                        if not content:
-                            logger.warning("Tool message content is empty.")
-                            continue
-                        jsonobj = json.loads(content)
-                        products = jsonobj.get("products", [])
-                        sources.extend(products)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"JSON decode error while parsing tool message content: {e}")
-                        logger.error(f"Content was: {content} \n end")  # Log first 200 chars of content
-                        continue
-            
-            if isinstance(msg, AIMessage):
-                metadata = msg.usage_metadata
-                if metadata:
-                    sum_input_tokens += metadata.get("input_tokens") or 0
-                    sum_output_tokens += metadata.get("output_tokens") or 0
-                    sum_total_tokens += metadata.get("total_tokens") or 0
+        sources = AgentTools.tool_artifacts(messages, "search_products")
+        sum_input_tokens, sum_output_tokens, sum_total_tokens = AgentTools.turn_usage(messages)
+        AgentPrefetch.record("product_search", "react", AgentPrefetch.elapsed_ms(start), AgentPrefetch.turn_llm_calls(messages))
 
         
         return AgentResponse (
@@ -232,6 +207,39 @@ class ProductDiscoveryAgent:
             )
         )
 
+    async def _prefetch_answer(self, user_query: str, session_Id: str) -> tuple[Optional[AgentResponse], int]:
+        """Category + product search from the query and one completion; (None, LLM calls spent) when the ReAct loop must answer"""
+        _, filters = QueryProcessor().process_query(user_query)
+        price_filter = PriceFilter(**filters, confidence=1.0) if filters else None
+        categories = await search_categories.coroutine(user_query)
+        context, products = await search_products.coroutine({"user_query": user_query, "categories": categories, "price_filter": price_filter})
+        if not products:
+            return None, 0
+
+        config = {"configurable": {"thread_id": session_Id}}
+        thread = await self.agent.aget_state(config)
+        message = await self.prefetch.answer(user_query, context, AgentPrefetch.history(thread.values.get("messages", [])))
+        if message is None:
+            return None, 1
+
+        # Keep the session thread complete for follow-ups answered by the ReAct loop
+        await self.agent.aupdate_state(config, {"messages": [HumanMessage(content=user_query), message]}, as_node="model")
+        if self.thread_summarizer is not None:
+            self.thread_summarizer.schedule(self.agent, session_Id)
+        usage = message.usage_metadata or {}
+        return AgentResponse (
+            message=message.content, 
+            sources=products, 
+            agent_name=f"product_discovery_agent",
+            model=self.model_deployment,
+            metadata= Metadata(
+                id=f"product_discovery_agent",
+                input_token=usage.get("input_tokens") or 0,
+                output_token=usage.get("output_tokens") or 0,
+                total_token=usage.get("total_tokens") or 0
+            )
+        ), 1
+
     async def get_history(self, session_id: str) -> list[dict]:
         """Retrieve the message history for a given session ID."""
         if self.agent is None:
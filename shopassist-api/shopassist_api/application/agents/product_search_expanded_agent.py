@@ -1,23 +1,22 @@
 
-import json
-import operator
 from typing import Annotated, Optional, TypedDict
 import uuid
 from langchain_openai import AzureChatOpenAI
-from langgraph.checkpoint.redis.aio import AsyncRedisSaver
 from langchain.agents import create_agent
+from langgraph.graph.message import add_messages
 from langchain.tools import tool
-from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.messages import AIMessage, HumanMessage
 
 from langsmith import traceable
 from pydantic import BaseModel, Field
 from shopassist_api.application.agents.agent_utils import AgentTools
+from shopassist_api.application.agents.checkpointing import trim_thread_messages
 from shopassist_api.application.agents.base import AgentResponse, Metadata, PriceFilter
 from shopassist_api.application.settings.config import settings
 from shopassist_api.infrastructure.services.azure_credential_manager import get_credential_manager
 from shopassist_api.application.prompts.agent_templates import ProductSearchTemplates
 from shopassist_api.application.services.context_builder import ContextBuilder
-from shopassist_api.application.interfaces.di_container import get_retrieval_service
+from shopassist_api.application.interfaces.di_container import get_retrieval_service, get_checkpoint_store
 
 from shopassist_api.logging_config import get_logger
 logger = get_logger(__name__)
@@ -26,7 +25,7 @@ logger = get_logger(__name__)
 #region ProductSearchAgent
 class ProductSearchExpandedAgentState(TypedDict):
     """State schema for ProductSearchAgent"""
-    messages: Annotated[list, operator.add]
+    messages: Annotated[list, add_messages]
     user_queries: Optional[list[str]] = None
     categories: Optional[list[str]] = None
     top_k: int = 3
@@ -34,9 +33,9 @@ class ProductSearchExpandedAgentState(TypedDict):
 
 
 
-@tool
+@tool(response_format="content_and_artifact")
 @traceable(name="search_agent.search_product", tags=["search", "agent_tool","products"], metadata={"version": "2.0"})
-async def search_products(state:ProductSearchExpandedAgentState) -> dict:
+async def search_products(state:ProductSearchExpandedAgentState) -> tuple[str, list[dict]]:
     """Tool to search products based on user query.
     Args:
         state (ProductSearchExpandedAgentState): The current state of the agent.
@@ -46,7 +45,7 @@ async def search_products(state:ProductSearchExpandedAgentState) -> dict:
             - top_k: Number of top products to retrieve.
             - price_filter: Optional price filter extracted from the query.
     Returns:
-        dict: A dictionary containing the search results and context.
+        str: The context for the answer (the matched products are returned as the tool artifact).
     """
     queries = state.get("user_queries", "")
     #hardcode top_k for now
@@ -78,10 +77,7 @@ async def search_products(state:ProductSearchExpandedAgentState) -> dict:
 
     if not products or len(products) == 0:
         logger.warning(f"No products found for query: [{queries}] with filters={filters}")
-        return {
-            "products": [],
-            "context": "No products found matching your query."
-        }
+        return "No products found matching your query.", []
     
     context_builder = ContextBuilder()
     context = context_builder.build_product_context(products)
@@ -97,14 +93,10 @@ async def search_products(state:ProductSearchExpandedAgentState) -> dict:
         "distance": prod.get('distance', None)
     } for prod in products ]
     logger.info(f"Retrieved {formatted_products} products for query: [{queries}]")
-    return {
-        "context": context,
-        "products": formatted_products
-    }
+    return context, formatted_products
 
 class ProductSearchExpandedAgent:
 
-    cache_checkpointer = None
 
     def __init__(self):
         
@@ -122,16 +114,11 @@ class ProductSearchExpandedAgent:
         
     
     async def _get_agent(self):
-        if ProductSearchExpandedAgent.cache_checkpointer is None:
-            logger.info(f"Initializing Redis Checkpointer for ProductSearchAgent: {settings.redis_url}")
-            async with AsyncRedisSaver.from_conn_string(settings.redis_url, ttl={ "default_ttl":1440, "refresh_on_read": True }) as checkpointer:
-                await checkpointer.asetup()
-                ProductSearchExpandedAgent.cache_checkpointer = checkpointer
-
         agent = create_agent(
                 model=self.llm,
                 tools=[search_products],
-                checkpointer= ProductSearchExpandedAgent.cache_checkpointer,  
+                checkpointer=await get_checkpoint_store().get_saver(),
+                middleware=[trim_thread_messages],
                 system_prompt= ProductSearchTemplates.SYSTEM_PROMPT_EXPANDED,
                 state_schema=ProductSearchExpandedAgentState,
             )
@@ -169,31 +156,12 @@ class ProductSearchExpandedAgent:
 
         response = messages[-1].content
 
-        sources = []
+        sources = AgentTools.tool_artifacts(messages, "search_products")
         sum_input_tokens = 0
         sum_output_tokens = 0
         sum_total_tokens = 0
 
         for msg in messages:
-            if isinstance(msg, ToolMessage):
-                if msg.name == "search_products":
-                    if not msg.content or not isinstance(msg.content, str):
-                        logger.warning(f"Invalid tool message content: {msg.content}")
-                        continue
-                    
-                    content = msg.content.strip()
-                    try:
-                        if not content:
-                            logger.warning("Tool message content is empty.")
-                            continue
-                        jsonobj = json.loads(content)
-                        products = jsonobj.get("products", [])
-                        sources.extend(products)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"JSON decode error while parsing tool message content: {e}")
-                        logger.error(f"Content was: {content} \n end")  # Log first 200 chars of content
-                        continue
-            
             if isinstance(msg, AIMessage):
                 metadata = msg.usage_metadata
                 if metadata:
@@ -0,0 +1,128 @@
+import asyncio
+from typing import Dict, List
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+from langsmith import traceable
+from shopassist_api.application.agents.agent_utils import CompiledAgent
+from shopassist_api.application.services.conversation_summarizer import ConversationSummarizer
+from shopassist_api.application.settings.config import settings
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class ThreadSummarizer:
+    """
+    Background compaction of the checkpointed session threads of the product agents.
+
+    After an agent turn is written to the checkpoint, schedule() checks the
+    thread in the background; above `token_budget` tokens, the turns before
+    the last `keep_messages` messages (cut at a user message, so tool calls
+    stay with their results) are replaced by one summary SystemMessage. The
+    agents then replay a bounded thread to the LLM on every turn.
+
+    The update is skipped when another turn was written to the thread while
+    the summary was generated; the next turn retries.
+    """
+
+    SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+    # Process-wide counters
+    _stats = {"compactions": 0, "removed_messages": 0, "skipped_concurrent": 0, "errors": 0}
+
+    def __init__(self, summarizer: ConversationSummarizer, token_budget: int = None, keep_messages: int = None):
+        self.summarizer = summarizer
+        self.token_budget = token_budget or settings.agent_thread_token_budget
+        self.keep_messages = keep_messages or settings.conversation_summary_verbatim_messages
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def thread_tokens(self, messages: List[AnyMessage]) -> int:
+        return sum(self.summarizer.count_tokens(str(msg.content)) for msg in messages)
+
+    def is_summary(self, message: AnyMessage) -> bool:
+        return isinstance(message, SystemMessage) and str(message.content).startswith(self.SUMMARY_PREFIX)
+
+    def cutoff(self, messages: List[AnyMessage]) -> int:
+        """Index of the user message that starts the kept part; 0 when there is nothing to fold"""
+        first = 1 if messages and self.is_summary(messages[0]) else 0
+        for index in range(len(messages) - self.keep_messages, first, -1):
+            if isinstance(messages[index], HumanMessage):
+                return index
+        return 0
+
+    @staticmethod
+    def transcript(messages: List[AnyMessage]) -> str:
+        """User/assistant text and the products returned by tools; tool call plumbing is left out"""
+        lines = []
+        for msg in messages:
+            if isinstance(msg, HumanMessage):
+                lines.append(f"User: {msg.content}")
+            elif isinstance(msg, AIMessage) and msg.content:
+                lines.append(f"Assistant: {msg.content}")
+            elif isinstance(msg, ToolMessage) and isinstance(msg.artifact, list):
+                names = [f"{item.get('name', '')} ({item.get('id', '')})" for item in msg.artifact if isinstance(item, dict)]
+                if names:
+                    lines.append("  Products shown: " + ", ".join(names))
+        return "\n".join(lines)
+
+    def schedule(self, agent: CompiledAgent, thread_id: str) -> None:
+        """Compact the thread in the background (one task per thread)"""
+        task = self._tasks.get(thread_id)
+        if task is not None and not task.done():
+            return
+        self._tasks[thread_id] = asyncio.create_task(self._run(agent, thread_id))
+
+    async def _run(self, agent: CompiledAgent, thread_id: str) -> None:
+        try:
+            await self.compact(agent, thread_id)
+        finally:
+            self._tasks.pop(thread_id, None)
+
+    @traceable(name="thread_summarizer.compact", tags=["agent", "summary", "checkpoint"], metadata={"version": "1.0"})
+    async def compact(self, agent: CompiledAgent, thread_id: str) -> bool:
+        """Replace the older part of an oversized thread with a summary; True when the thread was rewritten"""
+        config = {"configurable": {"thread_id": thread_id}}
+        try:
+            snapshot = await agent.aget_state(config)
+            messages = snapshot.values.get("messages", [])
+            if self.thread_tokens(messages) <= self.token_budget:
+                return False
+            cutoff = self.cutoff(messages)
+            if cutoff == 0:
+                return False
+
+            previous = str(messages[0].content)[len(self.SUMMARY_PREFIX):] if self.is_summary(messages[0]) else ""
+            folded = messages[1 if previous else 0:cutoff]
+            summary = await self.summarizer.summarize(previous, self.transcript(folded))
+
+            latest = await agent.aget_state(config)
+            if latest.config["configurable"].get("checkpoint_id") != snapshot.config["configurable"].get("checkpoint_id"):
+                ThreadSummarizer._stats["skipped_concurrent"] += 1
+                return False
+
+            await agent.aupdate_state(config, {"messages": [
+                RemoveMessage(id=REMOVE_ALL_MESSAGES),
+                SystemMessage(content=self.SUMMARY_PREFIX + summary),
+                *messages[cutoff:]
+            ]}, as_node="model")
+
+            ThreadSummarizer._stats["compactions"] += 1
+            ThreadSummarizer._stats["removed_messages"] += cutoff
+            logger.info(f"Compacted agent thread {thread_id}: {cutoff} messages folded into the summary")
+            return True
+        except Exception as e:
+            ThreadSummarizer._stats["errors"] += 1
+            logger.error(f"Error compacting agent thread {thread_id}: {e}")
+            return False
+
+    async def close(self) -> None:
+        """Cancel compactions still running (process shutdown)"""
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        return dict(cls._stats)
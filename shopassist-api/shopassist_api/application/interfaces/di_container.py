@@ -1,30 +1,93 @@
 """
 Dependency injection container for the Shop Assistant API.
+
+Services are registered with a lifetime (Scope):
+  - SINGLETON: one instance per process, created at startup and closed at shutdown
+  - REQUEST:   one instance per HTTP request (inside request_scope())
+  - TRANSIENT: a new instance on every resolution
 """
 
+import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import RLock
+from typing import Callable, Optional
 
 from shopassist_api.application.services.session_manager import SessionManager
+from shopassist_api.application.services.conversation_summarizer import ConversationSummarizer
+from shopassist_api.application.agents.checkpointing import CheckpointStore
+from shopassist_api.application.agents.thread_summarizer import ThreadSummarizer
 from shopassist_api.infrastructure.services.redis_cache_service import RedisCacheService
 from shopassist_api.infrastructure.services.cosmos_product_service import CosmosProductService
 from shopassist_api.infrastructure.services.dumb_product_service import DumbProductService
 from shopassist_api.infrastructure.services.milvus_service import MilvusService
+from shopassist_api.infrastructure.services.local_vector_service import LocalVectorService
 from shopassist_api.infrastructure.services.openai_embedding_service import OpenAIEmbeddingService
 from shopassist_api.infrastructure.services.openai_llm_service import OpenAILLMService
 from shopassist_api.infrastructure.services.transformers_embedding_service import TransformersEmbeddingService
-from shopassist_api.application.interfaces.service_interfaces import CacheServiceInterface, LLMServiceInterface, RepositoryServiceInterface, VectorServiceInterface
+from shopassist_api.infrastructure.services.cached_embedding_service import CachedEmbeddingService
+from shopassist_api.infrastructure.services.local_semantic_cache_store import LocalSemanticCacheStore
+from shopassist_api.infrastructure.services.redis_semantic_cache_store import RedisSemanticCacheStore
+from shopassist_api.application.interfaces.service_interfaces import CacheServiceInterface, LLMServiceInterface, RepositoryServiceInterface, SemanticCacheStoreInterface, VectorServiceInterface
 from shopassist_api.application.interfaces.service_interfaces import EmbeddingServiceInterface
 from shopassist_api.application.services.retrieval_service import RetrievalService
 from shopassist_api.application.services.comparison_service import ComparisonService
 from shopassist_api.application.services.rag_service import RAGService
+from shopassist_api.application.services.semantic_cache import SemanticAnswerCache
 from shopassist_api.application.settings.config import settings
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class Scope:
+    """Service lifetimes supported by the container."""
+    SINGLETON = "singleton"
+    REQUEST = "request"
+    TRANSIENT = "transient"
+
+
+# Instances of REQUEST-scoped services for the current request (None outside a request)
+_request_services: ContextVar[Optional[dict]] = ContextVar("di_request_services", default=None)
+
+
+@contextmanager
+def request_scope():
+    """
+    Scope REQUEST-scoped services to the enclosed block (one HTTP request).
+
+    Outside a request scope, REQUEST-scoped services resolve as transient.
+    """
+    token = _request_services.set({})
+    try:
+        yield
+    finally:
+        _request_services.reset(token)
+
+
+# Keys of composed services that are not bound to an interface
+NANO_LLM = "nano_llm"
+EMBEDDING = "embedding"
+CATEGORY_EMBEDDING_MODEL = "category_embedding_model"
+CATEGORY_EMBEDDING = "category_embedding"
+
 
 class DIContainer:
-    """Simple dependency injection container."""
+    """Simple dependency injection container with singleton, request and transient scopes."""
     
-    def __init__(self):
-        self._services = {}
+    # Resolved eagerly by startup(); their dependency graph covers every singleton
+    startup_services = [CheckpointStore, RAGService, ComparisonService, ThreadSummarizer]
+
+    def __init__(self, scope_override: str = None):
+        self._services = {}      # interface -> implementation class
+        self._factories = {}     # key -> (factory(container), scope)
         self._singletons = {}
+        self._creation_order = []
+        self._lock = RLock()
+        # Forces one scope for every service (e.g. Scope.TRANSIENT to measure construction cost)
+        self.scope_override = scope_override
         self._setup_services()
+        self._setup_factories()
     
     def setup_dump_services(self):
         """Configure BUMP service bindings."""
@@ -34,6 +97,13 @@ class DIContainer:
         """Configure BUMP service bindings."""
         self._services[RepositoryServiceInterface] = CosmosProductService
 
+    def setup_local_vector_services(self):
+        """Configure the embedded (in-process) vector backend."""
+        self._services[VectorServiceInterface] = LocalVectorService
+
+    def setup_milvus_services(self):
+        """Configure the Milvus vector backend."""
+        self._services[VectorServiceInterface] = MilvusService
 
     def _setup_services(self):
         """Configure service bindings."""
@@ -50,27 +120,196 @@ class DIContainer:
         elif settings.embedding_provider == "transformers":
             self._services[EmbeddingServiceInterface] = TransformersEmbeddingService
 
-        self._services[VectorServiceInterface] = MilvusService
+        if settings.use_local_vector_service:
+            self.setup_local_vector_services()
+        else:
+            self.setup_milvus_services()
+
         self._services[LLMServiceInterface] = OpenAILLMService
         self._services[CacheServiceInterface] = RedisCacheService
 
-    def get_service(self, service_type, *args, **kwargs):
-        
-        # Return cached singleton if exists
-        if service_type in self._singletons:
-            return self._singletons[service_type]
-        
-        """Get a service instance by type."""
+        if settings.semantic_cache_backend == "redis":
+            self._services[SemanticCacheStoreInterface] = RedisSemanticCacheStore
+        else:
+            self._services[SemanticCacheStoreInterface] = LocalSemanticCacheStore
+
+    def _setup_factories(self):
+        """Configure the composed services (interfaces bound above are singletons by default)."""
+        self.register(NANO_LLM, _build_nano_llm)
+        self.register(EMBEDDING, lambda c: _with_embedding_cache(c, c.get_service(EmbeddingServiceInterface)))
+        self.register(CATEGORY_EMBEDDING_MODEL, _build_category_embedding_model)
+        self.register(CATEGORY_EMBEDDING, lambda c: _with_embedding_cache(c, c.get_service(CATEGORY_EMBEDDING_MODEL)))
+        self.register(RetrievalService, _build_retrieval_service)
+        self.register(SemanticAnswerCache, _build_semantic_cache)
+        self.register(CheckpointStore, lambda c: CheckpointStore())
+        self.register(ConversationSummarizer, _build_conversation_summarizer)
+        self.register(ThreadSummarizer, _build_thread_summarizer)
+        self.register(SessionManager, _build_session_manager)
+        self.register(RAGService, _build_rag_service)
+        self.register(ComparisonService, _build_comparison_service)
+
+    def register(self, key, factory: Callable[["DIContainer"], object], scope: str = Scope.SINGLETON):
+        """Register a factory for a key; the factory receives the container to resolve dependencies."""
+        with self._lock:
+            self._factories[key] = (factory, scope)
+            if key in self._singletons:
+                del self._singletons[key]
+                self._creation_order.remove(key)
+
+    def _registration(self, service_type):
+        if service_type in self._factories:
+            return self._factories[service_type]
         if service_type in self._services:
             service_class = self._services[service_type]
-            return service_class( *args, **kwargs)
+            return (lambda c: service_class(), Scope.SINGLETON)
         raise ValueError(f"Service {service_type} not registered")
 
+    def get_service(self, service_type, *args, **kwargs):
+        """Get a service instance by type (or registration key), honouring its scope."""
+        if args or kwargs:
+            # Explicit constructor arguments always build a new instance
+            if service_type not in self._services:
+                raise ValueError(f"Service {service_type} not registered")
+            return self._services[service_type](*args, **kwargs)
+
+        factory, scope = self._registration(service_type)
+        scope = self.scope_override or scope
+
+        if scope == Scope.SINGLETON:
+            # Return cached singleton if exists (None is a valid instance, e.g. a disabled cache)
+            if service_type in self._singletons:
+                return self._singletons[service_type]
+            with self._lock:
+                # Double-check after acquiring lock
+                if service_type not in self._singletons:
+                    self._singletons[service_type] = factory(self)
+                    self._creation_order.append(service_type)
+                return self._singletons[service_type]
+
+        if scope == Scope.REQUEST:
+            services = _request_services.get()
+            if services is not None:
+                if service_type not in services:
+                    services[service_type] = factory(self)
+                return services[service_type]
+
+        return factory(self)
+
+    async def startup(self):
+        """Create the singletons (application startup)."""
+        for service_type in self.startup_services:
+            try:
+                self.get_service(service_type)
+            except Exception as e:
+                logger.error(f"Failed to create {getattr(service_type, '__name__', service_type)}: {e}")
+        logger.info(f"DI container ready: {len(self._singletons)} singletons")
+
+    async def shutdown(self):
+        """Close the singletons in reverse creation order (application shutdown)."""
+        with self._lock:
+            services = [self._singletons[key] for key in reversed(self._creation_order)]
+            self._singletons.clear()
+            self._creation_order.clear()
+
+        closed = set()
+        for service in services:
+            close = getattr(service, "close", None) or getattr(service, "aclose", None)
+            if close is None:
+                continue
+            # Class-level clients are closed once, whichever instance owns them
+            owner = getattr(close, "__self__", service)
+            if id(owner) in closed:
+                continue
+            closed.add(id(owner))
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Failed to close {type(service).__name__}: {e}")
+        logger.info(f"DI container closed {len(closed)} services")
+
+
+def _with_embedding_cache(container: DIContainer, embedding_service: EmbeddingServiceInterface) -> EmbeddingServiceInterface:
+    if not settings.embedding_cache_enabled:
+        return embedding_service
+    cache_service = container.get_service(CacheServiceInterface) if settings.embedding_cache_l2_enabled else None
+    return CachedEmbeddingService(embedding_service, cache_service=cache_service)
+
+
+def _build_nano_llm(container: DIContainer) -> LLMServiceInterface:
+    return container.get_service(LLMServiceInterface,
+                                 model_name=settings.azure_openai_nano_model,
+                                 deployment_name=settings.azure_openai_nano_model_deployment)
+
+
+def _build_category_embedding_model(container: DIContainer) -> EmbeddingServiceInterface:
+    if settings.embedding_provider == "azure_openai":
+        return OpenAIEmbeddingService()
+    return TransformersEmbeddingService(model_name=settings.transformers_category_embedding_model)
+
+
+def _build_retrieval_service(container: DIContainer) -> RetrievalService:
+    return RetrievalService(
+        vector_service=container.get_service(VectorServiceInterface),
+        embedding_service=container.get_service(EMBEDDING),
+        repository_service=container.get_service(RepositoryServiceInterface),
+        category_embedder_service=container.get_service(CATEGORY_EMBEDDING),
+        cache_service=container.get_service(CacheServiceInterface) if settings.retrieval_cache_enabled else None
+    )
+
+
+def _build_semantic_cache(container: DIContainer) -> Optional[SemanticAnswerCache]:
+    if not settings.semantic_cache_enabled:
+        return None
+    return SemanticAnswerCache(
+        store=container.get_service(SemanticCacheStoreInterface),
+        embedding_service=container.get_service(EMBEDDING),
+        cache_service=container.get_service(CacheServiceInterface)
+    )
+
+
+def _build_conversation_summarizer(container: DIContainer) -> Optional[ConversationSummarizer]:
+    if not settings.conversation_summary_enabled:
+        return None
+    return ConversationSummarizer(llm_service=container.get_service(NANO_LLM),
+                                  cache_service=container.get_service(CacheServiceInterface),
+                                  repository_service=container.get_service(RepositoryServiceInterface))
+
+
+def _build_thread_summarizer(container: DIContainer) -> Optional[ThreadSummarizer]:
+    summarizer = container.get_service(ConversationSummarizer)
+    return ThreadSummarizer(summarizer) if summarizer is not None else None
+
+
+def _build_session_manager(container: DIContainer) -> SessionManager:
+    return SessionManager(repository_service=container.get_service(RepositoryServiceInterface),
+                          cache_service=container.get_service(CacheServiceInterface),
+                          summarizer=container.get_service(ConversationSummarizer))
+
+
+def _build_rag_service(container: DIContainer) -> RAGService:
+    return RAGService(llm_service=container.get_service(LLMServiceInterface),
+                      nanolm_service=container.get_service(NANO_LLM),
+                      retrieval_service=container.get_service(RetrievalService),
+                      session_manager=container.get_service(SessionManager),
+                      semantic_cache=container.get_service(SemanticAnswerCache))
+
+
+def _build_comparison_service(container: DIContainer) -> ComparisonService:
+    return ComparisonService(repository_service=container.get_service(RepositoryServiceInterface),
+                             llm_service=container.get_service(LLMServiceInterface))
+
 
 # Global container instance
 _container = DIContainer()
 
 
+def get_container() -> DIContainer:
+    """The process-wide container (startup/shutdown are driven by the FastAPI lifespan)."""
+    return _container
+
+
 def get_repository_service() -> RepositoryServiceInterface:
     """Dependency injection function for product service."""
     return _container.get_service(RepositoryServiceInterface)
@@ -80,66 +319,58 @@ def get_vector_service() -> VectorServiceInterface:
     """Dependency injection function for vector service."""
     return _container.get_service(VectorServiceInterface)
 
-#TODO refactor and use self._services[''] mapping
 def get_llm_service()->LLMServiceInterface:
     """Dependency injection function for LLM service."""
     return _container.get_service(LLMServiceInterface)
 
 def get_nanolm_service():
     """Dependency injection function for nano LLM service."""
-    return _container.get_service(LLMServiceInterface,
-                                  model_name=settings.azure_openai_nano_model,
-                                  deployment_name=settings.azure_openai_nano_model_deployment)
+    return _container.get_service(NANO_LLM)
+
+def with_embedding_cache(embedding_service: EmbeddingServiceInterface) -> EmbeddingServiceInterface:
+    """Wrap an embedding service with the query embedding cache when enabled."""
+    return _with_embedding_cache(_container, embedding_service)
 
-#TODO refactor and use self._services[''] mapping
 def get_embedding_service() -> EmbeddingServiceInterface:
     """Dependency injection function for embedding service."""
-    return _container.get_service(EmbeddingServiceInterface)
+    return _container.get_service(EMBEDDING)
 
 def get_category_embedding_service() -> EmbeddingServiceInterface:
     """Dependency injection function for category embedding service."""
-    if settings.embedding_provider == "azure_openai":
-        embedded_service = OpenAIEmbeddingService()
-    elif settings.embedding_provider == "transformers":
-        embedded_service = TransformersEmbeddingService(model_name=settings.transformers_category_embedding_model)
-
-    return embedded_service
+    return _container.get_service(CATEGORY_EMBEDDING)
 
 def get_retrieval_service():
     """Dependency injection function for retrieval service."""
-
-    vector_service = get_vector_service()
-    embedding_service = get_embedding_service()
-    product_service = get_repository_service()
-    category_embedder_service = get_category_embedding_service()
-    return RetrievalService(
-        vector_service=vector_service,
-        embedding_service=embedding_service,
-        repository_service=product_service,
-        category_embedder_service=category_embedder_service
-    )
+    return _container.get_service(RetrievalService)
 
 def get_rag_service():
     """Dependency injection function for RAG service."""
-    llm_service = get_llm_service()
-    nanolm_service = get_nanolm_service()
-    retrieval_service = get_retrieval_service()
-    session_manager = get_session_manager()
-    return RAGService(llm_service=llm_service, nanolm_service=nanolm_service, 
-                      retrieval_service=retrieval_service, session_manager=session_manager)
+    return _container.get_service(RAGService)
 
 def get_cache_service():
     """Dependency injection function for cache service."""
     return _container.get_service(CacheServiceInterface)
 
+def get_semantic_cache():
+    """Dependency injection function for the semantic answer cache (None when disabled)."""
+    return _container.get_service(SemanticAnswerCache)
+
 def get_session_manager():
     """Dependency injection function for context manager service."""
-    repository = get_repository_service()
-    cache = get_cache_service()
-    return SessionManager( repository_service=repository, cache_service=cache)
+    return _container.get_service(SessionManager)
+
+def get_conversation_summarizer():
+    """Dependency injection function for the rolling conversation summary (None when disabled)."""
+    return _container.get_service(ConversationSummarizer)
+
+def get_checkpoint_store():
+    """Dependency injection function for the agents' Redis checkpointer (opened by the app lifespan)."""
+    return _container.get_service(CheckpointStore)
+
+def get_thread_summarizer():
+    """Dependency injection function for the agent thread compaction (None when disabled)."""
+    return _container.get_service(ThreadSummarizer)
 
 def get_comparison_service():
     """Dependency injection function for comparison service."""
-    repository = get_repository_service()
-    llm_service = get_llm_service()
-    return ComparisonService(repository_service=repository, llm_service=llm_service)
\ No newline at end of file
+    return _container.get_service(ComparisonService)
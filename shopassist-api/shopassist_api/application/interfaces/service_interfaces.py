@@ -1,8 +1,9 @@
 """
 Product service interface for dependency injection.
 """
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict, Generator
+from typing import AsyncGenerator, List, Dict, Optional
 from datetime import datetime
 
 from shopassist_api.domain.models.session_context import SessionContext
@@ -20,6 +21,21 @@ class RepositoryServiceInterface(ABC):
     async def get_products_by_ids(self, product_ids: List[str]) -> List[dict[str, any]]:
         """Retrieve multiple products by their IDs."""
         pass
+
+    async def get_product_projections(
+        self,
+        product_ids: List[str],
+        fields: List[str],
+        partition_keys: Optional[Dict[str, str]] = None
+    ) -> List[dict[str, any]]:
+        """
+        Retrieve only the given fields of multiple products.
+
+        partition_keys maps product ID -> partition key (category) when known,
+        letting implementations avoid cross-partition queries.
+        """
+        products = await self.get_products_by_ids(product_ids)
+        return [{field: product.get(field) for field in fields if field in product} for product in products]
     
     @abstractmethod
     async def search_products_by_category(self, category: str) -> List[dict[str, any]]:
@@ -107,6 +123,11 @@ class EmbeddingServiceInterface(ABC):
     def generate_embedding_batch(self, input_texts: list[str], batch_size: int = 50) -> list[dict]:
         """Generate embeddings for a list of input texts."""
         pass
+
+    async def generate_embeddings(self, input_texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for several texts in a single batched encode, in input order."""
+        results = await asyncio.to_thread(self.generate_embedding_batch, input_texts)
+        return [item["embedding"] for item in results]
     async def health_check(self) -> bool:
         """Ping the service to check connectivity"""
         pass
@@ -134,7 +155,9 @@ class VectorServiceInterface(ABC):
         self,
         query_embedding: List[float],
         top_k: int = 5,
-        filters: str = None
+        filters: str = None,
+        radius: float = None,
+        filter_params: Dict = None
     ) -> List[dict]:
         """Search products by vector similarity."""
         pass
@@ -155,6 +178,78 @@ class VectorServiceInterface(ABC):
         top_k: int = 5) -> List[Dict]:
         """Search categories by vector similarity."""
         pass
+
+    async def asearch_products(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        filters: str = None,
+        radius: float = None,
+        filter_params: Dict = None
+    ) -> List[dict]:
+        """Search products without blocking the event loop."""
+        return await asyncio.to_thread(self.search_products, query_embedding, top_k, filters, radius, filter_params)
+
+    def search_products_batch(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        filters: str = None,
+        radius: float = None,
+        filter_params: Dict = None
+    ) -> List[List[dict]]:
+        """Search products for several query vectors, one list of hits per query."""
+        return [self.search_products(embedding, top_k, filters, radius, filter_params) for embedding in query_embeddings]
+
+    async def asearch_products_batch(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        filters: str = None,
+        radius: float = None,
+        filter_params: Dict = None
+    ) -> List[List[dict]]:
+        """Multi-query product search without blocking the event loop."""
+        return await asyncio.to_thread(self.search_products_batch, query_embeddings, top_k, filters, radius, filter_params)
+
+    async def asearch_knowledge_base(
+        self,
+        query_embedding: List[float],
+        top_k: int = 3,
+        radius: float = None
+    ) -> List[dict]:
+        """Search knowledge base chunks without blocking the event loop."""
+        return await asyncio.to_thread(self.search_knowledge_base, query_embedding, top_k, radius)
+
+    async def asearch_categories(
+        self,
+        query_embedding: List[float],
+        field: str = "embedding",
+        top_k: int = 5,
+        radius: float = None
+    ) -> List[Dict]:
+        """Search categories without blocking the event loop."""
+        return await asyncio.to_thread(self.search_categories, query_embedding, field, top_k, radius)
+
+    def load_collections(self) -> Dict[str, Dict]:
+        """Resolve and load collections once, returning their load state."""
+        pass
+
+    def reload_collections(self, keys: List[str] = None) -> Dict[str, Dict]:
+        """Re-load collections (e.g. after ingestion), returning their load state."""
+        pass
+
+    def get_load_state(self) -> Dict[str, Dict]:
+        """Get the load state of the collections."""
+        pass
+
+    def get_collection_version(self, key: str) -> int:
+        """Data version of a collection; changes when it is re-loaded or re-ingested."""
+        return 0
+
+    def fetch_all_categories(self) -> List[Dict]:
+        """Fetch every category with its 'embedding' and 'full_embedding' vectors."""
+        return []
             
     async def health_check(self) -> bool:
         """Ping the service to check connectivity"""
@@ -174,13 +269,13 @@ class LLMServiceInterface(ABC):
         """Generate a response from the LLM."""
         pass
     @abstractmethod
-    def streaming_response(
+    async def streaming_response(
         self,
         messages: List[dict],
         temperature: float = 0.3,
         max_tokens: int = 500
-    )-> Generator[str, None, None]:
-        """Generate a streaming response from the LLM."""
+    ) -> AsyncGenerator[Dict, None]:
+        """Stream a response from the LLM: {"content": delta} items, then the generate_response dict."""
         pass
     @abstractmethod
     def get_stats(self) -> Dict:
@@ -192,6 +287,40 @@ class LLMServiceInterface(ABC):
         pass
 
 
+class SemanticCacheStoreInterface(ABC):
+    """Abstract base class for vector-indexed semantic cache stores."""
+
+    @abstractmethod
+    async def lookup(
+        self,
+        namespace: str,
+        embedding: List[float],
+        intents: List[str],
+        version: str,
+        threshold: float
+    ) -> Optional[Dict]:
+        """Most similar live entry (similarity >= threshold) with intent in intents and the given version."""
+        pass
+
+    @abstractmethod
+    async def store(
+        self,
+        namespace: str,
+        embedding: List[float],
+        intent: str,
+        version: str,
+        payload: Dict,
+        ttl: int
+    ) -> None:
+        """Store an entry with a TTL in seconds."""
+        pass
+
+    @abstractmethod
+    async def clear(self, namespace: Optional[str] = None) -> None:
+        """Remove all entries (of a namespace)."""
+        pass
+
+
 class CacheServiceInterface(ABC):
     """Abstract base class for Cache service implementations."""
     
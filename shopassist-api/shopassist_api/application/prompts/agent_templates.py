@@ -20,6 +20,21 @@ CRITICAL: Never fabricate information. If you don't know, admit it."""
 
 
 
+class PrefetchTemplates:
+    # Reply that sends a prefetch-mode answer back to the agent's tool-calling loop
+    MISSING_INFO = "NEED_MORE_INFO"
+
+    INSTRUCTIONS = """
+
+The search results for the user's question were already retrieved and are given as context below.
+No tools are available: answer from this context and the conversation only.
+If the context is not enough to answer (for example it is about a different product, or the question
+needs another search), reply with exactly NEED_MORE_INFO and nothing else.
+
+Context:
+{context}"""
+
+
 class RouteTemplates:
 
     SYSTEM_PROMPT_ROUTER = """You are a routing agent for ShopAssist, an intelligent product support assistant for an electronics store.
@@ -91,7 +106,74 @@ CRITICAL: Always choose the most appropriate agent based on the user's query.
             - escalation: Order issues, complaints, out of scope
             
             Consider conversation context when routing."""
-    
+
+    # Labelled single-intent queries for the local IntentRouter (see documentation/Intent_categories.md)
+    ROUTER_EXAMPLES = {
+        "policy": [
+            "what is the return policy",
+            "what if I want to return the product",
+            "when will my package arrive",
+            "how long does shipping take",
+            "do you ship internationally",
+            "how much does shipping cost",
+            "what does the warranty cover",
+            "how long is the warranty for electronics",
+            "can I get a refund",
+            "how do I exchange an item",
+            "what payment methods do you accept",
+            "what are your store hours",
+        ],
+        "product_search": [
+            "I need a full frame camera",
+            "which smartphones have cameras with zoom higher than 10x",
+            "show me laptops for gaming",
+            "wireless headphones under $100",
+            "find me a smartphone with a good camera and long battery life",
+            "bluetooth speaker for outdoor use",
+            "do you have 4k smart TVs",
+            "laptop for video editing",
+            "Sony headphones under $100",
+            "recommend a tablet for kids",
+            "cheap gaming mouse",
+            "noise cancelling earbuds",
+        ],
+        "product_detail": [
+            "does the Samsung z flip 5 have camera stabilization",
+            "what characteristics have the bose smart soundbar",
+            "give me details of the samsung z flip 5",
+            "what is the battery life of the Sony WH-1000XM5",
+            "how much does the iPad Air weigh",
+            "is the Canon EOS R6 waterproof",
+            "what are the specs of the Dell XPS 13",
+            "does the LG C3 OLED support HDMI 2.1",
+            "tell me more about the Bose QuietComfort 45",
+            "what colors does the iPhone 15 come in",
+        ],
+        "comparison": [
+            "what alternatives do I have to a Bose Smart Sound bar",
+            "compare the TCL smart TV 32 inches with the xiaomi MI 32 inches 5A series",
+            "Can you compare the latest laptops for gaming",
+            "which is better, the iPhone 15 or the Samsung Galaxy S24",
+            "Sony WH-1000XM5 vs Bose QuietComfort 45",
+            "difference between the iPad Air and the iPad Pro",
+            "compare the Canon EOS R6 and the Sony A7 IV",
+            "what is the difference between these two laptops",
+            "is the Pixel 8 better than the iPhone 15 for photos",
+        ],
+        "escalation": [
+            "the order page is empty, why",
+            "I want to talk to a human",
+            "my order never arrived and nobody answers",
+            "I was charged twice for my order",
+            "cancel my order",
+            "I want to speak to a manager",
+            "my account is locked",
+            "this is unacceptable, I want to file a complaint",
+            "the carrier came but I was not at home",
+            "change the delivery address of my order",
+        ],
+    }
+
 class ProductSearchTemplates:
     SYSTEM_PROMPT = """You are ShopAssist, an intelligent product search assistant for an electronics store.
 Your role is to:
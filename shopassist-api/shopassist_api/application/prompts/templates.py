@@ -274,6 +274,28 @@ or compare items.
             {"role": "user", "content": user_message}
         ]
 
+
+    @staticmethod
+    def conversation_summary_prompt(previous_summary: str, transcript: str, max_words: int = 120) -> List[Dict[str, str]]:
+        """
+        Prompt for the rolling conversation summary (ConversationSummarizer)
+        """
+        previous = previous_summary if previous_summary else "[None]"
+        user_message = f"""Current summary:
+{previous}
+
+New messages:
+{transcript}
+
+Update the summary with the new messages in at most {max_words} words. Keep what later turns may refer to:
+the customer's needs, budget and preferences, products shown or discussed (names and IDs), decisions made and open questions.
+Drop greetings and wording details. Reply with the summary only."""
+
+        return [
+            {"role": "system", "content": "You maintain a compact running summary of a customer conversation with ShopAssist, an electronics store assistant."},
+            {"role": "user", "content": user_message}
+        ]
+
     
 class ContextAnalysisPrompts:
     """
@@ -390,4 +412,78 @@ Example response: product_search|95"""
             {"role": "system", "content": ClassificationPrompts.INTENT_CLASSIFICATION_PROMPT},
             {"role": "user", "content": user_message}
         ]
-    
\ No newline at end of file
+    
+
+class ResponseTemplates:
+    """
+    Localised canned answers for trivial intents (TemplateResponder).
+    Keyed by locale, then kind; 'returning' variants are used once the session has history.
+    """
+    TEMPLATES = {
+        "en": {
+            "greeting": [
+                "Hi! I'm ShopAssist. I can help you find products, compare them, check specifications, or answer questions about returns, shipping and warranty. What are you looking for today?",
+                "Hello! Looking for something in particular? I can search our electronics catalog, compare products or explain our store policies.",
+            ],
+            "greeting_returning": [
+                "Welcome back! Want to continue where we left off, or look for something new?",
+                "Hi again! What else can I help you find?",
+            ],
+            "thanks": [
+                "You're welcome! Let me know if there's anything else I can help you with.",
+                "Happy to help! Anything else you'd like to know?",
+            ],
+            "thanks_products": [
+                "You're welcome! Would you like more details on any of those products, or a comparison?",
+                "Glad I could help! I can compare those products or look for alternatives if you like.",
+            ],
+            "goodbye": [
+                "Thanks for visiting! Come back any time you need help finding the right product.",
+                "Goodbye, and happy shopping!",
+            ],
+            "chitchat": [
+                "I'm here to help you shop for electronics: I can find products, compare them, or answer questions about returns, shipping and warranty. What can I do for you?",
+                "That's a bit outside what I can help with, but I'd be glad to help you find a product or answer a question about our store policies.",
+            ],
+            "out_of_scope": [
+                "I'm sorry, I can't help with orders, accounts or payments here. Please contact our support team and they will sort it out. In the meantime, I can help you with products or store policies.",
+                "That needs our support team, since I don't have access to orders or accounts. Is there anything about our products or policies I can help with?",
+            ],
+        },
+        "es": {
+            "greeting": [
+                "¡Hola! Soy ShopAssist. Puedo ayudarte a encontrar productos, compararlos, consultar especificaciones o resolver dudas sobre devoluciones, envíos y garantía. ¿Qué estás buscando hoy?",
+                "¡Hola! ¿Buscas algo en particular? Puedo buscar en nuestro catálogo de electrónica, comparar productos o explicarte nuestras políticas.",
+            ],
+            "greeting_returning": [
+                "¡Hola de nuevo! ¿Seguimos donde lo dejamos o buscamos algo nuevo?",
+                "¡Bienvenido otra vez! ¿Qué más puedo ayudarte a encontrar?",
+            ],
+            "thanks": [
+                "¡De nada! Avísame si puedo ayudarte con algo más.",
+                "¡Con gusto! ¿Hay algo más que quieras saber?",
+            ],
+            "thanks_products": [
+                "¡De nada! ¿Quieres más detalles de alguno de esos productos o una comparación?",
+                "¡Me alegra haber ayudado! Puedo comparar esos productos o buscar alternativas si quieres.",
+            ],
+            "goodbye": [
+                "¡Gracias por tu visita! Vuelve cuando necesites ayuda para encontrar el producto ideal.",
+                "¡Hasta luego y felices compras!",
+            ],
+            "chitchat": [
+                "Estoy aquí para ayudarte a comprar electrónica: puedo buscar productos, compararlos o responder dudas sobre devoluciones, envíos y garantía. ¿Qué necesitas?",
+                "Eso se sale un poco de lo que puedo hacer, pero con gusto te ayudo a encontrar un producto o a resolver dudas sobre nuestras políticas.",
+            ],
+            "out_of_scope": [
+                "Lo siento, desde aquí no puedo gestionar pedidos, cuentas ni pagos. Por favor contacta con nuestro equipo de soporte. Mientras tanto, puedo ayudarte con productos o políticas de la tienda.",
+                "Para eso necesitas a nuestro equipo de soporte, ya que no tengo acceso a pedidos ni cuentas. ¿Puedo ayudarte con algún producto o política?",
+            ],
+        },
+    }
+
+    # Words that identify the locale of a short message
+    LOCALE_KEYWORDS = {
+        "en": {"hi", "hello", "hey", "thanks", "thank", "you", "bye", "goodbye", "good", "morning", "how", "are", "what", "my", "order", "the"},
+        "es": {"hola", "gracias", "adiós", "adios", "buenos", "buenas", "días", "dias", "tardes", "noches", "qué", "que", "tal", "cómo", "como", "estás", "mi", "pedido", "el", "la"},
+    }
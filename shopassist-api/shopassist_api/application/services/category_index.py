@@ -0,0 +1,131 @@
+import asyncio
+from threading import RLock
+from typing import Dict, List, Optional
+import numpy as np
+from langsmith import traceable
+from shopassist_api.application.interfaces.service_interfaces import VectorServiceInterface
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class CategoryIndex:
+    """
+    In-process category index.
+
+    Loads every category vector once into two L2-normalised matrices
+    ('embedding' and 'full_embedding') and scores a query against both with a
+    single matrix product. The index is rebuilt when the vector service reports
+    a new version of the categories collection (reload or re-ingestion).
+    """
+
+    SHORT_WEIGHT = 0.3
+    FULL_WEIGHT = 0.7
+
+    # Process-wide instance
+    _instance: "CategoryIndex" = None
+    _instance_lock = RLock()
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.full_names: List[str] = []
+        self.matrix: Optional[np.ndarray] = None  # shape (2, n, dim): [short, full]
+        self.version: Optional[int] = None
+        self._lock = RLock()
+
+    @classmethod
+    def get_instance(cls) -> "CategoryIndex":
+        if cls._instance is None:
+            with cls._instance_lock:
+                # Double-check after acquiring lock
+                if cls._instance is None:
+                    cls._instance = CategoryIndex()
+        return cls._instance
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def build(self, categories: List[Dict], version: int = None) -> None:
+        """Build the matrices from category rows (id, name, full_name, embedding, full_embedding)."""
+        with self._lock:
+            if not categories:
+                self.ids, self.names, self.full_names = [], [], []
+                self.matrix = None
+                self.version = version
+                return
+
+            short = np.asarray([c["embedding"] for c in categories], dtype=np.float32)
+            full = np.asarray([c["full_embedding"] for c in categories], dtype=np.float32)
+            matrix = self._normalize(np.stack([short, full]))
+
+            self.ids = [str(c["id"]) for c in categories]
+            self.names = [c["name"] for c in categories]
+            self.full_names = [c["full_name"] for c in categories]
+            self.matrix = np.ascontiguousarray(matrix)
+            self.version = version
+            logger.info(f"Built category index: {len(self.ids)} categories, dim={matrix.shape[-1]}, version={version}")
+
+    def _build_from(self, vector_service: VectorServiceInterface, version: int) -> None:
+        with self._lock:
+            # Double-check: another caller may have rebuilt it meanwhile
+            if self.version == version and self.matrix is not None:
+                return
+            self.build(vector_service.fetch_all_categories(), version)
+
+    async def ensure_fresh(self, vector_service: VectorServiceInterface) -> None:
+        """(Re)build the index if it is empty or the categories collection changed."""
+        version = vector_service.get_collection_version("categories")
+        if self.matrix is not None and self.version == version:
+            return
+        await asyncio.to_thread(self._build_from, vector_service, version)
+
+    @property
+    def is_ready(self) -> bool:
+        return self.matrix is not None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @traceable(name="category_index.search", tags=["retrieval", "category", "local"], metadata={"version": "1.0"})
+    def search(self, query_embedding: List[float], top_k: int = 3, radius: float = None) -> List[Dict]:
+        """
+        Score all categories against the query, best first.
+
+        score = 0.7 * cos(query, full_embedding) + 0.3 * cos(query, embedding)
+        Categories scoring below radius (when given) are dropped.
+        """
+        matrix = self.matrix
+        if matrix is None or top_k <= 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return []
+        query = query / query_norm
+
+        sims = matrix @ query  # shape (2, n)
+        sim_short, sim_full = sims[0], sims[1]
+        scores = self.FULL_WEIGHT * sim_full + self.SHORT_WEIGHT * sim_short
+
+        candidates = np.flatnonzero(scores >= radius) if radius else np.arange(scores.shape[0])
+        if candidates.size == 0:
+            return []
+        if candidates.size > top_k:
+            top = np.argpartition(-scores[candidates], top_k - 1)[:top_k]
+            candidates = candidates[top]
+        candidates = candidates[np.argsort(-scores[candidates])]
+
+        return [{
+            "id": self.ids[i],
+            "name": self.names[i],
+            "full_name": self.full_names[i],
+            "distance": float(max(sim_short[i], sim_full[i])),
+            "sim_short": float(sim_short[i]),
+            "sim_full": float(sim_full[i]),
+            "score": float(scores[i]),
+        } for i in candidates]
@@ -2,6 +2,7 @@ import traceback
 from typing import Dict, List, Optional
 from shopassist_api.application.prompts.templates import PromptTemplates
 from shopassist_api.application.services.context_builder import ContextBuilder
+from shopassist_api.application.services.product_hydrator import ProductHydrator
 from shopassist_api.application.services.session_manager import SessionManager
 from shopassist_api.application.services.formaters import FormatterUtils
 from shopassist_api.application.services.llm_sufficiency_builder import LLMSufficiencyBuilder
@@ -22,6 +23,7 @@ class ComparisonService:
         self.repository = repository_service
         self.llm = llm_service
         self.context_builder = ContextBuilder()
+        self.hydrator = ProductHydrator(repository_service)
 
 
     async def get_products_for_comparison(
@@ -32,7 +34,7 @@ class ComparisonService:
         try:
             # Retrieve product details
 
-            products = await self.repository.get_products_by_ids(product_ids)
+            products = list((await self.hydrator.get_products(product_ids)).values())
 
             if not products or len(products) < 2:
                 logger.info(f"Not enough products found for comparison: found {len(products)} products.")
@@ -72,10 +72,11 @@ class ContextBuilder:
     
     def _format_product(self, product: Dict, index: int) -> str:
             """Format single product for context"""
-            return f"""Product {index}: {product['name']}
-                    Price: ${product['price']:.2f}
-                    Category: {product['category']}
-                    Brand: {product.get('brand', 'N/A')}
-                    Available: { product.get('availability', 'out_of_stock')}
-                    Description: {product.get('description', product.get('matched_text', 'N/A'))}
-                    Relevance Score: {product.get('distance', 0):.3f}"""
\ No newline at end of file
+            # No indentation inside the lines: every character here is prompt tokens
+            return (f"Product {index}: {product['name']}\n"
+                    f"Price: ${product['price']:.2f}\n"
+                    f"Category: {product['category']}\n"
+                    f"Brand: {product.get('brand', 'N/A')}\n"
+                    f"Available: {product.get('availability', 'out_of_stock')}\n"
+                    f"Description: {product.get('description', product.get('matched_text', 'N/A'))}\n"
+                    f"Relevance Score: {product.get('distance', 0):.3f}")
\ No newline at end of file
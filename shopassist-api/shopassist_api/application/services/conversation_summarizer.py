@@ -0,0 +1,179 @@
+import asyncio
+import json
+from typing import Dict, List, Optional
+import tiktoken
+from langsmith import traceable
+from shopassist_api.application.interfaces.service_interfaces import (
+    CacheServiceInterface, LLMServiceInterface, RepositoryServiceInterface
+)
+from shopassist_api.application.prompts.templates import PromptTemplates
+from shopassist_api.application.services.formaters import FormatterUtils
+from shopassist_api.application.settings.config import settings
+from shopassist_api.domain.models.message import Message
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class ConversationSummarizer:
+    """
+    Rolling per-session conversation summary.
+
+    After each assistant message (SessionManager.add_message) a background task
+    folds the messages older than the last `verbatim_messages` into a compact
+    summary with the nano LLM, and stores it in the cache together with the id
+    of the last folded message. history_text() gives prompt builders that
+    summary plus the messages after it, within `token_budget` tokens, so the
+    history part of a prompt stays flat however long the conversation grows.
+
+    summarize() is also used to compact checkpointed agent threads (ThreadSummarizer).
+    """
+
+    SUMMARY_MAX_WORDS = 120
+
+    # Process-wide counters
+    _stats = {"refreshes": 0, "folded_messages": 0, "skipped": 0, "errors": 0, "trimmed_prompts": 0}
+
+    def __init__(self,
+                 llm_service: LLMServiceInterface,
+                 cache_service: CacheServiceInterface,
+                 repository_service: RepositoryServiceInterface,
+                 verbatim_messages: int = None,
+                 token_budget: int = None,
+                 summary_max_tokens: int = None,
+                 ttl: int = None):
+        self.llm = llm_service
+        self.cache = cache_service
+        self.repository = repository_service
+        self.verbatim_messages = verbatim_messages or settings.conversation_summary_verbatim_messages
+        self.token_budget = token_budget or settings.conversation_summary_token_budget
+        self.summary_max_tokens = summary_max_tokens or settings.conversation_summary_max_tokens
+        self.ttl = ttl or settings.conversation_summary_ttl
+        self.encoding = tiktoken.encoding_for_model("gpt-4")
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._pending: set = set()
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.encoding.encode(text))
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"summary:{session_id}"
+
+    async def get_summary(self, session_id: str) -> Dict:
+        """{"summary": text, "last_id": id of the last message folded into it}"""
+        try:
+            cached = await self.cache.get(self._key(session_id))
+            if cached:
+                return json.loads(cached)
+        except Exception as e:
+            logger.error(f"Error reading conversation summary for session {session_id}: {e}")
+        return {"summary": "", "last_id": None}
+
+    @traceable(name="summarizer.summarize", tags=["session", "summary", "llm"], metadata={"version": "1.0"})
+    async def summarize(self, previous_summary: str, transcript: str) -> str:
+        """Previous summary updated with a transcript of newer messages"""
+        messages = PromptTemplates.conversation_summary_prompt(previous_summary, transcript, self.SUMMARY_MAX_WORDS)
+        llm_response = await self.llm.generate_response(messages=messages, temperature=0.1,
+                                                        max_tokens=self.summary_max_tokens)
+        return llm_response["response"].strip()
+
+    @staticmethod
+    def transcript(messages: List[Message]) -> str:
+        """Messages as summary input: text plus the names of the products shown, without descriptions"""
+        lines = []
+        for msg in messages:
+            line = f"{msg.role.title()}: {msg.content}"
+            products = (msg.metadata or {}).get("products", [])
+            if products:
+                line += "\n  Products shown: " + ", ".join(
+                    f"{product.get('name', '')} ({product.get('id', '')})" for product in products)
+            lines.append(line)
+        return "\n".join(lines)
+
+    def schedule(self, session_id: str) -> None:
+        """Refresh the summary in the background: one task per session, run again if messages arrive meanwhile"""
+        task = self._tasks.get(session_id)
+        if task is not None and not task.done():
+            self._pending.add(session_id)
+            return
+        self._tasks[session_id] = asyncio.create_task(self._run(session_id))
+
+    async def _run(self, session_id: str) -> None:
+        try:
+            while True:
+                self._pending.discard(session_id)
+                await self.refresh(session_id)
+                if session_id not in self._pending:
+                    break
+        finally:
+            self._tasks.pop(session_id, None)
+
+    @traceable(name="summarizer.refresh", tags=["session", "summary"], metadata={"version": "1.0"})
+    async def refresh(self, session_id: str) -> Optional[Dict]:
+        """Fold the messages that left the verbatim window into the session summary"""
+        try:
+            messages = [Message.model_validate(msg) for msg in await self.repository.get_conversation_history(session_id)]
+            state = await self.get_summary(session_id)
+            ids = [msg.id for msg in messages]
+            if state["last_id"] in ids:
+                start = ids.index(state["last_id"]) + 1
+            else:
+                # No summary yet, or the history it was built from is gone
+                state, start = {"summary": "", "last_id": None}, 0
+
+            end = len(messages) - self.verbatim_messages
+            if end <= start:
+                ConversationSummarizer._stats["skipped"] += 1
+                return state
+
+            summary = await self.summarize(state["summary"], self.transcript(messages[start:end]))
+            state = {"summary": summary, "last_id": messages[end - 1].id}
+            await self.cache.set(self._key(session_id), json.dumps(state), ttl=self.ttl)
+
+            ConversationSummarizer._stats["refreshes"] += 1
+            ConversationSummarizer._stats["folded_messages"] += end - start
+            logger.info(f"Conversation summary for session {session_id}: folded {end - start} messages, "
+                        f"{self.count_tokens(summary)} tokens")
+            return state
+        except Exception as e:
+            ConversationSummarizer._stats["errors"] += 1
+            logger.error(f"Error refreshing conversation summary for session {session_id}: {e}")
+            return None
+
+    async def history_text(self, session_id: str, history: List[Message]) -> str:
+        """
+        Prompt history: the session summary plus the messages of `history` it does
+        not cover, newest first until the token budget is spent. Only the most
+        recent message keeps its product sources.
+        """
+        if not history:
+            return ""
+        state = await self.get_summary(session_id)
+        ids = [msg.id for msg in history]
+        recent = history[ids.index(state["last_id"]) + 1:] if state["last_id"] in ids else history
+
+        parts = [f"Conversation summary:\n{state['summary']}"] if state["summary"] else []
+        budget = self.token_budget - sum(self.count_tokens(part) for part in parts)
+        kept = []
+        for position, msg in enumerate(reversed(recent)):
+            text = FormatterUtils.format_message_history([msg]) if position == 0 else f"{msg.role.title()}: {msg.content}"
+            tokens = self.count_tokens(text)
+            if tokens > budget and kept:
+                ConversationSummarizer._stats["trimmed_prompts"] += 1
+                break
+            kept.insert(0, text)
+            budget -= tokens
+        return "\n\n".join(parts + kept)
+
+    async def close(self) -> None:
+        """Cancel summaries still running (process shutdown)"""
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        return dict(cls._stats)
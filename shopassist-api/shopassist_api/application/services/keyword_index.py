@@ -0,0 +1,245 @@
+import asyncio
+import json
+import math
+import re
+from pathlib import Path
+from threading import RLock
+from typing import Dict, List, Optional
+import numpy as np
+from langsmith import traceable
+from shopassist_api.application.settings.config import settings
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Alphanumeric tokens, keeping model numbers/SKUs such as "wh-1000xm4" or "a7.iii" together
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+
+# Fields kept per indexed chunk (returned in results, used for filtering)
+DOC_FIELDS = ["id", "product_id", "text", "category", "price", "brand"]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens. Compound tokens (model numbers, SKUs) are emitted
+    as-is, joined ("wh1000xm4") and as their parts so that any spelling matches.
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        tokens.append(token)
+        parts = re.split(r"[-_./]", token)
+        if len(parts) > 1:
+            tokens.append("".join(parts))
+            tokens.extend(parts)
+    return tokens
+
+
+def resolve_index_path(path: str = None) -> Path:
+    """Resolve the keyword index path; relative paths are relative to the shopassist-api folder."""
+    path = Path(path or settings.keyword_index_path)
+    if not path.is_absolute():
+        path = Path(__file__).resolve().parents[3] / path
+    return path
+
+
+class KeywordIndex:
+    """
+    In-process BM25 keyword index over product chunks.
+
+    Postings are stored in a compact CSR layout: terms are numbered through
+    the vocabulary, and term_offsets[t]:term_offsets[t+1] slices the
+    (doc_ids, tfs) arrays. The index is built at ingestion time
+    (scripts/data/ingest_to_milvus.py) and saved as a single .npz file.
+    """
+
+    # Process-wide instance
+    _instance: "KeywordIndex" = None
+    _instance_lock = RLock()
+
+    def __init__(self, k1: float = None, b: float = None):
+        self.k1 = k1 if k1 is not None else settings.bm25_k1
+        self.b = b if b is not None else settings.bm25_b
+        self.vocabulary: Dict[str, int] = {}
+        self.term_offsets = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.zeros(0, dtype=np.uint32)
+        self.tfs = np.zeros(0, dtype=np.uint16)
+        self.doc_lengths = np.zeros(0, dtype=np.float32)
+        self.avg_doc_length = 0.0
+        self.docs: List[Dict] = []
+        self.source_mtime: Optional[float] = None
+        self._lock = RLock()
+
+    @classmethod
+    def get_instance(cls) -> "KeywordIndex":
+        if cls._instance is None:
+            with cls._instance_lock:
+                # Double-check after acquiring lock
+                if cls._instance is None:
+                    cls._instance = KeywordIndex()
+        return cls._instance
+
+    @property
+    def is_ready(self) -> bool:
+        return len(self.docs) > 0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def build(self, chunks: List[Dict]) -> None:
+        """Build the index from product chunks (same records as the Milvus products collection)."""
+        postings: Dict[str, Dict[int, int]] = {}
+        doc_lengths = []
+        docs = []
+        for doc_id, chunk in enumerate(chunks):
+            tokens = tokenize(chunk.get("text", ""))
+            doc_lengths.append(len(tokens))
+            docs.append({field: chunk.get(field) for field in DOC_FIELDS})
+            for token in tokens:
+                term_postings = postings.setdefault(token, {})
+                term_postings[doc_id] = term_postings.get(doc_id, 0) + 1
+
+        vocabulary = {term: term_id for term_id, term in enumerate(sorted(postings))}
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        doc_id_list, tf_list = [], []
+        for term, term_id in vocabulary.items():
+            term_postings = postings[term]
+            doc_id_list.extend(term_postings.keys())
+            tf_list.extend(term_postings.values())
+            offsets[term_id + 1] = len(doc_id_list)
+
+        with self._lock:
+            self.vocabulary = vocabulary
+            self.term_offsets = offsets
+            self.doc_ids = np.asarray(doc_id_list, dtype=np.uint32)
+            self.tfs = np.minimum(np.asarray(tf_list, dtype=np.int64), np.iinfo(np.uint16).max).astype(np.uint16)
+            self.doc_lengths = np.asarray(doc_lengths, dtype=np.float32)
+            self.avg_doc_length = float(self.doc_lengths.mean()) if docs else 0.0
+            self.docs = docs
+        logger.info(f"Built keyword index: {len(docs)} chunks, {len(vocabulary)} terms, {len(doc_id_list)} postings")
+
+    def save(self, path: str = None) -> Path:
+        """Save the index as a single compressed .npz file."""
+        path = resolve_index_path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                terms=np.asarray(json.dumps(terms)),
+                docs=np.asarray(json.dumps(self.docs)),
+                term_offsets=self.term_offsets,
+                doc_ids=self.doc_ids,
+                tfs=self.tfs,
+                doc_lengths=self.doc_lengths,
+            )
+        logger.info(f"Saved keyword index to {path}")
+        return path
+
+    def load(self, path: str = None) -> None:
+        """Load an index saved with save()."""
+        path = resolve_index_path(path)
+        mtime = path.stat().st_mtime
+        with np.load(path, allow_pickle=False) as data:
+            terms = json.loads(str(data["terms"]))
+            docs = json.loads(str(data["docs"]))
+            term_offsets = data["term_offsets"]
+            doc_ids = data["doc_ids"]
+            tfs = data["tfs"]
+            doc_lengths = data["doc_lengths"]
+
+        with self._lock:
+            self.vocabulary = {term: term_id for term_id, term in enumerate(terms)}
+            self.term_offsets = term_offsets
+            self.doc_ids = doc_ids
+            self.tfs = tfs
+            self.doc_lengths = doc_lengths
+            self.avg_doc_length = float(doc_lengths.mean()) if len(docs) else 0.0
+            self.docs = docs
+            self.source_mtime = mtime
+        logger.info(f"Loaded keyword index from {path}: {len(docs)} chunks, {len(terms)} terms")
+
+    def _reload_if_changed(self, path: Path) -> None:
+        with self._lock:
+            # Double-check: another caller may have loaded it meanwhile
+            if path.exists() and path.stat().st_mtime != self.source_mtime:
+                self.load(str(path))
+
+    async def ensure_loaded(self, path: str = None) -> None:
+        """Load the index file if it exists and changed since the last load (re-ingestion)."""
+        path = resolve_index_path(path)
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if mtime != self.source_mtime:
+            await asyncio.to_thread(self._reload_if_changed, path)
+
+    @staticmethod
+    def _matches_filters(doc: Dict, filters: Optional[Dict]) -> bool:
+        """Python equivalent of RetrievalService._build_filter_expression"""
+        if not filters:
+            return True
+        price = doc.get("price") or 0.0
+        if "min_price" in filters and price < filters["min_price"]:
+            return False
+        if "max_price" in filters and price > filters["max_price"]:
+            return False
+        if filters.get("category") and doc.get("category") != filters["category"]:
+            return False
+        if filters.get("categories") and doc.get("category") not in filters["categories"]:
+            return False
+        if "brand" in filters and doc.get("brand") != filters["brand"]:
+            return False
+        return True
+
+    def score(self, query: str) -> np.ndarray:
+        """BM25 score of every chunk for the query"""
+        scores = np.zeros(len(self.docs), dtype=np.float32)
+        num_docs = len(self.docs)
+        for token in set(tokenize(query)):
+            term_id = self.vocabulary.get(token)
+            if term_id is None:
+                continue
+            start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+            doc_ids = self.doc_ids[start:end]
+            tfs = self.tfs[start:end].astype(np.float32)
+            doc_freq = end - start
+            idf = math.log(1 + (num_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_ids] / self.avg_doc_length)
+            # doc_ids are unique within a posting list
+            scores[doc_ids] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+        return scores
+
+    @traceable(name="keyword_index.search", tags=["retrieval", "product", "keyword"], metadata={"version": "1.0"})
+    def search(self, query: str, top_k: int = 5, filters: Optional[Dict] = None) -> List[Dict]:
+        """
+        Top products by BM25 score (best chunk per product), best first.
+        Results use the same fields as the Milvus product hits, plus keyword_score.
+        """
+        if not self.is_ready or top_k <= 0:
+            return []
+
+        scores = self.score(query)
+        candidates = np.flatnonzero(scores > 0)
+        if candidates.size == 0:
+            return []
+        candidates = candidates[np.argsort(-scores[candidates])]
+
+        results = []
+        seen_products = set()
+        for doc_id in candidates:
+            doc = self.docs[doc_id]
+            if doc["product_id"] in seen_products or not self._matches_filters(doc, filters):
+                continue
+            seen_products.add(doc["product_id"])
+            results.append({**doc, "keyword_score": float(scores[doc_id])})
+            if len(results) >= top_k:
+                break
+        return results
+
+
+def build_keyword_index_file(chunks: List[Dict], path: str = None) -> Path:
+    """Build and save the keyword index for product chunks (ingestion time)."""
+    index = KeywordIndex()
+    index.build(chunks)
+    return index.save(path)
@@ -0,0 +1,120 @@
+import time
+from collections import OrderedDict
+from threading import RLock
+from typing import Dict, List, Optional
+from langsmith import traceable
+from shopassist_api.application.interfaces.service_interfaces import RepositoryServiceInterface
+from shopassist_api.application.settings.config import settings
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class ProductHydrator:
+    """
+    Joins vector hits with product documents from the repository.
+
+    Only the fields listed in settings.product_hydration_fields are fetched
+    (the large 'chunks' arrays stay in Cosmos). Products are kept in a bounded
+    in-process LRU with a TTL; misses are fetched in one call, passing the
+    category of each hit as partition key so the repository can do point reads
+    and single-partition queries.
+    """
+
+    # Shared by all instances: {product_id: (expires_at, product)}
+    _cache: "OrderedDict[str, tuple]" = OrderedDict()
+    _lock = RLock()
+    _stats = {"hits": 0, "misses": 0, "fetches": 0}
+
+    def __init__(self, repository_service: RepositoryServiceInterface,
+                 fields: List[str] = None, cache_size: int = None, ttl: int = None):
+        self.repository = repository_service
+        fields = fields or settings.product_hydration_fields
+        self.fields = fields if "id" in fields else ["id", *fields]
+        self.cache_size = cache_size if cache_size is not None else settings.product_cache_size
+        self.ttl = ttl if ttl is not None else settings.product_cache_ttl
+
+    def _get_cached(self, product_id: str) -> Optional[Dict]:
+        with ProductHydrator._lock:
+            entry = ProductHydrator._cache.get(product_id)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del ProductHydrator._cache[product_id]
+                return None
+            ProductHydrator._cache.move_to_end(product_id)
+            return entry[1]
+
+    def _put_cached(self, products: List[Dict]):
+        if self.cache_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl
+        with ProductHydrator._lock:
+            for product in products:
+                ProductHydrator._cache[product["id"]] = (expires_at, product)
+                ProductHydrator._cache.move_to_end(product["id"])
+            while len(ProductHydrator._cache) > self.cache_size:
+                ProductHydrator._cache.popitem(last=False)
+
+    @traceable(name="hydrator.get_products", tags=["hydration", "product", "cosmos"], metadata={"version": "1.0"})
+    async def get_products(self, product_ids: List[str], partition_keys: Optional[Dict[str, str]] = None) -> Dict[str, Dict]:
+        """Products by ID ({id: product}); IDs not found in the repository are absent"""
+        products = {}
+        missing = []
+        for product_id in dict.fromkeys(product_ids):
+            product = self._get_cached(product_id)
+            if product is None:
+                missing.append(product_id)
+            else:
+                products[product_id] = product
+
+        ProductHydrator._stats["hits"] += len(products)
+        ProductHydrator._stats["misses"] += len(missing)
+        if missing:
+            ProductHydrator._stats["fetches"] += 1
+            fetched = await self.repository.get_product_projections(
+                missing,
+                fields=self.fields,
+                partition_keys={pid: partition_keys[pid] for pid in missing if partition_keys and partition_keys.get(pid)}
+            )
+            self._put_cached(fetched)
+            products.update({product["id"]: product for product in fetched})
+        return products
+
+    async def hydrate(self, hits: List[Dict]) -> List[Dict]:
+        """
+        Full product data for vector hits (one entry per hit, in hit order).
+
+        Hits need 'product_id', 'distance' and 'text'; 'category' is used as
+        partition key when present.
+        """
+        if not hits:
+            return []
+        partition_keys = {hit["product_id"]: hit.get("category") for hit in hits}
+        products = await self.get_products([hit["product_id"] for hit in hits], partition_keys)
+
+        enriched = []
+        for hit in hits:
+            product = products.get(hit["product_id"])
+            if product is None:
+                logger.warning(f"Product ID {hit['product_id']} not found in Milvus-Cosmos results")
+                continue
+            enriched.append({
+                **product,
+                "distance": hit["distance"],
+                "matched_text": hit.get("text", "")[:200]  # Preview
+            })
+        return enriched
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._cache.clear()
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        stats = dict(cls._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["size"] = len(cls._cache)
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
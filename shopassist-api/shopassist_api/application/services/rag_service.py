@@ -1,5 +1,7 @@
+import hashlib
+import json
 import traceback
-from typing import Dict, List, Optional
+from typing import AsyncGenerator, Dict, List, Optional
 from langsmith import traceable
 from langsmith.run_helpers import get_current_run_tree
 import time
@@ -9,7 +11,10 @@ from shopassist_api.application.services.session_manager import SessionManager
 from shopassist_api.application.services.formaters import FormatterUtils
 from shopassist_api.application.services.llm_sufficiency_builder import LLMSufficiencyBuilder
 from shopassist_api.application.services.query_processor import QueryProcessor
+from shopassist_api.application.services.retrieval_cache import canonicalize_filters
 from shopassist_api.application.services.retrieval_service import RetrievalService
+from shopassist_api.application.services.semantic_cache import SemanticAnswerCache
+from shopassist_api.application.services.template_responder import TemplateResponder
 from shopassist_api.application.interfaces.service_interfaces import LLMServiceInterface
 from shopassist_api.application.settings.config import settings
 from shopassist_api.logging_config import get_logger
@@ -30,15 +35,18 @@ class RAGService:
                  llm_service: LLMServiceInterface,
                  nanolm_service: LLMServiceInterface,
                  retrieval_service: RetrievalService,
-                 session_manager: SessionManager
+                 session_manager: SessionManager,
+                 semantic_cache: Optional[SemanticAnswerCache] = None
                  ):
         self.retrieval = retrieval_service
+        self.semantic_cache = semantic_cache
         self.llm = llm_service
         self.nanolm = nanolm_service # Use nanolm for lightweight tasks
         self.session_manager = session_manager
         self.sufficiency_builder = LLMSufficiencyBuilder(llm_service=nanolm_service)
         self.query_processor = QueryProcessor()
         self.context_builder = ContextBuilder()
+        self.template_responder = TemplateResponder()
         
         
     async def generate_dumb_answer(
@@ -124,123 +132,294 @@ class RAGService:
         Returns:
             Dict with response, sources, metadata
         """
-        run = get_current_run_tree()
         start_time = time.time()
         try:
-            logger.info(f"Processing. Session: {session_id}, Query: {query}")
-            
-            # Step 1: Format conversation history
-            history = await self.session_manager.get_conversation_history(session_id=session_id)
+            turn = await self._prepare_turn(user_id, query, session_id)
+            if "cached" in turn:
+                return turn["cached"]
 
-            history_text = FormatterUtils.format_message_history(history)
+            # Step 5: Generate response
+            if turn["template_response"] is not None:
+                llm_response = TemplateResponder.as_llm_response(turn["template_response"])
+            else:
+                logger.info(f"Generating LLM response for session: [{session_id}] with {len(turn['messages'])} messages")
+                llm_response = await self.llm.generate_response(turn["messages"])
 
-            # Step 2: Process query and get price filters
-            cleaned_query, filters = self.query_processor.process_query(query)
+            return await self._complete_turn(user_id, query, session_id, turn, llm_response, start_time)
             
-            #step 3: Classify intent
-            sufficiency = await self.sufficiency_builder.analyze_sufficiency(
-                cleaned_query, history=history_text)
+        except Exception as e:
+            logger.error(f"Error in RAG pipeline: {e}")
+            traceback.print_exc()
+            raise
 
-            logger.info(f"Sufficiency data: {sufficiency}")
-            
-            data = {
-                "query": cleaned_query,
-                "filters": filters,
-                "history_text": history_text,
-                "sufficiency_data": sufficiency
-            }
-            
-            llm_query_type = sufficiency.get('intent_query', 'general_support')
-            
-            messages = []
-            results = []
-            # Step 4: Handle different query types
-            match llm_query_type:
-                case 'product_search':
-                    logger.info("Handling product search intent")
-                    messages, results = await self.handle_product_search(data)
-                case 'product_details':
-                    logger.info("Handling product details intent")
-                    messages, results = await self.handle_product_details(data)
-                case 'product_comparison':
-                    logger.info("Handling product comparison intent")
-                    messages, results = await self.handle_product_comparison(data)
-                case 'policy_question':
-                    logger.info("Handling policy question intent")
-                    messages, results = await self.handle_policy_question(data)
-                case 'general_support':
-                    logger.info("Handling general support intent")
-                    messages, results = await self.handle_general_support(data)
-                case 'chitchat':
-                    logger.info("Handling chitchat intent")
-                    messages, results = await self.handle_chitchat(data)
-                case 'out_of_scope':
-                    logger.info("Handling out_of_scope intent")
-                    messages, results = await self.handle_general_out_of_scope(data)
-                case _:
-                    logger.info("Handling default/general intent")
-                    messages, results = await self.handle_general_out_of_scope(data)
+    @traceable(name="rag.stream_answer", tags=["rag", "entry-point", "streaming"], metadata={"version": "1.0"})
+    async def stream_answer(
+        self,
+        user_id:str,
+        query: str,
+        session_id: Optional[str] = None
+    ) -> AsyncGenerator[Dict, None]:
+        """
+        Streaming variant of generate_answer.
 
+        Yields events as {"event": ..., "data": ...}:
+          sources  - retrieved sources and intent, before the LLM call
+          token    - LLM content deltas as they arrive
+          metadata - tokens, cost, time to first token; sent after the turn is persisted
+        """
+        start_time = time.time()
+        try:
+            turn = await self._prepare_turn(user_id, query, session_id)
+            if "cached" in turn:
+                cached = turn["cached"]
+                yield {"event": "sources", "data": {"query_type": cached["query_type"], "sources": cached["sources"]}}
+                yield {"event": "token", "data": {"content": cached["response"]}}
+                yield {"event": "metadata", "data": cached["metadata"]}
+                return
+
+            yield {"event": "sources", "data": {"query_type": turn["intent"], "sources": turn["results"]}}
+
+            if turn["template_response"] is not None:
+                yield {"event": "token", "data": {"content": turn["template_response"]}}
+                result = await self._complete_turn(user_id, query, session_id, turn,
+                                                   TemplateResponder.as_llm_response(turn["template_response"]), start_time)
+                yield {"event": "metadata", "data": {**result["metadata"], "ttft_ms": (time.time() - start_time) * 1000}}
+                return
+
+            logger.info(f"Streaming LLM response for session: [{session_id}] with {len(turn['messages'])} messages")
+            llm_response = None
+            first_token_ms = None
+            async for chunk in self.llm.streaming_response(turn["messages"]):
+                if "content" in chunk:
+                    if first_token_ms is None:
+                        first_token_ms = (time.time() - start_time) * 1000
+                    yield {"event": "token", "data": {"content": chunk["content"]}}
+                else:
+                    llm_response = chunk
+
+            # Persist only once the whole answer is known
+            result = await self._complete_turn(user_id, query, session_id, turn, llm_response, start_time)
+            yield {"event": "metadata", "data": {**result["metadata"], "ttft_ms": first_token_ms}}
 
-            # Step 5: Generate response
-            logger.info(f"Generating LLM response for session: [{session_id}] with {len(messages)} messages")
-            llm_response = await self.llm.generate_response(messages)
+        except Exception as e:
+            logger.error(f"Error in RAG streaming pipeline: {e}")
+            traceback.print_exc()
+            raise
 
-            logger.info(f"LLM response generated for session: [{session_id}] with {llm_response['tokens']} tokens, cost: {llm_response['cost']}")
-            
-            product_sources = FormatterUtils.build_product_sources(llm_query_type,results)
-
-            # Step 6: Save user and assistant messages
-            await self.session_manager.add_message(
-                session_id=session_id,
-                user_id=user_id,
-                role="user",
-                content=query,
-            )
+    async def _prepare_turn(self, user_id: str, query: str, session_id: Optional[str]) -> Dict:
+        """
+        Steps 1-4 of the pipeline: history, query processing, intent, retrieval and prompt.
 
-            metadata = {
-                    "query_type_confidence": sufficiency.get('confidence', 0.0),
-                    "num_sources": len(results),
-                    "tokens": llm_response['tokens'],
-                    "cost": llm_response['cost'],
-                    "products": product_sources,
-                    "turn_index": len(history) + 1 if history else 1
-                }
-            
-            await self.session_manager.add_message(
-                session_id=session_id,
-                user_id=user_id,
-                role="assistant",
-                content=llm_response['response'],
-                metadata=metadata
-            )
+        Returns {"cached": result} on a semantic cache hit.
+        """
+        logger.info(f"Processing. Session: {session_id}, Query: {query}")
+        
+        # Step 1: Format conversation history
+        history = await self.session_manager.get_conversation_history(session_id=session_id)
 
-            total_time = time.time() - start_time
-            logger.info(f"RAG pipeline completed in {total_time*1000:.2f} ms for session: [{session_id}]")
-            if run:
-                run.add_metadata({
-                    "total_latency_ms": total_time * 1000,
-                    "intent": llm_query_type,
-                    "docs_used": len(results)
-                })
-            else:
-                logger.warning("No active LangSmith run found to add metadata.")
+        history_text = await self.session_manager.get_history_text(session_id, history)
 
-            # return
+        # Step 2: Process query and get price filters
+        cleaned_query, filters = self.query_processor.process_query(query)
+
+        # Bare greetings / thanks / goodbyes need neither the cache nor the intent classifier
+        trivial_kind = self.template_responder.match(cleaned_query) if self.template_responder.enabled else None
+        if trivial_kind:
             return {
-                "response": llm_response['response'],
-                "sources": results,
-                "query_type": llm_query_type,
-                "has_results": True,
-                "filters_applied": filters,
-                "metadata": metadata
+                "history": history,
+                "filters": filters,
+                "sufficiency": {"intent_query": "chitchat", "is_sufficient": "yes", "confidence": 1.0,
+                                "reason": f"template match: {trivial_kind}", "query_retrieval_hint": ""},
+                "intent": "chitchat",
+                "messages": [],
+                "results": [],
+                "template_response": self.template_responder.respond("chitchat", cleaned_query, history),
+                "cache_namespace": None,
+                "use_semantic_cache": False
             }
-            
-        except Exception as e:
-            logger.error(f"Error in RAG pipeline: {e}")
-            traceback.print_exc()
-            raise
+
+        # Semantic answer cache, first turn only (the answer cannot depend on history)
+        cache_namespace = self._semantic_cache_namespace(filters)
+        use_semantic_cache = self.semantic_cache is not None and not history
+        if use_semantic_cache:
+            cached = await self.semantic_cache.lookup(cache_namespace, query, settings.semantic_cache_rag_intents)
+            if cached:
+                return {"cached": await self._answer_from_cache(user_id, query, session_id, cached)}
+        
+        #step 3: Classify intent
+        sufficiency = await self.sufficiency_builder.analyze_sufficiency(
+            cleaned_query, history=history_text)
+
+        logger.info(f"Sufficiency data: {sufficiency}")
+        
+        data = {
+            "query": cleaned_query,
+            "filters": filters,
+            "history_text": history_text,
+            "sufficiency_data": sufficiency
+        }
+        
+        llm_query_type = sufficiency.get('intent_query', 'general_support')
+        
+        messages = []
+        results = []
+        template_response = None
+        # Step 4: Handle different query types
+        match llm_query_type:
+            case 'product_search':
+                logger.info("Handling product search intent")
+                messages, results = await self.handle_product_search(data)
+            case 'product_details':
+                logger.info("Handling product details intent")
+                messages, results = await self.handle_product_details(data)
+            case 'product_comparison':
+                logger.info("Handling product comparison intent")
+                messages, results = await self.handle_product_comparison(data)
+            case 'policy_question':
+                logger.info("Handling policy question intent")
+                messages, results = await self.handle_policy_question(data)
+            case 'general_support':
+                logger.info("Handling general support intent")
+                messages, results = await self.handle_general_support(data)
+            case 'chitchat' | 'out_of_scope' if self.template_responder.enabled:
+                logger.info(f"Handling {llm_query_type} intent with a template")
+                template_response = self.template_responder.respond(llm_query_type, cleaned_query, history)
+            case 'chitchat':
+                logger.info("Handling chitchat intent")
+                messages, results = await self.handle_chitchat(data)
+                TemplateResponder.record_llm()
+            case 'out_of_scope':
+                logger.info("Handling out_of_scope intent")
+                messages, results = await self.handle_general_out_of_scope(data)
+                TemplateResponder.record_llm()
+            case _:
+                logger.info("Handling default/general intent")
+                messages, results = await self.handle_general_out_of_scope(data)
+
+        return {
+            "history": history,
+            "filters": filters,
+            "sufficiency": sufficiency,
+            "intent": llm_query_type,
+            "messages": messages,
+            "results": results,
+            "template_response": template_response,
+            "cache_namespace": cache_namespace,
+            "use_semantic_cache": use_semantic_cache
+        }
+
+    async def _complete_turn(self, user_id: str, query: str, session_id: Optional[str],
+                             turn: Dict, llm_response: Dict, start_time: float) -> Dict:
+        """Step 6: persist the turn, feed the semantic cache and build the result"""
+        run = get_current_run_tree()
+        history = turn["history"]
+        results = turn["results"]
+        filters = turn["filters"]
+        llm_query_type = turn["intent"]
+
+        logger.info(f"LLM response generated for session: [{session_id}] with {llm_response['tokens']} tokens, cost: {llm_response['cost']}")
+        
+        product_sources = FormatterUtils.build_product_sources(llm_query_type,results)
+
+        # Step 6: Save user and assistant messages
+        await self.session_manager.add_message(
+            session_id=session_id,
+            user_id=user_id,
+            role="user",
+            content=query,
+        )
+
+        metadata = {
+                "query_type_confidence": turn["sufficiency"].get('confidence', 0.0),
+                "num_sources": len(results),
+                "tokens": llm_response['tokens'],
+                "cost": llm_response['cost'],
+                "products": product_sources,
+                "turn_index": len(history) + 1 if history else 1
+            }
+        
+        await self.session_manager.add_message(
+            session_id=session_id,
+            user_id=user_id,
+            role="assistant",
+            content=llm_response['response'],
+            metadata=metadata
+        )
+
+        total_time = time.time() - start_time
+        logger.info(f"RAG pipeline completed in {total_time*1000:.2f} ms for session: [{session_id}]")
+
+        if turn["use_semantic_cache"] and llm_query_type in settings.semantic_cache_rag_intents:
+            await self.semantic_cache.store(
+                namespace=turn["cache_namespace"],
+                query=query,
+                intent=llm_query_type,
+                payload={
+                    "response": llm_response['response'],
+                    "sources": results,
+                    "filters_applied": filters,
+                    "metadata": metadata
+                },
+                latency_ms=total_time * 1000,
+                tokens=llm_response['tokens'].get('total', 0)
+            )
+        if run:
+            run.add_metadata({
+                "total_latency_ms": total_time * 1000,
+                "intent": llm_query_type,
+                "docs_used": len(results)
+            })
+        else:
+            logger.warning("No active LangSmith run found to add metadata.")
+
+        # return
+        return {
+            "response": llm_response['response'],
+            "sources": results,
+            "query_type": llm_query_type,
+            "has_results": True,
+            "filters_applied": filters,
+            "metadata": metadata
+        }
     
+    def _semantic_cache_namespace(self, filters: Dict) -> str:
+        """Cached answers are only shared between turns with the same extracted filters"""
+        if not filters:
+            return "rag"
+        digest = hashlib.sha1(json.dumps(canonicalize_filters(filters), sort_keys=True, default=str).encode("utf-8"))
+        return f"rag_{digest.hexdigest()[:12]}"
+
+    async def _answer_from_cache(self, user_id: str, query: str, session_id: str, cached: Dict) -> Dict:
+        """Build the generate_answer result from a semantic cache entry and record the turn"""
+        metadata = {
+            **cached.get("metadata", {}),
+            "tokens": {"prompt": 0, "completion": 0, "total": 0},
+            "cost": 0,
+            "turn_index": 1,
+            "semantic_cache": {"similarity": cached["similarity"], "cached_query": cached.get("query")}
+        }
+        await self.session_manager.add_message(
+            session_id=session_id,
+            user_id=user_id,
+            role="user",
+            content=query,
+        )
+        await self.session_manager.add_message(
+            session_id=session_id,
+            user_id=user_id,
+            role="assistant",
+            content=cached["response"],
+            metadata=metadata
+        )
+        return {
+            "response": cached["response"],
+            "sources": cached.get("sources", []),
+            "query_type": cached["intent"],
+            "has_results": True,
+            "filters_applied": cached.get("filters_applied", {}),
+            "metadata": metadata
+        }
+
     @traceable(name="rag.handle_product_search", tags=["rag", "intent"], metadata={"version": "1.0"})
     async def handle_product_search(self, data:dict)-> tuple[List[Dict[str,str]], List[Dict]]:
         """ 
@@ -470,18 +649,18 @@ class RAGService:
         query = data['query']
         
         logger.warning("No results found for chitchat query")
-        messages = PromptTemplates.general_prompt(query, history)
+        messages = PromptTemplates.general_prompt(query, conversation_history=history)
         results = []
     
         return messages, results
 
     @traceable(name="rag.handle_general_out_of_scope", tags=["rag", "intent"], metadata={"version": "1.0"})
-    async def handle_general_out_of_scope(self, query:str, history:str) -> tuple[List[Dict[str,str]], List[Dict]]:
+    async def handle_general_out_of_scope(self, data:dict) -> tuple[List[Dict[str,str]], List[Dict]]:
         # handle out_of_scope queries. No retrieval        
         results = []
         
         logger.warning("No results found for out_of_scope query")
-        messages = PromptTemplates.general_prompt(query, history)
+        messages = PromptTemplates.general_prompt(data['query'], conversation_history=data['history_text'])
         results = []
     
         return messages, results
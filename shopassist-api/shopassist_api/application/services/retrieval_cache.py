@@ -0,0 +1,128 @@
+import hashlib
+import json
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+from shopassist_api.application.interfaces.service_interfaces import CacheServiceInterface
+from shopassist_api.application.settings.config import settings
+from shopassist_api.infrastructure.services.cached_embedding_service import normalize_text
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def canonicalize_filters(filters: Optional[Dict]) -> Dict:
+    """Order-independent form of a filters dict (sorted keys, sorted list values)"""
+    if not filters:
+        return {}
+    canonical = {}
+    for key in sorted(filters):
+        value = filters[key]
+        if isinstance(value, (list, tuple, set)):
+            value = sorted(str(v) for v in value)
+        canonical[key] = value
+    return canonical
+
+
+class RetrievalCache:
+    """
+    Redis result cache for RetrievalService (through CacheServiceInterface).
+
+    Key: retrieval:{collection}:{catalog token}:{in-process version}:{sha1(payload)}
+    where payload holds the normalised query, canonical filters, top_k and the
+    enriched flag. The catalog token is a shared Redis value replaced by
+    invalidate() after ingestion (insert_products / insert_knowledge_base),
+    so every process moves to new keys; old entries expire with the TTL.
+    """
+
+    VERSION_KEY = "retrieval:catalog_version:{collection}"
+
+    # Process-wide counters and catalog tokens memo {collection: (token, fetched_at)}
+    _stats = {"hits": 0, "misses": 0, "errors": 0, "saved_ms": 0.0}
+    _tokens: Dict[str, tuple] = {}
+
+    def __init__(self, cache_service: CacheServiceInterface, ttl: int = None, version_ttl: float = None):
+        self.cache = cache_service
+        self.ttl = ttl or settings.retrieval_cache_ttl
+        self.version_ttl = version_ttl if version_ttl is not None else settings.retrieval_cache_version_ttl
+
+    async def catalog_token(self, collection: str) -> str:
+        """Shared catalog version, memoised in-process for version_ttl seconds"""
+        memo = RetrievalCache._tokens.get(collection)
+        if memo and time.monotonic() - memo[1] < self.version_ttl:
+            return memo[0]
+        token = await self.cache.get(self.VERSION_KEY.format(collection=collection)) or "0"
+        RetrievalCache._tokens[collection] = (token, time.monotonic())
+        return token
+
+    async def invalidate(self, collection: str) -> str:
+        """Start a new catalog version for a collection (call after ingestion)"""
+        token = uuid.uuid4().hex[:12]
+        await self.cache.set(self.VERSION_KEY.format(collection=collection), token, ttl=None)
+        RetrievalCache._tokens[collection] = (token, time.monotonic())
+        logger.info(f"Invalidated retrieval cache for [{collection}], catalog version {token}")
+        return token
+
+    async def build_key(self, collection: str, local_version: int, query: str,
+                        filters: Optional[Dict], top_k: int, enriched: bool) -> str:
+        payload = json.dumps({
+            "query": normalize_text(query),
+            "filters": canonicalize_filters(filters),
+            "top_k": top_k,
+            "enriched": enriched,
+        }, sort_keys=True, default=str)
+        digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        token = await self.catalog_token(collection)
+        return f"retrieval:{collection}:{token}:{local_version}:{digest}"
+
+    async def get_or_compute(
+        self,
+        collection: str,
+        local_version: int,
+        query: str,
+        filters: Optional[Dict],
+        top_k: int,
+        enriched: bool,
+        compute: Callable[[], Awaitable[List[Dict]]]
+    ) -> List[Dict]:
+        """Return cached results or run compute() and cache non-empty results"""
+        start = time.perf_counter()
+        key = None
+        try:
+            key = await self.build_key(collection, local_version, query, filters, top_k, enriched)
+            cached = await self.cache.get(key)
+            if cached:
+                entry = json.loads(cached)
+                lookup_ms = (time.perf_counter() - start) * 1000
+                RetrievalCache._stats["hits"] += 1
+                RetrievalCache._stats["saved_ms"] += max(0.0, entry["compute_ms"] - lookup_ms)
+                return entry["results"]
+        except Exception as e:
+            RetrievalCache._stats["errors"] += 1
+            logger.warning(f"Retrieval cache read failed: {e}")
+
+        RetrievalCache._stats["misses"] += 1
+        compute_start = time.perf_counter()
+        results = await compute()
+        compute_ms = (time.perf_counter() - compute_start) * 1000
+
+        # Empty results are not cached (they may come from a transient failure)
+        if key and results:
+            try:
+                entry = json.dumps({"results": results, "compute_ms": compute_ms}, default=str)
+                await self.cache.set(key, entry, ttl=self.ttl)
+            except Exception as e:
+                RetrievalCache._stats["errors"] += 1
+                logger.warning(f"Retrieval cache write failed: {e}")
+        return results
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """Hit ratio and saved latency"""
+        stats = dict(cls._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["lookups"] = lookups
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["saved_ms"] = round(stats["saved_ms"], 2)
+        stats["avg_saved_ms_per_hit"] = stats["saved_ms"] / stats["hits"] if stats["hits"] else 0.0
+        return stats
@@ -1,7 +1,11 @@
 import json
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from langsmith import traceable
-from shopassist_api.application.interfaces.service_interfaces import EmbeddingServiceInterface, RepositoryServiceInterface, VectorServiceInterface
+from shopassist_api.application.interfaces.service_interfaces import CacheServiceInterface, EmbeddingServiceInterface, RepositoryServiceInterface, VectorServiceInterface
+from shopassist_api.application.services.category_index import CategoryIndex
+from shopassist_api.application.services.keyword_index import KeywordIndex
+from shopassist_api.application.services.product_hydrator import ProductHydrator
+from shopassist_api.application.services.retrieval_cache import RetrievalCache
 from shopassist_api.application.settings.config import settings
 from shopassist_api.logging_config import get_logger
 import traceback
@@ -17,82 +21,105 @@ class RetrievalService:
         vector_service: VectorServiceInterface,
         embedding_service: EmbeddingServiceInterface,
         repository_service: RepositoryServiceInterface,
-        category_embedder_service: EmbeddingServiceInterface
+        category_embedder_service: EmbeddingServiceInterface,
+        cache_service: Optional[CacheServiceInterface] = None
         ):
         self.milvus = vector_service
         self.embedder = embedding_service
         self.cosmos = repository_service
         self.category_embedder = category_embedder_service
+        self.hydrator = ProductHydrator(repository_service)
+        self.result_cache = RetrievalCache(cache_service) if cache_service else None
 
     def cosine_sim(self, a, b):
         return dot(a, b) / (norm(a) * norm(b))
 
+    def category_radius(self) -> float:
+        """Min category score applied when the caller passes no radius (the tuned index radius, else the Milvus threshold)"""
+        if settings.category_index_enabled and settings.category_index_search_radius is not None:
+            return settings.category_index_search_radius
+        return settings.threshold_category_similarity
+
     @traceable(name="retrieval.retrieve_top_categories", tags=["retrieval", "category", "milvus"], metadata={"version": "1.0"})
     async def retrieve_top_categories(self, query:str, top_k=3, radius:int = None) -> List[Dict]:
         """Retrieve product categories"""
         try:
             logger.info(f"Generating embedding for query: {query}")
             query_embedding = await self.category_embedder.generate_embedding(query)
-            categories = self.milvus.search_categories(
-                query_embedding=query_embedding,
-                field="embedding",
-                top_k=top_k) # Get top category
-            
-            categories_sim = []
-            for cat in categories:
-                sim_short = self.cosine_sim(query_embedding, cat['embedding'])
-                sim_full = self.cosine_sim(query_embedding, cat['full_embedding'])
-                val = {
-                    "id": cat['id'],
-                    "name": cat['name'],
-                    "full_name": cat['full_name'],
-                    "distance": cat['distance'],
-                    "sim_short": sim_short,
-                    "sim_full": sim_full,
-                    "score": 0.7*sim_full + 0.3*sim_short # Weighted score
-                }
-                categories_sim.append(val)
-
-            categories_with_full = self.milvus.search_categories(
-                query_embedding=query_embedding,
-                field="full_embedding",
-                top_k=top_k) # Get top category            
-            
-            categories_sim_full = []
-            for cat in categories_with_full:
-                sim_short = self.cosine_sim(query_embedding, cat['embedding'])
-                sim_full = self.cosine_sim(query_embedding, cat['full_embedding'])
-                val = {
-                    "id": cat['id'],
-                    "name": cat['name'],
-                    "full_name": cat['full_name'],
-                    "distance": cat['distance'],
-                    "sim_short": sim_short,
-                    "sim_full": sim_full,
-                    "score": 0.7*sim_full + 0.3*sim_short # Weighted score
-                }
-                categories_sim_full.append(val)
-
-            #merge and deduplicate categories
-            categories = self.merge_deduplicate_categories(categories_sim, categories_sim_full)
-            selected_categories = []
-            for cat in categories:
-                if radius:
-                    if cat['score'] >= radius:
-                        selected_categories.append(cat)
-                else:
-                    selected_categories.append(cat)
 
-            if categories:
-                return selected_categories[:top_k]
-            else:
-                return {}
-            
+            if settings.category_index_enabled:
+                index = CategoryIndex.get_instance()
+                await index.ensure_fresh(self.milvus)
+                if index.is_ready:
+                    categories = index.search(query_embedding, top_k=top_k,
+                                              radius=radius if radius is not None else self.category_radius())
+                    return categories if categories else {}
+
+            return await self._retrieve_top_categories_milvus(
+                query_embedding, top_k, radius if radius is not None else settings.threshold_category_similarity)
+
         except Exception as e:
             logger.error(f"Error retrieving categories: {e}")
             traceback.print_exc()
             return ""
 
+    async def _retrieve_top_categories_milvus(self, query_embedding: List[float], top_k=3, radius:int = None) -> List[Dict]:
+        """Fallback: two Milvus searches (short and full embedding) merged and re-scored"""
+        categories = await self.milvus.asearch_categories(
+            query_embedding=query_embedding,
+            field="embedding",
+            top_k=top_k) # Get top category
+        
+        categories_sim = []
+        for cat in categories:
+            sim_short = self.cosine_sim(query_embedding, cat['embedding'])
+            sim_full = self.cosine_sim(query_embedding, cat['full_embedding'])
+            val = {
+                "id": cat['id'],
+                "name": cat['name'],
+                "full_name": cat['full_name'],
+                "distance": cat['distance'],
+                "sim_short": sim_short,
+                "sim_full": sim_full,
+                "score": 0.7*sim_full + 0.3*sim_short # Weighted score
+            }
+            categories_sim.append(val)
+
+        categories_with_full = await self.milvus.asearch_categories(
+            query_embedding=query_embedding,
+            field="full_embedding",
+            top_k=top_k) # Get top category            
+        
+        categories_sim_full = []
+        for cat in categories_with_full:
+            sim_short = self.cosine_sim(query_embedding, cat['embedding'])
+            sim_full = self.cosine_sim(query_embedding, cat['full_embedding'])
+            val = {
+                "id": cat['id'],
+                "name": cat['name'],
+                "full_name": cat['full_name'],
+                "distance": cat['distance'],
+                "sim_short": sim_short,
+                "sim_full": sim_full,
+                "score": 0.7*sim_full + 0.3*sim_short # Weighted score
+            }
+            categories_sim_full.append(val)
+
+        #merge and deduplicate categories
+        categories = self.merge_deduplicate_categories(categories_sim, categories_sim_full)
+        selected_categories = []
+        for cat in categories:
+            if radius:
+                if cat['score'] >= radius:
+                    selected_categories.append(cat)
+            else:
+                selected_categories.append(cat)
+
+        if categories:
+            return selected_categories[:top_k]
+        else:
+            return {}
+
     def merge_deduplicate_categories(self, categories1: List[Dict], categories2: List[Dict]) -> List[Dict]:
         """Merge and deduplicate categories from two lists"""
         category_map = {}
@@ -124,17 +151,18 @@ class RetrievalService:
             # Generate query embedding
             query_embedding = await self.embedder.generate_embedding(query)
             # Build filter expression for Milvus
-            filter_expr = self._build_filter_expression(filters)
+            filter_expr, filter_params = self._build_filter_expression(filters)
             
-            logger.info(f"Retrieve products for [{query}] and filters: {filter_expr}, Top_k:{top_k}, with adaptative filtering")
+            logger.info(f"Retrieve products for [{query}] and filters: {filter_expr} {filter_params}, Top_k:{top_k}, with adaptative filtering")
             # Search in Milvus with initial radius
             results = []
 
             #results with radius filtering
-            results = self.milvus.search_products(
+            results = await self.milvus.asearch_products(
                     query_embedding=query_embedding,
                     top_k=top_k,
                     filters=filter_expr,
+                    filter_params=filter_params,
                     radius=settings.threshold_product_similarity
                 )
             
@@ -189,23 +217,32 @@ class RetrievalService:
             filters: Optional[Dict] = None,
             enriched: bool = True
         ) -> List[Dict]:
-        
-        filter_expr = self._build_filter_expression(filters)
-        all_products = []
+        """
+        Retrieve products for a list of query variations
+
+        All queries are embedded in a single batched encode and sent to Milvus as
+        one multi-query search (nq = len(queries)). Hits are demultiplexed per
+        query and fused per product.
+        """
+        filter_expr, filter_params = self._build_filter_expression(filters)
 
         try:
-            for query in queries:
-                #TODO optimize by batching embeddings
-                query_embedding = await self.embedder.generate_embedding(query)
-                results = self.milvus.search_products(
-                    query_embedding=query_embedding,
-                    top_k=top_k,
-                    filters=filter_expr,
-                    radius=settings.threshold_product_similarity
-                )
-                logger.info(f"Retrieved {len(results)} products for query: {query} with filters: {filter_expr}")
-                all_products.extend(results)
-            
+            if not queries:
+                return []
+
+            query_embeddings = await self.embedder.generate_embeddings(queries)
+            results_per_query = await self.milvus.asearch_products_batch(
+                query_embeddings=query_embeddings,
+                top_k=top_k,
+                filters=filter_expr,
+                filter_params=filter_params,
+                radius=settings.threshold_product_similarity
+            )
+
+            for query, results in zip(queries, results_per_query):
+                logger.info(f"Retrieved {len(results)} products for query: {query} with filters: {filter_expr} {filter_params}")
+
+            all_products = self._fuse_query_results(results_per_query)
             if len(all_products) == 0:
                 return []
 
@@ -215,6 +252,29 @@ class RetrievalService:
             traceback.print_exc()
             return []
 
+    def _fuse_query_results(self, results_per_query: List[List[Dict]]) -> List[Dict]:
+        """
+        Fuse multi-query hits per product
+
+        Keeps the best scoring hit for each product and records which
+        query indexes matched it.
+        """
+        product_map = {}
+        for query_index, results in enumerate(results_per_query):
+            for result in results:
+                product_id = result['product_id']
+                current = product_map.get(product_id)
+                if current is None:
+                    product_map[product_id] = {**result, "matched_queries": [query_index]}
+                    continue
+
+                if query_index not in current["matched_queries"]:
+                    current["matched_queries"].append(query_index)
+                if result['distance'] > current['distance']:
+                    product_map[product_id] = {**result, "matched_queries": current["matched_queries"]}
+
+        return list(product_map.values())
+
     @traceable(name="retrieval.retrieve_products", tags=["retrieval", "product", "milvus"], metadata={"version": "1.0"})
     async def retrieve_products(
             self,
@@ -234,19 +294,29 @@ class RetrievalService:
         Returns:
             List of relevant products with scores
         """
+        if self.result_cache is None:
+            return await self._retrieve_products(query, top_k, filters, enriched)
+        return await self.result_cache.get_or_compute(
+            "products", self.milvus.get_collection_version("products"),
+            query, filters, top_k, enriched,
+            lambda: self._retrieve_products(query, top_k, filters, enriched)
+        )
+
+    async def _retrieve_products(self, query: str, top_k: int, filters: Optional[Dict], enriched: bool) -> List[Dict]:
         try:
             # Generate query embedding
             
             query_embedding = await self.embedder.generate_embedding(query)
             # Build filter expression for Milvus
-            filter_expr = self._build_filter_expression(filters)
+            filter_expr, filter_params = self._build_filter_expression(filters)
             
-            logger.info(f"Retrieve products for [{query}] and filters: {filter_expr}, Top_k:{top_k}, radius:{settings.threshold_product_similarity}")
+            logger.info(f"Retrieve products for [{query}] and filters: {filter_expr} {filter_params}, Top_k:{top_k}, radius:{settings.threshold_product_similarity}")
             # Search in Milvus
-            results = self.milvus.search_products(
+            results = await self.milvus.asearch_products(
                 query_embedding=query_embedding,
                 top_k=top_k,
                 filters=filter_expr,
+                filter_params=filter_params,
                 radius=settings.threshold_product_similarity
             )            
             
@@ -277,6 +347,15 @@ class RetrievalService:
         Returns:
             List of relevant KB chunks with scores
         """
+        if self.result_cache is None:
+            return await self._retrieve_knowledge_base(query, top_k)
+        return await self.result_cache.get_or_compute(
+            "knowledge_base", self.milvus.get_collection_version("knowledge_base"),
+            query, None, top_k, False,
+            lambda: self._retrieve_knowledge_base(query, top_k)
+        )
+
+    async def _retrieve_knowledge_base(self, query: str, top_k: int) -> List[Dict]:
         try:
             logger.info(f"Retrieving KB for query: {query}")
             
@@ -284,7 +363,7 @@ class RetrievalService:
             query_embedding = await self.embedder.generate_embedding(query)
             
             # Search knowledge base
-            results = self.milvus.search_knowledge_base(
+            results = await self.milvus.asearch_knowledge_base(
                 query_embedding=query_embedding,
                 top_k=top_k
             )
@@ -295,65 +374,145 @@ class RetrievalService:
             logger.error(f"Error in retrieve_knowledge_base: {e}")
             return []
 
-    @traceable(name="retrieval.hybrid_search", tags=["retrieval", "product", "milvus"], metadata={"version": "1.0"})
+    @traceable(name="retrieval.hybrid_search", tags=["retrieval", "product", "milvus", "keyword"], metadata={"version": "1.0"})
     async def hybrid_search(
         self,
         query: str,
         top_k: int = 5,
+        filters: Optional[Dict] = None,
         use_vector: bool = True,
-        use_keyword: bool = False
+        use_keyword: bool = True,
+        vector_weight: float = None,
+        keyword_weight: float = None,
+        rrf_k: int = None,
+        enriched: bool = True
     ) -> List[Dict]:
         """
         Combine vector and keyword search results
-        
-        For now, focuses on vector search.
-        Keyword search via Cosmos DB can be added later.
+
+        Vector hits (Milvus) and keyword hits (in-process BM25 index) are
+        fused per product with weighted reciprocal-rank fusion:
+            score = sum(weight / (rrf_k + rank))
+        Exact model numbers and SKUs are resolved by the keyword side.
         """
-        if use_vector:
-            return self.retrieve_products(query, top_k)
-        else:
-            # Fallback to Cosmos DB keyword search
-            return await self.cosmos.search_products_by_text(query, top_k)
-    
-    def _build_filter_expression(self, filters: Optional[Dict]) -> Optional[str]:
+        try:
+            vector_weight = settings.hybrid_vector_weight if vector_weight is None else vector_weight
+            keyword_weight = settings.hybrid_keyword_weight if keyword_weight is None else keyword_weight
+            rrf_k = rrf_k or settings.hybrid_rrf_k
+            candidates_k = top_k * settings.hybrid_candidate_multiplier
+
+            keyword_index = KeywordIndex.get_instance()
+            if use_keyword:
+                await keyword_index.ensure_loaded()
+
+            if use_keyword and not keyword_index.is_ready:
+                logger.warning("Keyword index not available, hybrid search uses vector results only")
+                if not use_vector:
+                    # Legacy fallback to Cosmos DB keyword search
+                    return await self.cosmos.search_products_by_text(query, top_k)
+
+            vector_hits = []
+            if use_vector and vector_weight > 0:
+                vector_hits = await self.retrieve_products(query, candidates_k, filters=filters, enriched=False)
+
+            keyword_hits = []
+            if use_keyword and keyword_weight > 0 and keyword_index.is_ready:
+                keyword_hits = keyword_index.search(query, candidates_k, filters=filters)
+
+            logger.info(f"Hybrid search for [{query}]: {len(vector_hits)} vector hits, {len(keyword_hits)} keyword hits")
+            fused = self._reciprocal_rank_fusion(
+                [(vector_hits, vector_weight), (keyword_hits, keyword_weight)],
+                rrf_k
+            )[:top_k]
+
+            if len(fused) == 0:
+                return []
+            return await self._process_products(enriched, fused)
+        except Exception as e:
+            logger.error(f"Error in hybrid_search: {e}")
+            traceback.print_exc()
+            return []
+
+    def _reciprocal_rank_fusion(self, ranked_lists: List[tuple], rrf_k: int = 60) -> List[Dict]:
+        """
+        Weighted reciprocal-rank fusion of per-product ranked hit lists
+
+        The fused score is stored in 'distance' (so the usual sort applies);
+        vector_distance and keyword_score keep the original scores.
         """
-        Build Milvus filter expression from filters dict
+        product_map = {}
+        for hits, weight in ranked_lists:
+            for rank, hit in enumerate(hits, start=1):
+                product_id = hit['product_id']
+                fused = product_map.get(product_id)
+                if fused is None:
+                    fused = {**hit, "rrf_score": 0.0}
+                    if "distance" in hit:
+                        fused["vector_distance"] = hit["distance"]
+                    product_map[product_id] = fused
+                else:
+                    if "distance" in hit and "vector_distance" not in fused:
+                        fused["vector_distance"] = hit["distance"]
+                    if "keyword_score" in hit:
+                        fused["keyword_score"] = hit["keyword_score"]
+                fused["rrf_score"] += weight / (rrf_k + rank)
+
+        fused_results = sorted(product_map.values(), key=lambda x: x['rrf_score'], reverse=True)
+        for result in fused_results:
+            result['distance'] = result['rrf_score']
+        return fused_results
+
+    def _build_filter_expression(self, filters: Optional[Dict]) -> Tuple[Optional[str], Dict]:
+        """
+        Build a parameterised Milvus filter template from filters dict
         
         Example filters:
         {
             "min_price": 100,
             "max_price": 500,
-            "category": "Laptops",
+            "categories": ["Laptops", "Tablets"],
             "brand": "Apple"
         }
         
-        Returns Milvus expression: "price >= 100 and price <= 500 and category == 'Laptops'"
+        Returns the template and its parameters:
+            "price >= {min_price} and price <= {max_price} and category in {categories} and brand == {brand}",
+            {"min_price": 100, "max_price": 500, "categories": ["Laptops", "Tablets"], "brand": "Apple"}
+
+        'category' is the partition key of products_collection, so 'category == ...' and
+        'category in [...]' prune partitions; values are never quoted into the expression.
         """
         if not filters:
-            return None
+            return None, {}
         
         expressions = []
+        params = {}
         
         if "min_price" in filters:
-            expressions.append(f"price >= {filters['min_price']}")
+            expressions.append("price >= {min_price}")
+            params["min_price"] = float(filters['min_price'])
         
         if "max_price" in filters:
-            expressions.append(f"price <= {filters['max_price']}")
+            expressions.append("price <= {max_price}")
+            params["max_price"] = float(filters['max_price'])
         
-        # Categorical filters
-        if "category" in filters:
-            expressions.append(f"category == '{filters['category']}'")
+        # Categorical filters (both must hold when category and categories are given)
+        if "category" in filters and filters['category']:
+            expressions.append("category == {category}")
+            params["category"] = filters['category']
 
         if "categories" in filters:
             category_list = filters['categories']
-            if category_list and isinstance(category_list, list) and len(category_list) > 0:
-                category_expr = " or ".join([f"category == '{cat}'" for cat in category_list])
-                expressions.append(f"({category_expr})")
+            if category_list and isinstance(category_list, list):
+                expressions.append("category in {categories}")
+                params["categories"] = list(category_list)
         
         if "brand" in filters:
-            expressions.append(f"brand == '{filters['brand']}'")
+            expressions.append("brand == {brand}")
+            params["brand"] = filters['brand']
         
-        return " and ".join(expressions) if expressions else None
+        if not expressions:
+            return None, {}
+        return " and ".join(expressions), params
     
     def _deduplicate_and_aggregate(self, results: List[Dict]) -> List[Dict]:
         """
@@ -380,30 +539,15 @@ class RetrievalService:
     
     async def _enrich_with_product_data(self, products: List[Dict]) -> List[Dict]:
         """
-        Fetch full product details from Cosmos DB
+        Fetch product details (projected fields, cached) from Cosmos DB
         """
         logger.info(f"Enriching {len(products)} products with full data from Cosmos DB")
-        enriched = []
-        if not products or len(products) == 0:
-            return enriched
-        product_ids = [product['product_id'] for product in products]
         try:
-            full_products = await self.cosmos.get_products_by_ids(product_ids)
-            for full_product in full_products:
-                product = next((p for p in products if p['product_id'] == full_product['id']), None)
-                if product:
-                    enriched.append({
-                        **full_product,
-                        "distance": product['distance'],
-                        "matched_text": product['text'][:200]  # Preview
-                    })
-                else:
-                    logger.warning(f"Product ID {full_product['id']} not found in Milvus-Cosmos results")
+            return await self.hydrator.hydrate(products)
         except Exception as e:
-            logger.error(f"Error enriching product {full_product['product_id']}: {e}")
+            logger.error(f"Error enriching products: {e}")
             traceback.print_exc()
-
-        return enriched
+            return []
     
     async def health_check(self) -> dict:
         """Ping the service to check connectivity"""
@@ -0,0 +1,102 @@
+import time
+from typing import Dict, List, Optional
+from langsmith import traceable
+from shopassist_api.application.interfaces.service_interfaces import (
+    CacheServiceInterface, EmbeddingServiceInterface, SemanticCacheStoreInterface
+)
+from shopassist_api.application.services.retrieval_cache import RetrievalCache
+from shopassist_api.application.settings.config import settings
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class SemanticAnswerCache:
+    """
+    Semantic cache of final answers (RAGService.generate_answer, AgentOrchestrator.ainvoke).
+
+    A turn is looked up by query embedding in a SemanticCacheStoreInterface,
+    scoped by namespace ('rag' / 'orchestrator'), by the intents allowed for that
+    namespace and by the catalog version, so answers stored before an ingestion
+    are no longer returned. Callers only use it for history-independent turns.
+    """
+
+    # Process-wide counters
+    _stats = {"hits": 0, "misses": 0, "stores": 0, "errors": 0, "saved_ms": 0.0, "saved_tokens": 0}
+
+    def __init__(self,
+                 store: SemanticCacheStoreInterface,
+                 embedding_service: EmbeddingServiceInterface,
+                 cache_service: CacheServiceInterface,
+                 threshold: float = None,
+                 ttl: int = None):
+        self.store_service = store
+        self.embedder = embedding_service
+        self.catalog = RetrievalCache(cache_service)
+        self.threshold = threshold or settings.semantic_cache_threshold
+        self.ttl = ttl or settings.semantic_cache_ttl
+
+    async def _catalog_version(self) -> str:
+        """Answers depend on both the product catalog and the knowledge base"""
+        products = await self.catalog.catalog_token("products")
+        knowledge_base = await self.catalog.catalog_token("knowledge_base")
+        return f"{products}_{knowledge_base}"
+
+    @traceable(name="semantic_cache.lookup", tags=["cache", "semantic"], metadata={"version": "1.0"})
+    async def lookup(self, namespace: str, query: str, intents: List[str]) -> Optional[Dict]:
+        """
+        Stored answer for a paraphrase of query, or None.
+
+        Returns the stored payload plus 'intent' and 'similarity'.
+        """
+        try:
+            embedding = await self.embedder.generate_embedding(query)
+            entry = await self.store_service.lookup(
+                namespace=namespace,
+                embedding=embedding,
+                intents=intents,
+                version=await self._catalog_version(),
+                threshold=self.threshold
+            )
+        except Exception as e:
+            SemanticAnswerCache._stats["errors"] += 1
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return None
+
+        if entry is None:
+            SemanticAnswerCache._stats["misses"] += 1
+            return None
+
+        SemanticAnswerCache._stats["hits"] += 1
+        SemanticAnswerCache._stats["saved_ms"] += entry.get("latency_ms", 0.0)
+        SemanticAnswerCache._stats["saved_tokens"] += entry.get("tokens", 0)
+        logger.info(f"Semantic cache hit [{namespace}/{entry['intent']}] similarity={entry['similarity']:.3f} for: {query}")
+        return entry
+
+    async def store(self, namespace: str, query: str, intent: str, payload: Dict,
+                    latency_ms: float = 0.0, tokens: int = 0) -> None:
+        """Store an answer; payload must be JSON serialisable"""
+        try:
+            embedding = await self.embedder.generate_embedding(query)
+            await self.store_service.store(
+                namespace=namespace,
+                embedding=embedding,
+                intent=intent,
+                version=await self._catalog_version(),
+                payload={**payload, "query": query, "latency_ms": latency_ms, "tokens": tokens},
+                ttl=self.ttl
+            )
+            SemanticAnswerCache._stats["stores"] += 1
+        except Exception as e:
+            SemanticAnswerCache._stats["errors"] += 1
+            logger.warning(f"Semantic cache store failed: {e}")
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """Hit ratio, saved latency and saved LLM tokens"""
+        stats = dict(cls._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["lookups"] = lookups
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["saved_ms"] = round(stats["saved_ms"], 2)
+        return stats
@@ -1,9 +1,11 @@
 from datetime import datetime, timezone
 import re
-from typing import List
+from typing import List, Optional
 import uuid
 from langsmith import traceable
 from shopassist_api.application.interfaces.service_interfaces import CacheServiceInterface, RepositoryServiceInterface
+from shopassist_api.application.services.conversation_summarizer import ConversationSummarizer
+from shopassist_api.application.services.formaters import FormatterUtils
 from shopassist_api.domain.models.session_context import SessionContext
 from shopassist_api.domain.models.message import Message
 from shopassist_api.domain.models.user_preferences import UserPreferences
@@ -12,7 +14,8 @@ class SessionManager:
     def __init__(
         self, 
         repository_service: RepositoryServiceInterface,
-        cache_service: CacheServiceInterface = None
+        cache_service: CacheServiceInterface = None,
+        summarizer: Optional[ConversationSummarizer] = None
     ):
         """
         Manages conversation context and session state
@@ -20,9 +23,11 @@ class SessionManager:
         Args:
             repository: Cosmos DB client for persistence
             cache_client: Optional Redis for hot session cache
+            summarizer: Optional rolling conversation summary, refreshed after each assistant message
         """
         self.repository = repository_service
         self.cache = cache_service
+        self.summarizer = summarizer
         self.cache_ttl = 1800  # 1 hour TTL for cached sessions
         
     async def create_session(self, user_id:str, metadata: dict = None) -> str:
@@ -88,6 +93,8 @@ class SessionManager:
         if self.cache:
             # Invalidate cache
             await self.cache.delete(f"session:{session_id}")
+        if self.summarizer and role == "assistant":
+            self.summarizer.schedule(session_id)
         
     async def get_conversation_history(
         self, 
@@ -98,6 +105,12 @@ class SessionManager:
         raw = await self.repository.get_conversation_history(session_id)
         messages = [ Message.model_validate(msg) for msg in raw ]
         return messages[-max_turns:]
+
+    async def get_history_text(self, session_id: str, history: List[Message]) -> str:
+        """Conversation history for prompts: rolling summary + recent messages when summarization is on"""
+        if self.summarizer is None:
+            return FormatterUtils.format_message_history(history)
+        return await self.summarizer.history_text(session_id, history)
         
     async def update_preferences(
         self, 
@@ -0,0 +1,118 @@
+import re
+from typing import Dict, List, Optional
+from langsmith import traceable
+from shopassist_api.application.prompts.templates import ResponseTemplates
+from shopassist_api.application.settings.config import settings
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class TemplateResponder:
+    """
+    Answers trivial intents (chitchat, out_of_scope) in-process from
+    ResponseTemplates, without a completion call.
+
+    The locale comes from keywords of the message, the kind of chitchat
+    (greeting / thanks / goodbye) from a few patterns, and the session varies
+    the wording: returning-user greetings, thanks that refer to the products of
+    the last answer, and a variant rotating with the turn index.
+    Enabled unless settings.template_responder_mode is 'llm'.
+    """
+
+    KIND_PATTERNS = {
+        "goodbye": re.compile(r"\b(bye|goodbye|see you|adi[oó]s|hasta luego|chao)\b", re.IGNORECASE),
+        "thanks": re.compile(r"\b(thanks?|thank you|thx|cheers|gracias)\b", re.IGNORECASE),
+        "greeting": re.compile(r"\b(hi|hello|hey|hiya|good (morning|afternoon|evening)|hola|buen[oa]s (d[ií]as|tardes|noches))\b", re.IGNORECASE),
+    }
+    # Words that may surround a greeting/thanks without making it a real request
+    FILLER_WORDS = {"there", "a", "lot", "so", "much", "very", "ok", "okay", "you", "again", "all", "for", "the",
+                    "help", "shopassist", "muchas", "mil", "por", "todo", "la", "ayuda", "and", "y", "great", "nice"}
+    WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+    _stats = {"template": 0, "llm": 0, "classifier_skipped": 0}
+
+    def __init__(self, mode: str = None, default_locale: str = None):
+        self.mode = mode or settings.template_responder_mode
+        self.default_locale = default_locale or settings.template_responder_default_locale
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "llm"
+
+    def detect_locale(self, query: str) -> str:
+        words = set(self.WORD_PATTERN.findall(query.lower()))
+        hits = {locale: len(words & keywords) for locale, keywords in ResponseTemplates.LOCALE_KEYWORDS.items()}
+        locale = max(hits, key=hits.get)
+        return locale if hits[locale] > 0 else self.default_locale
+
+    def detect_kind(self, query: str) -> Optional[str]:
+        """greeting, thanks or goodbye when the message contains one"""
+        for kind, pattern in self.KIND_PATTERNS.items():
+            if pattern.search(query):
+                return kind
+        return None
+
+    def match(self, query: str) -> Optional[str]:
+        """
+        Kind of a message that is only a greeting, thanks or goodbye ("hi there!",
+        "thanks a lot"), so it can be answered without classifying the intent.
+        None as soon as anything else is asked ("hi, I need a laptop").
+        """
+        kind = self.detect_kind(query)
+        if kind is None:
+            return None
+        remainder = query.lower()
+        for pattern in self.KIND_PATTERNS.values():
+            remainder = pattern.sub(" ", remainder)
+        if any(word not in self.FILLER_WORDS for word in self.WORD_PATTERN.findall(remainder)):
+            return None
+        TemplateResponder._stats["classifier_skipped"] += 1
+        return kind
+
+    @traceable(name="template_responder.respond", tags=["rag", "template"], metadata={"version": "1.0"})
+    def respond(self, intent: str, query: str, history: List = None) -> str:
+        """Templated answer for a chitchat / out_of_scope turn"""
+        history = history or []
+        locale = self.detect_locale(query)
+        templates = ResponseTemplates.TEMPLATES.get(locale, ResponseTemplates.TEMPLATES[self.default_locale])
+
+        kind = "out_of_scope" if intent == "out_of_scope" else self.detect_kind(query) or "chitchat"
+        if kind == "greeting" and history:
+            kind = "greeting_returning"
+        elif kind == "thanks" and self._last_answer_had_products(history):
+            kind = "thanks_products"
+
+        variants = templates[kind]
+        response = variants[len(history) % len(variants)]
+        TemplateResponder._stats["template"] += 1
+        logger.info(f"Template response: intent={intent}, kind={kind}, locale={locale}")
+        return response
+
+    @staticmethod
+    def _last_answer_had_products(history: List) -> bool:
+        for message in reversed(history):
+            if message.role == "assistant":
+                return bool((message.metadata or {}).get("products"))
+        return False
+
+    @staticmethod
+    def as_llm_response(response: str) -> Dict:
+        """Shape of LLMServiceInterface.generate_response for a templated answer"""
+        return {
+            "response": response,
+            "finish_reason": "template",
+            "tokens": {"prompt": 0, "completion": 0, "total": 0},
+            "cost": 0.0
+        }
+
+    @classmethod
+    def record_llm(cls) -> None:
+        cls._stats["llm"] += 1
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        stats = dict(cls._stats)
+        answered = stats["template"] + stats["llm"]
+        stats["template_rate"] = stats["template"] / answered if answered else 0.0
+        return stats
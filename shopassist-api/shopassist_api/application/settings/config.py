@@ -3,7 +3,7 @@ Core configuration settings for the Shop Assistant API.
 """
 from pydantic import ConfigDict
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -16,6 +16,7 @@ class Settings(BaseSettings):
     debug: bool = False
 
     use_dumb_service: bool = False
+    use_local_vector_service: bool = False  # embedded vector backend instead of Milvus
 
     # Embedding Configuration
     embedding_provider: str = "azure_openai"  # Options: 'azure_openai', 'transformers'
@@ -43,6 +44,19 @@ class Settings(BaseSettings):
     transformers_category_embedding_model_dim: int = 1024
 
     use_singleton_transformers_model: bool = True
+
+    # Micro-batching of concurrent generate_embedding calls (transformers provider)
+    embedding_batching_enabled: bool = True
+    embedding_batch_max_size: int = 32
+    embedding_batch_max_wait_ms: float = 5.0
+    embedding_batch_max_queue_size: int = 1024
+
+    # Query embedding cache: request memo + in-process LRU (L1) + optional Redis (L2)
+    embedding_cache_enabled: bool = True
+    embedding_cache_l1_size: int = 4096
+    embedding_cache_l2_enabled: bool = False
+    embedding_cache_l2_ttl: int = 86400
+    embedding_cache_l2_dtype: str = "float16"  # Options: 'float16', 'float32'
     
     # Azure AI Search
     azure_search_endpoint: Optional[str] = None
@@ -74,12 +88,122 @@ class Settings(BaseSettings):
     milvus_port: str = "19530"
     milvus_product_collection: str = "products_collection"
     milvus_knowledge_base_collection: str = "knowledge_base_collection"
+    milvus_categories_collection: str = "categories_collection"
+
+    # Milvus per-collection search defaults
+    milvus_product_search_ef: int = 128
+    milvus_product_consistency_level: str = "Bounded"
+    milvus_product_output_fields: List[str] = ["product_id", "text", "category", "price", "brand"]
+
+    milvus_knowledge_base_search_ef: int = 64
+    milvus_knowledge_base_consistency_level: str = "Bounded"
+    milvus_knowledge_base_output_fields: List[str] = ["doc_id", "text", "doc_type"]
+
+    milvus_categories_search_ef: int = 64
+    milvus_categories_consistency_level: str = "Bounded"
+    milvus_categories_output_fields: List[str] = ["name", "full_name", "embedding", "full_embedding"]
+
+    # ANN index profile per collection (see milvus_index_profiles.INDEX_PROFILES):
+    # 'hnsw', 'hnsw_ip', 'hnsw_sq', 'ivf_sq8', 'ivf_pq'. Must match the index built by create_milvus_collections.py
+    milvus_product_index_profile: str = "hnsw"
+    milvus_knowledge_base_index_profile: str = "hnsw"
+    milvus_categories_index_profile: str = "hnsw"
+    milvus_search_nprobe: int = 16  # IVF profiles
+    # Default search radius (min similarity) when the caller passes none; products use threshold_product_similarity.
+    # Tuned values come from scripts/testing/tune_search_params.py. The milvus_categories_* search settings only
+    # apply when category_index_enabled is False (otherwise categories are scored by CategoryIndex)
+    milvus_knowledge_base_search_radius: Optional[float] = None
+    milvus_categories_search_radius: Optional[float] = None
+
+    # Embedded local vector backend (use_local_vector_service): ingestion artefacts (JSONL/JSON/parquet)
+    local_vector_engine: str = "exact"  # Options: 'exact', 'hnsw' (requires hnswlib)
+    local_vector_data_dir: str = "data/vectors"
+    local_vector_products_file: str = ""
+    local_vector_knowledge_base_file: str = ""
+    local_vector_categories_file: str = ""
+    local_vector_hnsw_m: int = 16
+    local_vector_hnsw_ef_construction: int = 200
+
+    # Max concurrent Milvus searches off the event loop
+    milvus_search_max_workers: int = 8
 
     # Similarity Thresholds for category searchs
     threshold_category_similarity: float = 0.75
     top_k_categories: int = 3
-
-    # Similarity Thresholds. Not used currently
+    # Score categories in-process (all category vectors held in memory) instead of two Milvus searches
+    category_index_enabled: bool = True
+    category_index_search_radius: Optional[float] = None  # min blended score of the index; None = threshold_category_similarity
+
+    # Hybrid search: in-process BM25 keyword index fused with vector results (reciprocal-rank fusion)
+    keyword_index_path: str = "data/keyword_index.npz"
+    bm25_k1: float = 1.2
+    bm25_b: float = 0.75
+    hybrid_vector_weight: float = 1.0
+    hybrid_keyword_weight: float = 1.0
+    hybrid_rrf_k: int = 60
+    hybrid_candidate_multiplier: int = 4
+
+    # Redis result cache for retrieve_products / retrieve_knowledge_base.
+    # Keys include a catalog version bumped after ingestion; version_ttl is how long
+    # a process trusts its copy of that version before re-reading it from Redis
+    retrieval_cache_enabled: bool = True
+    retrieval_cache_ttl: int = 900
+    retrieval_cache_version_ttl: float = 5.0
+
+    # Product hydration: fields fetched from Cosmos for vector hits (no 'chunks') and in-process LRU/TTL cache
+    product_hydration_fields: List[str] = ["id", "name", "description", "category", "category_full", "price", "brand",
+                                           "rating", "review_count", "availability", "image_url", "product_url"]
+    product_cache_size: int = 2048
+    product_cache_ttl: int = 600
+
+    # Semantic answer cache for history-independent turns (paraphrases of answered questions)
+    semantic_cache_enabled: bool = True
+    semantic_cache_backend: str = "local"  # Options: 'local', 'redis' (needs Redis Stack / RediSearch)
+    semantic_cache_threshold: float = 0.92
+    semantic_cache_ttl: int = 86400
+    semantic_cache_max_entries: int = 10000  # local backend only
+    semantic_cache_index_name: str = "semantic_answer_cache"
+    # Intents whose answers are cached (RAG sufficiency intents / orchestrator route intents)
+    semantic_cache_rag_intents: List[str] = ["policy_question", "general_support", "product_search"]
+    semantic_cache_orchestrator_intents: List[str] = ["policy"]
+
+    # Orchestrator: max routes of a multi-intent turn executed concurrently (LangGraph max_concurrency)
+    orchestrator_max_concurrency: int = 4
+    # Local embedding intent router in front of the supervisor LLM (nearest centroid of labelled examples).
+    # Tune threshold/margin with scripts/testing/test_intent_router.py
+    intent_router_enabled: bool = True
+    intent_router_threshold: float = 0.6
+    intent_router_margin: float = 0.05
+    # Agent prefetch mode: policy/search/detail agents run their tool from the routed query and answer
+    # with one LLM call, falling back to the ReAct loop when the answer signals missing information.
+    # Compare both modes with scripts/testing/test_agent_prefetch.py
+    agent_prefetch_enabled: bool = True
+    agent_prefetch_intents: List[str] = ["policy", "product_search", "product_detail"]
+    agent_prefetch_history_messages: int = 6  # conversation messages given to session agents' prefetch call
+    # Trivial intents (chitchat / out_of_scope): 'template' answers in-process from localised templates
+    # (prompts/templates.py ResponseTemplates), 'llm' sends the chitchat prompt to the chat model
+    template_responder_mode: str = "template"  # Options: 'template', 'llm'
+    template_responder_default_locale: str = "en"
+    # Rolling conversation summary: messages older than the last verbatim_messages are folded into a
+    # per-session summary (nano model) in the background; prompts get summary + recent messages within
+    # token_budget. Checkpointed agent threads are compacted the same way above agent_thread_token_budget
+    conversation_summary_enabled: bool = True
+    conversation_summary_verbatim_messages: int = 4
+    conversation_summary_token_budget: int = 1200
+    conversation_summary_max_tokens: int = 250
+    conversation_summary_ttl: int = 86400
+    agent_thread_token_budget: int = 4000
+    # Agent checkpoints (Redis, one saver per process opened by the app lifespan). 'shallow' stores only the
+    # latest checkpoint of a thread, 'full' every version until the TTL. Threads are trimmed at user turns to
+    # max_tokens / max_messages. Checkpoint size is measured on one write in size_sample_every
+    agent_checkpoint_mode: str = "shallow"  # Options: 'shallow', 'full'
+    agent_checkpoint_ttl_minutes: int = 1440
+    agent_checkpoint_refresh_on_read: bool = False
+    agent_checkpoint_max_tokens: int = 8000
+    agent_checkpoint_max_messages: int = 40
+    agent_checkpoint_size_sample_every: int = 20
+
+    # Similarity Thresholds. threshold_product_similarity is the product search radius
     threshold_product_similarity: float = 0.5
 
     threshold_knowledge_base_similarity: float = 0.5
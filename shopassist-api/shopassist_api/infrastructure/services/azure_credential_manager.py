@@ -1,4 +1,5 @@
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
 from shopassist_api.logging_config import get_logger
 from threading import RLock  # Changed from Lock
 
@@ -13,6 +14,7 @@ class AzureCredentialManager:
     _credential = None
     _openai_token_provider = None
     _cosmos_credential = None
+    _async_credential = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -47,6 +49,21 @@ class AzureCredentialManager:
         """Get credential for Cosmos DB (uses same credential)."""
         return self.get_credential()
 
+    def get_async_cosmos_credential(self) -> AsyncDefaultAzureCredential:
+        """Get shared async credential for the async Cosmos DB client (lazy initialization)."""
+        if self._async_credential is None:
+            with self._lock:
+                if self._async_credential is None:
+                    logger.info("Initializing shared async Azure DefaultAzureCredential")
+                    self._async_credential = AsyncDefaultAzureCredential()
+        return self._async_credential
+
+    async def close_async(self):
+        """Close the async credential (application shutdown)."""
+        if self._async_credential is not None:
+            await self._async_credential.close()
+            self._async_credential = None
+
 
 # Global instance
 _credential_manager = AzureCredentialManager()
@@ -0,0 +1,190 @@
+import base64
+import hashlib
+import inspect
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import RLock
+from typing import Optional
+import numpy as np
+from shopassist_api.application.interfaces.service_interfaces import CacheServiceInterface, EmbeddingServiceInterface
+from shopassist_api.application.settings.config import settings
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Request-scoped memo: {(model_name, normalised_text): vector}
+_request_memo: ContextVar[Optional[dict]] = ContextVar("embedding_request_memo", default=None)
+
+
+@contextmanager
+def embedding_request_scope():
+    """Open a request-scoped embedding memo (used by the HTTP middleware)."""
+    token = _request_memo.set({})
+    try:
+        yield
+    finally:
+        _request_memo.reset(token)
+
+
+def normalize_text(text: str) -> str:
+    """Normalise query text for cache keys"""
+    return " ".join(text.split()).casefold()
+
+
+class CachedEmbeddingService(EmbeddingServiceInterface):
+    """
+    Query embedding cache in front of an EmbeddingServiceInterface.
+
+    Lookup order, keyed by (model name, normalised text):
+    1. request-scoped memo (same text embedded twice in one request)
+    2. in-process LRU (L1), shared by all instances in the process
+    3. optional Redis (L2) through CacheServiceInterface, vectors stored as
+       base64 encoded float16/float32 bytes
+    """
+
+    # Class-level L1 LRU and hit counters shared by all instances
+    _l1: OrderedDict = OrderedDict()
+    _l1_lock = RLock()
+    _stats = {"memo_hits": 0, "l1_hits": 0, "l2_hits": 0, "misses": 0, "l2_errors": 0}
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingServiceInterface,
+        cache_service: CacheServiceInterface = None,
+        l1_size: int = None,
+        l2_ttl: int = None,
+        l2_dtype: str = None
+    ):
+        self.inner = embedding_service
+        self.model_name = getattr(embedding_service, "model_name", type(embedding_service).__name__)
+        self.cache = cache_service
+        self.l1_size = l1_size if l1_size is not None else settings.embedding_cache_l1_size
+        self.l2_ttl = l2_ttl or settings.embedding_cache_l2_ttl
+        self.l2_dtype = np.dtype(l2_dtype or settings.embedding_cache_l2_dtype)
+
+    def _key(self, text: str) -> tuple[str, str]:
+        return (self.model_name, normalize_text(text))
+
+    def _redis_key(self, key: tuple[str, str]) -> str:
+        digest = hashlib.sha1(key[1].encode("utf-8")).hexdigest()
+        return f"emb:{key[0]}:{self.l2_dtype.name}:{digest}"
+
+    def _encode_vector(self, vector: list[float]) -> str:
+        return base64.b64encode(np.asarray(vector, dtype=self.l2_dtype).tobytes()).decode("ascii")
+
+    def _decode_vector(self, value: str) -> list[float]:
+        return np.frombuffer(base64.b64decode(value), dtype=self.l2_dtype).astype(np.float32).tolist()
+
+    def _l1_get(self, key: tuple[str, str]) -> Optional[list[float]]:
+        with CachedEmbeddingService._l1_lock:
+            vector = CachedEmbeddingService._l1.get(key)
+            if vector is not None:
+                CachedEmbeddingService._l1.move_to_end(key)
+            return vector
+
+    def _l1_set(self, key: tuple[str, str], vector: list[float]) -> None:
+        if self.l1_size <= 0:
+            return
+        with CachedEmbeddingService._l1_lock:
+            CachedEmbeddingService._l1[key] = vector
+            CachedEmbeddingService._l1.move_to_end(key)
+            while len(CachedEmbeddingService._l1) > self.l1_size:
+                CachedEmbeddingService._l1.popitem(last=False)
+
+    async def _l2_get(self, key: tuple[str, str]) -> Optional[list[float]]:
+        if not self.cache:
+            return None
+        try:
+            value = await self.cache.get(self._redis_key(key))
+            return self._decode_vector(value) if value else None
+        except Exception as e:
+            CachedEmbeddingService._stats["l2_errors"] += 1
+            logger.warning(f"Embedding L2 cache read failed: {e}")
+            return None
+
+    async def _l2_set(self, key: tuple[str, str], vector: list[float]) -> None:
+        if not self.cache:
+            return
+        try:
+            await self.cache.set(self._redis_key(key), self._encode_vector(vector), ttl=self.l2_ttl)
+        except Exception as e:
+            CachedEmbeddingService._stats["l2_errors"] += 1
+            logger.warning(f"Embedding L2 cache write failed: {e}")
+
+    async def _lookup(self, key: tuple[str, str]) -> Optional[list[float]]:
+        """Check memo, L1 and L2 in order, promoting hits to the faster tiers."""
+        memo = _request_memo.get()
+        if memo is not None and key in memo:
+            CachedEmbeddingService._stats["memo_hits"] += 1
+            return memo[key]
+
+        vector = self._l1_get(key)
+        if vector is not None:
+            CachedEmbeddingService._stats["l1_hits"] += 1
+        else:
+            vector = await self._l2_get(key)
+            if vector is not None:
+                CachedEmbeddingService._stats["l2_hits"] += 1
+                self._l1_set(key, vector)
+
+        if vector is not None and memo is not None:
+            memo[key] = vector
+        return vector
+
+    async def _store(self, key: tuple[str, str], vector: list[float]) -> None:
+        memo = _request_memo.get()
+        if memo is not None:
+            memo[key] = vector
+        self._l1_set(key, vector)
+        await self._l2_set(key, vector)
+
+    def count_tokens(self, text: str) -> int:
+        return self.inner.count_tokens(text)
+
+    async def generate_embedding(self, input_text: str) -> list[float]:
+        """Generate (or reuse a cached) embedding for the given input text."""
+        key = self._key(input_text)
+        vector = await self._lookup(key)
+        if vector is not None:
+            return vector
+
+        CachedEmbeddingService._stats["misses"] += 1
+        vector = self.inner.generate_embedding(input_text)
+        if inspect.isawaitable(vector):
+            vector = await vector
+        if vector:
+            await self._store(key, vector)
+        return vector
+
+    async def generate_embeddings(self, input_texts: list[str]) -> list[list[float]]:
+        """Batched variant: only cache misses are sent to the model, in one batch."""
+        keys = [self._key(text) for text in input_texts]
+        vectors = [await self._lookup(key) for key in keys]
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            CachedEmbeddingService._stats["misses"] += len(missing)
+            computed = await self.inner.generate_embeddings([input_texts[i] for i in missing])
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+                await self._store(keys[i], vector)
+        return vectors
+
+    def generate_embedding_batch(self, input_texts: list[str], batch_size: int = 50) -> list[dict]:
+        """Bulk (ingestion) embeddings bypass the query cache."""
+        return self.inner.generate_embedding_batch(input_texts, batch_size)
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """Hit-rate counters"""
+        stats = dict(cls._stats)
+        lookups = stats["memo_hits"] + stats["l1_hits"] + stats["l2_hits"] + stats["misses"]
+        hits = lookups - stats["misses"]
+        stats["lookups"] = lookups
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        stats["l1_size"] = len(cls._l1)
+        return stats
+
+    async def health_check(self) -> bool:
+        return await self.inner.health_check()
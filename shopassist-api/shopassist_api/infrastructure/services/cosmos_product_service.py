@@ -1,8 +1,9 @@
 import traceback
 from datetime import datetime
-from typing import List, Dict
+from threading import RLock
+from typing import List, Dict, Optional
 import uuid
-from azure.cosmos import CosmosClient
+from azure.cosmos.aio import ContainerProxy, CosmosClient
 from azure.cosmos.exceptions import CosmosResourceNotFoundError
 from langsmith import traceable
 from shopassist_api.application.settings.config import settings
@@ -16,36 +17,87 @@ from shopassist_api.infrastructure.services.azure_credential_manager import get_
 logger = get_logger(__name__)
 
 class CosmosProductService(RepositoryServiceInterface):
+    """
+    Repository on the async Cosmos DB SDK (azure.cosmos.aio).
+
+    One CosmosClient and its container clients are shared by all instances
+    (scripts build their own) and closed by close() at shutdown.
+    """
+
+    _client: Optional[CosmosClient] = None
+    _containers: Dict[str, ContainerProxy] = {}
+    _client_lock = RLock()
 
     def __init__(self):
         self.client = None
         self.database_name = None
         self.product_container = None
-        self.chat_container = None
+        self.messages_container = None
         self.session_container = None
         self._initialize_client()
     
     def _initialize_client(self):
-        """Initialize the CosmosDB client based on configuration."""
+        """Initialize the shared CosmosDB client and container clients based on configuration."""
         if settings.cosmosdb_endpoint:
-            # Use shared credential manager
-            credential_manager = get_credential_manager()
-            credential = credential_manager.get_cosmos_credential()
-            
-            self.client = CosmosClient(
-                url=settings.cosmosdb_endpoint,
-                credential=credential
-            )
+            if CosmosProductService._client is None:
+                with CosmosProductService._client_lock:
+                    # Double-check after acquiring lock
+                    if CosmosProductService._client is None:
+                        logger.info(f"Initializing singleton async CosmosDB client [{settings.cosmosdb_endpoint}]")
+                        # Use shared credential manager
+                        credential_manager = get_credential_manager()
+                        client = CosmosClient(
+                            url=settings.cosmosdb_endpoint,
+                            credential=credential_manager.get_async_cosmos_credential()
+                        )
+                        database = client.get_database_client(settings.cosmosdb_database)
+                        CosmosProductService._containers = {
+                            name: database.get_container_client(name)
+                            for name in (settings.cosmosdb_product_container,
+                                         settings.cosmosdb_messages_container,
+                                         settings.cosmosdb_session_container)
+                        }
+                        CosmosProductService._client = client
+
+            self.client = CosmosProductService._client
             self.database_name = settings.cosmosdb_database
             self.product_container = settings.cosmosdb_product_container
             self.messages_container = settings.cosmosdb_messages_container
             self.session_container = settings.cosmosdb_session_container
 
-            self.database = self.client.get_database_client(self.database_name)
+            self.products = CosmosProductService._containers[self.product_container]
+            self.messages = CosmosProductService._containers[self.messages_container]
+            self.sessions = CosmosProductService._containers[self.session_container]
 
         else:
             self.client = None
 
+    @staticmethod
+    async def _query(
+        container: ContainerProxy,
+        query: str,
+        parameters: Optional[List[Dict]] = None,
+        partition_key: Optional[str] = None
+    ) -> List[Dict]:
+        """Run a query and collect all result pages (cross-partition unless partition_key is given)"""
+        kwargs = {"query": query, "parameters": parameters}
+        if partition_key is not None:
+            kwargs["partition_key"] = partition_key
+        items = []
+        async for page in container.query_items(**kwargs).by_page():
+            async for item in page:
+                items.append(item)
+        return items
+
+    @classmethod
+    async def close(cls):
+        """Close the shared client (application shutdown)."""
+        with cls._client_lock:
+            client, cls._client, cls._containers = cls._client, None, {}
+        if client is not None:
+            await client.close()
+            await get_credential_manager().close_async()
+
     @traceable(name="cosmos.get_product_by_id", tags=["cosmos", "product", "azure"], metadata={"version": "1.0"})
     async def get_product_by_id(self, product_id: str)-> dict[str, any]:
         """Retrieve a product by its ID from CosmosDB."""
@@ -54,12 +106,11 @@ class CosmosProductService(RepositoryServiceInterface):
 
         try:
 
-            # Get the product container
-            container = self.database.get_container_client(self.product_container)
+            container = self.products
             logger.info(f"Querying for product ID: {product_id} database:{self.database_name}, in container: {self.product_container}")
             # Query for the product by ID
-            query = f"SELECT * FROM c WHERE c.id = '{product_id}'"
-            items = list(container.query_items(query=query, enable_cross_partition_query=True))
+            query = "SELECT * FROM c WHERE c.id = @id"
+            items = await self._query(container, query, parameters=[{"name": "@id", "value": product_id}])
             if items:
                 return items[0]
             else:
@@ -78,37 +129,95 @@ class CosmosProductService(RepositoryServiceInterface):
         if not product_ids or len(product_ids) == 0:
                 return []
         try:
-            # Get the product container
-            container = self.database.get_container_client(self.product_container)
+            container = self.products
             # Query for products by IDs
-            ids_string = ",".join([f"'{pid}'" for pid in product_ids])
-            query = f"SELECT * FROM c WHERE c.id IN ({ids_string})"
-            items = list(container.query_items(
-                query=query,
-                enable_cross_partition_query=True
-                ))
+            query = "SELECT * FROM c WHERE ARRAY_CONTAINS(@ids, c.id)"
+            items = await self._query(container, query, parameters=[{"name": "@ids", "value": list(product_ids)}])
             return items
         except Exception as e:
             logger.error(f"Error retrieving products by IDs: {e}")
             traceback.print_exc()
             return []
 
+    @traceable(name="cosmos.get_product_projections", tags=["cosmos", "product", "azure"], metadata={"version": "1.0"})
+    async def get_product_projections(
+        self,
+        product_ids: List[str],
+        fields: List[str],
+        partition_keys: Optional[Dict[str, str]] = None
+    ) -> list[dict[str, any]]:
+        """
+        Retrieve only the given fields of multiple products.
+
+        IDs with a known partition key (category) are grouped per partition:
+        a single ID is a point read, several IDs are one single-partition
+        projected query. Remaining IDs use one cross-partition projected query.
+        """
+        if not self.client or not self.database_name or not product_ids:
+            return []
+
+        fields = [field for field in fields if field.isidentifier()]
+        partition_keys = partition_keys or {}
+        by_partition: Dict[str, List[str]] = {}
+        unknown = []
+        for product_id in dict.fromkeys(product_ids):
+            partition_key = partition_keys.get(product_id)
+            if partition_key:
+                by_partition.setdefault(partition_key, []).append(product_id)
+            else:
+                unknown.append(product_id)
+
+        try:
+            container = self.products
+            projection = ", ".join(f"c.{field}" for field in fields)
+            query = f"SELECT {projection} FROM c WHERE ARRAY_CONTAINS(@ids, c.id)"
+            items = []
+
+            for partition_key, ids in by_partition.items():
+                if len(ids) == 1:
+                    try:
+                        item = await container.read_item(item=ids[0], partition_key=partition_key)
+                        items.append({field: item.get(field) for field in fields if field in item})
+                    except CosmosResourceNotFoundError:
+                        # Partition key from the vector hit may be stale; retry cross-partition
+                        unknown.append(ids[0])
+                else:
+                    found = await self._query(
+                        container, query,
+                        parameters=[{"name": "@ids", "value": ids}],
+                        partition_key=partition_key
+                    )
+                    items.extend(found)
+                    found_ids = {item.get("id") for item in found}
+                    unknown.extend(product_id for product_id in ids if product_id not in found_ids)
+
+            if unknown:
+                items.extend(await self._query(
+                    container, query,
+                    parameters=[{"name": "@ids", "value": unknown}]
+                ))
+            return items
+        except Exception as e:
+            logger.error(f"Error retrieving product projections: {e}")
+            traceback.print_exc()
+            return []
+
     @traceable(name="cosmos.search_products_by_category", tags=["cosmos", "product", "azure"], metadata={"version": "1.0"})
     async def search_products_by_category(self, category: str)-> list[dict[str, any]]:
         """Search products by category from CosmosDB."""
-        if not self.client or not self.database:
+        if not self.client or not self.database_name:
             return []
 
         try:
-            # Get the product container
-            container = self.database.get_container_client(self.product_container)
+            container = self.products
 
             # Query for products by category
-            query = f"SELECT * FROM c WHERE c.category = '{category}'"
-            items = list(container.query_items(
-                partition_key=category,
-                query=query
-                ))
+            query = "SELECT * FROM c WHERE c.category = @category"
+            items = await self._query(
+                container, query,
+                parameters=[{"name": "@category", "value": category}],
+                partition_key=category
+            )
             return items
         except Exception as e:
             logger.error(f"Error searching products by category: {e}")
@@ -122,12 +231,14 @@ class CosmosProductService(RepositoryServiceInterface):
 
         try:
 
-            # Get the product container
-            container = self.database.get_container_client(self.product_container)
+            container = self.products
 
             # Query for products within the price range
-            query = f"SELECT * FROM c WHERE c.price >= {min_price} AND c.price <= {max_price}"
-            items = list(container.query_items(query=query, enable_cross_partition_query=True))
+            query = "SELECT * FROM c WHERE c.price >= @min_price AND c.price <= @max_price"
+            items = await self._query(container, query, parameters=[
+                {"name": "@min_price", "value": min_price},
+                {"name": "@max_price", "value": max_price}
+            ])
             return items
         except Exception as e:
             logger.error(f"Error searching products by price range: {e}")
@@ -141,15 +252,11 @@ class CosmosProductService(RepositoryServiceInterface):
             return []
 
         try:
-            # Get the product container
-            container = self.database.get_container_client(self.product_container)
+            container = self.products
 
             # Query for products by text in name or description
-            query = f"SELECT * FROM c WHERE CONTAINS(c.name, '{text}') OR CONTAINS(c.description, '{text}')"
-            items = list(container.query_items(
-                query=query,
-                enable_cross_partition_query=True
-                ))
+            query = "SELECT * FROM c WHERE CONTAINS(c.name, @text) OR CONTAINS(c.description, @text)"
+            items = await self._query(container, query, parameters=[{"name": "@text", "value": text}])
             return items
         except Exception as e:
             logger.error(f"Error searching products by text: {e}")
@@ -164,15 +271,11 @@ class CosmosProductService(RepositoryServiceInterface):
 
         try:
             
-            # Get the product container
-            container = self.database.get_container_client(self.product_container)
+            container = self.products
 
             # Query for products by name
-            query = f"SELECT * FROM c WHERE CONTAINS(c.name, '{name}')"
-            items = list(container.query_items(
-                query=query,
-                enable_cross_partition_query=True
-                ))
+            query = "SELECT * FROM c WHERE CONTAINS(c.name, @name)"
+            items = await self._query(container, query, parameters=[{"name": "@name", "value": name}])
             return items
         except Exception as e:
             logger.error(f"Error searching products by name: {e}")
@@ -185,7 +288,7 @@ class CosmosProductService(RepositoryServiceInterface):
         """Get conversation history for a session"""
         try:
             
-            container = self.database.get_container_client(self.messages_container)
+            container = self.messages
             
             query = """
             SELECT c.role, c.content, c.timestamp, c.metadata, c.id, c.user_id, c.session_id
@@ -194,11 +297,7 @@ class CosmosProductService(RepositoryServiceInterface):
             ORDER BY c.timestamp ASC
             """
             logger.info(f"Getting conversation history for session_id: {session_id}")
-            items = list(container.query_items(
-                query=query,
-                parameters=[{"name": "@session_id", "value": session_id}],
-                enable_cross_partition_query=True
-            ))
+            items = await self._query(container, query, parameters=[{"name": "@session_id", "value": session_id}])
             
             return items
             
@@ -217,7 +316,7 @@ class CosmosProductService(RepositoryServiceInterface):
     ):
         """Save a message to conversation history"""
         try:
-            container = self.database.get_container_client(self.messages_container)
+            container = self.messages
             
             message = {
                 "id": str(uuid.uuid4()),
@@ -229,7 +328,7 @@ class CosmosProductService(RepositoryServiceInterface):
                 "metadata": metadata or {}
             }
             
-            container.create_item(body=message)
+            await container.create_item(body=message)
             logger.info(f"Saved message for session {session_id}")
             
         except Exception as e:
@@ -245,12 +344,8 @@ class CosmosProductService(RepositoryServiceInterface):
             logger.error("CosmosDB client not initialized.")
             return False
         try:
-            # Create (or get) a container
-            container_name = self.product_container
-            container = self.database.get_container_client(container_name)
-
-            # query = "SELECT TOP 1 * FROM c"
-            # items = list(container.query_items(query=query, enable_cross_partition_query=True))
+            # Read the product container properties (metadata request)
+            await self.products.read()
             logger.info("Connected to CosmosDB successfully.")
             return True
         except Exception as e:
@@ -268,10 +363,10 @@ class CosmosProductService(RepositoryServiceInterface):
                 data.id = str(uuid.uuid4())
 
             logger.info(f"Created new session with ID: {data.id}")
-            container = self.database.get_container_client(self.session_container)
+            container = self.sessions
             safe_data = data.model_dump(mode='json') if data else {}
             print(safe_data)
-            container.create_item(body=safe_data)
+            await container.create_item(body=safe_data)
             logger.info(f"Saved session context for session ID: {data.id}")
             
             return data.id
@@ -284,17 +379,13 @@ class CosmosProductService(RepositoryServiceInterface):
         """Retrieve session details by session ID"""
         try:
             logger.info(f"Retrieving session with ID: {session_id}")
-            container = self.database.get_container_client(self.session_container)
+            container = self.sessions
             query = """
             SELECT *
             FROM c
             WHERE c.id = @id
             """
-            items = list(container.query_items(
-                query=query,
-                parameters=[{"name": "@id", "value": session_id}],
-                enable_cross_partition_query=True
-            ))
+            items = await self._query(container, query, parameters=[{"name": "@id", "value": session_id}])
             if items:
                 session_data = items[0]
                 # Convert to SessionContext model if needed
@@ -314,9 +405,9 @@ class CosmosProductService(RepositoryServiceInterface):
     async def delete_session(self, user_id:str, session_id: str) -> None:
         """Delete a session by session ID"""
         try:
-            container = self.database.get_container_client(self.session_container)
+            container = self.sessions
             # delete the session item without retrieving it first
-            container.delete_item(item=session_id, partition_key=user_id)
+            await container.delete_item(item=session_id, partition_key=user_id)
         except CosmosResourceNotFoundError:
             logger.warning(f"Session with ID: {session_id}, User Id {user_id}, not found for deletion.")
         except Exception as e:
@@ -348,7 +439,7 @@ class CosmosProductService(RepositoryServiceInterface):
     ) -> None:
         """Update user preferences for a session"""
         try:
-            container = self.database.get_container_client(self.session_container)
+            container = self.sessions
             # Retrieve existing session
             session = await self.get_session(session_id)
             if not session:
@@ -358,7 +449,7 @@ class CosmosProductService(RepositoryServiceInterface):
             # Update preferences
             session.user_preferences = preferences
             safe_data = SessionContext.model_dump(session)
-            container.upsert_item(body=safe_data)
+            await container.upsert_item(body=safe_data)
             logger.info(f"Updated user preferences for session ID: {session_id}")
         except Exception as e:
             logger.error(f"Error updating user preferences: {e}")
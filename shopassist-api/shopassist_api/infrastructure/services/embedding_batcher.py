@@ -0,0 +1,152 @@
+import asyncio
+import time
+from typing import Callable, List, Optional
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    Dynamic micro-batching scheduler for embedding requests.
+
+    Incoming texts are queued and flushed as one encode call when either
+    max_batch_size texts are waiting or max_wait_ms has elapsed since the
+    first text of the batch arrived. Each caller awaits its own future.
+
+    encode_fn is a blocking callable taking a list of texts and returning one
+    vector per text; it runs in a worker thread.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], list],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        max_queue_size: int = 1024,
+        name: str = "embedding"
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_queue_size = max_queue_size
+        self.name = name
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Metrics
+        self.total_requests = 0
+        self.total_batches = 0
+        self.total_errors = 0
+        self.max_queue_depth = 0
+        self.max_observed_batch = 0
+        self.total_encode_ms = 0.0
+
+    def _ensure_worker(self):
+        """
+        Start the worker on the running loop. A dead worker is restarted on the
+        same queue, so queued texts are still encoded; the queue is only replaced
+        when the loop changed, after failing the futures left in it.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._queue is not None:
+                self._fail_pending(RuntimeError(f"Embedding batcher [{self.name}] moved to another event loop"))
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._worker = None
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run(), name=f"{self.name}-batcher")
+            logger.info(f"Started embedding batcher [{self.name}] max_batch={self.max_batch_size}, max_wait_ms={self.max_wait * 1000}")
+
+    def _fail_pending(self, error: Exception):
+        """Fail the futures still waiting in the queue so their submit() callers do not hang."""
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if future.done():
+                continue
+            loop = future.get_loop()
+            if loop is asyncio.get_running_loop():
+                future.set_exception(error)
+            elif not loop.is_closed():
+                loop.call_soon_threadsafe(lambda f=future: f.done() or f.set_exception(error))
+
+    async def submit(self, text: str) -> list:
+        """Queue a text for encoding and wait for its vector."""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((text, future))
+        self.total_requests += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def _collect_batch(self) -> list:
+        """Wait for the first item, then gather more until full or max_wait elapsed."""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect_batch()
+            # Drop callers that gave up (cancelled) before encoding
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            texts = [text for text, _ in batch]
+            start = time.perf_counter()
+            try:
+                vectors = await asyncio.to_thread(self.encode_fn, texts)
+            except Exception as e:
+                self.total_errors += 1
+                logger.error(f"Embedding batch [{self.name}] of {len(texts)} failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.total_encode_ms += (time.perf_counter() - start) * 1000
+            self.total_batches += 1
+            self.max_observed_batch = max(self.max_observed_batch, len(batch))
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+    def get_stats(self) -> dict:
+        """Batching metrics"""
+        return {
+            "name": self.name,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "total_requests": self.total_requests,
+            "total_batches": self.total_batches,
+            "total_errors": self.total_errors,
+            "avg_batch_size": self.total_requests / self.total_batches if self.total_batches else 0.0,
+            "max_observed_batch": self.max_observed_batch,
+            "avg_encode_ms": self.total_encode_ms / self.total_batches if self.total_batches else 0.0,
+        }
+
+    async def close(self):
+        """Stop the worker task and fail the texts still queued"""
+        if self._worker and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+        if self._queue is not None:
+            self._fail_pending(RuntimeError(f"Embedding batcher [{self.name}] closed"))
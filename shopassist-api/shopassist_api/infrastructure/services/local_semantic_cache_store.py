@@ -0,0 +1,86 @@
+import time
+from threading import RLock
+from typing import Dict, List, Optional
+import numpy as np
+from shopassist_api.application.interfaces.service_interfaces import SemanticCacheStoreInterface
+from shopassist_api.application.settings.config import settings
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class LocalSemanticCacheStore(SemanticCacheStoreInterface):
+    """
+    In-process semantic cache store.
+
+    Normalised embeddings are kept in one matrix (cosine similarity is a single
+    matrix-vector product); entries past their TTL are skipped and dropped on the
+    next store. Oldest entries are evicted past semantic_cache_max_entries.
+    """
+
+    # Shared by all instances (DI creates a new instance per request)
+    _lock = RLock()
+    _matrix: Optional[np.ndarray] = None
+    _entries: List[Dict] = []
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or settings.semantic_cache_max_entries
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def lookup(self, namespace: str, embedding: List[float], intents: List[str],
+                     version: str, threshold: float) -> Optional[Dict]:
+        cls = LocalSemanticCacheStore
+        with cls._lock:
+            if cls._matrix is None or not cls._entries:
+                return None
+            now = time.time()
+            mask = np.fromiter(
+                (e["namespace"] == namespace and e["intent"] in intents and e["version"] == version
+                 and e["expires_at"] > now for e in cls._entries),
+                dtype=bool, count=len(cls._entries)
+            )
+            if not mask.any():
+                return None
+            scores = cls._matrix @ self._normalize(embedding)
+            scores[~mask] = -np.inf
+            best = int(np.argmax(scores))
+            if scores[best] < threshold:
+                return None
+            entry = cls._entries[best]
+            return {**entry["payload"], "intent": entry["intent"], "similarity": float(scores[best])}
+
+    async def store(self, namespace: str, embedding: List[float], intent: str,
+                    version: str, payload: Dict, ttl: int) -> None:
+        cls = LocalSemanticCacheStore
+        vector = self._normalize(embedding)
+        with cls._lock:
+            now = time.time()
+            keep = [i for i, e in enumerate(cls._entries) if e["expires_at"] > now]
+            keep = keep[-(self.max_entries - 1):] if self.max_entries > 1 else []
+            entries = [cls._entries[i] for i in keep]
+            matrix = cls._matrix[keep] if cls._matrix is not None and keep else np.empty((0, vector.shape[0]), dtype=np.float32)
+
+            entries.append({
+                "namespace": namespace,
+                "intent": intent,
+                "version": version,
+                "expires_at": now + ttl,
+                "payload": payload,
+            })
+            cls._entries = entries
+            cls._matrix = np.vstack([matrix, vector[None, :]])
+
+    async def clear(self, namespace: Optional[str] = None) -> None:
+        cls = LocalSemanticCacheStore
+        with cls._lock:
+            if namespace is None or cls._matrix is None:
+                cls._entries, cls._matrix = [], None
+                return
+            keep = [i for i, e in enumerate(cls._entries) if e["namespace"] != namespace]
+            cls._entries = [cls._entries[i] for i in keep]
+            cls._matrix = cls._matrix[keep] if keep else None
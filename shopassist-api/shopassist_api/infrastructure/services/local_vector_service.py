@@ -0,0 +1,477 @@
+import hashlib
+import json
+import re
+from pathlib import Path
+from threading import RLock
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from langsmith import traceable
+from shopassist_api.application.interfaces.service_interfaces import VectorServiceInterface
+from shopassist_api.application.settings.config import settings
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# Vector and scalar fields per logical collection (same schema as the Milvus collections)
+COLLECTION_SCHEMAS = {
+    "products": {
+        "vector_fields": ["embedding"],
+        "fields": ["id", "product_id", "text", "chunk_index", "total_chunks", "category", "price", "brand"],
+    },
+    "knowledge_base": {
+        "vector_fields": ["embedding"],
+        "fields": ["id", "doc_id", "doc_type", "text"],
+    },
+    "categories": {
+        "vector_fields": ["embedding", "full_embedding"],
+        "fields": ["id", "name", "full_name"],
+    },
+}
+
+_CLAUSE_RE = re.compile(r"^(\w+)\s+(not in|in)\s+(.+)$|^(\w+)\s*(==|!=|>=|<=|>|<)\s*(.+)$")
+_PLACEHOLDER_RE = re.compile(r"^\{(\w+)\}$")
+
+
+def _parse_literal(value: str, params: Dict):
+    value = value.strip()
+    placeholder = _PLACEHOLDER_RE.match(value)
+    if placeholder:
+        return params[placeholder.group(1)]
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    if value.startswith("[") and value.endswith("]"):
+        return [_parse_literal(item, params) for item in _split_outside_quotes(value[1:-1], ",") if item]
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _split_outside_quotes(expr: str, separator: str) -> List[str]:
+    """Split on a separator (' and ', ' or ', ',') outside quotes, brackets and parentheses."""
+    parts, depth, quote, start = [], 0, None, 0
+    i = 0
+    while i < len(expr):
+        char = expr[i]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif depth == 0 and expr.startswith(separator, i):
+            parts.append(expr[start:i])
+            i += len(separator)
+            start = i
+            continue
+        i += 1
+    parts.append(expr[start:])
+    return [part.strip() for part in parts]
+
+
+_OPERATORS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">=": lambda a, b: a is not None and a >= b,
+    "<=": lambda a, b: a is not None and a <= b,
+    ">": lambda a, b: a is not None and a > b,
+    "<": lambda a, b: a is not None and a < b,
+    "in": lambda a, b: a in b,
+    "not in": lambda a, b: a not in b,
+}
+
+
+def compile_filter(expr: Optional[str], params: Optional[Dict] = None) -> Optional[Callable[[Dict], bool]]:
+    """
+    Compile the Milvus filter templates produced by
+    RetrievalService._build_filter_expression into a row predicate.
+
+    Supports 'and' / 'or', parentheses, ==, !=, >=, <=, >, <, in / not in,
+    and {name} placeholders resolved from params (Milvus expr_params).
+    """
+    if not expr or not expr.strip():
+        return None
+    expr = expr.strip()
+    params = params or {}
+
+    or_parts = _split_outside_quotes(expr, " or ")
+    if len(or_parts) > 1:
+        predicates = [compile_filter(part, params) for part in or_parts]
+        return lambda row: any(p(row) for p in predicates)
+
+    and_parts = _split_outside_quotes(expr, " and ")
+    if len(and_parts) > 1:
+        predicates = [compile_filter(part, params) for part in and_parts]
+        return lambda row: all(p(row) for p in predicates)
+
+    if expr.startswith("(") and expr.endswith(")"):
+        return compile_filter(expr[1:-1], params)
+
+    match = _CLAUSE_RE.match(expr)
+    if not match:
+        raise ValueError(f"Unsupported filter expression: {expr}")
+    field, op, literal = match.group(1, 2, 3) if match.group(1) else match.group(4, 5, 6)
+    value = _parse_literal(literal, params)
+    compare = _OPERATORS[op]
+    return lambda row: compare(row.get(field), value)
+
+
+def load_records(file_path: str) -> List[Dict]:
+    """Load the ingestion artefacts (JSONL, JSON array or parquet)."""
+    path = Path(file_path)
+    if path.suffix == ".parquet":
+        import pandas as pd  # optional, only needed for parquet artefacts
+        return pd.read_parquet(path).to_dict(orient="records")
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix == ".json":
+            return json.load(f)
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class LocalCollection:
+    """
+    One collection held in-process: scalar rows plus one L2-normalised
+    float32 matrix per vector field, memory-mapped from the data dir.
+    Search is exact (matrix product) or HNSW (hnswlib, optional).
+    """
+
+    def __init__(self, key: str, engine: str = "exact", ef: int = 64):
+        self.key = key
+        self.schema = COLLECTION_SCHEMAS[key]
+        self.engine = engine
+        self.ef = ef
+        self.rows: List[Dict] = []
+        self.vectors: Dict[str, np.ndarray] = {}
+        self._hnsw: Dict[str, object] = {}
+        self.source: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32)
+
+    def _matrix_path(self, data_dir: Path, field: str, source: Path) -> Path:
+        stat = source.stat()
+        digest = hashlib.sha1(f"{source.resolve()}:{stat.st_mtime}:{stat.st_size}".encode()).hexdigest()[:12]
+        return data_dir / f"{self.key}.{field}.{digest}.f32"
+
+    def load_file(self, file_path: str, data_dir: Path) -> None:
+        """Load an artefact file, caching vectors as raw float32 files that are memory-mapped."""
+        source = Path(file_path)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        meta_path = data_dir / f"{self.key}.rows.json"
+        matrix_paths = {field: self._matrix_path(data_dir, field, source) for field in self.schema["vector_fields"]}
+
+        if all(p.exists() for p in matrix_paths.values()) and meta_path.exists():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("matrices") == sorted(p.name for p in matrix_paths.values()):
+                rows, dim = meta["rows"], meta["dim"]
+                vectors = {
+                    field: np.memmap(p, dtype=np.float32, mode="r", shape=(len(rows), dim))
+                    for field, p in matrix_paths.items()
+                }
+                self._set(rows, vectors, str(source))
+                logger.info(f"Memory-mapped local collection [{self.key}]: {len(rows)} rows from cache")
+                return
+
+        records = load_records(file_path)
+        rows = [{field: record.get(field) for field in self.schema["fields"]} for record in records]
+        if not records:
+            self._set([], {}, str(source))
+            logger.warning(f"Artefact file {file_path} for local collection [{self.key}] is empty")
+            return
+        vectors, dim = {}, 0
+        for field, p in matrix_paths.items():
+            matrix = self._normalize(np.asarray([record[field] for record in records], dtype=np.float32))
+            dim = matrix.shape[1] if matrix.ndim == 2 else 0
+            memmap = np.memmap(p, dtype=np.float32, mode="w+", shape=matrix.shape)
+            memmap[:] = matrix
+            memmap.flush()
+            vectors[field] = np.memmap(p, dtype=np.float32, mode="r", shape=matrix.shape)
+        meta_path.write_text(json.dumps({
+            "matrices": sorted(p.name for p in matrix_paths.values()), "dim": dim, "rows": rows
+        }), encoding="utf-8")
+        self._set(rows, vectors, str(source))
+        logger.info(f"Loaded local collection [{self.key}]: {len(rows)} rows from {file_path}")
+
+    def _set(self, rows: List[Dict], vectors: Dict[str, np.ndarray], source: str = None) -> None:
+        self.rows = rows
+        self.vectors = vectors
+        self.source = source
+        self._hnsw = {}
+        if self.engine == "hnsw":
+            for field in vectors:
+                self._build_hnsw(field)
+
+    def insert(self, records: List[Dict]) -> int:
+        """Append records in memory (not written back to the artefact files)."""
+        rows = self.rows + [{field: r.get(field) for field in self.schema["fields"]} for r in records]
+        vectors = {}
+        for field in self.schema["vector_fields"]:
+            new = self._normalize(np.asarray([r[field] for r in records], dtype=np.float32))
+            current = self.vectors.get(field)
+            vectors[field] = new if current is None or len(current) == 0 else np.concatenate([np.asarray(current), new])
+        self._set(rows, vectors, self.source)
+        return len(records)
+
+    def _build_hnsw(self, field: str) -> None:
+        try:
+            import hnswlib  # optional dependency
+        except ImportError:
+            logger.warning("hnswlib is not installed, local vector search falls back to exact search")
+            self.engine = "exact"
+            return
+        matrix = self.vectors[field]
+        if len(matrix) == 0:
+            return
+        index = hnswlib.Index(space="ip", dim=matrix.shape[1])
+        index.init_index(
+            max_elements=len(matrix),
+            M=settings.local_vector_hnsw_m,
+            ef_construction=settings.local_vector_hnsw_ef_construction
+        )
+        index.add_items(np.asarray(matrix), np.arange(len(matrix)))
+        index.set_ef(self.ef)
+        self._hnsw[field] = index
+
+    def search(
+        self,
+        query_embeddings: List[List[float]],
+        field: str = "embedding",
+        top_k: int = 5,
+        filters: Optional[str] = None,
+        radius: Optional[float] = None,
+        filter_params: Optional[Dict] = None
+    ) -> List[List[tuple]]:
+        """Return (row index, cosine similarity) pairs per query, best first."""
+        matrix = self.vectors.get(field)
+        if matrix is None or len(self.rows) == 0 or top_k <= 0:
+            return [[] for _ in query_embeddings]
+
+        queries = self._normalize(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        predicate = compile_filter(filters, filter_params)
+        candidates = None
+        if predicate:
+            candidates = np.asarray([i for i, row in enumerate(self.rows) if predicate(row)], dtype=np.int64)
+            if candidates.size == 0:
+                return [[] for _ in query_embeddings]
+
+        if self.engine == "hnsw" and field in self._hnsw:
+            hits = self._search_hnsw(field, queries, top_k, candidates)
+        else:
+            hits = self._search_exact(matrix, queries, top_k, candidates)
+
+        if radius is not None:
+            hits = [[(i, score) for i, score in query_hits if score > radius] for query_hits in hits]
+        return hits
+
+    @staticmethod
+    def _search_exact(matrix: np.ndarray, queries: np.ndarray, top_k: int, candidates: Optional[np.ndarray]) -> List[List[tuple]]:
+        subset = matrix if candidates is None else matrix[candidates]
+        scores = queries @ np.asarray(subset).T  # shape (nq, n)
+        k = min(top_k, scores.shape[1])
+        results = []
+        for query_scores in scores:
+            top = np.argpartition(-query_scores, k - 1)[:k]
+            top = top[np.argsort(-query_scores[top])]
+            ids = top if candidates is None else candidates[top]
+            results.append([(int(i), float(query_scores[j])) for i, j in zip(ids, top)])
+        return results
+
+    def _search_hnsw(self, field: str, queries: np.ndarray, top_k: int, candidates: Optional[np.ndarray]) -> List[List[tuple]]:
+        index = self._hnsw[field]
+        allowed = None if candidates is None else set(candidates.tolist())
+        k = min(top_k, len(self.rows) if allowed is None else len(allowed))
+        labels, distances = index.knn_query(
+            queries, k=k, filter=(lambda label: label in allowed) if allowed is not None else None
+        )
+        # hnswlib 'ip' distance is 1 - inner product
+        return [
+            [(int(label), float(1.0 - distance)) for label, distance in zip(query_labels, query_distances)]
+            for query_labels, query_distances in zip(labels, distances)
+        ]
+
+
+class LocalVectorService(VectorServiceInterface):
+    """
+    Embedded vector backend: products, knowledge base and categories served
+    in-process from the ingestion artefacts, with no Milvus hop. Intended for
+    small deployments, edge nodes, latency benchmarks and CI.
+
+    Enabled with use_local_vector_service=true; artefact paths come from
+    local_vector_*_file settings.
+    """
+
+    # Collections shared by all instances in the process
+    _collections: Dict[str, LocalCollection] = {}
+    _versions: Dict[str, int] = {}
+    _load_state: Dict[str, Dict] = {}
+    _lock = RLock()
+
+    def __init__(self, engine: str = None, data_dir: str = None):
+        self.engine = engine or settings.local_vector_engine
+        self.data_dir = Path(data_dir or settings.local_vector_data_dir)
+        self.files = {
+            "products": settings.local_vector_products_file,
+            "knowledge_base": settings.local_vector_knowledge_base_file,
+            "categories": settings.local_vector_categories_file,
+        }
+        self.search_ef = {
+            "products": settings.milvus_product_search_ef,
+            "knowledge_base": settings.milvus_knowledge_base_search_ef,
+            "categories": settings.milvus_categories_search_ef,
+        }
+
+    def _get(self, key: str) -> LocalCollection:
+        collection = LocalVectorService._collections.get(key)
+        if collection is None:
+            with LocalVectorService._lock:
+                # Double-check after acquiring lock
+                collection = LocalVectorService._collections.get(key)
+                if collection is None:
+                    collection = self._load(key)
+        return collection
+
+    def _load(self, key: str) -> LocalCollection:
+        """Load a single collection. Caller must hold the lock."""
+        collection = LocalCollection(key, engine=self.engine, ef=self.search_ef[key])
+        file_path = self.files.get(key)
+        if file_path:
+            collection.load_file(file_path, self.data_dir)
+        else:
+            logger.warning(f"No artefact file configured for local collection [{key}], starting empty")
+        LocalVectorService._collections[key] = collection
+        LocalVectorService._versions[key] = LocalVectorService._versions.get(key, 0) + 1
+        LocalVectorService._load_state[key] = {
+            "name": key,
+            "loaded": True,
+            "num_entities": len(collection),
+            "source": file_path,
+            "engine": collection.engine,
+        }
+        return collection
+
+    def load_collections(self) -> Dict[str, Dict]:
+        for key in COLLECTION_SCHEMAS:
+            self._get(key)
+        return self.get_load_state()
+
+    def reload_collections(self, keys: List[str] = None) -> Dict[str, Dict]:
+        with LocalVectorService._lock:
+            for key in keys or list(COLLECTION_SCHEMAS):
+                self._load(key)
+        return self.get_load_state()
+
+    def get_load_state(self) -> Dict[str, Dict]:
+        return {key: dict(state) for key, state in LocalVectorService._load_state.items()}
+
+    def get_collection_version(self, key: str) -> int:
+        return LocalVectorService._versions.get(key, 0)
+
+    def _insert(self, key: str, records: List[Dict]) -> int:
+        collection = self._get(key)
+        with LocalVectorService._lock:
+            count = collection.insert(records)
+            LocalVectorService._versions[key] = LocalVectorService._versions.get(key, 0) + 1
+            LocalVectorService._load_state[key]["num_entities"] = len(collection)
+        logger.info(f"Inserted {count} rows into local collection [{key}]")
+        return count
+
+    def insert_products(self, products: List[Dict]) -> int:
+        return self._insert("products", products)
+
+    def insert_knowledge_base(self, chunks: List[Dict]) -> int:
+        return self._insert("knowledge_base", chunks)
+
+    def insert_categories(self, categories: List[Dict]) -> int:
+        return self._insert("categories", categories)
+
+    @traceable(name="local_vector.search_products", tags=["retrieval", "products", "embedding", "local"], metadata={"version": "1.0"})
+    def search_products(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        filters: Optional[str] = None,
+        radius: Optional[float] = None,
+        filter_params: Optional[Dict] = None
+    ) -> List[Dict]:
+        return self.search_products_batch([query_embedding], top_k, filters, radius, filter_params)[0]
+
+    @traceable(name="local_vector.search_products_batch", tags=["retrieval", "products", "embedding", "local"], metadata={"version": "1.0"})
+    def search_products_batch(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        filters: Optional[str] = None,
+        radius: Optional[float] = None,
+        filter_params: Optional[Dict] = None
+    ) -> List[List[Dict]]:
+        collection = self._get("products")
+        hits = collection.search(query_embeddings, "embedding", top_k, filters, radius, filter_params)
+        return [
+            [{"id": collection.rows[i]["id"], "distance": score, **{
+                field: collection.rows[i].get(field) for field in ["product_id", "text", "category", "price", "brand"]
+            }} for i, score in query_hits]
+            for query_hits in hits
+        ]
+
+    @traceable(name="local_vector.search_knowledge_base", tags=["retrieval", "knowledge_base", "embedding", "local"], metadata={"version": "1.0"})
+    def search_knowledge_base(
+        self,
+        query_embedding: List[float],
+        top_k: int = 3,
+        radius: Optional[float] = None
+    ) -> List[Dict]:
+        collection = self._get("knowledge_base")
+        hits = collection.search([query_embedding], "embedding", top_k, None, radius)[0]
+        return [{
+            "id": collection.rows[i]["id"],
+            "distance": score,
+            "doc_id": collection.rows[i].get("doc_id"),
+            "text": collection.rows[i].get("text"),
+            "doc_type": collection.rows[i].get("doc_type"),
+        } for i, score in hits]
+
+    @traceable(name="local_vector.search_categories", tags=["retrieval", "categories", "embedding", "local"], metadata={"version": "1.0"})
+    def search_categories(
+        self,
+        query_embedding: List[float],
+        field: str = "embedding",
+        top_k: int = 5,
+        radius: Optional[float] = None
+    ) -> List[Dict]:
+        collection = self._get("categories")
+        hits = collection.search([query_embedding], field, top_k, None, radius)[0]
+        return [{
+            "id": collection.rows[i]["id"],
+            "distance": score,
+            "name": collection.rows[i].get("name"),
+            "full_name": collection.rows[i].get("full_name"),
+            "embedding": collection.vectors["embedding"][i].tolist(),
+            "full_embedding": collection.vectors["full_embedding"][i].tolist(),
+        } for i, score in hits]
+
+    def fetch_all_categories(self) -> List[Dict]:
+        collection = self._get("categories")
+        return [{
+            **row,
+            "embedding": collection.vectors["embedding"][i].tolist(),
+            "full_embedding": collection.vectors["full_embedding"][i].tolist(),
+        } for i, row in enumerate(collection.rows)]
+
+    async def health_check(self) -> bool:
+        """The local backend is healthy once its collections load"""
+        try:
+            self.load_collections()
+            return True
+        except Exception as e:
+            logger.error(f"Local vector service health check failed: {e}")
+            return False
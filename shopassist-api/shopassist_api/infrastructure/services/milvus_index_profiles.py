@@ -0,0 +1,105 @@
+"""
+Named ANN index profiles for the Milvus collections.
+
+Used by scripts/deployment/create_milvus_collections.py to build the vector
+indexes and by MilvusService to build matching search params. Profiles with
+normalize=True use the IP metric; vectors are L2-normalised on insert and at
+query time, so IP equals cosine similarity without per-search normalisation.
+"""
+import math
+from typing import Dict, List, Optional
+
+INDEX_PROFILES: Dict[str, Dict] = {
+    # Full precision float32 graph (previous default)
+    "hnsw": {
+        "index_type": "HNSW",
+        "metric_type": "COSINE",
+        "params": {"M": 16, "efConstruction": 256},
+        "search_param": "ef",
+        "normalize": False,
+    },
+    # Same graph, inner product over pre-normalised vectors
+    "hnsw_ip": {
+        "index_type": "HNSW",
+        "metric_type": "IP",
+        "params": {"M": 16, "efConstruction": 256},
+        "search_param": "ef",
+        "normalize": True,
+    },
+    # HNSW graph over 8-bit scalar quantised vectors (~4x smaller)
+    "hnsw_sq": {
+        "index_type": "HNSW_SQ",
+        "metric_type": "IP",
+        "params": {"M": 16, "efConstruction": 256, "sq_type": "SQ8"},
+        "search_param": "ef",
+        "normalize": True,
+    },
+    # Inverted file over 8-bit scalar quantised vectors (~4x smaller)
+    "ivf_sq8": {
+        "index_type": "IVF_SQ8",
+        "metric_type": "IP",
+        "params": {"nlist": 128},
+        "search_param": "nprobe",
+        "normalize": True,
+    },
+    # Inverted file with product quantisation (m sub-vectors of nbits each)
+    "ivf_pq": {
+        "index_type": "IVF_PQ",
+        "metric_type": "IP",
+        "params": {"nlist": 128, "m": 32, "nbits": 8},
+        "search_param": "nprobe",
+        "normalize": True,
+    },
+}
+
+
+def get_index_profile(name: str) -> Dict:
+    """Look up an index profile by name."""
+    try:
+        return INDEX_PROFILES[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown index profile '{name}'. Options: {', '.join(INDEX_PROFILES)}")
+
+
+def build_index_params(name: str, dim: int, num_entities: Optional[int] = None) -> Dict:
+    """
+    Index params for create_index.
+
+    IVF nlist is capped to ~4*sqrt(n) when the entity count is known, and the
+    PQ sub-vector count is reduced until it divides the dimension.
+    """
+    profile = get_index_profile(name)
+    params = dict(profile["params"])
+    if "nlist" in params and num_entities:
+        params["nlist"] = max(1, min(params["nlist"], int(4 * math.sqrt(num_entities))))
+    if "m" in params:
+        m = params["m"]
+        while dim % m:
+            m -= 1
+        params["m"] = m
+    return {
+        "index_type": profile["index_type"],
+        "metric_type": profile["metric_type"],
+        "params": params,
+    }
+
+
+def build_search_params(name: str, ef: int, nprobe: int, radius: Optional[float] = None) -> Dict:
+    """Search params matching the index profile."""
+    profile = get_index_profile(name)
+    value = ef if profile["search_param"] == "ef" else nprobe
+    return {
+        "metric_type": profile["metric_type"],
+        "params": {profile["search_param"]: value,
+                   "radius": radius if radius else 0.0
+                   }
+    }
+
+
+def normalize_vectors(vectors: List[List[float]]) -> List[List[float]]:
+    """L2-normalise vectors for the IP profiles."""
+    normalized = []
+    for vector in vectors:
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        normalized.append([v / norm for v in vector])
+    return normalized
@@ -1,19 +1,177 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from threading import RLock
 from typing import List, Dict, Optional
 from langsmith import traceable
 from pymilvus import connections, Collection
 from shopassist_api.application.interfaces.service_interfaces import VectorServiceInterface
+from shopassist_api.infrastructure.services.milvus_index_profiles import build_search_params, get_index_profile, normalize_vectors
 from shopassist_api.logging_config import get_logger
 from shopassist_api.application.settings.config import settings
 
 logger = get_logger(__name__)
 
+
+def get_collection_search_defaults() -> Dict[str, Dict]:
+    """Per-collection search defaults, keyed by logical collection name."""
+    return {
+        "products": {
+            "name": settings.milvus_product_collection,
+            "ef": settings.milvus_product_search_ef,
+            "index_profile": settings.milvus_product_index_profile,
+            "radius": settings.threshold_product_similarity,
+            "consistency_level": settings.milvus_product_consistency_level,
+            "output_fields": settings.milvus_product_output_fields,
+        },
+        "knowledge_base": {
+            "name": settings.milvus_knowledge_base_collection,
+            "ef": settings.milvus_knowledge_base_search_ef,
+            "index_profile": settings.milvus_knowledge_base_index_profile,
+            "radius": settings.milvus_knowledge_base_search_radius,
+            "consistency_level": settings.milvus_knowledge_base_consistency_level,
+            "output_fields": settings.milvus_knowledge_base_output_fields,
+        },
+        "categories": {
+            "name": settings.milvus_categories_collection,
+            "ef": settings.milvus_categories_search_ef,
+            "index_profile": settings.milvus_categories_index_profile,
+            "radius": settings.milvus_categories_search_radius,
+            "consistency_level": settings.milvus_categories_consistency_level,
+            "output_fields": settings.milvus_categories_output_fields,
+        },
+    }
+
+
+class MilvusCollectionRegistry:
+    """
+    Resolves and loads Milvus collections once and hands out cached handles.
+
+    Searches reuse the loaded handle instead of building a new Collection and
+    calling load() on every query. Call reload() after a collection has been
+    dropped/re-created or re-ingested.
+    """
+
+    def __init__(self, search_defaults: Dict[str, Dict]):
+        self.search_defaults = search_defaults
+        self._collections: Dict[str, Collection] = {}
+        self._load_state: Dict[str, Dict] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = RLock()
+
+    def get(self, key: str) -> Collection:
+        """Get the loaded collection handle for a logical collection name."""
+        collection = self._collections.get(key)
+        if collection is not None:
+            return collection
+
+        with self._lock:
+            # Double-check after acquiring lock
+            if key not in self._collections:
+                self._load(key)
+            return self._collections[key]
+
+    def get_defaults(self, key: str) -> Dict:
+        """Get the search defaults for a logical collection name."""
+        return self.search_defaults[key]
+
+    def get_version(self, key: str) -> int:
+        """Data version of a collection; bumped on every (re)load and insert."""
+        return self._versions.get(key, 0)
+
+    def bump_version(self, key: str) -> None:
+        """Mark a collection's data as changed so in-process derived indexes refresh."""
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def _load(self, key: str) -> None:
+        """Resolve and load a single collection. Caller must hold the lock."""
+        name = self.search_defaults[key]["name"]
+        start = datetime.now(timezone.utc)
+        try:
+            collection = Collection(name)
+            collection.load()
+            self._collections[key] = collection
+            self.bump_version(key)
+            self._load_state[key] = {
+                "name": name,
+                "loaded": True,
+                "loaded_at": start.isoformat(),
+                "load_ms": (datetime.now(timezone.utc) - start).total_seconds() * 1000,
+                "error": None,
+            }
+            logger.info(f"Loaded Milvus collection [{name}] in {self._load_state[key]['load_ms']:.2f} ms")
+        except Exception as e:
+            self._load_state[key] = {
+                "name": name,
+                "loaded": False,
+                "loaded_at": None,
+                "load_ms": None,
+                "error": str(e),
+            }
+            logger.error(f"Failed to load Milvus collection [{name}]: {e}")
+            raise
+
+    def load_all(self) -> Dict[str, Dict]:
+        """Resolve and load every registered collection. Errors are logged, not raised."""
+        for key in self.search_defaults:
+            try:
+                self.get(key)
+            except Exception:
+                continue
+        return self.get_load_state()
+
+    def reload(self, keys: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Drop cached handles and load them again (e.g. after ingestion)."""
+        keys = keys or list(self.search_defaults.keys())
+        with self._lock:
+            for key in keys:
+                if key not in self.search_defaults:
+                    logger.warning(f"Unknown Milvus collection key for reload: {key}")
+                    continue
+                self._collections.pop(key, None)
+                try:
+                    self._load(key)
+                except Exception:
+                    continue
+        return self.get_load_state()
+
+    def get_load_state(self) -> Dict[str, Dict]:
+        """Load state of every registered collection."""
+        state = {}
+        for key, defaults in self.search_defaults.items():
+            state[key] = self._load_state.get(key, {
+                "name": defaults["name"],
+                "loaded": False,
+                "loaded_at": None,
+                "load_ms": None,
+                "error": None,
+            })
+        return state
+
+
 class MilvusService(VectorServiceInterface):
     """Service to interact with Milvus vector database."""
+
+    # Class-level collection registry shared by all service instances
+    _registry: MilvusCollectionRegistry = None
+    _registry_lock = RLock()
+
+    # Class-level bounded executor for the async search path
+    _executor: ThreadPoolExecutor = None
+    _executor_lock = RLock()
+
     def __init__(self, host: str = None, port: str = None):
         self.host = host or settings.milvus_host
         self.port = port or settings.milvus_port
         self.connected = False
         self._connect()
+        self._initialize_registry()
+        self.registry = MilvusService._registry
+        self._initialize_executor()
+        self.executor = MilvusService._executor
 
     def _connect(self):
         """Connect to Milvus (reuses existing connection if available)"""
@@ -35,17 +193,83 @@ class MilvusService(VectorServiceInterface):
         except Exception as e:
             logger.error(f"Failed to connect to Milvus: {e}")
             self.connected = False
+
+    def _initialize_registry(self):
+        """Initialize the collection registry as singleton."""
+        if MilvusService._registry is None:
+            with MilvusService._registry_lock:
+                # Double-check after acquiring lock
+                if MilvusService._registry is None:
+                    logger.info("Initializing singleton Milvus collection registry")
+                    MilvusService._registry = MilvusCollectionRegistry(get_collection_search_defaults())
+
+    def _initialize_executor(self):
+        """Initialize the bounded search executor as singleton."""
+        if MilvusService._executor is None:
+            with MilvusService._executor_lock:
+                # Double-check after acquiring lock
+                if MilvusService._executor is None:
+                    logger.info(f"Initializing Milvus search executor with {settings.milvus_search_max_workers} workers")
+                    MilvusService._executor = ThreadPoolExecutor(
+                        max_workers=settings.milvus_search_max_workers,
+                        thread_name_prefix="milvus-search"
+                    )
+
+    @classmethod
+    def close(cls):
+        """Stop the search executor and drop the Milvus connection (application shutdown)."""
+        with cls._executor_lock:
+            executor, cls._executor = cls._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if connections.has_connection(alias="default"):
+            connections.disconnect(alias="default")
+
+    async def _run_in_executor(self, func, *args, **kwargs):
+        """Run a blocking call on the bounded executor, keeping the tracing context"""
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, func, *args, **kwargs)
+        return await loop.run_in_executor(self.executor, call)
+
+    def load_collections(self) -> Dict[str, Dict]:
+        """Resolve and load all collections once (called at startup)."""
+        return self.registry.load_all()
+
+    def reload_collections(self, keys: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Re-resolve and re-load collections, e.g. after ingestion."""
+        return self.registry.reload(keys)
+
+    def get_load_state(self) -> Dict[str, Dict]:
+        """Load state of the registered collections."""
+        return self.registry.get_load_state()
+
+    def get_collection_version(self, key: str) -> int:
+        """Data version of a collection (changes after reload/insert)."""
+        return self.registry.get_version(key)
+
+    def _search_params(self, key: str, radius: Optional[float] = None) -> Dict:
+        """Build search params (ef/nprobe, radius) from the collection config and its index profile"""
+        defaults = self.registry.get_defaults(key)
+        radius = radius if radius is not None else defaults["radius"]
+        return build_search_params(defaults["index_profile"], defaults["ef"], settings.milvus_search_nprobe, radius)
+
+    def _prepare_vectors(self, key: str, vectors: List[List[float]]) -> List[List[float]]:
+        """Normalise vectors (inserts and queries) for IP index profiles"""
+        if get_index_profile(self.registry.get_defaults(key)["index_profile"])["normalize"]:
+            return normalize_vectors(vectors)
+        return vectors
     
     def insert_products(self, products: List[Dict]) -> int:
         """Insert product embeddings into Milvus"""
-        collection = Collection("products_collection")
+        collection = self.registry.get("products")
         
         # Prepare data for insertion
         data = [
             [p["id"] for p in products],  # id
             [p["product_id"] for p in products],  # product_id
             [p["text"] for p in products],  # text
-            [p["embedding"] for p in products],  # embedding
+            self._prepare_vectors("products", [p["embedding"] for p in products]),  # embedding
             [p["chunk_index"] for p in products],  # chunk_index
             [p["total_chunks"] for p in products],  # total_chunks
             [p["category"] for p in products],  # category
@@ -56,41 +280,44 @@ class MilvusService(VectorServiceInterface):
         # Insert
         mr = collection.insert(data)
         collection.flush()
+        self.registry.bump_version("products")
         logger.info(f"Inserted {len(products)} product chunks")
         return mr.insert_count
 
     def insert_knowledge_base(self, chunks: List[Dict]) -> int:
         """Insert knowledge base chunks into Milvus"""
-        collection = Collection("knowledge_base_collection")
+        collection = self.registry.get("knowledge_base")
         
         data = [
             [c["id"] for c in chunks],
             [c["doc_id"] for c in chunks],
             [c["text"] for c in chunks],
             [c["chunk_index"] for c in chunks],
-            [c["embedding"] for c in chunks],
+            self._prepare_vectors("knowledge_base", [c["embedding"] for c in chunks]),
             [c["doc_type"] for c in chunks]
         ]
         
         mr = collection.insert(data)
         collection.flush()
+        self.registry.bump_version("knowledge_base")
         logger.info(f"Inserted {len(chunks)} knowledge base chunks")
         return mr.insert_count
     
     def insert_categories(self, categories: List[Dict]) -> int:
         """Insert category embeddings into Milvus"""
-        collection = Collection("categories_collection")
+        collection = self.registry.get("categories")
         
         data = [
             [c["id"] for c in categories],
             [c["name"] for c in categories],
             [c["full_name"] for c in categories],
-            [c["embedding"] for c in categories],
-            [c["full_embedding"] for c in categories]
+            self._prepare_vectors("categories", [c["embedding"] for c in categories]),
+            self._prepare_vectors("categories", [c["full_embedding"] for c in categories])
         ]
         
         mr = collection.insert(data)
         collection.flush()
+        self.registry.bump_version("categories")
         logger.info(f"Inserted {len(categories)} categories")
         return mr.insert_count
 
@@ -100,34 +327,57 @@ class MilvusService(VectorServiceInterface):
         query_embedding: List[float],
         top_k: int = 5,
         filters: Optional[str] = None,
-        radius: Optional[float] = None
+        radius: Optional[float] = None,
+        filter_params: Optional[Dict] = None
     ) -> List[Dict]:
         """Search products by vector similarity"""
-        collection = Collection("products_collection")
-        collection.load()
-        
-        search_params = {
-            "metric_type": "COSINE",
-            "params": {"ef": 128, 
-                       "radius": radius if radius else 0.0
-                       }
-        }
+        results = self.search_products_batch(
+            query_embeddings=[query_embedding],
+            top_k=top_k,
+            filters=filters,
+            radius=radius,
+            filter_params=filter_params
+        )
+        return results[0] if results else []
+
+    @traceable(name="milvus.search_products_batch", tags=["retrieval", "products", "embedding", "milvus"], metadata={"version": "1.0"})
+    def search_products_batch(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        filters: Optional[str] = None,
+        radius: Optional[float] = None,
+        filter_params: Optional[Dict] = None
+    ) -> List[List[Dict]]:
+        """
+        Search products for several query vectors in a single request (nq = len(query_embeddings))
+
+        Returns one list of hits per query vector, in the same order.
+        """
+        if not query_embeddings:
+            return []
+
+        collection = self.registry.get("products")
+        defaults = self.registry.get_defaults("products")
+        search_params = self._search_params("products", radius)
         
         results = collection.search(
-            data=[query_embedding],
+            data=self._prepare_vectors("products", query_embeddings),
             anns_field="embedding",
-            
             param=search_params,
             limit=top_k,
-            expr=filters,  # e.g., "price < 1000"
-            output_fields=["product_id", "text", "category", "price", "brand"]
+            expr=filters,  # e.g., "category in {categories} and price <= {max_price}"
+            expr_params=filter_params or None,  # values for the expression template
+            output_fields=defaults["output_fields"],
+            consistency_level=defaults["consistency_level"]
         )
         
-        # Format results
+        # Format results, one list per query
         formatted = []
         for hits in results:
+            query_hits = []
             for hit in hits:
-                formatted.append({
+                query_hits.append({
                     "id": hit.id,
                     "distance": hit.distance,
                     "product_id": hit.entity.get("product_id"),
@@ -136,6 +386,7 @@ class MilvusService(VectorServiceInterface):
                     "price": hit.entity.get("price"),
                     "brand": hit.entity.get("brand")
                 })
+            formatted.append(query_hits)
         
         return formatted
 
@@ -147,20 +398,17 @@ class MilvusService(VectorServiceInterface):
         radius: Optional[float] = None
     ) -> List[Dict]:
         """Search knowledge base by vector similarity"""
-        collection = Collection("knowledge_base_collection")
-        collection.load()
-        
-        search_params = {
-            "metric_type": "COSINE",
-            "params": {"ef": 64, "radius": radius if radius else 0.0}
-        }
+        collection = self.registry.get("knowledge_base")
+        defaults = self.registry.get_defaults("knowledge_base")
+        search_params = self._search_params("knowledge_base", radius)
         
         results = collection.search(
-            data=[query_embedding],
+            data=self._prepare_vectors("knowledge_base", [query_embedding]),
             anns_field="embedding",
             param=search_params,
             limit=top_k,
-            output_fields=["doc_id", "text", "doc_type"]
+            output_fields=defaults["output_fields"],
+            consistency_level=defaults["consistency_level"]
         )
         
         formatted = []
@@ -184,18 +432,16 @@ class MilvusService(VectorServiceInterface):
         top_k: int = 5,
         radius:int = None) -> List[Dict]:
         """Search categories by vector similarity"""
-        collection = Collection("categories_collection")
-        collection.load()
-        search_params = {
-            "metric_type": "COSINE",
-            "params": {"ef": 64, "radius": radius if radius else 0.0}
-        }
+        collection = self.registry.get("categories")
+        defaults = self.registry.get_defaults("categories")
+        search_params = self._search_params("categories", radius)
         results = collection.search(
-            data=[query_embedding],
+            data=self._prepare_vectors("categories", [query_embedding]),
             anns_field=field,
             param=search_params,
             limit=top_k,
-            output_fields=["name", "full_name", "embedding", "full_embedding"]
+            output_fields=defaults["output_fields"],
+            consistency_level=defaults["consistency_level"]
         )
         formatted = []
         for hits in results:
@@ -211,6 +457,91 @@ class MilvusService(VectorServiceInterface):
 
         return formatted
 
+    async def asearch_products(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        filters: Optional[str] = None,
+        radius: Optional[float] = None,
+        filter_params: Optional[Dict] = None
+    ) -> List[Dict]:
+        """Search products on the bounded executor (non-blocking)"""
+        return await self._run_in_executor(
+            self.search_products,
+            query_embedding=query_embedding,
+            top_k=top_k,
+            filters=filters,
+            radius=radius,
+            filter_params=filter_params
+        )
+
+    async def asearch_products_batch(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        filters: Optional[str] = None,
+        radius: Optional[float] = None,
+        filter_params: Optional[Dict] = None
+    ) -> List[List[Dict]]:
+        """Multi-query product search on the bounded executor (non-blocking)"""
+        return await self._run_in_executor(
+            self.search_products_batch,
+            query_embeddings=query_embeddings,
+            top_k=top_k,
+            filters=filters,
+            radius=radius,
+            filter_params=filter_params
+        )
+
+    async def asearch_knowledge_base(
+        self,
+        query_embedding: List[float],
+        top_k: int = 3,
+        radius: Optional[float] = None
+    ) -> List[Dict]:
+        """Search knowledge base on the bounded executor (non-blocking)"""
+        return await self._run_in_executor(
+            self.search_knowledge_base,
+            query_embedding=query_embedding,
+            top_k=top_k,
+            radius=radius
+        )
+
+    async def asearch_categories(
+        self,
+        query_embedding: List[float],
+        field: str = "embedding",
+        top_k: int = 5,
+        radius: Optional[float] = None
+    ) -> List[Dict]:
+        """Search categories on the bounded executor (non-blocking)"""
+        return await self._run_in_executor(
+            self.search_categories,
+            query_embedding=query_embedding,
+            field=field,
+            top_k=top_k,
+            radius=radius
+        )
+
+    @traceable(name="milvus.fetch_all_categories", tags=["categories", "milvus"], metadata={"version": "1.0"})
+    def fetch_all_categories(self, batch_size: int = 1000) -> List[Dict]:
+        """Fetch every category row with both embedding fields (categories are a small set)"""
+        collection = self.registry.get("categories")
+        iterator = collection.query_iterator(
+            batch_size=batch_size,
+            expr="",
+            output_fields=["id", "name", "full_name", "embedding", "full_embedding"]
+        )
+        rows = []
+        while True:
+            batch = iterator.next()
+            if not batch:
+                iterator.close()
+                break
+            rows.extend(batch)
+        logger.info(f"Fetched {len(rows)} categories from Milvus")
+        return rows
+
     def get_collection_stats(self, collection_name: str) -> Dict:
         """Get collection statistics"""
         collection = Collection(collection_name)
@@ -46,6 +46,14 @@ class OpenAIEmbeddingService(EmbeddingServiceInterface):
                 else:
                     logger.info("Using existing singleton Azure OpenAI client for embeddings")
 
+    @classmethod
+    def close(cls):
+        """Close the shared client (application shutdown)."""
+        with cls._client_lock:
+            client, cls._client = cls._client, None
+        if client is not None:
+            client.close()
+
     def count_tokens(self, text: str) -> int:
         """Count tokens in text"""
         return len(self.encoding.encode(text))
@@ -1,4 +1,4 @@
-from typing import List, Dict, Generator
+from typing import AsyncGenerator, List, Dict
 from langsmith import traceable
 from openai import AsyncAzureOpenAI
 import tiktoken
@@ -60,6 +60,14 @@ class OpenAILLMService(LLMServiceInterface):
                 else:
                     logger.info("Using existing singleton Azure OpenAI client")
     
+    @classmethod
+    async def close(cls):
+        """Close the shared client (application shutdown)."""
+        with cls._client_lock:
+            client, cls._client = cls._client, None
+        if client is not None:
+            await client.close()
+
     @traceable(name="llm.generate_response", tags=["llm", "openai", "azure"], metadata={"version": "1.0"})
     async def generate_response(
         self,
@@ -139,31 +147,76 @@ class OpenAILLMService(LLMServiceInterface):
             logger.error(f"Error generating response: {e}")
             raise
 
-    @traceable(name="llm.streaming_response", tags=["llm", "openai", "azure"], metadata={"version": "1.0"})    
-    def streaming_response(
+    @traceable(name="llm.streaming_response", tags=["llm", "openai", "azure", "streaming"], metadata={"version": "2.0"})    
+    async def streaming_response(
         self,
         messages: List[Dict[str, str]],
         temperature: float = 0.3,
         max_tokens: int = 500
-    ) -> Generator[str, None, None]:
+    ) -> AsyncGenerator[Dict, None]:
         """
         Generate a streaming response (for better UX)
         
         Yields:
-            Chunks of response text
+            {"content": chunk} for each content delta, then one final dict shaped
+            like generate_response (response, finish_reason, tokens, cost)
         """
         try:
-            response = self.client.chat.completions.create(
+            if self.client is None:
+                raise ValueError("Azure OpenAI client is not initialized.")
+
+            stream = await self.client.chat.completions.create(
                 model=self.deployment,
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
-                stream=True
+                top_p=0.9,
+                stream=True,
+                stream_options={"include_usage": True}
             )
             
-            for chunk in response:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content # Here Yield content chunks
+            parts = []
+            finish_reason = None
+            usage = None
+            async for chunk in stream:
+                if chunk.usage:
+                    usage = chunk.usage  # last chunk, no choices
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                if choice.delta and choice.delta.content:
+                    parts.append(choice.delta.content)
+                    yield {"content": choice.delta.content} # Here Yield content chunks
+
+            response = "".join(parts)
+            if usage:
+                prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+            else:
+                prompt_tokens = len(self.encoding.encode("\n".join([m['content'] for m in messages])))
+                completion_tokens = len(self.encoding.encode(response))
+            total_tokens = prompt_tokens + completion_tokens
+
+            total_cost = (prompt_tokens / 1_000_000) * self.input_cost + (completion_tokens / 1_000_000) * self.output_cost
+            self.total_tokens_used += total_tokens
+            self.total_cost += total_cost
+
+            logger.info(
+                f"Streamed response: {completion_tokens} tokens, "
+                f"${total_cost:.6f}, finish: {finish_reason}"
+            )
+
+            yield {
+                "response": response,
+                "finish_reason": finish_reason,
+                "tokens": {
+                    "prompt": prompt_tokens,
+                    "completion": completion_tokens,
+                    "total": total_tokens
+                },
+                "cost": total_cost
+            }
                     
         except Exception as e:
             logger.error(f"Error in streaming response: {e}")
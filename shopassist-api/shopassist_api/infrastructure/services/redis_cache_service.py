@@ -37,6 +37,14 @@ class RedisCacheService(CacheServiceInterface):
                 else:
                     logger.info("Using existing singleton Redis client")
         
+    @classmethod
+    async def close(cls):
+        """Close the shared client (application shutdown)."""
+        with cls._client_lock:
+            client, cls._client = cls._client, None
+        if client is not None:
+            await client.aclose()
+
     async def get(self, key: str) -> str:
         """Get value from cache by key"""
         value = await self.client.get(key)
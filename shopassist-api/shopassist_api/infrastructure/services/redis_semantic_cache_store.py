@@ -0,0 +1,108 @@
+import json
+import re
+import uuid
+from threading import RLock
+from typing import Dict, List, Optional
+import numpy as np
+from redis.commands.search.field import TagField, VectorField
+from redis.commands.search.index_definition import IndexDefinition, IndexType
+from redis.commands.search.query import Query
+from shopassist_api.application.interfaces.service_interfaces import SemanticCacheStoreInterface
+from shopassist_api.application.settings.config import settings
+from shopassist_api.infrastructure.services.redis_cache_service import RedisCacheService
+from shopassist_api.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def _escape_tag(value: str) -> str:
+    """Escape punctuation in a RediSearch tag value"""
+    return re.sub(r"([^A-Za-z0-9_])", r"\\\1", value)
+
+
+class RedisSemanticCacheStore(SemanticCacheStoreInterface):
+    """
+    Semantic cache store on a RediSearch vector index (Redis Stack).
+
+    Entries are hashes under {index}:entry:* with namespace/intent/version tags,
+    a FLAT cosine vector field and a JSON payload (stored, not indexed); each
+    hash expires with its TTL.
+    Shared by all API replicas.
+    """
+
+    _index_ready = False
+    _index_lock = RLock()
+
+    def __init__(self, index_name: str = None, dim: int = None):
+        self.index_name = index_name or settings.semantic_cache_index_name
+        self.prefix = f"{self.index_name}:entry:"
+        self.dim = dim
+        self.client = RedisCacheService().client
+
+    async def _ensure_index(self, dim: int):
+        """Create the index on first use; the vector dimension comes from the first embedding"""
+        if RedisSemanticCacheStore._index_ready:
+            return
+        ft = self.client.ft(self.index_name)
+        try:
+            await ft.info()
+        except Exception:
+            dim = self.dim or dim
+            logger.info(f"Creating semantic cache index [{self.index_name}] dim={dim}")
+            await ft.create_index(
+                fields=[
+                    TagField("namespace"),
+                    TagField("intent"),
+                    TagField("version"),
+                    VectorField("embedding", "FLAT", {
+                        "TYPE": "FLOAT32",
+                        "DIM": dim,
+                        "DISTANCE_METRIC": "COSINE",
+                    }),
+                ],
+                definition=IndexDefinition(prefix=[self.prefix], index_type=IndexType.HASH)
+            )
+        with RedisSemanticCacheStore._index_lock:
+            RedisSemanticCacheStore._index_ready = True
+
+    async def lookup(self, namespace: str, embedding: List[float], intents: List[str],
+                     version: str, threshold: float) -> Optional[Dict]:
+        if not intents:
+            return None
+        await self._ensure_index(len(embedding))
+        intent_filter = "|".join(_escape_tag(i) for i in intents)
+        query = (
+            Query(f"(@namespace:{{{_escape_tag(namespace)}}} @intent:{{{intent_filter}}} "
+                  f"@version:{{{_escape_tag(version)}}})=>[KNN 1 @embedding $vec AS distance]")
+            .sort_by("distance")
+            .return_fields("payload", "intent", "distance")
+            .dialect(2)
+        )
+        vector = np.asarray(embedding, dtype=np.float32).tobytes()
+        result = await self.client.ft(self.index_name).search(query, query_params={"vec": vector})
+        if not result.docs:
+            return None
+        doc = result.docs[0]
+        # COSINE distance = 1 - cosine similarity
+        similarity = 1.0 - float(doc.distance)
+        if similarity < threshold:
+            return None
+        return {**json.loads(doc.payload), "intent": doc.intent, "similarity": similarity}
+
+    async def store(self, namespace: str, embedding: List[float], intent: str,
+                    version: str, payload: Dict, ttl: int) -> None:
+        await self._ensure_index(len(embedding))
+        key = f"{self.prefix}{uuid.uuid4().hex}"
+        await self.client.hset(key, mapping={
+            "namespace": namespace,
+            "intent": intent,
+            "version": version,
+            "payload": json.dumps(payload, default=str),
+            "embedding": np.asarray(embedding, dtype=np.float32).tobytes(),
+        })
+        await self.client.expire(key, ttl)
+
+    async def clear(self, namespace: Optional[str] = None) -> None:
+        async for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            if namespace is None or await self.client.hget(key, "namespace") == namespace:
+                await self.client.delete(key)
@@ -3,6 +3,7 @@ from langsmith import traceable
 from sentence_transformers import SentenceTransformer
 from shopassist_api.application.interfaces.service_interfaces import EmbeddingServiceInterface
 from shopassist_api.application.settings.config import settings
+from shopassist_api.infrastructure.services.embedding_batcher import EmbeddingBatcher
 from threading import RLock
 from shopassist_api.logging_config import get_logger
 
@@ -14,12 +15,14 @@ class TransformersEmbeddingService(EmbeddingServiceInterface):
     # Class-level singleton with thread safety
     _model_lock = RLock()
     _model_cache = {}  # Cache multiple models by name
+    _batchers = {}  # One micro-batcher per model name
 
     def __init__(self, model_name: str = None):
         self.model_name = model_name or settings.transformers_embedding_model or "sentence-transformers/multi-qa-mpnet-base-dot-v1"
         
         # Initialize model (uses cache)
         self._initialize_client()
+        self.batcher = self._initialize_batcher() if settings.embedding_batching_enabled else None
 
     def _initialize_client(self):
         """Initialize the Transformers model based on configuration."""
@@ -37,6 +40,35 @@ class TransformersEmbeddingService(EmbeddingServiceInterface):
                     TransformersEmbeddingService._model_cache[self.model_name] = SentenceTransformer(self.model_name)
                 self.model = TransformersEmbeddingService._model_cache[self.model_name]
     
+    def _initialize_batcher(self) -> EmbeddingBatcher:
+        """Get (or create) the shared micro-batcher for this model."""
+        if self.model_name not in TransformersEmbeddingService._batchers:
+            with TransformersEmbeddingService._model_lock:
+                # Double-check after acquiring lock
+                if self.model_name not in TransformersEmbeddingService._batchers:
+                    model = self.model
+                    TransformersEmbeddingService._batchers[self.model_name] = EmbeddingBatcher(
+                        encode_fn=lambda texts: model.encode(texts, convert_to_tensor=False),
+                        max_batch_size=settings.embedding_batch_max_size,
+                        max_wait_ms=settings.embedding_batch_max_wait_ms,
+                        max_queue_size=settings.embedding_batch_max_queue_size,
+                        name=self.model_name
+                    )
+        return TransformersEmbeddingService._batchers[self.model_name]
+
+    @classmethod
+    def get_batcher_stats(cls) -> list[dict]:
+        """Micro-batching metrics for every loaded model."""
+        return [batcher.get_stats() for batcher in cls._batchers.values()]
+
+    @classmethod
+    async def close(cls):
+        """Stop the micro-batcher workers of every loaded model (application shutdown)."""
+        with cls._model_lock:
+            batchers, cls._batchers = list(cls._batchers.values()), {}
+        for batcher in batchers:
+            await batcher.close()
+
     def count_tokens(self, text: str) -> int:
         """Count tokens in text"""
         # Note: This is a rough approximation
@@ -44,11 +76,22 @@ class TransformersEmbeddingService(EmbeddingServiceInterface):
 
     @traceable(name="llm.generate_embedding", tags=["embedding", "sentence_transformer"], metadata={"version": "1.0"})
     async def generate_embedding(self, text: str) -> list[float]:
-        """Generate embedding for single text using Transformers model."""
-        #embedding = self.model.encode(text, convert_to_tensor=False)
-        embedding = await asyncio.to_thread(self.model.encode, text, convert_to_tensor=False)
+        """Generate embedding for single text using Transformers model.
+        Concurrent calls are coalesced into one encode by the micro-batcher when enabled."""
+        if self.batcher:
+            embedding = await self.batcher.submit(text)
+        else:
+            embedding = await asyncio.to_thread(self.model.encode, text, convert_to_tensor=False)
         return embedding.tolist()
 
+    @traceable(name="llm.generate_embeddings", tags=["embedding", "sentence_transformer"], metadata={"version": "1.0"})
+    async def generate_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for several texts in a single batched encode."""
+        if not texts:
+            return []
+        embeddings = await asyncio.to_thread(self.model.encode, texts, convert_to_tensor=False)
+        return [embedding.tolist() for embedding in embeddings]
+
     @traceable(name="llm.generate_embedding_batch", tags=["embedding", "sentence_transformer"], metadata={"version": "1.0"})
     def generate_embedding_batch(self, input_texts: list[str], batch_size: int = 50) -> list[dict]:
         """Generate embeddings for a list of input texts."""
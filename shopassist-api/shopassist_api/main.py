@@ -11,11 +11,18 @@ from shopassist_api.logging_config import setup_logging
 from .logging_config import get_logger
 from contextlib import asynccontextmanager
 import time
+from shopassist_api.infrastructure.services.cached_embedding_service import embedding_request_scope
+from shopassist_api.application.agents.orchestrator import AgentOrchestrator
+from shopassist_api.application.services.category_index import CategoryIndex
+from shopassist_api.application.services.keyword_index import KeywordIndex
 from shopassist_api.application.interfaces.di_container import (
     get_category_embedding_service,
+    get_checkpoint_store,
+    get_container,
     get_embedding_service,
     get_llm_service,
-    get_vector_service
+    get_vector_service,
+    request_scope
 )
 
 load_dotenv()
@@ -63,10 +70,43 @@ async def warmup_services():
     try:
         vector_service = get_vector_service()
         response = await vector_service.health_check()
-        logger.info(f"✓ Vector service ready: {response}")
+        load_state = vector_service.load_collections()
+        logger.info(f"✓ Vector service ready: {response}, collections: {load_state}")
     except Exception as e:
         logger.error(f"Failed to initialize vector service: {e}")
+
+    # Category Index
+    if settings.category_index_enabled:
+        try:
+            index = CategoryIndex.get_instance()
+            await index.ensure_fresh(get_vector_service())
+            logger.info(f"✓ Category index ready: {len(index)} categories")
+        except Exception as e:
+            logger.error(f"Failed to build category index: {e}")
     
+    # Keyword Index (built at ingestion time)
+    try:
+        keyword_index = KeywordIndex.get_instance()
+        await keyword_index.ensure_loaded()
+        logger.info(f"✓ Keyword index ready: {len(keyword_index)} chunks")
+    except Exception as e:
+        logger.error(f"Failed to load keyword index: {e}")
+
+    # Agent checkpointer (one Redis connection for the app lifetime, closed by the container)
+    try:
+        await get_checkpoint_store().open()
+        logger.info(f"✓ Agent checkpointer ready ({settings.agent_checkpoint_mode})")
+    except Exception as e:
+        logger.error(f"Failed to open agent checkpointer: {e}")
+
+    # Agent orchestrator (agents, LLM clients, compiled graph)
+    try:
+        orchestrator = AgentOrchestrator.get_instance()
+        await orchestrator.warmup()
+        logger.info("✓ Agent orchestrator ready")
+    except Exception as e:
+        logger.error(f"Failed to initialize agent orchestrator: {e}")
+
     logger.info("Service warmup complete!")
 
 
@@ -76,6 +116,9 @@ async def lifespan(app: FastAPI):
     logger.info("Starting ShopAssist API...")
     logger.info(f"API Title: {settings.api_title} Version: {settings.api_version}")
     
+    # Create the singleton services once for the whole process
+    await get_container().startup()
+
     # Warmup services
     await warmup_services()
     
@@ -83,6 +126,8 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down ShopAssist API...")
+    # Close HTTP/Redis/Cosmos/Milvus clients held by the singletons
+    await get_container().shutdown()
 
 
 app = FastAPI(
@@ -101,7 +146,9 @@ async def log_requests(request: Request, call_next):
     
     logger.warning(f"Request: {request.method} {request.url.path}")
     
-    response = await call_next(request)
+    # Request-scoped embedding memo: the same query is embedded at most once per request
+    with request_scope(), embedding_request_scope():
+        response = await call_next(request)
     
     process_time = time.time() - start_time
     logger.info(
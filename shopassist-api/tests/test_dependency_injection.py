@@ -4,7 +4,7 @@ Test dependency injection implementation.
 import pytest
 from unittest.mock import MagicMock
 from shopassist_api.application.interfaces.service_interfaces import RepositoryServiceInterface
-from shopassist_api.application.interfaces.di_container import get_repository_service
+from shopassist_api.application.interfaces.di_container import DIContainer, Scope, get_repository_service, request_scope
 from shopassist_api.infrastructure.services.cosmos_product_service import CosmosProductService
 
 
@@ -34,3 +34,83 @@ def test_product_service_methods_exist():
     assert callable(service.get_product_by_id)
     assert callable(service.search_products_by_category)
     assert callable(service.search_products_by_price_range)
+
+
+class FakeClient:
+    closed = []
+
+    def __init__(self, name):
+        self.name = name
+
+    async def close(self):
+        FakeClient.closed.append(self.name)
+
+
+class SharedClient:
+    closes = 0
+
+    @classmethod
+    def close(cls):
+        cls.closes += 1
+
+
+class TestContainerScopes:
+    def setup_method(self):
+        FakeClient.closed = []
+        SharedClient.closes = 0
+        self.container = DIContainer()
+
+    def test_singleton_is_created_once(self):
+        factory = MagicMock(side_effect=lambda c: object())
+        self.container.register("svc", factory, Scope.SINGLETON)
+        assert self.container.get_service("svc") is self.container.get_service("svc")
+        assert factory.call_count == 1
+
+    def test_disabled_singleton_is_cached(self):
+        factory = MagicMock(return_value=None)
+        self.container.register("svc", factory, Scope.SINGLETON)
+        assert self.container.get_service("svc") is None
+        assert self.container.get_service("svc") is None
+        assert factory.call_count == 1
+
+    def test_transient_is_created_every_time(self):
+        self.container.register("svc", lambda c: object(), Scope.TRANSIENT)
+        assert self.container.get_service("svc") is not self.container.get_service("svc")
+
+    def test_request_scope(self):
+        self.container.register("svc", lambda c: object(), Scope.REQUEST)
+        with request_scope():
+            first = self.container.get_service("svc")
+            assert self.container.get_service("svc") is first
+        with request_scope():
+            assert self.container.get_service("svc") is not first
+        # Outside a request the service is transient
+        assert self.container.get_service("svc") is not self.container.get_service("svc")
+
+    def test_scope_override(self):
+        container = DIContainer(scope_override=Scope.TRANSIENT)
+        container.register("svc", lambda c: object(), Scope.SINGLETON)
+        assert container.get_service("svc") is not container.get_service("svc")
+
+    def test_factories_resolve_dependencies(self):
+        self.container.register("client", lambda c: FakeClient("client"))
+        self.container.register("service", lambda c: {"client": c.get_service("client")})
+        assert self.container.get_service("service")["client"] is self.container.get_service("client")
+
+    async def test_shutdown_closes_in_reverse_creation_order(self):
+        self.container.register("redis", lambda c: FakeClient("redis"))
+        self.container.register("cosmos", lambda c: FakeClient("cosmos"))
+        self.container.register("shared_a", lambda c: SharedClient())
+        self.container.register("shared_b", lambda c: SharedClient())
+        self.container.register("service", lambda c: [c.get_service(key) for key in ("redis", "cosmos", "shared_a", "shared_b")])
+        self.container.get_service("service")
+
+        await self.container.shutdown()
+
+        assert FakeClient.closed == ["cosmos", "redis"]
+        assert SharedClient.closes == 1  # class-level client closed once
+        assert self.container._singletons == {}
+
+    def test_unknown_service(self):
+        with pytest.raises(ValueError):
+            self.container.get_service("missing")
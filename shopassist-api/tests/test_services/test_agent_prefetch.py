@@ -0,0 +1,70 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from shopassist_api.application.agents.prefetch import AgentPrefetch
+from shopassist_api.application.prompts.agent_templates import PrefetchTemplates
+
+
+class FakeLLM:
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+
+    async def ainvoke(self, messages, config=None):
+        self.calls.append((messages, config))
+        return AIMessage(content=self.reply, usage_metadata={"input_tokens": 50, "output_tokens": 10, "total_tokens": 60})
+
+
+class TestAgentPrefetch:
+    def setup_method(self):
+        AgentPrefetch._stats = {}
+
+    async def test_answer_uses_context_in_one_call(self):
+        llm = FakeLLM("Returns are accepted within 30 days.")
+        prefetch = AgentPrefetch("policy", llm, "SYSTEM")
+        history = [HumanMessage(content="hi"), AIMessage(content="hello")]
+
+        message = await prefetch.answer("return policy?", "Source 1 [returns]: 30 days", history)
+
+        assert message.content == "Returns are accepted within 30 days."
+        assert len(llm.calls) == 1
+        messages, config = llm.calls[0]
+        assert isinstance(messages[0], SystemMessage)
+        assert messages[0].content.startswith("SYSTEM") and "Source 1 [returns]: 30 days" in messages[0].content
+        assert messages[1:3] == history
+        assert messages[-1].content == "return policy?"
+        assert "prefetch" in config["tags"]
+
+    async def test_missing_info_reply_falls_back(self):
+        prefetch = AgentPrefetch("product_detail", FakeLLM(PrefetchTemplates.MISSING_INFO), "SYSTEM")
+        assert await prefetch.answer("does it have stabilization?", "No products found") is None
+
+    def test_history_drops_tool_traffic(self):
+        tool_call = AIMessage(content="", tool_calls=[{"name": "search_product", "args": {}, "id": "call_1"}])
+        messages = [HumanMessage(content="q1"), tool_call, ToolMessage(content="{}", tool_call_id="call_1"),
+                    AIMessage(content="a1"), HumanMessage(content="q2"), AIMessage(content="a2")]
+        assert [msg.content for msg in AgentPrefetch.history(messages, limit=3)] == ["a1", "q2", "a2"]
+        assert AgentPrefetch.history(messages, limit=0) == []
+
+    def test_turn_llm_calls_counts_last_turn_only(self):
+        messages = [HumanMessage(content="q1"), AIMessage(content="a1"),
+                    HumanMessage(content="q2"), AIMessage(content=""), ToolMessage(content="{}", tool_call_id="c"),
+                    AIMessage(content="a2")]
+        assert AgentPrefetch.turn_llm_calls(messages) == 2
+
+    def test_stats_report_calls_and_latency_saved(self):
+        AgentPrefetch.record("policy", "react", 2000.0, 2)
+        AgentPrefetch.record("policy", "prefetch", 900.0, 1)
+        AgentPrefetch.record("policy", "prefetch", 1100.0, 1)
+        AgentPrefetch.record("policy", "fallback", 500.0, 1)
+
+        stats = AgentPrefetch.get_stats()["policy"]
+        assert stats["prefetch_runs"] == 2 and stats["fallbacks"] == 1 and stats["react_runs"] == 1
+        assert stats["fallback_rate"] == pytest.approx(1 / 3)
+        # two prefetch runs save one call each, the fallback wasted one
+        assert stats["llm_calls_saved"] == pytest.approx(1)
+        assert stats["latency_saved_ms"] == pytest.approx(2 * (2000 - 1000) - 500)
+
+    def test_no_baseline_without_react_runs(self):
+        AgentPrefetch.record("product_search", "prefetch", 800.0, 1)
+        stats = AgentPrefetch.get_stats()["product_search"]
+        assert stats["llm_calls_saved"] is None and stats["latency_saved_ms"] is None
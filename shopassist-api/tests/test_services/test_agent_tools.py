@@ -0,0 +1,52 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from shopassist_api.application.agents import product_discovery_agent
+from shopassist_api.application.agents.agent_utils import AgentTools
+from shopassist_api.application.agents.product_discovery_agent import search_products
+
+PRODUCT = {
+    "id": "p1", "name": "Sony WH-CH720N", "price": 89.99, "category": "Headphones", "brand": "Sony",
+    "description": "Wireless noise cancelling headphones", "availability": "in_stock",
+    "image_url": "https://img.example.com/p1.png", "product_url": "https://shop.example.com/p1", "distance": 0.82
+}
+
+
+class TestAgentTools:
+    def test_tool_artifacts_of_last_turn(self):
+        messages = [
+            HumanMessage(content="headphones"),
+            ToolMessage(content="Product 1: Old", artifact=[{"id": "old"}], tool_call_id="c1", name="search_products"),
+            AIMessage(content="Here are some headphones"),
+            HumanMessage(content="cheaper ones?"),
+            ToolMessage(content="Product 1: A", artifact=[{"id": "a"}], tool_call_id="c2", name="search_products"),
+            ToolMessage(content="Product 1: B", artifact=[{"id": "b"}], tool_call_id="c3", name="search_products"),
+            ToolMessage(content="[]", artifact=["Headphones"], tool_call_id="c4", name="search_categories"),
+            AIMessage(content="Here are cheaper ones"),
+        ]
+        assert AgentTools.tool_artifacts(messages, "search_products") == [{"id": "a"}, {"id": "b"}]
+
+    def test_tool_artifacts_without_artifact(self):
+        messages = [HumanMessage(content="q"), ToolMessage(content="ctx", tool_call_id="c1", name="search_products")]
+        assert AgentTools.tool_artifacts(messages, "search_products") == []
+
+    async def test_search_products_sources_stay_out_of_the_content(self, monkeypatch):
+        retrieval = MagicMock()
+        retrieval.retrieve_products = AsyncMock(return_value=[PRODUCT])
+        monkeypatch.setattr(product_discovery_agent, "get_retrieval_service", lambda: retrieval)
+
+        assert search_products.response_format == "content_and_artifact"
+        context, products = await search_products.coroutine({"user_query": "sony headphones", "categories": []})
+
+        assert "Sony WH-CH720N" in context
+        assert "https://" not in context
+        assert products[0]["product_url"] == PRODUCT["product_url"]
+
+    async def test_search_products_nothing_found(self, monkeypatch):
+        retrieval = MagicMock()
+        retrieval.retrieve_products = AsyncMock(return_value=[])
+        monkeypatch.setattr(product_discovery_agent, "get_retrieval_service", lambda: retrieval)
+
+        context, products = await search_products.coroutine({"user_query": "zebra umbrella"})
+        assert products == []
+        assert context.startswith("No products found")
@@ -0,0 +1,53 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from shopassist_api.infrastructure.services.cached_embedding_service import CachedEmbeddingService, embedding_request_scope
+
+class FakeCache:
+    def __init__(self):
+        self.data = {}
+    async def get(self, key):
+        return self.data.get(key)
+    async def set(self, key, value, ttl=None):
+        self.data[key] = value
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+class TestCachedEmbeddingService:
+    def setup_method(self):
+        CachedEmbeddingService._l1.clear()
+        self.inner = MagicMock()
+        self.inner.model_name = "test-model"
+        self.inner.generate_embedding = AsyncMock(return_value=[0.5, 0.25])
+        self.inner.generate_embeddings = AsyncMock(side_effect=lambda texts: [[float(len(t))] for t in texts])
+
+    async def test_l1_hit_on_normalised_text(self):
+        service = CachedEmbeddingService(self.inner, l1_size=10)
+        first = await service.generate_embedding("Wireless  Headphones")
+        second = await service.generate_embedding("wireless headphones")
+        assert first == second
+        self.inner.generate_embedding.assert_awaited_once()
+
+    async def test_request_memo_without_l1(self):
+        service = CachedEmbeddingService(self.inner, l1_size=0)
+        with embedding_request_scope():
+            await service.generate_embedding("laptop")
+            await service.generate_embedding("laptop")
+        self.inner.generate_embedding.assert_awaited_once()
+
+    async def test_l2_round_trip(self):
+        cache = FakeCache()
+        writer = CachedEmbeddingService(self.inner, cache_service=cache, l1_size=0, l2_dtype="float32")
+        await writer.generate_embedding("camera")
+        assert len(cache.data) == 1
+
+        reader = CachedEmbeddingService(self.inner, cache_service=cache, l1_size=0, l2_dtype="float32")
+        vector = await reader.generate_embedding("camera")
+        assert vector == [0.5, 0.25]
+        self.inner.generate_embedding.assert_awaited_once()
+
+    async def test_batch_only_embeds_misses(self):
+        service = CachedEmbeddingService(self.inner, l1_size=10)
+        await service.generate_embeddings(["a", "bb"])
+        vectors = await service.generate_embeddings(["a", "bb", "ccc"])
+        assert vectors == [[1.0], [2.0], [3.0]]
+        assert self.inner.generate_embeddings.await_args_list[-1].args[0] == ["ccc"]
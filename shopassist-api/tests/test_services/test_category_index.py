@@ -0,0 +1,47 @@
+import pytest
+from unittest.mock import MagicMock
+from shopassist_api.application.services.category_index import CategoryIndex
+
+CATEGORIES = [
+    {"id": 1, "name": "Headphones", "full_name": "Electronics > Audio > Headphones",
+     "embedding": [1.0, 0.0, 0.0], "full_embedding": [0.9, 0.1, 0.0]},
+    {"id": 2, "name": "Laptops", "full_name": "Electronics > Computers > Laptops",
+     "embedding": [0.0, 1.0, 0.0], "full_embedding": [0.1, 0.9, 0.0]},
+    {"id": 3, "name": "Cameras", "full_name": "Electronics > Cameras",
+     "embedding": [0.0, 0.0, 1.0], "full_embedding": [0.0, 0.1, 0.9]},
+]
+
+
+class TestCategoryIndex:
+    def setup_method(self):
+        self.index = CategoryIndex()
+        self.index.build(CATEGORIES, version=1)
+
+    def test_search_orders_by_weighted_score(self):
+        results = self.index.search([1.0, 0.2, 0.0], top_k=3)
+        assert [r["id"] for r in results] == ["1", "2", "3"]
+        top = results[0]
+        assert top["score"] == pytest.approx(0.7 * top["sim_full"] + 0.3 * top["sim_short"])
+
+    def test_search_applies_top_k_and_radius(self):
+        assert len(self.index.search([1.0, 0.2, 0.0], top_k=1)) == 1
+        results = self.index.search([1.0, 0.0, 0.0], top_k=3, radius=0.5)
+        assert [r["id"] for r in results] == ["1"]
+
+    def test_empty_index_returns_no_results(self):
+        index = CategoryIndex()
+        assert not index.is_ready
+        assert index.search([1.0, 0.0, 0.0]) == []
+
+    async def test_ensure_fresh_rebuilds_on_version_change(self):
+        vector_service = MagicMock()
+        vector_service.get_collection_version.return_value = 1
+        vector_service.fetch_all_categories.return_value = CATEGORIES[:2]
+
+        await self.index.ensure_fresh(vector_service)
+        vector_service.fetch_all_categories.assert_not_called()
+
+        vector_service.get_collection_version.return_value = 2
+        await self.index.ensure_fresh(vector_service)
+        assert len(self.index) == 2
+        assert self.index.version == 2
@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from shopassist_api.application.agents.checkpointing import CheckpointStore, _CheckpointMetrics, trim_thread
+from shopassist_api.application.settings.config import settings
+
+
+def turns(count):
+    messages = []
+    for turn in range(count):
+        messages += [
+            HumanMessage(content=f"question {turn}"),
+            AIMessage(content="", tool_calls=[{"name": "search_products", "args": {}, "id": f"c{turn}"}]),
+            ToolMessage(content="products " * 50, tool_call_id=f"c{turn}", name="search_products"),
+            AIMessage(content=f"answer {turn}"),
+        ]
+    return messages
+
+
+class TestTrimThread:
+    def test_thread_within_limits_is_untouched(self):
+        assert trim_thread(turns(2), max_tokens=10000, max_messages=8) is None
+
+    def test_trims_whole_turns_by_message_count(self):
+        messages = turns(5)
+        kept = trim_thread(messages, max_tokens=10000, max_messages=8)
+        assert kept == messages[12:]
+        assert isinstance(kept[0], HumanMessage)
+
+    def test_trims_by_tokens_and_keeps_summary(self):
+        messages = [SystemMessage(content="Summary of the earlier conversation:\n...")] + turns(5)
+        kept = trim_thread(messages, max_tokens=200, max_messages=100)
+        assert kept[0] is messages[0]
+        assert isinstance(kept[1], HumanMessage)
+        assert kept[-1].content == "answer 4"
+        assert len(kept) < len(messages)
+
+    def test_current_turn_is_always_kept(self):
+        messages = turns(3)
+        assert trim_thread(messages, max_tokens=1, max_messages=1) == messages[8:]
+
+
+class TestCheckpointStats:
+    def setup_method(self):
+        CheckpointStore._stats = {key: 0 for key in CheckpointStore._stats}
+
+    def test_size_and_latency_stats(self):
+        CheckpointStore._stats.update({"reads": 2, "read_ms": 3.0, "writes": 2, "write_ms": 8.0})
+        CheckpointStore.record_size(1000, 4)
+        CheckpointStore.record_size(3000, 10)
+        stats = CheckpointStore.get_stats()
+        assert stats["avg_read_ms"] == 1.5
+        assert stats["avg_write_ms"] == 4.0
+        assert stats["avg_checkpoint_bytes"] == 2000
+        assert stats["max_checkpoint_bytes"] == 3000 and stats["max_messages"] == 10
+
+    async def test_size_is_sampled(self, monkeypatch):
+        class BaseSaver:
+            async def aput(self, config, checkpoint, metadata, new_versions):
+                return config
+
+        class Saver(_CheckpointMetrics, BaseSaver):
+            serde = SimpleNamespace(dumps_typed=lambda checkpoint: ("json", b"x" * 100))
+
+        monkeypatch.setattr(settings, "agent_checkpoint_size_sample_every", 5)
+        saver = Saver()
+        checkpoint = {"channel_values": {"messages": [1, 2, 3]}}
+        for _ in range(10):
+            await saver.aput({"configurable": {"thread_id": "s1"}}, checkpoint, {}, {})
+        stats = CheckpointStore.get_stats()
+        assert stats["writes"] == 10
+        assert stats["size_samples"] == 2
+        assert stats["avg_checkpoint_bytes"] == 100 and stats["max_messages"] == 3
+
+
+class TestHasThread:
+    def store_with(self, aget_tuple):
+        store = CheckpointStore(redis_url="redis://unused")
+        store._saver = SimpleNamespace(aget_tuple=aget_tuple)
+        return store
+
+    async def test_first_turn_has_no_thread(self):
+        async def aget_tuple(config):
+            return None if config["configurable"]["thread_id"] == "new" else object()
+
+        store = self.store_with(aget_tuple)
+        assert await store.has_thread("new") is False
+        assert await store.has_thread("s1") is True
+
+    async def test_errors_count_as_existing_thread(self):
+        async def aget_tuple(config):
+            raise ConnectionError("redis down")
+
+        assert await self.store_with(aget_tuple).has_thread("s1") is True
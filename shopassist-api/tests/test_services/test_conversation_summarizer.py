@@ -0,0 +1,152 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from shopassist_api.application.agents.thread_summarizer import ThreadSummarizer
+from shopassist_api.application.services.conversation_summarizer import ConversationSummarizer
+from shopassist_api.domain.models.message import Message
+
+
+class FakeLLM:
+    def __init__(self):
+        self.calls = []
+
+    async def generate_response(self, messages, temperature=0.7, max_tokens=None):
+        self.calls.append(messages[-1]["content"])
+        return {"response": f"summary {len(self.calls)}", "tokens": {"prompt": 0, "completion": 0, "total": 0}}
+
+
+class FakeCache:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.store[key] = value
+
+
+class FakeRepository:
+    def __init__(self):
+        self.messages = []
+
+    def add(self, role, content, products=None):
+        self.messages.append({"id": f"m{len(self.messages)}", "user_id": "u1", "session_id": "s1", "role": role,
+                              "content": content, "timestamp": "", "metadata": {"products": products or []}})
+
+    async def get_conversation_history(self, session_id, limit=None):
+        return list(self.messages)
+
+
+class TestConversationSummarizer:
+    def setup_method(self):
+        ConversationSummarizer._stats = {"refreshes": 0, "folded_messages": 0, "skipped": 0, "errors": 0, "trimmed_prompts": 0}
+        self.llm, self.cache, self.repository = FakeLLM(), FakeCache(), FakeRepository()
+        self.summarizer = ConversationSummarizer(self.llm, self.cache, self.repository,
+                                                 verbatim_messages=2, token_budget=1000, summary_max_tokens=100, ttl=60)
+
+    def add_turns(self, count):
+        for _ in range(count):
+            turn = len(self.repository.messages) // 2
+            self.repository.add("user", f"question {turn}")
+            self.repository.add("assistant", f"answer {turn}", products=[{"id": f"p{turn}", "name": f"Laptop {turn}"}])
+
+    async def test_refresh_folds_only_messages_outside_the_window(self):
+        self.add_turns(1)
+        assert await self.summarizer.refresh("s1") == {"summary": "", "last_id": None}
+        assert self.llm.calls == []
+
+        self.add_turns(2)
+        state = await self.summarizer.refresh("s1")
+        assert state == {"summary": "summary 1", "last_id": "m3"}
+        assert "Laptop 0 (p0)" in self.llm.calls[0]
+
+        self.add_turns(1)
+        await self.summarizer.refresh("s1")
+        # Only the two messages added since are folded, on top of the previous summary
+        assert "summary 1" in self.llm.calls[1]
+        assert "question 2" in self.llm.calls[1] and "question 0" not in self.llm.calls[1]
+        assert json.loads(self.cache.store["summary:s1"])["last_id"] == "m5"
+        assert ConversationSummarizer.get_stats()["folded_messages"] == 6
+
+    async def test_history_text_is_summary_plus_uncovered_messages(self):
+        self.add_turns(3)
+        await self.summarizer.refresh("s1")
+        history = [Message.model_validate(msg) for msg in self.repository.messages]
+        text = await self.summarizer.history_text("s1", history)
+        assert text.startswith("Conversation summary:\nsummary 1")
+        assert "question 2" in text and "question 1" not in text
+
+    async def test_history_text_respects_token_budget(self):
+        self.summarizer.token_budget = 20
+        self.add_turns(5)
+        history = [Message.model_validate(msg) for msg in self.repository.messages]
+        text = await self.summarizer.history_text("s1", history)
+        assert "answer 4" in text and "question 0" not in text
+        assert ConversationSummarizer.get_stats()["trimmed_prompts"] == 1
+
+
+class FakeAgent:
+    def __init__(self, messages):
+        self.messages = messages
+        self.checkpoint = 0
+        self.aupdate_state = AsyncMock()
+
+    async def aget_state(self, config):
+        return SimpleNamespace(values={"messages": self.messages},
+                               config={"configurable": {"checkpoint_id": str(self.checkpoint)}})
+
+
+def thread(turns):
+    messages = []
+    for turn in range(turns):
+        messages += [
+            HumanMessage(content=f"question {turn} " * 20),
+            AIMessage(content="", tool_calls=[{"name": "search_products", "args": {}, "id": f"c{turn}"}]),
+            ToolMessage(content="products", tool_call_id=f"c{turn}", name="search_products",
+                        artifact=[{"id": f"p{turn}", "name": f"Laptop {turn}"}]),
+            AIMessage(content=f"answer {turn} " * 20),
+        ]
+    return messages
+
+
+class TestThreadSummarizer:
+    def setup_method(self):
+        ThreadSummarizer._stats = {"compactions": 0, "removed_messages": 0, "skipped_concurrent": 0, "errors": 0}
+        self.llm = FakeLLM()
+        self.summarizer = ConversationSummarizer(self.llm, FakeCache(), FakeRepository(), verbatim_messages=2)
+        self.threads = ThreadSummarizer(self.summarizer, token_budget=100, keep_messages=2)
+
+    def test_cutoff_keeps_tool_calls_with_their_turn(self):
+        messages = thread(3)
+        assert self.threads.cutoff(messages) == 8
+        assert self.threads.cutoff(thread(1)) == 0
+
+    async def test_compact_replaces_older_turns_with_summary(self):
+        agent = FakeAgent(thread(3))
+        assert await self.threads.compact(agent, "s1")
+
+        update = agent.aupdate_state.await_args.args[1]["messages"]
+        assert isinstance(update[1], SystemMessage)
+        assert update[1].content == ThreadSummarizer.SUMMARY_PREFIX + "summary 1"
+        assert update[2:] == agent.messages[8:]
+        assert "Laptop 1 (p1)" in self.llm.calls[0]
+        assert ThreadSummarizer.get_stats()["removed_messages"] == 8
+
+    async def test_compact_skips_small_threads(self):
+        agent = FakeAgent(thread(1))
+        assert not await self.threads.compact(agent, "s1")
+        agent.aupdate_state.assert_not_awaited()
+
+    async def test_compact_skips_when_thread_changed(self):
+        agent = FakeAgent(thread(3))
+
+        async def summarize(previous, transcript):
+            agent.checkpoint += 1
+            return "summary"
+        self.summarizer.summarize = summarize
+
+        assert not await self.threads.compact(agent, "s1")
+        agent.aupdate_state.assert_not_awaited()
+        assert ThreadSummarizer.get_stats()["skipped_concurrent"] == 1
@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from shopassist_api.infrastructure.services.embedding_batcher import EmbeddingBatcher
+
+class TestEmbeddingBatcher:
+    def setup_method(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    async def test_concurrent_requests_are_batched(self):
+        batcher = EmbeddingBatcher(self.encode, max_batch_size=8, max_wait_ms=20)
+        texts = ["a", "bb", "ccc", "dddd"]
+        results = await asyncio.gather(*[batcher.submit(t) for t in texts])
+        await batcher.close()
+
+        assert results == [[1.0], [2.0], [3.0], [4.0]]
+        assert len(self.calls) == 1
+        assert batcher.get_stats()["total_batches"] == 1
+
+    async def test_max_batch_size_splits_batches(self):
+        batcher = EmbeddingBatcher(self.encode, max_batch_size=2, max_wait_ms=20)
+        results = await asyncio.gather(*[batcher.submit(t) for t in ["a", "b", "c"]])
+        await batcher.close()
+
+        assert len(results) == 3
+        assert all(len(call) <= 2 for call in self.calls)
+
+    async def test_encode_error_propagates_to_callers(self):
+        def failing_encode(texts):
+            raise RuntimeError("boom")
+
+        batcher = EmbeddingBatcher(failing_encode, max_batch_size=4, max_wait_ms=1)
+        with pytest.raises(RuntimeError):
+            await batcher.submit("a")
+        await batcher.close()
+        assert batcher.get_stats()["total_errors"] == 1
+
+    async def test_dead_worker_restarts_on_the_same_queue(self):
+        batcher = EmbeddingBatcher(self.encode, max_batch_size=4, max_wait_ms=1)
+        batcher._ensure_worker()
+        batcher._worker.cancel()
+        await asyncio.sleep(0)
+        queue = batcher._queue
+        # queued while the worker is down
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait(("abc", future))
+
+        assert await batcher.submit("a") == [1.0]
+        assert await future == [3.0]
+        assert batcher._queue is queue
+        await batcher.close()
+
+    async def test_close_fails_queued_requests(self):
+        batcher = EmbeddingBatcher(self.encode, max_batch_size=4, max_wait_ms=1)
+        batcher._ensure_worker()
+        await batcher.close()
+        future = asyncio.get_running_loop().create_future()
+        batcher._queue.put_nowait(("abc", future))
+        await batcher.close()
+        with pytest.raises(RuntimeError):
+            await future
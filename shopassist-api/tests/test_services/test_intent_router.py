@@ -0,0 +1,63 @@
+import zlib
+import numpy as np
+import pytest
+from shopassist_api.application.agents.intent_router import IntentRouter
+
+EXAMPLES = {
+    "policy": ["return policy", "what is the return policy", "shipping time", "warranty coverage"],
+    "product_search": ["wireless headphones", "gaming laptop", "cheap wireless headphones", "laptop for gaming"],
+    "comparison": ["compare laptop and tablet", "compare headphones and earbuds"],
+}
+
+
+class FakeEmbeddingService:
+    """Bag of words hashed into 64 dimensions"""
+    model_name = "fake-bow"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_embeddings(self, texts):
+        self.calls += 1
+        vectors = []
+        for text in texts:
+            vector = np.zeros(64, dtype=np.float32)
+            for word in text.lower().replace("?", " ").split():
+                vector[zlib.crc32(word.encode()) % 64] += 1.0
+            vectors.append(vector.tolist())
+        return vectors
+
+
+class TestIntentRouter:
+    def setup_method(self):
+        IntentRouter._stats = {"queries": 0, "bypassed": 0, "low_confidence": 0, "multi_intent": 0, "errors": 0}
+        self.embedder = FakeEmbeddingService()
+        self.router = IntentRouter(examples=EXAMPLES, threshold=0.5, margin=0.05)
+
+    async def test_confident_single_intent_is_routed_locally(self):
+        decision = await self.router.route("what is your return policy", self.embedder)
+        assert decision is not None
+        assert [route.intent for route in decision.routes] == ["policy"]
+        assert decision.routes[0].query == "what is your return policy"
+        assert decision.metadata.total_token == 0
+
+    async def test_low_confidence_falls_back(self):
+        assert await self.router.route("zebra umbrella", self.embedder) is None
+        assert IntentRouter.get_stats()["low_confidence"] == 1
+
+    async def test_multi_intent_falls_back(self):
+        decision = await self.router.route("what is the return policy and show cheap wireless headphones", self.embedder)
+        assert decision is None
+        assert IntentRouter.get_stats()["multi_intent"] == 1
+
+    async def test_comparison_spanning_and_is_routed(self):
+        decision = await self.router.route("compare gaming laptop and tablet", self.embedder)
+        assert decision is not None and decision.routes[0].intent == "comparison"
+
+    async def test_examples_embedded_once_and_bypass_rate(self):
+        await self.router.route("return policy", self.embedder)
+        await self.router.route("zebra umbrella", self.embedder)
+        assert self.embedder.calls == 3  # examples + one call per query
+        stats = IntentRouter.get_stats()
+        assert stats["queries"] == 2 and stats["bypassed"] == 1
+        assert stats["bypass_rate"] == pytest.approx(0.5)
@@ -0,0 +1,57 @@
+import pytest
+from shopassist_api.application.services.keyword_index import KeywordIndex, tokenize
+
+CHUNKS = [
+    {"id": "c1", "product_id": "p1", "text": "Sony WH-1000XM4 wireless noise cancelling headphones",
+     "category": "Headphones", "price": 278.0, "brand": "Sony"},
+    {"id": "c2", "product_id": "p2", "text": "Bose QuietComfort 45 wireless headphones",
+     "category": "Headphones", "price": 329.0, "brand": "Bose"},
+    {"id": "c3", "product_id": "p3", "text": "Sony Alpha a7 III mirrorless camera",
+     "category": "Cameras", "price": 1998.0, "brand": "Sony"},
+    {"id": "c4", "product_id": "p1", "text": "Sony headphones with 30 hour battery",
+     "category": "Headphones", "price": 278.0, "brand": "Sony"},
+]
+
+
+class TestKeywordIndex:
+    def setup_method(self):
+        self.index = KeywordIndex(k1=1.2, b=0.75)
+        self.index.build(CHUNKS)
+
+    def test_tokenize_model_numbers(self):
+        tokens = tokenize("WH-1000XM4")
+        assert "wh-1000xm4" in tokens
+        assert "wh1000xm4" in tokens
+        assert "1000xm4" in tokens
+
+    def test_exact_model_number_ranks_first(self):
+        results = self.index.search("wh1000xm4", top_k=3)
+        assert [r["product_id"] for r in results] == ["p1"]
+
+    def test_one_result_per_product(self):
+        results = self.index.search("sony headphones", top_k=5)
+        product_ids = [r["product_id"] for r in results]
+        assert len(product_ids) == len(set(product_ids))
+        assert product_ids[0] == "p1"
+
+    def test_filters_applied(self):
+        results = self.index.search("sony", top_k=5, filters={"categories": ["Cameras"]})
+        assert [r["product_id"] for r in results] == ["p3"]
+        results = self.index.search("wireless headphones", top_k=5, filters={"max_price": 300})
+        assert [r["product_id"] for r in results] == ["p1"]
+
+    def test_category_and_categories_both_apply(self):
+        # Same AND semantics as RetrievalService._build_filter_expression
+        results = self.index.search("sony", top_k=5, filters={"category": "Headphones", "categories": ["Cameras"]})
+        assert results == []
+        results = self.index.search("sony", top_k=5, filters={"category": "", "categories": ["Cameras"]})
+        assert [r["product_id"] for r in results] == ["p3"]
+
+    def test_save_and_load(self, tmp_path):
+        path = self.index.save(str(tmp_path / "keyword_index.npz"))
+        loaded = KeywordIndex(k1=1.2, b=0.75)
+        loaded.load(str(path))
+        assert len(loaded) == len(CHUNKS)
+        assert loaded.search("bose", top_k=1)[0]["product_id"] == "p2"
+        assert loaded.search("alpha camera")[0]["keyword_score"] == pytest.approx(
+            self.index.search("alpha camera")[0]["keyword_score"])
@@ -0,0 +1,68 @@
+import json
+import pytest
+from shopassist_api.infrastructure.services.local_vector_service import LocalVectorService, compile_filter
+
+PRODUCTS = [
+    {"id": "c1", "product_id": "p1", "text": "headphones", "embedding": [1.0, 0.0, 0.0],
+     "chunk_index": 0, "total_chunks": 1, "category": "Headphones", "price": 99.0, "brand": "Sony"},
+    {"id": "c2", "product_id": "p2", "text": "laptop", "embedding": [0.0, 1.0, 0.0],
+     "chunk_index": 0, "total_chunks": 1, "category": "Laptops", "price": 1200.0, "brand": "Apple"},
+    {"id": "c3", "product_id": "p3", "text": "camera", "embedding": [0.6, 0.0, 0.8],
+     "chunk_index": 0, "total_chunks": 1, "category": "Cameras", "price": 450.0, "brand": "Sony"},
+]
+
+
+class TestCompileFilter:
+    def test_expression_from_build_filter_expression(self):
+        predicate = compile_filter("price >= 100 and price <= 500 and (category == 'Cameras' or category == 'Laptops')")
+        assert [p["id"] for p in PRODUCTS if predicate(p)] == ["c3"]
+
+    def test_parameterised_template(self):
+        predicate = compile_filter(
+            "price <= {max_price} and category in {categories}",
+            {"max_price": 500.0, "categories": ["Headphones", "Cameras"]})
+        assert [p["id"] for p in PRODUCTS if predicate(p)] == ["c1", "c3"]
+
+    def test_quoted_values_with_keywords(self):
+        predicate = compile_filter("brand == 'Black and Decker'")
+        assert predicate({"brand": "Black and Decker"})
+        assert not predicate({"brand": "Black"})
+
+    def test_empty_expression(self):
+        assert compile_filter(None) is None
+
+
+class TestLocalVectorService:
+    def setup_method(self):
+        LocalVectorService._collections = {}
+        LocalVectorService._versions = {}
+        LocalVectorService._load_state = {}
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        products_file = tmp_path / "products.jsonl"
+        products_file.write_text("\n".join(json.dumps(p) for p in PRODUCTS))
+        service = LocalVectorService(engine="exact", data_dir=str(tmp_path / "vectors"))
+        service.files["products"] = str(products_file)
+        return service
+
+    def test_search_products_exact(self, service):
+        results = service.search_products([1.0, 0.0, 0.1], top_k=2)
+        assert [r["product_id"] for r in results] == ["p1", "p3"]
+        assert results[0]["distance"] > results[1]["distance"]
+
+    def test_search_products_with_filter_and_radius(self, service):
+        results = service.search_products([1.0, 0.0, 0.0], top_k=3, filters="brand == 'Sony' and price >= 100")
+        assert [r["product_id"] for r in results] == ["p3"]
+        results = service.search_products([1.0, 0.0, 0.0], top_k=3,
+                                          filters="brand == {brand}", filter_params={"brand": "Apple"})
+        assert [r["product_id"] for r in results] == ["p2"]
+        assert service.search_products([0.0, 0.0, 1.0], top_k=3, radius=0.9) == []
+
+    def test_reload_uses_memory_mapped_cache(self, service):
+        service.load_collections()
+        version = service.get_collection_version("products")
+        state = service.reload_collections(["products"])
+        assert state["products"]["num_entities"] == 3
+        assert service.get_collection_version("products") == version + 1
+        assert service.search_products([0.0, 1.0, 0.0], top_k=1)[0]["product_id"] == "p2"
@@ -0,0 +1,27 @@
+import math
+import pytest
+from shopassist_api.infrastructure.services.milvus_index_profiles import (
+    INDEX_PROFILES, build_index_params, build_search_params, normalize_vectors
+)
+
+
+class TestMilvusIndexProfiles:
+    def test_search_params_match_profile(self):
+        assert build_search_params("hnsw", ef=128, nprobe=16)["params"]["ef"] == 128
+        ivf = build_search_params("ivf_sq8", ef=128, nprobe=16, radius=0.5)
+        assert ivf["metric_type"] == "IP"
+        assert ivf["params"] == {"nprobe": 16, "radius": 0.5}
+
+    def test_index_params_adjusted_to_collection(self):
+        pq = build_index_params("ivf_pq", dim=1000, num_entities=100)
+        assert 1000 % pq["params"]["m"] == 0
+        assert pq["params"]["nlist"] == 40
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError):
+            build_search_params("flat", ef=64, nprobe=8)
+
+    def test_ip_profiles_normalize(self):
+        assert all(p["metric_type"] == "IP" for p in INDEX_PROFILES.values() if p["normalize"])
+        vector = normalize_vectors([[3.0, 4.0]])[0]
+        assert math.isclose(vector[0], 0.6) and math.isclose(vector[1], 0.8)
@@ -0,0 +1,56 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from shopassist_api.application.services.product_hydrator import ProductHydrator
+
+FIELDS = ["id", "name", "category", "price"]
+
+
+def project(product_ids, fields, partition_keys=None):
+    return [{"id": pid, "name": f"Product {pid}", "category": "Headphones", "price": 10.0}
+            for pid in product_ids if pid != "missing"]
+
+
+class TestProductHydrator:
+    def setup_method(self):
+        ProductHydrator.clear()
+        ProductHydrator._stats = {"hits": 0, "misses": 0, "fetches": 0}
+        self.repository = MagicMock()
+        self.repository.get_product_projections = AsyncMock(side_effect=project)
+        self.hydrator = ProductHydrator(self.repository, fields=FIELDS, cache_size=2, ttl=60)
+
+    async def test_hydrate_joins_in_hit_order_with_partition_keys(self):
+        hits = [
+            {"product_id": "p2", "distance": 0.9, "text": "second", "category": "Headphones"},
+            {"product_id": "p1", "distance": 0.8, "text": "first", "category": "Headphones"},
+            {"product_id": "missing", "distance": 0.7, "text": "gone"},
+        ]
+        enriched = await self.hydrator.hydrate(hits)
+        assert [p["id"] for p in enriched] == ["p2", "p1"]
+        assert enriched[0]["distance"] == 0.9 and enriched[0]["matched_text"] == "second"
+
+        kwargs = self.repository.get_product_projections.call_args.kwargs
+        assert kwargs["fields"] == FIELDS
+        assert kwargs["partition_keys"] == {"p2": "Headphones", "p1": "Headphones"}
+
+    async def test_cached_products_are_not_fetched_again(self):
+        await self.hydrator.get_products(["p1", "p2"])
+        products = await self.hydrator.get_products(["p1", "p2"])
+        assert set(products) == {"p1", "p2"}
+        assert self.repository.get_product_projections.await_count == 1
+        assert ProductHydrator.get_stats()["hits"] == 2
+
+    async def test_cache_is_bounded_lru(self):
+        await self.hydrator.get_products(["p1", "p2"])
+        await self.hydrator.get_products(["p1"])  # p1 most recently used
+        await self.hydrator.get_products(["p3"])
+        assert list(ProductHydrator._cache) == ["p1", "p3"]
+
+    async def test_expired_entries_are_refetched(self):
+        hydrator = ProductHydrator(self.repository, fields=FIELDS, cache_size=10, ttl=-1)
+        await hydrator.get_products(["p1"])
+        await hydrator.get_products(["p1"])
+        assert self.repository.get_product_projections.await_count == 2
+
+    def test_id_is_always_projected(self):
+        hydrator = ProductHydrator(self.repository, fields=["name"])
+        assert hydrator.fields == ["id", "name"]
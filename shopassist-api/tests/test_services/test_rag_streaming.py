@@ -0,0 +1,55 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from shopassist_api.application.services.rag_service import RAGService
+
+SOURCES = [{"doc_id": "returns", "text": "30 day returns"}]
+
+
+class FakeLLM:
+    def __init__(self, log):
+        self.log = log
+
+    async def streaming_response(self, messages, temperature=0.3, max_tokens=500):
+        for part in ["You can ", "return items ", "within 30 days."]:
+            self.log.append(("token", part))
+            yield {"content": part}
+        yield {
+            "response": "You can return items within 30 days.",
+            "finish_reason": "stop",
+            "tokens": {"prompt": 20, "completion": 8, "total": 28},
+            "cost": 0.0001
+        }
+
+
+class TestRAGStreaming:
+    def setup_method(self):
+        self.log = []
+        self.session_manager = MagicMock()
+        self.session_manager.get_conversation_history = AsyncMock(return_value=[])
+        self.session_manager.get_history_text = AsyncMock(return_value="")
+        self.session_manager.add_message = AsyncMock(side_effect=lambda **kwargs: self.log.append(("save", kwargs["role"])))
+        self.rag = RAGService(llm_service=FakeLLM(self.log), nanolm_service=MagicMock(),
+                              retrieval_service=MagicMock(), session_manager=self.session_manager)
+        self.rag.sufficiency_builder.analyze_sufficiency = AsyncMock(
+            return_value={"intent_query": "policy_question", "confidence": 0.9, "is_sufficient": "yes"})
+        self.rag.handle_policy_question = AsyncMock(
+            return_value=([{"role": "user", "content": "return policy?"}], SOURCES))
+
+    async def collect(self):
+        return [event async for event in self.rag.stream_answer(user_id="u1", query="return policy?", session_id="s1")]
+
+    async def test_sources_then_tokens_then_metadata(self):
+        events = await self.collect()
+        assert [event["event"] for event in events] == ["sources", "token", "token", "token", "metadata"]
+        assert events[0]["data"] == {"query_type": "policy_question", "sources": SOURCES}
+        assert "".join(event["data"]["content"] for event in events if event["event"] == "token") == \
+            "You can return items within 30 days."
+        metadata = events[-1]["data"]
+        assert metadata["tokens"]["total"] == 28
+        assert metadata["ttft_ms"] is not None
+
+    async def test_turn_is_persisted_after_the_stream(self):
+        await self.collect()
+        assert self.log[-2:] == [("save", "user"), ("save", "assistant")]
+        assistant = self.session_manager.add_message.await_args_list[-1].kwargs
+        assert assistant["content"] == "You can return items within 30 days."
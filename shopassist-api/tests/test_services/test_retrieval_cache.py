@@ -0,0 +1,73 @@
+import pytest
+from shopassist_api.application.services.retrieval_cache import RetrievalCache, canonicalize_filters
+
+
+class FakeCache:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.store[key] = value
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+
+
+class TestRetrievalCache:
+    def setup_method(self):
+        RetrievalCache._stats = {"hits": 0, "misses": 0, "errors": 0, "saved_ms": 0.0}
+        RetrievalCache._tokens = {}
+        self.cache = RetrievalCache(FakeCache(), ttl=60, version_ttl=0)
+        self.calls = 0
+
+    async def compute(self):
+        self.calls += 1
+        return [{"product_id": "p1", "distance": 0.9}]
+
+    def test_canonicalize_filters_is_order_independent(self):
+        a = canonicalize_filters({"max_price": 100, "categories": ["b", "a"]})
+        b = canonicalize_filters({"categories": ["a", "b"], "max_price": 100})
+        assert a == b
+        assert canonicalize_filters(None) == {}
+
+    async def test_normalised_query_and_filters_hit(self):
+        await self.cache.get_or_compute("products", 1, "Wireless  Headphones", {"categories": ["b", "a"]}, 3, True, self.compute)
+        results = await self.cache.get_or_compute("products", 1, "wireless headphones", {"categories": ["a", "b"]}, 3, True, self.compute)
+        assert results == [{"product_id": "p1", "distance": 0.9}]
+        assert self.calls == 1
+        stats = RetrievalCache.get_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["hit_ratio"] == pytest.approx(0.5)
+
+    async def test_key_includes_top_k_enriched_and_version(self):
+        await self.cache.get_or_compute("products", 1, "q", None, 3, True, self.compute)
+        await self.cache.get_or_compute("products", 1, "q", None, 5, True, self.compute)
+        await self.cache.get_or_compute("products", 1, "q", None, 3, False, self.compute)
+        await self.cache.get_or_compute("products", 2, "q", None, 3, True, self.compute)
+        assert self.calls == 4
+
+    async def test_invalidate_moves_to_new_keys(self):
+        await self.cache.get_or_compute("products", 1, "q", None, 3, True, self.compute)
+        await self.cache.invalidate("products")
+        await self.cache.get_or_compute("products", 1, "q", None, 3, True, self.compute)
+        assert self.calls == 2
+
+    async def test_empty_results_not_cached(self):
+        async def empty():
+            self.calls += 1
+            return []
+        await self.cache.get_or_compute("knowledge_base", 0, "q", None, 3, False, empty)
+        await self.cache.get_or_compute("knowledge_base", 0, "q", None, 3, False, empty)
+        assert self.calls == 2
+
+    async def test_cache_errors_fall_through(self):
+        class BrokenCache(FakeCache):
+            async def get(self, key):
+                raise ConnectionError("redis down")
+        cache = RetrievalCache(BrokenCache(), ttl=60, version_ttl=0)
+        results = await cache.get_or_compute("products", 1, "q", None, 3, True, self.compute)
+        assert results and self.calls == 1
+        assert RetrievalCache.get_stats()["errors"] == 1
@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from shopassist_api.application.services.retrieval_service import RetrievalService
+
+class TestRetrievalService:
+    def setup_method(self):
+        self.vector_service = MagicMock()
+        self.embedding_service = MagicMock()
+        self.repository_service = MagicMock()
+        self.category_embedder_service = MagicMock()
+        self.service = RetrievalService(
+            vector_service=self.vector_service,
+            embedding_service=self.embedding_service,
+            repository_service=self.repository_service,
+            category_embedder_service=self.category_embedder_service
+        )
+
+    def test_fuse_query_results_keeps_best_hit(self):
+        results_per_query = [
+            [{"product_id": "p1", "distance": 0.6, "text": "a"},
+             {"product_id": "p2", "distance": 0.7, "text": "b"}],
+            [{"product_id": "p1", "distance": 0.9, "text": "c"}],
+        ]
+        fused = self.service._fuse_query_results(results_per_query)
+        by_id = {p["product_id"]: p for p in fused}
+        assert len(fused) == 2
+        assert by_id["p1"]["distance"] == 0.9
+        assert by_id["p1"]["matched_queries"] == [0, 1]
+        assert by_id["p2"]["matched_queries"] == [0]
+
+    async def test_retrieve_products_query_list_single_batched_search(self):
+        self.embedding_service.generate_embeddings = AsyncMock(return_value=[[0.1], [0.2], [0.3]])
+        self.vector_service.asearch_products_batch = AsyncMock(return_value=[
+            [{"product_id": "p1", "distance": 0.8, "text": "a"}],
+            [],
+            [{"product_id": "p1", "distance": 0.85, "text": "b"}],
+        ])
+        products = await self.service.retrieve_products_query_list(
+            ["q1", "q2", "q3"], top_k=3, enriched=False)
+
+        self.embedding_service.generate_embeddings.assert_awaited_once_with(["q1", "q2", "q3"])
+        self.vector_service.asearch_products_batch.assert_awaited_once()
+        assert len(products) == 1
+        assert products[0]["distance"] == 0.85
+
+    def test_reciprocal_rank_fusion_merges_both_lists(self):
+        vector_hits = [{"product_id": "p1", "distance": 0.9}, {"product_id": "p2", "distance": 0.8}]
+        keyword_hits = [{"product_id": "p2", "keyword_score": 7.5}, {"product_id": "p3", "keyword_score": 3.0}]
+        fused = self.service._reciprocal_rank_fusion([(vector_hits, 1.0), (keyword_hits, 1.0)], rrf_k=60)
+        assert [p["product_id"] for p in fused] == ["p2", "p1", "p3"]
+        assert fused[0]["vector_distance"] == 0.8
+        assert fused[0]["keyword_score"] == 7.5
+        assert fused[0]["distance"] == pytest.approx(1 / 62 + 1 / 61)
+
+    def test_build_filter_expression_parameterised(self):
+        expr, params = self.service._build_filter_expression(
+            {"max_price": 500, "categories": ["Laptops", "Tablets"], "brand": "O'Neil"})
+        assert expr == "price <= {max_price} and category in {categories} and brand == {brand}"
+        assert params == {"max_price": 500.0, "categories": ["Laptops", "Tablets"], "brand": "O'Neil"}
+        assert self.service._build_filter_expression({}) == (None, {})
+
+    def test_build_filter_expression_category_and_categories(self):
+        expr, params = self.service._build_filter_expression({"category": "Laptops", "categories": ["Laptops", "Tablets"]})
+        assert expr == "category == {category} and category in {categories}"
+        assert params == {"category": "Laptops", "categories": ["Laptops", "Tablets"]}
+
+    def test_category_radius_prefers_tuned_index_radius(self, monkeypatch):
+        from shopassist_api.application.settings.config import settings
+        monkeypatch.setattr(settings, "category_index_enabled", True)
+        monkeypatch.setattr(settings, "category_index_search_radius", 0.62)
+        assert self.service.category_radius() == 0.62
+        monkeypatch.setattr(settings, "category_index_search_radius", None)
+        assert self.service.category_radius() == settings.threshold_category_similarity
+        monkeypatch.setattr(settings, "category_index_search_radius", 0.62)
+        monkeypatch.setattr(settings, "category_index_enabled", False)
+        assert self.service.category_radius() == settings.threshold_category_similarity
@@ -0,0 +1,75 @@
+import pytest
+from shopassist_api.application.services.retrieval_cache import RetrievalCache
+from shopassist_api.application.services.semantic_cache import SemanticAnswerCache
+from shopassist_api.infrastructure.services.local_semantic_cache_store import LocalSemanticCacheStore
+
+VECTORS = {
+    "what's your return policy": [1.0, 0.0, 0.0],
+    "how do returns work": [0.98, 0.05, 0.0],
+    "do you ship to canada": [0.0, 1.0, 0.0],
+}
+
+
+class FakeEmbedder:
+    async def generate_embedding(self, text):
+        return VECTORS[text]
+
+
+class FakeCache:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.store[key] = value
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+
+
+class TestSemanticAnswerCache:
+    def setup_method(self):
+        SemanticAnswerCache._stats = {"hits": 0, "misses": 0, "stores": 0, "errors": 0, "saved_ms": 0.0, "saved_tokens": 0}
+        RetrievalCache._tokens = {}
+        LocalSemanticCacheStore._entries, LocalSemanticCacheStore._matrix = [], None
+        self.redis = FakeCache()
+        self.cache = SemanticAnswerCache(LocalSemanticCacheStore(max_entries=10), FakeEmbedder(), self.redis,
+                                         threshold=0.9, ttl=60)
+        self.cache.catalog.version_ttl = 0
+
+    async def store_policy_answer(self):
+        await self.cache.store("rag", "what's your return policy", "policy_question",
+                               {"response": "30 days", "sources": []}, latency_ms=1200.0, tokens=350)
+
+    async def test_paraphrase_hits_within_intent_scope(self):
+        await self.store_policy_answer()
+        entry = await self.cache.lookup("rag", "how do returns work", ["policy_question"])
+        assert entry["response"] == "30 days"
+        assert entry["intent"] == "policy_question"
+        assert entry["similarity"] >= 0.9
+        stats = SemanticAnswerCache.get_stats()
+        assert stats["hits"] == 1 and stats["saved_tokens"] == 350
+
+    async def test_dissimilar_query_misses(self):
+        await self.store_policy_answer()
+        assert await self.cache.lookup("rag", "do you ship to canada", ["policy_question"]) is None
+        assert SemanticAnswerCache.get_stats()["misses"] == 1
+
+    async def test_other_intent_or_namespace_misses(self):
+        await self.store_policy_answer()
+        assert await self.cache.lookup("rag", "how do returns work", ["product_search"]) is None
+        assert await self.cache.lookup("orchestrator", "how do returns work", ["policy_question"]) is None
+
+    async def test_catalog_invalidation_hides_old_answers(self):
+        await self.store_policy_answer()
+        await self.cache.catalog.invalidate("knowledge_base")
+        assert await self.cache.lookup("rag", "how do returns work", ["policy_question"]) is None
+
+    async def test_local_store_evicts_oldest_entries(self):
+        store = LocalSemanticCacheStore(max_entries=2)
+        for i in range(3):
+            await store.store("rag", [1.0, float(i), 0.0], "chitchat", "v", {"response": str(i)}, ttl=60)
+        assert len(LocalSemanticCacheStore._entries) == 2
+        assert [e["payload"]["response"] for e in LocalSemanticCacheStore._entries] == ["1", "2"]
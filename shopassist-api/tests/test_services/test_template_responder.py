@@ -0,0 +1,82 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from shopassist_api.application.prompts.templates import ResponseTemplates
+from shopassist_api.application.services.rag_service import RAGService
+from shopassist_api.application.services.template_responder import TemplateResponder
+
+EN = ResponseTemplates.TEMPLATES["en"]
+ES = ResponseTemplates.TEMPLATES["es"]
+
+
+def message(role, products=None):
+    return SimpleNamespace(role=role, metadata={"products": products or []})
+
+
+class TestTemplateResponder:
+    def setup_method(self):
+        TemplateResponder._stats = {"template": 0, "llm": 0, "classifier_skipped": 0}
+        self.responder = TemplateResponder(mode="template", default_locale="en")
+
+    def test_match_only_bare_greetings_and_thanks(self):
+        assert self.responder.match("hi there!") == "greeting"
+        assert self.responder.match("thanks a lot") == "thanks"
+        assert self.responder.match("ok thanks, bye") == "goodbye"
+        assert self.responder.match("hi, I need a laptop") is None
+        assert self.responder.match("what is the return policy") is None
+        assert TemplateResponder.get_stats()["classifier_skipped"] == 3
+
+    def test_locale_from_message(self):
+        assert self.responder.respond("chitchat", "hola") == ES["greeting"][0]
+        assert self.responder.respond("chitchat", "muchas gracias") == ES["thanks"][0]
+        assert self.responder.respond("chitchat", "hello") == EN["greeting"][0]
+        # no known words: default locale
+        assert self.responder.respond("chitchat", "42?") == EN["chitchat"][0]
+
+    def test_session_context_varies_the_answer(self):
+        history = [message("user"), message("assistant", products=[{"id": "p1"}])]
+        assert self.responder.respond("chitchat", "thank you", history) == EN["thanks_products"][0]
+        assert self.responder.respond("chitchat", "hey", history) == EN["greeting_returning"][0]
+        history.append(message("user"))
+        assert self.responder.respond("chitchat", "hey", history) == EN["greeting_returning"][1]
+
+    def test_out_of_scope(self):
+        assert self.responder.respond("out_of_scope", "where is my order") == EN["out_of_scope"][0]
+
+    def test_llm_mode_is_disabled(self):
+        assert not TemplateResponder(mode="llm").enabled
+
+
+class TestRAGTemplateTurns:
+    def setup_method(self):
+        TemplateResponder._stats = {"template": 0, "llm": 0, "classifier_skipped": 0}
+        self.llm = MagicMock()
+        self.llm.generate_response = AsyncMock()
+        self.session_manager = MagicMock()
+        self.session_manager.get_conversation_history = AsyncMock(return_value=[])
+        self.session_manager.get_history_text = AsyncMock(return_value="")
+        self.session_manager.add_message = AsyncMock()
+        self.rag = RAGService(llm_service=self.llm, nanolm_service=MagicMock(),
+                              retrieval_service=MagicMock(), session_manager=self.session_manager)
+        self.rag.template_responder = TemplateResponder(mode="template", default_locale="en")
+        self.rag.sufficiency_builder.analyze_sufficiency = AsyncMock(
+            return_value={"intent_query": "out_of_scope", "confidence": 0.9, "is_sufficient": "yes"})
+
+    async def test_bare_greeting_skips_classifier_and_llm(self):
+        result = await self.rag.generate_answer(user_id="u1", query="Hello!", session_id="s1")
+        assert result["response"] == EN["greeting"][0]
+        assert result["query_type"] == "chitchat"
+        assert result["metadata"]["tokens"]["total"] == 0
+        self.rag.sufficiency_builder.analyze_sufficiency.assert_not_awaited()
+        self.llm.generate_response.assert_not_awaited()
+
+    async def test_classified_out_of_scope_answered_from_template(self):
+        result = await self.rag.generate_answer(user_id="u1", query="where is my order", session_id="s1")
+        assert result["response"] == EN["out_of_scope"][0]
+        self.llm.generate_response.assert_not_awaited()
+        assert self.session_manager.add_message.await_count == 2
+
+    async def test_stream_template_turn(self):
+        events = [event async for event in self.rag.stream_answer(user_id="u1", query="thanks!", session_id="s1")]
+        assert [event["event"] for event in events] == ["sources", "token", "metadata"]
+        assert events[1]["data"]["content"] == EN["thanks"][0]